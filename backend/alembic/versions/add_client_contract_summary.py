@@ -0,0 +1,46 @@
+"""add_client_contract_summary
+
+Revision ID: add_client_contract_summary
+Revises: 43643a6332bb
+Create Date: 2025-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_client_contract_summary'
+down_revision = '43643a6332bb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-client active contract counter read by the client list
+    op.create_table('t_client_contract_summary',
+        sa.Column('client_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('active_contracts_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['client_id'], ['app.m_client.client_id'], ),
+        sa.PrimaryKeyConstraint('client_id'),
+        schema='app'
+    )
+
+    # Per-client refreshes filter p_candidate_client by client_id
+    op.create_index('ix_p_candidate_client_client_id', 'p_candidate_client', ['client_id'], unique=False, schema='app')
+
+    # Backfill counters from existing placements
+    op.execute("""
+        INSERT INTO app.t_client_contract_summary (client_id, active_contracts_count, updated_on)
+        SELECT c.client_id, COUNT(pcc.pcc_id) FILTER (WHERE pcc.status = 0), NOW()
+        FROM app.m_client c
+        LEFT JOIN app.p_candidate_client pcc ON pcc.client_id = c.client_id
+        GROUP BY c.client_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_p_candidate_client_client_id', table_name='p_candidate_client', schema='app')
+    op.drop_table('t_client_contract_summary', schema='app')
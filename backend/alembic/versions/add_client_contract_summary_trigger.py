@@ -0,0 +1,74 @@
+"""add_client_contract_summary_trigger
+
+Revision ID: add_client_contract_summary_trigger
+Revises: add_contractor_hours_key_guards
+Create Date: 2025-11-05 00:00:00.000000
+
+t_client_contract_summary was kept up to date by recounting a client's active
+placements in the writer's snapshot. Two concurrent placements for one client
+each counted only their own uncommitted row, and the second upsert overwrote
+the first, leaving the counter one low. A row trigger on p_candidate_client
+now applies +1/-1 deltas instead, so concurrent writers add up (the upsert
+locks the summary row) and writes made outside the API are counted too.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_client_contract_summary_trigger'
+down_revision = 'add_contractor_hours_key_guards'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE FUNCTION app.apply_client_contract_delta(p_client_id uuid, p_delta integer) RETURNS void AS $$
+        BEGIN
+            IF p_client_id IS NULL OR p_delta = 0 THEN
+                RETURN;
+            END IF;
+            INSERT INTO app.t_client_contract_summary AS s (client_id, active_contracts_count, updated_on)
+            VALUES (p_client_id, GREATEST(p_delta, 0), now())
+            ON CONFLICT (client_id) DO UPDATE
+            SET active_contracts_count = s.active_contracts_count + p_delta, updated_on = now();
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION app.maintain_client_contract_summary() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 0 THEN
+                PERFORM app.apply_client_contract_delta(OLD.client_id, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 0 THEN
+                PERFORM app.apply_client_contract_delta(NEW.client_id, 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_p_candidate_client_contract_summary
+        AFTER INSERT OR DELETE OR UPDATE OF status, client_id ON app.p_candidate_client
+        FOR EACH ROW EXECUTE FUNCTION app.maintain_client_contract_summary()
+    """)
+
+    # Counters may already be off from the old recount; start the deltas from a fresh count
+    op.execute("""
+        INSERT INTO app.t_client_contract_summary AS s (client_id, active_contracts_count, updated_on)
+        SELECT c.client_id, COUNT(pcc.pcc_id) FILTER (WHERE pcc.status = 0), NOW()
+        FROM app.m_client c
+        LEFT JOIN app.p_candidate_client pcc ON pcc.client_id = c.client_id
+        GROUP BY c.client_id
+        ON CONFLICT (client_id) DO UPDATE
+        SET active_contracts_count = EXCLUDED.active_contracts_count,
+            updated_on = EXCLUDED.updated_on
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_p_candidate_client_contract_summary ON app.p_candidate_client")
+    op.execute("DROP FUNCTION IF EXISTS app.maintain_client_contract_summary()")
+    op.execute("DROP FUNCTION IF EXISTS app.apply_client_contract_delta(uuid, integer)")
@@ -0,0 +1,87 @@
+"""add_client_roster_version
+
+Revision ID: add_client_roster_version
+Revises: add_holiday_opening_timesheet_entries
+Create Date: 2025-11-01 00:00:00.000000
+
+A version counter per client (t_client_roster_version), bumped by triggers
+whenever something a client's roster shows changes: a p_candidate_client row
+of the client, or the name, email or deletion of a candidate placed with it.
+Every API worker checks a cached roster against it (one primary key lookup),
+so a write handled by one worker, or made outside the API, is seen by all.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_client_roster_version'
+down_revision = 'add_holiday_opening_timesheet_entries'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('t_client_roster_version',
+        sa.Column('client_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default=sa.text('1'), nullable=False),
+        sa.Column('updated_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('client_id'),
+        schema='app'
+    )
+
+    op.execute("""
+        CREATE FUNCTION app.bump_client_roster_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'p_candidate_client' THEN
+                IF TG_OP <> 'DELETE' THEN
+                    INSERT INTO app.t_client_roster_version AS v (client_id, version, updated_on)
+                    VALUES (NEW.client_id, 1, now())
+                    ON CONFLICT (client_id) DO UPDATE SET version = v.version + 1, updated_on = now();
+                END IF;
+                -- A moved or deleted placement also changes the roster it left
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO app.t_client_roster_version AS v (client_id, version, updated_on)
+                    VALUES (OLD.client_id, 1, now())
+                    ON CONFLICT (client_id) DO UPDATE SET version = v.version + 1, updated_on = now();
+                ELSIF TG_OP = 'UPDATE' THEN
+                    IF OLD.client_id IS DISTINCT FROM NEW.client_id THEN
+                        INSERT INTO app.t_client_roster_version AS v (client_id, version, updated_on)
+                        VALUES (OLD.client_id, 1, now())
+                        ON CONFLICT (client_id) DO UPDATE SET version = v.version + 1, updated_on = now();
+                    END IF;
+                END IF;
+            ELSE
+                INSERT INTO app.t_client_roster_version AS v (client_id, version, updated_on)
+                SELECT DISTINCT pcc.client_id, 1, now()
+                FROM app.p_candidate_client pcc
+                WHERE pcc.candidate_id = NEW.user_id
+                ON CONFLICT (client_id) DO UPDATE SET version = v.version + 1, updated_on = now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_p_candidate_client_roster_version
+        AFTER INSERT OR UPDATE OR DELETE ON app.p_candidate_client
+        FOR EACH ROW EXECUTE FUNCTION app.bump_client_roster_version()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_m_user_roster_version
+        AFTER UPDATE OF first_name, last_name, email_id, deleted_on ON app.m_user
+        FOR EACH ROW
+        WHEN (OLD.first_name IS DISTINCT FROM NEW.first_name
+              OR OLD.last_name IS DISTINCT FROM NEW.last_name
+              OR OLD.email_id IS DISTINCT FROM NEW.email_id
+              OR OLD.deleted_on IS DISTINCT FROM NEW.deleted_on)
+        EXECUTE FUNCTION app.bump_client_roster_version()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_m_user_roster_version ON app.m_user")
+    op.execute("DROP TRIGGER IF EXISTS trg_p_candidate_client_roster_version ON app.p_candidate_client")
+    op.execute("DROP FUNCTION IF EXISTS app.bump_client_roster_version()")
+    op.drop_table('t_client_roster_version', schema='app')
@@ -0,0 +1,105 @@
+"""add_contractor_hours_change_xid
+
+Revision ID: add_contractor_hours_change_xid
+Revises: add_payroll_batch_job
+Create Date: 2025-11-03 00:00:00.000000
+
+Commit-order watermarks for contractor hours delta sync
+(crud.list_contractor_hours_changes), replacing the timestamp index.
+
+Every insert or update of t_contractor_hours stamps the row with the writing
+transaction's id (change_xid, set by a trigger). A poll returns
+pg_snapshot_xmin(pg_current_snapshot()) as its watermark: every transaction
+below it has finished, and every one still running has an id at or above it.
+So the next poll's change_xid >= watermark catches rows of transactions that
+commit later, however long they ran.
+
+Rows that leave a timesheet (moved to another one by an upsert, or hard
+deleted) are recorded in t_contractor_hours_removed under the timesheet they
+left, so its clients can drop them.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_contractor_hours_change_xid'
+down_revision = 'add_payroll_batch_job'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('t_contractor_hours', sa.Column('change_xid', sa.BigInteger(), nullable=True), schema='app')
+    op.execute("""
+        CREATE FUNCTION app.set_contractor_hours_change_xid() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_t_contractor_hours_change_xid
+        BEFORE INSERT OR UPDATE ON app.t_contractor_hours
+        FOR EACH ROW EXECUTE FUNCTION app.set_contractor_hours_change_xid()
+    """)
+
+    op.create_table('t_contractor_hours_removed',
+        sa.Column('removed_id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('tch_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('timesheet_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('change_xid', sa.BigInteger(), nullable=False),
+        sa.Column('removed_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('removed_id'),
+        schema='app'
+    )
+    op.create_index('ix_t_contractor_hours_removed_timesheet_id_change_xid', 't_contractor_hours_removed',
+                    ['timesheet_id', 'change_xid'], schema='app')
+    # A move to another partition (work_date changed) also fires the delete trigger;
+    # the sync query skips ids still live in the timesheet
+    op.execute("""
+        CREATE FUNCTION app.record_contractor_hours_removed() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO app.t_contractor_hours_removed (tch_id, timesheet_id, change_xid)
+            VALUES (OLD.tch_id, OLD.timesheet_id, pg_current_xact_id()::text::bigint);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_t_contractor_hours_moved
+        AFTER UPDATE OF timesheet_id ON app.t_contractor_hours
+        FOR EACH ROW WHEN (OLD.timesheet_id IS DISTINCT FROM NEW.timesheet_id)
+        EXECUTE FUNCTION app.record_contractor_hours_removed()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_t_contractor_hours_deleted
+        AFTER DELETE ON app.t_contractor_hours
+        FOR EACH ROW EXECUTE FUNCTION app.record_contractor_hours_removed()
+    """)
+
+    op.drop_index('ix_t_contractor_hours_timesheet_id_changed_on', table_name='t_contractor_hours', schema='app')
+    # Created on the partitioned parent, so each yearly partition gets its own copy
+    op.create_index('ix_t_contractor_hours_timesheet_id_change_xid', 't_contractor_hours',
+                    ['timesheet_id', 'change_xid'], schema='app')
+
+
+def downgrade():
+    op.drop_index('ix_t_contractor_hours_timesheet_id_change_xid', table_name='t_contractor_hours', schema='app')
+    op.create_index(
+        'ix_t_contractor_hours_timesheet_id_changed_on',
+        't_contractor_hours',
+        ['timesheet_id', sa.text('greatest(created_on, updated_on, deleted_on)')],
+        schema='app'
+    )
+    op.execute("DROP TRIGGER IF EXISTS trg_t_contractor_hours_deleted ON app.t_contractor_hours")
+    op.execute("DROP TRIGGER IF EXISTS trg_t_contractor_hours_moved ON app.t_contractor_hours")
+    op.execute("DROP FUNCTION IF EXISTS app.record_contractor_hours_removed()")
+    op.drop_index('ix_t_contractor_hours_removed_timesheet_id_change_xid', table_name='t_contractor_hours_removed',
+                  schema='app')
+    op.drop_table('t_contractor_hours_removed', schema='app')
+    op.execute("DROP TRIGGER IF EXISTS trg_t_contractor_hours_change_xid ON app.t_contractor_hours")
+    op.execute("DROP FUNCTION IF EXISTS app.set_contractor_hours_change_xid()")
+    op.drop_column('t_contractor_hours', 'change_xid', schema='app')
@@ -0,0 +1,103 @@
+"""add_contractor_hours_key_guards
+
+Revision ID: add_contractor_hours_key_guards
+Revises: add_contractor_hours_change_xid
+Create Date: 2025-11-04 00:00:00.000000
+
+Closes two gaps left by partitioning t_contractor_hours (partition_contractor_hours):
+
+- The trigger standing in for the t_contractor_rate_hours.tch_id foreign key
+  only checked that the parent row existed, so a rate hours insert and a
+  concurrent delete of its parent could both pass. It now takes FOR KEY SHARE
+  on the parent row, as a real foreign key does: the delete waits for the
+  insert to commit (and then sees the reference), or the insert waits for the
+  delete and finds no parent.
+- The primary key is (tch_id, work_date), so nothing enforced tch_id alone
+  any more. A trigger now refuses a second row with the same tch_id;
+  inserts of one tch_id are serialized with a transaction advisory lock so
+  two concurrent ones cannot both pass the check.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_contractor_hours_key_guards'
+down_revision = 'add_contractor_hours_change_xid'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.check_contractor_rate_hours_tch()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF NEW.tch_id IS NOT NULL THEN
+                PERFORM 1 FROM app.t_contractor_hours WHERE tch_id = NEW.tch_id FOR KEY SHARE;
+                IF NOT FOUND THEN
+                    RAISE EXCEPTION 'insert or update on table "t_contractor_rate_hours" violates foreign key: tch_id % not present in "t_contractor_hours"', NEW.tch_id
+                        USING ERRCODE = 'foreign_key_violation';
+                END IF;
+            END IF;
+            RETURN NEW;
+        END;
+        $$
+    """)
+
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM app.t_contractor_hours GROUP BY tch_id HAVING count(*) > 1) THEN
+                RAISE EXCEPTION 't_contractor_hours has duplicate tch_id values; resolve them before upgrading'
+                    USING ERRCODE = 'unique_violation';
+            END IF;
+        END $$;
+    """)
+    op.execute("""
+        CREATE FUNCTION app.check_contractor_hours_tch_unique()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            -- Moving a row to another work_date keeps its tch_id; nothing new to check
+            IF TG_OP = 'UPDATE' AND NEW.tch_id = OLD.tch_id THEN
+                RETURN NEW;
+            END IF;
+            PERFORM pg_advisory_xact_lock(hashtext('t_contractor_hours.tch_id'), hashtext(NEW.tch_id::text));
+            IF EXISTS (SELECT 1 FROM app.t_contractor_hours WHERE tch_id = NEW.tch_id) THEN
+                RAISE EXCEPTION 'duplicate key value violates unique constraint on "t_contractor_hours": tch_id % already exists', NEW.tch_id
+                    USING ERRCODE = 'unique_violation';
+            END IF;
+            RETURN NEW;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_contractor_hours_tch_unique
+        BEFORE INSERT OR UPDATE OF tch_id ON app.t_contractor_hours
+        FOR EACH ROW EXECUTE FUNCTION app.check_contractor_hours_tch_unique()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_contractor_hours_tch_unique ON app.t_contractor_hours")
+    op.execute("DROP FUNCTION IF EXISTS app.check_contractor_hours_tch_unique()")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.check_contractor_rate_hours_tch()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF NEW.tch_id IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM app.t_contractor_hours WHERE tch_id = NEW.tch_id
+            ) THEN
+                RAISE EXCEPTION 'insert or update on table "t_contractor_rate_hours" violates foreign key: tch_id % not present in "t_contractor_hours"', NEW.tch_id
+                    USING ERRCODE = 'foreign_key_violation';
+            END IF;
+            RETURN NEW;
+        END;
+        $$
+    """)
@@ -0,0 +1,31 @@
+"""add_contractor_hours_period_index
+
+Revision ID: add_contractor_hours_period_index
+Revises: add_trigram_search_indexes
+Create Date: 2025-10-21 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_contractor_hours_period_index'
+down_revision = 'add_trigram_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Payroll aggregates t_contractor_hours by contractor over a work_date range
+    op.create_index(
+        'ix_t_contractor_hours_work_date_contractor_id',
+        't_contractor_hours',
+        ['work_date', 'contractor_id'],
+        unique=False,
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_t_contractor_hours_work_date_contractor_id', table_name='t_contractor_hours', schema='app')
@@ -0,0 +1,35 @@
+"""add_contractor_hours_sync_index
+
+Revision ID: add_contractor_hours_sync_index
+Revises: add_holiday_backfill_checkpoint
+Create Date: 2025-10-30 00:00:00.000000
+
+Index for crud.list_contractor_hours_changes (delta sync of a timesheet's
+contractor hours): a timesheet's rows by their latest change, whether that was
+the insert, an update or the soft delete. Not partial, because deleted rows
+must be found too. The expression has to match the query's
+greatest(created_on, updated_on, deleted_on) exactly to be used.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_contractor_hours_sync_index'
+down_revision = 'add_holiday_backfill_checkpoint'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Created on the partitioned parent, so each yearly partition gets its own copy
+    op.create_index(
+        'ix_t_contractor_hours_timesheet_id_changed_on',
+        't_contractor_hours',
+        ['timesheet_id', sa.text('greatest(created_on, updated_on, deleted_on)')],
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_t_contractor_hours_timesheet_id_changed_on', table_name='t_contractor_hours', schema='app')
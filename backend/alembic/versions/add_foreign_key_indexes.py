@@ -0,0 +1,104 @@
+"""add_foreign_key_indexes
+
+Revision ID: add_foreign_key_indexes
+Revises: partition_contractor_hours
+Create Date: 2025-10-27 00:00:00.000000
+
+Indexes for the foreign key lookups that crud, the invoice router and the
+payroll/invoice services run on every request. Most of those queries also
+filter on deleted_on IS NULL, so the indexes are partial on live rows and
+ordered to match the query's filter and sort columns.
+
+Already covered elsewhere and not repeated here:
+  - t_contractor_hours (work_date, contractor_id): add_contractor_hours_period_index
+  - t_contractor_hours (tch_id): partition_contractor_hours
+  - p_candidate_client (client_id): add_client_contract_summary
+  - t_timesheet_entry (timesheet_id): leading column of the
+    (timesheet_id, employee_code) unique constraint
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_foreign_key_indexes'
+down_revision = 'partition_contractor_hours'
+branch_labels = None
+depends_on = None
+
+LIVE_ROWS = sa.text('deleted_on IS NULL')
+
+
+def upgrade():
+    # crud.list_contractor_hours_by_timesheet, payroll report line item resolution
+    op.create_index(
+        'ix_t_contractor_hours_timesheet_id_live',
+        't_contractor_hours',
+        ['timesheet_id'],
+        schema='app',
+        postgresql_where=LIVE_ROWS
+    )
+    # Per-contractor history (timesheets, holiday accrual) in date order
+    op.create_index(
+        'ix_t_contractor_hours_contractor_id_work_date_live',
+        't_contractor_hours',
+        ['contractor_id', 'work_date'],
+        schema='app',
+        postgresql_where=LIVE_ROWS
+    )
+    # Invoice generation joins hours to placements on pcc_id for one work_date
+    op.create_index(
+        'ix_t_contractor_hours_pcc_id_work_date',
+        't_contractor_hours',
+        ['pcc_id', 'work_date'],
+        schema='app'
+    )
+
+    # Not partial: the rate hours integrity triggers look up tch_id regardless of deleted_on
+    op.create_index(
+        'ix_t_contractor_rate_hours_tch_id',
+        't_contractor_rate_hours',
+        ['tch_id'],
+        schema='app'
+    )
+
+    # Invoice detail / payroll report line items
+    op.create_index(
+        'ix_p_invoice_line_items_invoice_id_live',
+        'p_invoice_line_items',
+        ['invoice_id'],
+        schema='app',
+        postgresql_where=LIVE_ROWS
+    )
+
+    # crud.list_contract_rates_by_pcc and the per-candidate rate lookups, newest first
+    op.create_index(
+        'ix_t_contract_rates_pcc_id_created_on_live',
+        't_contract_rates',
+        ['pcc_id', sa.text('created_on DESC')],
+        schema='app',
+        postgresql_where=LIVE_ROWS
+    )
+
+    # Placements by candidate, and crud.get_active_pcc_id by (candidate, client)
+    op.create_index(
+        'ix_p_candidate_client_candidate_id_client_id_live',
+        'p_candidate_client',
+        ['candidate_id', 'client_id'],
+        schema='app',
+        postgresql_where=LIVE_ROWS
+    )
+
+    for table in ('t_contractor_hours', 't_contractor_rate_hours', 'p_invoice_line_items',
+                  't_contract_rates', 'p_candidate_client'):
+        op.execute(f"ANALYZE app.{table}")
+
+
+def downgrade():
+    op.drop_index('ix_p_candidate_client_candidate_id_client_id_live', table_name='p_candidate_client', schema='app')
+    op.drop_index('ix_t_contract_rates_pcc_id_created_on_live', table_name='t_contract_rates', schema='app')
+    op.drop_index('ix_p_invoice_line_items_invoice_id_live', table_name='p_invoice_line_items', schema='app')
+    op.drop_index('ix_t_contractor_rate_hours_tch_id', table_name='t_contractor_rate_hours', schema='app')
+    op.drop_index('ix_t_contractor_hours_pcc_id_work_date', table_name='t_contractor_hours', schema='app')
+    op.drop_index('ix_t_contractor_hours_contractor_id_work_date_live', table_name='t_contractor_hours', schema='app')
+    op.drop_index('ix_t_contractor_hours_timesheet_id_live', table_name='t_contractor_hours', schema='app')
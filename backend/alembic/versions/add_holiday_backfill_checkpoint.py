@@ -0,0 +1,39 @@
+"""add_holiday_backfill_checkpoint
+
+Revision ID: add_holiday_backfill_checkpoint
+Revises: add_holiday_ledger
+Create Date: 2025-10-29 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_holiday_backfill_checkpoint'
+down_revision = 'add_holiday_ledger'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Progress of each partition of a holiday backfill job, so an interrupted run resumes
+    op.create_table('t_holiday_backfill_checkpoint',
+        sa.Column('job_name', sa.String(), nullable=False),
+        sa.Column('partition', sa.Integer(), nullable=False),
+        sa.Column('partitions', sa.Integer(), nullable=False),
+        sa.Column('last_entry_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('entries_processed', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('ledger_entries', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('holiday_hours', sa.Float(), server_default=sa.text('0'), nullable=False),
+        sa.Column('started_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('completed_on', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('job_name', 'partition'),
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_table('t_holiday_backfill_checkpoint', schema='app')
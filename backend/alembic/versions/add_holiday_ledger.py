@@ -0,0 +1,134 @@
+"""add_holiday_ledger
+
+Revision ID: add_holiday_ledger
+Revises: add_foreign_key_indexes
+Create Date: 2025-10-28 00:00:00.000000
+
+Append-only holiday ledger (t_holiday_ledger) with running balances per
+candidate and source (t_holiday_balance).
+
+v_contractor_hours_holiday gives each t_contractor_hours row's holiday
+figures the way the holiday summary always counted them: hours worked are
+the standard rate hours (rate type 1, frequency 1), falling back to
+standard_hours, and holiday taken is the quantity booked against rate types
+named like 'holiday'. The ledger is seeded from it for all existing hours;
+those 'contractor_hours' entries feed t_holiday_balance only, as the holiday
+summary was always a figure of its own.
+
+m_candidate.holiday_count is fed by timesheet entries alone. Each candidate's
+current holiday_count is recorded as an 'opening' entry, so a candidate's
+'timesheet_entry' and 'opening' entries always sum to holiday_count.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_holiday_ledger'
+down_revision = 'add_foreign_key_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('t_holiday_ledger',
+        sa.Column('entry_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('candidate_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('source_id', sa.String(), nullable=True),
+        sa.Column('entry_type', sa.String(), nullable=False),
+        sa.Column('hours_worked', sa.Float(), server_default=sa.text('0'), nullable=False),
+        sa.Column('holiday_hours', sa.Float(), server_default=sa.text('0'), nullable=False),
+        sa.Column('effective_date', sa.Date(), nullable=False),
+        sa.Column('created_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.ForeignKeyConstraint(['candidate_id'], ['app.m_user.user_id'], ),
+        sa.PrimaryKeyConstraint('entry_id'),
+        schema='app'
+    )
+    # Balance as of a date, and a candidate's history in order
+    op.create_index('ix_t_holiday_ledger_candidate_id_effective_date', 't_holiday_ledger',
+                    ['candidate_id', 'effective_date', 'entry_id'], schema='app')
+    # What has already been recorded for a t_contractor_hours row / timesheet entry
+    op.create_index('ix_t_holiday_ledger_source_source_id', 't_holiday_ledger',
+                    ['source', 'source_id'], schema='app')
+
+    op.create_table('t_holiday_balance',
+        sa.Column('candidate_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('hours_worked', sa.Float(), server_default=sa.text('0'), nullable=False),
+        sa.Column('total_holiday', sa.Float(), server_default=sa.text('0'), nullable=False),
+        sa.Column('holiday_taken', sa.Float(), server_default=sa.text('0'), nullable=False),
+        sa.Column('holiday_balance', sa.Float(), server_default=sa.text('0'), nullable=False),
+        sa.Column('last_entry_id', sa.Integer(), nullable=True),
+        sa.Column('updated_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['candidate_id'], ['app.m_user.user_id'], ),
+        sa.PrimaryKeyConstraint('candidate_id', 'source'),
+        schema='app'
+    )
+
+    op.execute("""
+        CREATE VIEW app.v_contractor_hours_holiday AS
+        SELECT h.tch_id,
+               h.contractor_id AS candidate_id,
+               h.work_date,
+               CASE WHEN h.deleted_on IS NULL
+                    THEN coalesce(r.standard_quantity, h.standard_hours, 0) ELSE 0 END AS hours_worked,
+               CASE WHEN h.deleted_on IS NULL
+                    THEN coalesce(r.holiday_quantity, 0) ELSE 0 END AS holiday_taken
+        FROM app.t_contractor_hours h
+        LEFT JOIN LATERAL (
+            SELECT sum(rh.quantity) FILTER (WHERE rh.rate_type_id = 1 AND rh.rate_frequency_id = 1) AS standard_quantity,
+                   sum(rh.quantity) FILTER (WHERE rt.rate_type_id IS NOT NULL) AS holiday_quantity
+            FROM app.t_contractor_rate_hours rh
+            LEFT JOIN app.m_rate_type rt
+              ON rt.rate_type_id = rh.rate_type_id
+             AND rt.deleted_on IS NULL
+             AND rt.rate_type_name ILIKE '%holiday%'
+            WHERE rh.tch_id = h.tch_id AND rh.deleted_on IS NULL
+        ) r ON true
+    """)
+
+    # Seed the ledger from the existing hours (8% of hours worked accrues as holiday)
+    op.execute("""
+        INSERT INTO app.t_holiday_ledger (candidate_id, source, source_id, entry_type, hours_worked, holiday_hours, effective_date)
+        SELECT candidate_id, 'contractor_hours', tch_id::text, 'accrual', hours_worked, hours_worked * 0.08, work_date
+        FROM app.v_contractor_hours_holiday
+        WHERE hours_worked <> 0
+        UNION ALL
+        SELECT candidate_id, 'contractor_hours', tch_id::text, 'usage', 0, -holiday_taken, work_date
+        FROM app.v_contractor_hours_holiday
+        WHERE holiday_taken <> 0
+    """)
+    op.execute("""
+        INSERT INTO app.t_holiday_ledger (candidate_id, source, entry_type, holiday_hours, effective_date)
+        SELECT c.candidate_id, 'opening', 'opening', coalesce(c.holiday_count, 0) - coalesce(l.holiday_hours, 0), CURRENT_DATE
+        FROM app.m_candidate c
+        LEFT JOIN (
+            SELECT candidate_id, sum(holiday_hours) AS holiday_hours
+            FROM app.t_holiday_ledger
+            WHERE source IN ('timesheet_entry', 'opening')
+            GROUP BY candidate_id
+        ) l ON l.candidate_id = c.candidate_id
+        WHERE coalesce(c.holiday_count, 0) - coalesce(l.holiday_hours, 0) <> 0
+    """)
+    op.execute("""
+        INSERT INTO app.t_holiday_balance (candidate_id, source, hours_worked, total_holiday, holiday_taken, holiday_balance, last_entry_id)
+        SELECT candidate_id, source,
+               sum(hours_worked),
+               coalesce(sum(holiday_hours) FILTER (WHERE entry_type = 'accrual'), 0),
+               coalesce(-sum(holiday_hours) FILTER (WHERE entry_type = 'usage'), 0),
+               sum(holiday_hours),
+               max(entry_id)
+        FROM app.t_holiday_ledger
+        GROUP BY candidate_id, source
+    """)
+
+
+def downgrade():
+    op.execute("DROP VIEW IF EXISTS app.v_contractor_hours_holiday")
+    op.drop_table('t_holiday_balance', schema='app')
+    op.drop_index('ix_t_holiday_ledger_source_source_id', table_name='t_holiday_ledger', schema='app')
+    op.drop_index('ix_t_holiday_ledger_candidate_id_effective_date', table_name='t_holiday_ledger', schema='app')
+    op.drop_table('t_holiday_ledger', schema='app')
@@ -0,0 +1,60 @@
+"""add_holiday_ledger_requested
+
+Revision ID: add_holiday_ledger_requested
+Revises: fix_contractor_hours_partition_moves
+Create Date: 2025-11-07 00:00:00.000000
+
+Holiday taken on a timesheet entry is deducted only down to a holiday count of
+0 (deduct_candidate_holiday_count), and the ledger recorded only the hours
+actually deducted. The holiday backfill compares an entry's holiday_hours with
+the usage the ledger holds for it, so it deducted the forgiven remainder again,
+uncapped, and could leave a candidate's count negative.
+
+t_holiday_ledger.holiday_requested keeps the hours asked for next to the hours
+deducted (holiday_hours) on usage entries; NULL means the two are equal. For
+every timesheet entry the ledger already tracks, this records what was asked
+for but never deducted as a usage entry of 0 hours, so the backfill finds it
+settled. Holiday counts and balances don't change.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_holiday_ledger_requested'
+down_revision = 'fix_contractor_hours_partition_moves'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        't_holiday_ledger',
+        sa.Column('holiday_requested', sa.Float(), nullable=True),
+        schema='app'
+    )
+
+    op.execute("""
+        WITH recorded AS (
+            SELECT source_id, candidate_id,
+                   max(effective_date) AS effective_date,
+                   coalesce(-sum(holiday_hours) FILTER (WHERE entry_type = 'usage'), 0) AS requested
+            FROM app.t_holiday_ledger
+            WHERE source = 'timesheet_entry'
+            GROUP BY source_id, candidate_id
+        )
+        INSERT INTO app.t_holiday_ledger (
+            candidate_id, source, source_id, entry_type, hours_worked, holiday_hours, holiday_requested, effective_date
+        )
+        SELECT r.candidate_id, 'timesheet_entry', r.source_id, 'usage', 0, 0,
+               coalesce(e.holiday_hours, 0) - r.requested,
+               r.effective_date
+        FROM recorded r
+        JOIN app.t_timesheet_entry e ON e.entry_id::text = r.source_id
+        WHERE abs(coalesce(e.holiday_hours, 0) - r.requested) > 1e-9
+    """)
+
+
+def downgrade():
+    op.execute("DELETE FROM app.t_holiday_ledger WHERE entry_type = 'usage' AND holiday_hours = 0")
+    op.drop_column('t_holiday_ledger', 'holiday_requested', schema='app')
@@ -0,0 +1,106 @@
+"""add_holiday_opening_timesheet_entries
+
+Revision ID: add_holiday_opening_timesheet_entries
+Revises: add_contractor_hours_sync_index
+Create Date: 2025-10-31 00:00:00.000000
+
+Timesheet entries created before the holiday ledger are already counted in
+each candidate's 'opening' entry (it reconciled the ledger with
+m_candidate.holiday_count), but the ledger holds nothing for them under
+source 'timesheet_entry'. The holiday backfill compares an entry's figures
+with what the ledger holds for it, so it would add their hours a second time.
+
+This records, for every entry created before the cut-over (the ledger's first
+entry), the accrual and usage the opening entry already covers, as
+'timesheet_entry' ledger entries, and takes the same amount off each
+candidate's opening balance. Holiday counts don't change; the backfill then
+finds those entries recorded and leaves them out.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_holiday_opening_timesheet_entries'
+down_revision = 'add_contractor_hours_sync_index'
+branch_labels = None
+depends_on = None
+
+UUID_PATTERN = '^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'
+OPENING_SOURCE_ID = 'timesheet_entries_before_ledger'
+
+
+def upgrade():
+    op.execute(sa.text("""
+        WITH cutover AS (
+            SELECT coalesce(min(created_on), now()) AS created_on FROM app.t_holiday_ledger
+        ), target AS (
+            SELECT e.entry_id::text AS source_id,
+                   cand.candidate_id,
+                   coalesce(e.standard_hours, 0) AS standard_hours,
+                   coalesce(e.holiday_hours, 0) AS holiday_hours,
+                   CAST(coalesce(e.created_on, cutover.created_on) AS date) AS effective_date
+            FROM app.t_timesheet_entry e
+            CROSS JOIN cutover
+            JOIN app.m_candidate cand
+              ON e.employee_code ~ :uuid_pattern AND cand.candidate_id = CAST(e.employee_code AS uuid)
+            WHERE e.created_on IS NULL OR e.created_on < cutover.created_on
+        ), recorded AS (
+            SELECT l.source_id,
+                   sum(l.hours_worked) AS hours_worked,
+                   coalesce(sum(l.holiday_hours) FILTER (WHERE l.entry_type = 'accrual'), 0) AS accrued,
+                   coalesce(-sum(l.holiday_hours) FILTER (WHERE l.entry_type = 'usage'), 0) AS taken
+            FROM app.t_holiday_ledger l
+            JOIN target t ON l.source = 'timesheet_entry' AND l.source_id = t.source_id
+            GROUP BY l.source_id
+        ), covered AS (
+            SELECT t.candidate_id, t.source_id, t.effective_date, 'accrual' AS entry_type,
+                   t.standard_hours - coalesce(r.hours_worked, 0) AS hours_worked,
+                   t.standard_hours * 0.08 - coalesce(r.accrued, 0) AS holiday_hours
+            FROM target t LEFT JOIN recorded r USING (source_id)
+            UNION ALL
+            SELECT t.candidate_id, t.source_id, t.effective_date, 'usage', 0,
+                   -(t.holiday_hours - coalesce(r.taken, 0))
+            FROM target t LEFT JOIN recorded r USING (source_id)
+        ), inserted AS (
+            INSERT INTO app.t_holiday_ledger (candidate_id, source, source_id, entry_type, hours_worked, holiday_hours, effective_date)
+            SELECT candidate_id, 'timesheet_entry', source_id, entry_type, hours_worked, holiday_hours, effective_date
+            FROM covered
+            WHERE abs(hours_worked) > 1e-9 OR abs(holiday_hours) > 1e-9
+            RETURNING candidate_id, holiday_hours
+        )
+        INSERT INTO app.t_holiday_ledger (candidate_id, source, source_id, entry_type, holiday_hours, effective_date)
+        SELECT i.candidate_id, 'opening', :opening_source_id, 'opening', -sum(i.holiday_hours),
+               CAST((SELECT created_on FROM cutover) AS date)
+        FROM inserted i
+        GROUP BY i.candidate_id
+        HAVING abs(sum(i.holiday_hours)) > 1e-9
+    """).bindparams(uuid_pattern=UUID_PATTERN, opening_source_id=OPENING_SOURCE_ID))
+
+    # Rebuild the running balances from the ledger (per-candidate totals are unchanged)
+    op.execute("""
+        INSERT INTO app.t_holiday_balance AS b (
+            candidate_id, source, hours_worked, total_holiday, holiday_taken, holiday_balance, last_entry_id, updated_on
+        )
+        SELECT candidate_id, source,
+               sum(hours_worked),
+               coalesce(sum(holiday_hours) FILTER (WHERE entry_type = 'accrual'), 0),
+               coalesce(-sum(holiday_hours) FILTER (WHERE entry_type = 'usage'), 0),
+               sum(holiday_hours),
+               max(entry_id),
+               NOW()
+        FROM app.t_holiday_ledger
+        GROUP BY candidate_id, source
+        ON CONFLICT (candidate_id, source) DO UPDATE SET
+            hours_worked = EXCLUDED.hours_worked,
+            total_holiday = EXCLUDED.total_holiday,
+            holiday_taken = EXCLUDED.holiday_taken,
+            holiday_balance = EXCLUDED.holiday_balance,
+            last_entry_id = EXCLUDED.last_entry_id,
+            updated_on = EXCLUDED.updated_on
+    """)
+
+
+def downgrade():
+    # The ledger is append-only and the entries net to zero per candidate; they are kept
+    pass
@@ -0,0 +1,31 @@
+"""add_invoice_date_index
+
+Revision ID: add_invoice_date_index
+Revises: add_payroll_period_snapshot
+Create Date: 2025-10-24 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_invoice_date_index'
+down_revision = 'add_payroll_period_snapshot'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves the available-weeks DISTINCT and the per-week invoice range lookups
+    op.create_index(
+        'ix_t_invoice_invoice_date',
+        't_invoice',
+        ['invoice_date'],
+        schema='app',
+        postgresql_where=sa.text('deleted_on IS NULL')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_t_invoice_invoice_date', table_name='t_invoice', schema='app')
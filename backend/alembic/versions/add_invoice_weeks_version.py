@@ -0,0 +1,64 @@
+"""add_invoice_weeks_version
+
+Revision ID: add_invoice_weeks_version
+Revises: store_payroll_snapshot_payload
+Create Date: 2025-11-05 00:00:00.000000
+
+A single version counter (t_invoice_weeks_version) bumped by triggers whenever
+the set of invoice weeks can change: an insert or delete on t_invoice, or an
+update of an invoice's invoice_date or deleted_on. The cached available-weeks
+list is checked against it with one primary key lookup, instead of a count and
+max() over every invoice.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_invoice_weeks_version'
+down_revision = 'store_payroll_snapshot_payload'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('t_invoice_weeks_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default=sa.text('1'), nullable=False),
+        sa.Column('updated_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.CheckConstraint('id = 1', name='ck_t_invoice_weeks_version_single_row'),
+        sa.PrimaryKeyConstraint('id'),
+        schema='app'
+    )
+    op.execute("INSERT INTO app.t_invoice_weeks_version (id, version) VALUES (1, 1)")
+
+    op.execute("""
+        CREATE FUNCTION app.bump_invoice_weeks_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE app.t_invoice_weeks_version SET version = version + 1, updated_on = now() WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # Once per insert/delete statement, so a bulk write bumps (and locks) the row once
+    op.execute("""
+        CREATE TRIGGER trg_t_invoice_weeks_version_write
+        AFTER INSERT OR DELETE OR TRUNCATE ON app.t_invoice
+        FOR EACH STATEMENT EXECUTE FUNCTION app.bump_invoice_weeks_version()
+    """)
+    # Other updates (amounts, status, ...) leave the weeks alone and don't touch the counter
+    op.execute("""
+        CREATE TRIGGER trg_t_invoice_weeks_version_update
+        AFTER UPDATE OF invoice_date, deleted_on ON app.t_invoice
+        FOR EACH ROW
+        WHEN (OLD.invoice_date IS DISTINCT FROM NEW.invoice_date
+              OR OLD.deleted_on IS DISTINCT FROM NEW.deleted_on)
+        EXECUTE FUNCTION app.bump_invoice_weeks_version()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_t_invoice_weeks_version_update ON app.t_invoice")
+    op.execute("DROP TRIGGER IF EXISTS trg_t_invoice_weeks_version_write ON app.t_invoice")
+    op.execute("DROP FUNCTION IF EXISTS app.bump_invoice_weeks_version()")
+    op.drop_table('t_invoice_weeks_version', schema='app')
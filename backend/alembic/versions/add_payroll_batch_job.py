@@ -0,0 +1,42 @@
+"""add_payroll_batch_job
+
+Revision ID: add_payroll_batch_job
+Revises: add_client_roster_version
+Create Date: 2025-11-02 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_batch_job'
+down_revision = 'add_client_roster_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Payroll batch runs and their progress, readable from any API worker
+    op.create_table('t_payroll_batch_job',
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('status', sa.String(), server_default=sa.text("'pending'"), nullable=False),
+        sa.Column('parallel', sa.Boolean(), server_default=sa.text('true'), nullable=False),
+        sa.Column('total_periods', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('processed_periods', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('period_ids', postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column('results', postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column('seconds', sa.Float(), nullable=True),
+        sa.Column('periods_per_second', sa.Float(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('completed_on', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('job_id'),
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_table('t_payroll_batch_job', schema='app')
@@ -0,0 +1,34 @@
+"""add_payroll_dirty_contractor
+
+Revision ID: add_payroll_dirty_contractor
+Revises: add_payroll_run_unique_constraint
+Create Date: 2025-10-22 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_dirty_contractor'
+down_revision = 'add_payroll_run_unique_constraint'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Contractors to recompute on the next incremental payroll calculation
+    op.create_table('t_payroll_dirty_contractor',
+        sa.Column('period_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('contractor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('marked_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['period_id'], ['app.t_payroll_period.period_id'], ),
+        sa.ForeignKeyConstraint(['contractor_id'], ['app.m_user.user_id'], ),
+        sa.PrimaryKeyConstraint('period_id', 'contractor_id'),
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_table('t_payroll_dirty_contractor', schema='app')
@@ -0,0 +1,37 @@
+"""add_payroll_period_snapshot
+
+Revision ID: add_payroll_period_snapshot
+Revises: add_payroll_dirty_contractor
+Create Date: 2025-10-23 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_period_snapshot'
+down_revision = 'add_payroll_dirty_contractor'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per closed period pointing at its compressed payroll run snapshot
+    op.create_table('t_payroll_period_snapshot',
+        sa.Column('period_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('file_path', sa.String(), nullable=False),
+        sa.Column('run_count', sa.Integer(), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=True),
+        sa.Column('checksum', sa.String(length=64), nullable=True),
+        sa.Column('period_status', sa.String(), nullable=True),
+        sa.Column('created_on', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['period_id'], ['app.t_payroll_period.period_id'], ),
+        sa.PrimaryKeyConstraint('period_id'),
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_table('t_payroll_period_snapshot', schema='app')
@@ -0,0 +1,44 @@
+"""add_payroll_run_unique_constraint
+
+Revision ID: add_payroll_run_unique_constraint
+Revises: add_contractor_hours_period_index
+Create Date: 2025-10-21 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_run_unique_constraint'
+down_revision = 'add_contractor_hours_period_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Earlier calculations could insert several runs for the same contractor and period;
+    # keep the most recently written one
+    op.execute("""
+        DELETE FROM app.t_payroll_run r
+        USING (
+            SELECT run_id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY period_id, contractor_id
+                       ORDER BY COALESCE(updated_on, created_on) DESC NULLS LAST, created_on DESC NULLS LAST
+                   ) AS rn
+            FROM app.t_payroll_run
+        ) ranked
+        WHERE r.run_id = ranked.run_id AND ranked.rn > 1
+    """)
+
+    op.create_unique_constraint(
+        'uq_t_payroll_run_period_contractor',
+        't_payroll_run',
+        ['period_id', 'contractor_id'],
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_t_payroll_run_period_contractor', 't_payroll_run', schema='app', type_='unique')
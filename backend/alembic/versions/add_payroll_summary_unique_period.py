@@ -0,0 +1,44 @@
+"""add_payroll_summary_unique_period
+
+Revision ID: add_payroll_summary_unique_period
+Revises: expand_timesheet_entry_employee_codes
+Create Date: 2025-11-09 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_summary_unique_period'
+down_revision = 'expand_timesheet_entry_employee_codes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Concurrent first calculations of a period could each insert a summary;
+    # keep the most recently written one
+    op.execute("""
+        DELETE FROM app.t_payroll_summary s
+        USING (
+            SELECT summary_id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY period_id
+                       ORDER BY COALESCE(updated_on, created_on) DESC NULLS LAST, created_on DESC NULLS LAST
+                   ) AS rn
+            FROM app.t_payroll_summary
+        ) ranked
+        WHERE s.summary_id = ranked.summary_id AND ranked.rn > 1
+    """)
+
+    op.create_unique_constraint(
+        'uq_t_payroll_summary_period_id',
+        't_payroll_summary',
+        ['period_id'],
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_t_payroll_summary_period_id', 't_payroll_summary', schema='app', type_='unique')
@@ -0,0 +1,48 @@
+"""add_timesheet_entry_unique_code
+
+Revision ID: add_timesheet_entry_unique_code
+Revises: add_invoice_date_index
+Create Date: 2025-10-25 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_timesheet_entry_unique_code'
+down_revision = 'add_invoice_date_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Earlier get-or-create calls could add the same candidate to a timesheet more than once;
+    # keep the entry with hours filled in, then the most recently edited one
+    op.execute("""
+        DELETE FROM app.t_timesheet_entry e
+        USING (
+            SELECT entry_id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY timesheet_id, employee_code
+                       ORDER BY filled DESC NULLS LAST,
+                                COALESCE(standard_hours, 0) + COALESCE(rate2_hours, 0) + COALESCE(rate3_hours, 0)
+                                    + COALESCE(rate4_hours, 0) + COALESCE(rate5_hours, 0) + COALESCE(rate6_hours, 0)
+                                    + COALESCE(holiday_hours, 0) + COALESCE(bank_holiday_hours, 0) DESC,
+                                COALESCE(updated_on, created_on) DESC NULLS LAST
+                   ) AS rn
+            FROM app.t_timesheet_entry
+        ) ranked
+        WHERE e.entry_id = ranked.entry_id AND ranked.rn > 1
+    """)
+
+    op.create_unique_constraint(
+        'uq_t_timesheet_entry_timesheet_employee_code',
+        't_timesheet_entry',
+        ['timesheet_id', 'employee_code'],
+        schema='app'
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_t_timesheet_entry_timesheet_employee_code', 't_timesheet_entry', schema='app', type_='unique')
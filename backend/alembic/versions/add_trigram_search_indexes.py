@@ -0,0 +1,45 @@
+"""add_trigram_search_indexes
+
+Revision ID: add_trigram_search_indexes
+Revises: add_client_contract_summary
+Create Date: 2025-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_trigram_search_indexes'
+down_revision = 'add_client_contract_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Expressions must match the ones used by crud.search_clients / crud.search_candidates
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_m_client_client_name_trgm
+        ON app.m_client USING gin (coalesce(client_name, '') gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_m_user_full_name_trgm
+        ON app.m_user USING gin ((coalesce(first_name, '') || ' ' || coalesce(last_name, '')) gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_m_user_email_id_trgm
+        ON app.m_user USING gin (coalesce(email_id, '') gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_m_candidate_pps_number_trgm
+        ON app.m_candidate USING gin (coalesce(pps_number, '') gin_trgm_ops)
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS app.ix_m_candidate_pps_number_trgm")
+    op.execute("DROP INDEX IF EXISTS app.ix_m_user_email_id_trgm")
+    op.execute("DROP INDEX IF EXISTS app.ix_m_user_full_name_trgm")
+    op.execute("DROP INDEX IF EXISTS app.ix_m_client_client_name_trgm")
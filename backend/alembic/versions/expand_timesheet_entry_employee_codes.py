@@ -0,0 +1,54 @@
+"""expand_timesheet_entry_employee_codes
+
+Revision ID: expand_timesheet_entry_employee_codes
+Revises: add_holiday_ledger_requested
+Create Date: 2025-11-08 00:00:00.000000
+
+POST /api/timesheets used to store the first 8 characters of the candidate id
+as an entry's employee_code; it now stores the full candidate id, like
+get_or_create_timesheet_entries_for_candidates always did. Everything that
+reads employee_code as a candidate id (the holiday ledger, the backfill, the
+(timesheet_id, employee_code) ON CONFLICT of get-or-create) skipped the short
+codes, and get-or-create added a second entry for the same candidate.
+
+This expands every 8-character code that matches exactly one candidate to
+that candidate's full id. An entry is left as it is when its timesheet already
+holds an entry with the full id (the two can't be merged without losing
+hours). The holiday backfill then picks the expanded entries up; their hours
+were never counted in holiday_count before.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'expand_timesheet_entry_employee_codes'
+down_revision = 'add_holiday_ledger_requested'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        WITH matches AS (
+            SELECT e.entry_id, min(c.candidate_id::text) AS candidate_id
+            FROM app.t_timesheet_entry e
+            JOIN app.m_candidate c ON left(c.candidate_id::text, 8) = lower(e.employee_code)
+            WHERE length(e.employee_code) = 8
+            GROUP BY e.entry_id
+            HAVING count(*) = 1
+        )
+        UPDATE app.t_timesheet_entry e
+        SET employee_code = m.candidate_id
+        FROM matches m
+        WHERE e.entry_id = m.entry_id
+          AND NOT EXISTS (
+              SELECT 1 FROM app.t_timesheet_entry other
+              WHERE other.timesheet_id = e.timesheet_id AND other.employee_code = m.candidate_id
+          )
+    """)
+
+
+def downgrade():
+    # The full ids are what the application writes now; they are kept
+    pass
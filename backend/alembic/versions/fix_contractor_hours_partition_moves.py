@@ -0,0 +1,151 @@
+"""fix_contractor_hours_partition_moves
+
+Revision ID: fix_contractor_hours_partition_moves
+Revises: add_invoice_weeks_version
+Create Date: 2025-11-06 00:00:00.000000
+
+Moving a t_contractor_hours row to another partition (a work_date update that
+crosses a year, or ensure_contractor_hours_partition rehoming rows out of the
+default partition) is a DELETE plus an INSERT, so it fired the trigger standing
+in for the t_contractor_rate_hours foreign key and was refused for any row with
+rate hours, which a real foreign key never did.
+
+- check_contractor_hours_referenced (an AFTER trigger, so it runs once the
+  whole statement is done) now only objects when no row with OLD.tch_id is
+  left in t_contractor_hours.
+- ensure_contractor_hours_partition moves rows into the new, not yet attached
+  table, where the check cannot see them; it sets the transaction-local
+  app.contractor_hours_rehoming flag around the move, and the check skips
+  while it is set. The rows are attached again in the same transaction.
+- Concurrent calls (e.g. several API workers starting at once) are serialized
+  with a transaction advisory lock, so only one creates a given partition.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fix_contractor_hours_partition_moves'
+down_revision = 'add_invoice_weeks_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.check_contractor_hours_referenced()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF current_setting('app.contractor_hours_rehoming', true) = 'on' THEN
+                RETURN OLD;
+            END IF;
+            -- A row moved to another partition is still there under the same tch_id
+            IF EXISTS (SELECT 1 FROM app.t_contractor_rate_hours WHERE tch_id = OLD.tch_id)
+               AND NOT EXISTS (SELECT 1 FROM app.t_contractor_hours WHERE tch_id = OLD.tch_id) THEN
+                RAISE EXCEPTION 'delete on table "t_contractor_hours" violates foreign key: tch_id % is still referenced from "t_contractor_rate_hours"', OLD.tch_id
+                    USING ERRCODE = 'foreign_key_violation';
+            END IF;
+            RETURN OLD;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.ensure_contractor_hours_partition(p_year integer)
+        RETURNS text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            partition_name text := format('t_contractor_hours_y%s', p_year);
+            range_start date := make_date(p_year, 1, 1);
+            range_end date := make_date(p_year + 1, 1, 1);
+            has_default boolean;
+        BEGIN
+            IF to_regclass(format('app.%I', partition_name)) IS NOT NULL THEN
+                RETURN partition_name;
+            END IF;
+
+            PERFORM pg_advisory_xact_lock(hashtext('app.ensure_contractor_hours_partition'));
+            IF to_regclass(format('app.%I', partition_name)) IS NOT NULL THEN
+                RETURN partition_name;
+            END IF;
+
+            SELECT EXISTS (
+                SELECT 1 FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'app.t_contractor_hours'::regclass
+                  AND c.relname = 't_contractor_hours_default'
+            ) INTO has_default;
+
+            EXECUTE format('CREATE TABLE app.%I (LIKE app.t_contractor_hours INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+            IF has_default THEN
+                PERFORM set_config('app.contractor_hours_rehoming', 'on', true);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM app.t_contractor_hours_default WHERE work_date >= %L AND work_date < %L RETURNING *) '
+                    'INSERT INTO app.%I SELECT * FROM moved',
+                    range_start, range_end, partition_name
+                );
+                PERFORM set_config('app.contractor_hours_rehoming', 'off', true);
+            END IF;
+            EXECUTE format(
+                'ALTER TABLE app.t_contractor_hours ATTACH PARTITION app.%I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, range_start, range_end
+            );
+            RETURN partition_name;
+        END;
+        $$
+    """)
+
+
+def downgrade():
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.check_contractor_hours_referenced()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM app.t_contractor_rate_hours WHERE tch_id = OLD.tch_id) THEN
+                RAISE EXCEPTION 'delete on table "t_contractor_hours" violates foreign key: tch_id % is still referenced from "t_contractor_rate_hours"', OLD.tch_id
+                    USING ERRCODE = 'foreign_key_violation';
+            END IF;
+            RETURN OLD;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.ensure_contractor_hours_partition(p_year integer)
+        RETURNS text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            partition_name text := format('t_contractor_hours_y%s', p_year);
+            range_start date := make_date(p_year, 1, 1);
+            range_end date := make_date(p_year + 1, 1, 1);
+            has_default boolean;
+        BEGIN
+            IF to_regclass(format('app.%I', partition_name)) IS NOT NULL THEN
+                RETURN partition_name;
+            END IF;
+
+            SELECT EXISTS (
+                SELECT 1 FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'app.t_contractor_hours'::regclass
+                  AND c.relname = 't_contractor_hours_default'
+            ) INTO has_default;
+
+            EXECUTE format('CREATE TABLE app.%I (LIKE app.t_contractor_hours INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+            IF has_default THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM app.t_contractor_hours_default WHERE work_date >= %L AND work_date < %L RETURNING *) '
+                    'INSERT INTO app.%I SELECT * FROM moved',
+                    range_start, range_end, partition_name
+                );
+            END IF;
+            EXECUTE format(
+                'ALTER TABLE app.t_contractor_hours ATTACH PARTITION app.%I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, range_start, range_end
+            );
+            RETURN partition_name;
+        END;
+        $$
+    """)
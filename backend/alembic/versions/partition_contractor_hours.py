@@ -0,0 +1,261 @@
+"""partition_contractor_hours
+
+Revision ID: partition_contractor_hours
+Revises: add_timesheet_entry_unique_code
+Create Date: 2025-10-26 00:00:00.000000
+
+Turns app.t_contractor_hours into a table range-partitioned by work_date, one
+partition per calendar year (t_contractor_hours_yYYYY) plus a default
+partition. Invoice, payroll and holiday queries filter on work_date, so the
+planner only visits the partitions covering the requested dates.
+
+The primary key becomes (tch_id, work_date), since a partitioned table's
+unique keys must include the partition key; tch_id alone is kept unique by a
+trigger (add_contractor_hours_key_guards). The t_contractor_rate_hours.tch_id
+foreign key cannot reference tch_id alone any more and is replaced by triggers
+enforcing the same rule.
+
+New years are added with app.ensure_contractor_hours_partition(year), which
+also moves matching rows out of the default partition. Old years can be
+archived with
+    ALTER TABLE app.t_contractor_hours DETACH PARTITION app.t_contractor_hours_yYYYY;
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'partition_contractor_hours'
+down_revision = 'add_timesheet_entry_unique_code'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 1. Move the current table aside, remembering its foreign keys and indexes
+    op.execute("""
+        DO $$
+        DECLARE
+            fk record;
+        BEGIN
+            -- The rate hours FK is replaced by triggers below
+            FOR fk IN
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = 'app.t_contractor_rate_hours'::regclass
+                  AND confrelid = 'app.t_contractor_hours'::regclass
+                  AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE app.t_contractor_rate_hours DROP CONSTRAINT %I', fk.conname);
+            END LOOP;
+
+            CREATE TEMP TABLE contractor_hours_fks ON COMMIT DROP AS
+            SELECT conname, pg_get_constraintdef(oid) AS definition
+            FROM pg_constraint
+            WHERE conrelid = 'app.t_contractor_hours'::regclass AND contype = 'f';
+
+            CREATE TEMP TABLE contractor_hours_indexes ON COMMIT DROP AS
+            SELECT i.relname AS name, pg_get_indexdef(x.indexrelid) AS definition
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = 'app.t_contractor_hours'::regclass
+              AND NOT x.indisprimary AND NOT x.indisunique;
+        END $$;
+    """)
+    op.execute("ALTER TABLE app.t_contractor_hours RENAME TO t_contractor_hours_unpartitioned")
+    # Free the primary key's index name for the new table
+    op.execute("""
+        DO $$
+        DECLARE
+            pk_name text;
+        BEGIN
+            SELECT conname INTO pk_name FROM pg_constraint
+            WHERE conrelid = 'app.t_contractor_hours_unpartitioned'::regclass AND contype = 'p';
+            EXECUTE format('ALTER TABLE app.t_contractor_hours_unpartitioned RENAME CONSTRAINT %I TO t_contractor_hours_unpartitioned_pkey', pk_name);
+        END $$;
+    """)
+
+    # 2. Partitioned table with the same columns and defaults
+    op.execute("""
+        CREATE TABLE app.t_contractor_hours (
+            LIKE app.t_contractor_hours_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (work_date)
+    """)
+    op.execute("ALTER TABLE app.t_contractor_hours ADD PRIMARY KEY (tch_id, work_date)")
+
+    # 3. Partition maintenance: create a year's partition, rehoming rows from the default partition
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.ensure_contractor_hours_partition(p_year integer)
+        RETURNS text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            partition_name text := format('t_contractor_hours_y%s', p_year);
+            range_start date := make_date(p_year, 1, 1);
+            range_end date := make_date(p_year + 1, 1, 1);
+            has_default boolean;
+        BEGIN
+            IF to_regclass(format('app.%I', partition_name)) IS NOT NULL THEN
+                RETURN partition_name;
+            END IF;
+
+            SELECT EXISTS (
+                SELECT 1 FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'app.t_contractor_hours'::regclass
+                  AND c.relname = 't_contractor_hours_default'
+            ) INTO has_default;
+
+            EXECUTE format('CREATE TABLE app.%I (LIKE app.t_contractor_hours INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+            IF has_default THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM app.t_contractor_hours_default WHERE work_date >= %L AND work_date < %L RETURNING *) '
+                    'INSERT INTO app.%I SELECT * FROM moved',
+                    range_start, range_end, partition_name
+                );
+            END IF;
+            EXECUTE format(
+                'ALTER TABLE app.t_contractor_hours ATTACH PARTITION app.%I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, range_start, range_end
+            );
+            RETURN partition_name;
+        END;
+        $$
+    """)
+
+    op.execute("""
+        DO $$
+        DECLARE
+            first_year integer;
+            last_year integer := extract(year FROM CURRENT_DATE)::integer + 1;
+            partition_year integer;
+        BEGIN
+            SELECT coalesce(extract(year FROM min(work_date))::integer, extract(year FROM CURRENT_DATE)::integer)
+            INTO first_year
+            FROM app.t_contractor_hours_unpartitioned;
+
+            FOR partition_year IN first_year..last_year LOOP
+                PERFORM app.ensure_contractor_hours_partition(partition_year);
+            END LOOP;
+        END $$;
+    """)
+    op.execute("CREATE TABLE app.t_contractor_hours_default PARTITION OF app.t_contractor_hours DEFAULT")
+
+    # 4. Copy the rows, then drop the old table and recreate its foreign keys and indexes
+    op.execute("INSERT INTO app.t_contractor_hours SELECT * FROM app.t_contractor_hours_unpartitioned")
+    op.execute("""
+        DO $$
+        DECLARE
+            item record;
+        BEGIN
+            DROP TABLE app.t_contractor_hours_unpartitioned;
+
+            FOR item IN SELECT conname, definition FROM contractor_hours_fks LOOP
+                EXECUTE format('ALTER TABLE app.t_contractor_hours ADD CONSTRAINT %I %s', item.conname, item.definition);
+            END LOOP;
+
+            FOR item IN SELECT name, definition FROM contractor_hours_indexes LOOP
+                EXECUTE replace(item.definition, 'ONLY ', '');
+            END LOOP;
+        END $$;
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_t_contractor_hours_tch_id ON app.t_contractor_hours (tch_id)")
+
+    # 5. The foreign key from t_contractor_rate_hours, as triggers
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.check_contractor_rate_hours_tch()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF NEW.tch_id IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM app.t_contractor_hours WHERE tch_id = NEW.tch_id
+            ) THEN
+                RAISE EXCEPTION 'insert or update on table "t_contractor_rate_hours" violates foreign key: tch_id % not present in "t_contractor_hours"', NEW.tch_id
+                    USING ERRCODE = 'foreign_key_violation';
+            END IF;
+            RETURN NEW;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_contractor_rate_hours_tch
+        BEFORE INSERT OR UPDATE OF tch_id ON app.t_contractor_rate_hours
+        FOR EACH ROW EXECUTE FUNCTION app.check_contractor_rate_hours_tch()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.check_contractor_hours_referenced()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM app.t_contractor_rate_hours WHERE tch_id = OLD.tch_id) THEN
+                RAISE EXCEPTION 'delete on table "t_contractor_hours" violates foreign key: tch_id % is still referenced from "t_contractor_rate_hours"', OLD.tch_id
+                    USING ERRCODE = 'foreign_key_violation';
+            END IF;
+            RETURN OLD;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_contractor_hours_referenced
+        AFTER DELETE ON app.t_contractor_hours
+        FOR EACH ROW EXECUTE FUNCTION app.check_contractor_hours_referenced()
+    """)
+
+    op.execute("ANALYZE app.t_contractor_hours")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_contractor_rate_hours_tch ON app.t_contractor_rate_hours")
+    op.execute("DROP FUNCTION IF EXISTS app.check_contractor_rate_hours_tch()")
+    op.execute("DROP TRIGGER IF EXISTS trg_contractor_hours_referenced ON app.t_contractor_hours")
+    op.execute("DROP FUNCTION IF EXISTS app.check_contractor_hours_referenced()")
+
+    op.execute("""
+        DO $$
+        BEGIN
+            CREATE TEMP TABLE contractor_hours_fks ON COMMIT DROP AS
+            SELECT conname, pg_get_constraintdef(oid) AS definition
+            FROM pg_constraint
+            WHERE conrelid = 'app.t_contractor_hours'::regclass AND contype = 'f' AND conparentid = 0;
+
+            CREATE TEMP TABLE contractor_hours_indexes ON COMMIT DROP AS
+            SELECT i.relname AS name, pg_get_indexdef(x.indexrelid) AS definition
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = 'app.t_contractor_hours'::regclass
+              AND NOT x.indisprimary AND NOT x.indisunique
+              AND i.relname <> 'ix_t_contractor_hours_tch_id';
+        END $$;
+    """)
+    op.execute("ALTER TABLE app.t_contractor_hours RENAME TO t_contractor_hours_partitioned")
+    op.execute("""
+        CREATE TABLE app.t_contractor_hours (
+            LIKE app.t_contractor_hours_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        )
+    """)
+    op.execute("INSERT INTO app.t_contractor_hours SELECT * FROM app.t_contractor_hours_partitioned")
+    op.execute("""
+        DO $$
+        DECLARE
+            item record;
+        BEGIN
+            -- Detached partitions are left in place for the operator to restore or drop
+            DROP TABLE app.t_contractor_hours_partitioned CASCADE;
+            ALTER TABLE app.t_contractor_hours ADD PRIMARY KEY (tch_id);
+
+            FOR item IN SELECT conname, definition FROM contractor_hours_fks LOOP
+                EXECUTE format('ALTER TABLE app.t_contractor_hours ADD CONSTRAINT %I %s', item.conname, item.definition);
+            END LOOP;
+
+            FOR item IN SELECT name, definition FROM contractor_hours_indexes LOOP
+                EXECUTE replace(item.definition, 'ONLY ', '');
+            END LOOP;
+        END $$;
+    """)
+    op.execute("DROP FUNCTION IF EXISTS app.ensure_contractor_hours_partition(integer)")
+    op.create_foreign_key(
+        't_contractor_rate_hours_tch_id_fkey',
+        't_contractor_rate_hours', 't_contractor_hours',
+        ['tch_id'], ['tch_id'],
+        source_schema='app', referent_schema='app'
+    )
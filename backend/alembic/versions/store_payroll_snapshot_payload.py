@@ -0,0 +1,58 @@
+"""store_payroll_snapshot_payload
+
+Revision ID: store_payroll_snapshot_payload
+Revises: add_client_contract_summary_trigger
+Create Date: 2025-11-05 00:00:00.000000
+
+Payroll period snapshots were gzip files in a relative local directory, with
+t_payroll_period_snapshot only pointing at them. Every container (and every
+redeploy) has its own directory, so the index row pointed at a file the other
+instances did not have and their reads silently fell back to the tables. The
+compressed payload now lives on the snapshot row itself.
+
+Existing snapshots are copied in when their file is readable from where the
+migration runs; rows whose file is not are dropped, and those periods are read
+from the tables until they are next locked/completed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'store_payroll_snapshot_payload'
+down_revision = 'add_client_contract_summary_trigger'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('t_payroll_period_snapshot', sa.Column('payload', sa.LargeBinary(), nullable=True), schema='app')
+    op.alter_column('t_payroll_period_snapshot', 'file_size', new_column_name='payload_size', schema='app')
+
+    connection = op.get_bind()
+    rows = connection.execute(sa.text("SELECT period_id, file_path FROM app.t_payroll_period_snapshot")).fetchall()
+    for period_id, file_path in rows:
+        try:
+            with open(file_path, 'rb') as f:
+                payload = f.read()
+        except OSError:
+            connection.execute(
+                sa.text("DELETE FROM app.t_payroll_period_snapshot WHERE period_id = :period_id"),
+                {"period_id": period_id}
+            )
+            continue
+        connection.execute(
+            sa.text("UPDATE app.t_payroll_period_snapshot SET payload = :payload WHERE period_id = :period_id"),
+            {"payload": payload, "period_id": period_id}
+        )
+
+    op.alter_column('t_payroll_period_snapshot', 'payload', nullable=False, schema='app')
+    op.drop_column('t_payroll_period_snapshot', 'file_path', schema='app')
+
+
+def downgrade():
+    # Payloads cannot be turned back into files here; closed periods fall back to the tables
+    op.execute("DELETE FROM app.t_payroll_period_snapshot")
+    op.add_column('t_payroll_period_snapshot', sa.Column('file_path', sa.String(), nullable=False), schema='app')
+    op.alter_column('t_payroll_period_snapshot', 'payload_size', new_column_name='file_size', schema='app')
+    op.drop_column('t_payroll_period_snapshot', 'payload', schema='app')
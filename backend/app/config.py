@@ -29,6 +29,50 @@ class Settings(BaseSettings):
     # Frontend URL for password reset links
     frontend_url: str = "http://localhost:3000"
 
+    # Invoice generation: sessions used to build per-client invoices in parallel mode
+    # (kept below the engine's pool_size + max_overflow)
+    invoice_generation_workers: int = 4
+
+    # Client roster cache: number of client rosters kept in memory per process, and the
+    # longest a roster is served before it is read again (it is also checked against
+    # the client's roster version on every read)
+    roster_cache_max_clients: int = 256
+    roster_cache_ttl_seconds: int = 60
+
+    # Name search: pg_trgm word similarity needed for a fuzzy (typo-tolerant) match
+    search_similarity_threshold: float = 0.3
+
+    # Payroll batch runs: worker processes calculating periods concurrently
+    # (each holds its own database connection)
+    payroll_batch_workers: int = 4
+
+    # Year-versioned PAYE/USC/PRSI definitions; empty uses the bundled app/tax_bands.json
+    tax_bands_file: str = ""
+
+    # Payroll what-if simulation: periods whose hours/runs are kept in memory per process
+    payroll_simulation_cache_periods: int = 16
+
+    # Payroll available weeks: longest the cached invoice week list is served (it is also
+    # checked against t_invoice_weeks_version on every read)
+    available_weeks_cache_ttl_seconds: int = 300
+
+    # Holiday backfill: timesheet entries per chunk, and sessions processing
+    # disjoint candidate partitions in parallel (also the most a run may ask for;
+    # kept below the engine's pool_size + max_overflow)
+    holiday_backfill_chunk_size: int = 10000
+    holiday_backfill_workers: int = 4
+
+    # Timesheet CSV/XLSX import: rows validated and written per committed chunk,
+    # and per-row errors kept in the response
+    timesheet_import_chunk_size: int = 2000
+    timesheet_import_max_errors: int = 1000
+
+    # Contractor hours partitions: yearly partitions created on startup beyond the current year
+    contractor_hours_partition_years_ahead: int = 1
+
+    # Columnar contractor hours saves: largest accepted body after gzip/brotli decompression
+    contractor_hours_payload_max_bytes: int = 64 * 1024 * 1024
+
     # pydantic-settings v2 configuration
     model_config = SettingsConfigDict(
         env_file=".env",
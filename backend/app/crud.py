@@ -1,12 +1,15 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func, text
-from sqlalchemy import Float, cast
+from sqlalchemy import Float, String, cast, select
 from uuid import uuid4, UUID
 from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 import os
 from . import models, schemas
 from .auth import get_password_hash
+from .services.roster_cache import roster_cache
+from .services.tax_tables import get_tax_table
+from .services.payroll_snapshots import PayrollSnapshotStore, PayrollPeriodClosed, is_closed_period
 
 
 def get_user(db: Session, user_id: int):
@@ -139,6 +142,7 @@ def soft_delete_client(db: Session, client_id: str, deleted_by: str):
         db_client.deleted_by = deleted_by
         db.commit()
         db.refresh(db_client)
+        roster_cache.invalidate_client(client_id)
     return db_client
 
 
@@ -197,9 +201,24 @@ def soft_delete_client_rate(db: Session, rate_id: str, deleted_by: Optional[str]
     return db_client_rate
 
 
+def get_client_roster_version(db: Session, client_id: str) -> int:
+    """Current roster version of a client (bumped by triggers on p_candidate_client and m_user)"""
+    version = db.execute(
+        text("SELECT version FROM app.t_client_roster_version WHERE client_id = :client_id"),
+        {"client_id": str(client_id)}
+    ).scalar()
+    return version or 0
+
+
 def get_candidates_for_client(db: Session, client_id: str):
     """Get all candidates assigned to a specific client where pcc.status = 0"""
     try:
+        # Read before the roster, so a write committed in between makes the cached copy stale
+        version = get_client_roster_version(db, client_id)
+        cached = roster_cache.get(client_id, version)
+        if cached is not None:
+            return cached
+
         from sqlalchemy.orm import aliased
         
         # Create aliases for the tables
@@ -242,6 +261,7 @@ def get_candidates_for_client(db: Session, client_id: str):
             }
             candidates.append(candidate)
         
+        roster_cache.set(client_id, version, candidates)
         return candidates
         
     except Exception as e:
@@ -251,6 +271,115 @@ def get_candidates_for_client(db: Session, client_id: str):
         return []
 
 
+def _set_search_threshold(db: Session):
+    """Apply the configured pg_trgm word similarity threshold for this transaction"""
+    from .config import settings
+    db.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+        {"threshold": str(settings.search_similarity_threshold)}
+    )
+
+
+def _like_prefix(q: str) -> str:
+    """ILIKE pattern matching values that start with q, with q's own % _ and backslash taken literally"""
+    return q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def search_clients(db: Session, q: str, limit: int = 10):
+    """Typo-tolerant prefix search over client names, best matches first.
+
+    Uses the pg_trgm GIN index on coalesce(client_name, '').
+    """
+    _set_search_threshold(db)
+    return db.execute(
+        text("""
+            SELECT client_id, client_name,
+                   GREATEST(
+                       word_similarity(:q, coalesce(client_name, '')),
+                       CASE WHEN coalesce(client_name, '') ILIKE :prefix THEN 1.0 ELSE 0 END
+                   ) AS score
+            FROM app.m_client
+            WHERE deleted_on IS NULL
+              AND (coalesce(client_name, '') ILIKE :prefix OR :q <% coalesce(client_name, ''))
+            ORDER BY score DESC, client_name, client_id
+            LIMIT :limit
+        """),
+        {"q": q, "prefix": _like_prefix(q), "limit": limit}
+    ).mappings().all()
+
+
+def search_candidates(db: Session, q: str, limit: int = 10):
+    """Typo-tolerant prefix search over candidate name, email and PPS number, best matches first.
+
+    Each field is searched on its own, through its pg_trgm GIN index on m_user
+    (full name, email_id) or m_candidate (pps_number), keeping its best `limit`
+    matches by that field's score; an OR across the two tables couldn't use the
+    indexes. A candidate's score is its best field score, and every list breaks
+    ties by name then id like the final ORDER BY, so the overall top `limit`
+    is always among those, and is picked from their union.
+    """
+    _set_search_threshold(db)
+    return db.execute(
+        text("""
+            WITH hits AS (
+                (SELECT u.user_id
+                 FROM app.m_user u
+                 WHERE u.deleted_on IS NULL
+                   AND (:q <% (coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, ''))
+                        OR (coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')) ILIKE :prefix
+                        OR (coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')) ILIKE :word_prefix)
+                   AND EXISTS (SELECT 1 FROM app.m_candidate c WHERE c.candidate_id = u.user_id)
+                 ORDER BY GREATEST(
+                     word_similarity(:q, coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')),
+                     CASE WHEN coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '') ILIKE :prefix
+                               OR coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '') ILIKE :word_prefix
+                          THEN 1.0 ELSE 0 END
+                 ) DESC, u.first_name, u.last_name, u.user_id
+                 LIMIT :limit)
+                UNION
+                (SELECT u.user_id
+                 FROM app.m_user u
+                 WHERE u.deleted_on IS NULL
+                   AND (:q <% coalesce(u.email_id, '') OR coalesce(u.email_id, '') ILIKE :prefix)
+                   AND EXISTS (SELECT 1 FROM app.m_candidate c WHERE c.candidate_id = u.user_id)
+                 ORDER BY GREATEST(
+                     word_similarity(:q, coalesce(u.email_id, '')),
+                     CASE WHEN coalesce(u.email_id, '') ILIKE :prefix THEN 1.0 ELSE 0 END
+                 ) DESC, u.first_name, u.last_name, u.user_id
+                 LIMIT :limit)
+                UNION
+                (SELECT c.candidate_id
+                 FROM app.m_candidate c
+                 JOIN app.m_user u ON u.user_id = c.candidate_id AND u.deleted_on IS NULL
+                 WHERE :q <% coalesce(c.pps_number, '') OR coalesce(c.pps_number, '') ILIKE :prefix
+                 ORDER BY GREATEST(
+                     word_similarity(:q, coalesce(c.pps_number, '')),
+                     CASE WHEN coalesce(c.pps_number, '') ILIKE :prefix THEN 1.0 ELSE 0 END
+                 ) DESC, u.first_name, u.last_name, u.user_id
+                 LIMIT :limit)
+            )
+            SELECT u.user_id, u.first_name, u.last_name, u.email_id, c.pps_number,
+                   GREATEST(
+                       word_similarity(:q, coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')),
+                       word_similarity(:q, coalesce(u.email_id, '')),
+                       word_similarity(:q, coalesce(c.pps_number, '')),
+                       CASE WHEN coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '') ILIKE :prefix
+                                 OR coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '') ILIKE :word_prefix
+                                 OR coalesce(u.email_id, '') ILIKE :prefix
+                                 OR coalesce(c.pps_number, '') ILIKE :prefix
+                            THEN 1.0 ELSE 0 END
+                   ) AS score
+            FROM hits h
+            JOIN app.m_user u ON u.user_id = h.user_id
+            JOIN app.m_candidate c ON c.candidate_id = u.user_id
+            ORDER BY score DESC, u.first_name, u.last_name, u.user_id
+            LIMIT :limit
+        """),
+        # word_prefix: a later word of the name (e.g. the last name) starts with q
+        {"q": q, "prefix": _like_prefix(q), "word_prefix": '% ' + _like_prefix(q), "limit": limit}
+    ).mappings().all()
+
+
 # Rate Type and Frequency CRUD operations
 def get_all_rate_types(db: Session):
     """Get all active rate types where deleted_on is null"""
@@ -267,25 +396,17 @@ def get_all_rate_frequencies(db: Session):
 
 
 def get_clients_with_active_contracts_count(db: Session, skip: int = 0, limit: int = 100):
-    """Get clients with count of active contracts (status=0) from p_candidate_client table"""
-    from sqlalchemy import func, case
-    
+    """Get clients with count of active contracts (status=0), read from t_client_contract_summary"""
     return (
         db.query(
             models.Client,
-            func.count(
-                case(
-                    (models.P_CandidateClient.status == 0, models.P_CandidateClient.pcc_id),
-                    else_=None
-                )
-            ).label('active_contracts_count')
+            func.coalesce(models.ClientContractSummary.active_contracts_count, 0).label('active_contracts_count')
         )
         .outerjoin(
-            models.P_CandidateClient, 
-            models.Client.client_id == models.P_CandidateClient.client_id
+            models.ClientContractSummary,
+            models.Client.client_id == models.ClientContractSummary.client_id
         )
         .filter(models.Client.deleted_on.is_(None))
-        .group_by(models.Client.client_id)
         .order_by(models.Client.created_on.desc())
         .offset(skip)
         .limit(limit)
@@ -841,6 +962,8 @@ def update_candidate(db: Session, user_id: str, candidate_data: dict):
         
         db.commit()
         db.refresh(m_user)
+        # Name/email appear in every roster the candidate is on
+        roster_cache.invalidate_all()
         
         print(f"✅ Successfully updated candidate: {m_user.first_name} {m_user.last_name}")
         return m_user
@@ -955,6 +1078,7 @@ def create_candidate_client(db: Session, candidate_client_data: schemas.Candidat
         db.add(candidate_client)
         db.commit()
         db.refresh(candidate_client)
+        roster_cache.invalidate_client(candidate_client.client_id)
         
         print(f"✅ Successfully created candidate-client relationship: {candidate_client.pcc_id}")
         return candidate_client
@@ -1042,49 +1166,122 @@ def get_latest_timesheet(db: Session):
     }
 
 
-def get_timesheet_detail(db: Session, timesheet_id: str):
-    """Get timesheet with all its entries"""
-    timesheet = db.query(models.Timesheet).filter(models.Timesheet.timesheet_id == timesheet_id).first()
-    if not timesheet:
-        return None
-    
-    # Get existing entries for this timesheet
-    entries = db.query(models.TimesheetEntry).filter(
-        models.TimesheetEntry.timesheet_id == timesheet_id
-    ).all()
-    
-    # Convert entries to proper schema objects
-    entry_objects = []
-    for entry in entries:
-        entry_objects.append(schemas.TimesheetEntry(
-            entry_id=entry.entry_id,
-            timesheet_id=entry.timesheet_id,
-            employee_name=entry.employee_name,
-            employee_code=entry.employee_code,
-            client_name=entry.client_name,
-            filled=entry.filled,
-            standard_hours=entry.standard_hours,
-            rate2_hours=entry.rate2_hours,
-            rate3_hours=entry.rate3_hours,
-            rate4_hours=entry.rate4_hours,
-            rate5_hours=entry.rate5_hours,
-            rate6_hours=entry.rate6_hours,
-            holiday_hours=entry.holiday_hours,
-            bank_holiday_hours=entry.bank_holiday_hours,
-            created_on=entry.created_on,
-            updated_on=entry.updated_on
-        ))
-    
+def create_timesheet_with_entries(db: Session, timesheet: schemas.TimesheetCreate) -> schemas.TimesheetDetail:
+    """Create a timesheet and one empty entry per candidate in a single round trip.
+
+    The entries are inserted with INSERT ... SELECT from m_candidate (in the order
+    the candidate ids were given, duplicates and invalid ids skipped) and the
+    detail is built from the RETURNING rows instead of being read back.
+
+    employee_code is the full candidate id, as in
+    get_or_create_timesheet_entries_for_candidates and the holiday ledger; it
+    used to be the first 8 characters (existing codes are expanded by the
+    expand_timesheet_entry_employee_codes migration).
+    """
+    candidate_ids = []
+    for candidate_id in timesheet.candidate_ids:
+        try:
+            candidate_uuid = str(UUID(str(candidate_id)))
+        except ValueError:
+            print(f"🔍 DEBUG: Skipping invalid candidate UUID {candidate_id}")
+            continue
+        if candidate_uuid not in candidate_ids:
+            candidate_ids.append(candidate_uuid)
+
+    timesheet_id = uuid4()
+    rows = db.execute(
+        text("""
+            WITH new_timesheet AS (
+                INSERT INTO app.t_timesheet (timesheet_id, month, week, status)
+                VALUES (:timesheet_id, :month, :week, 'Open')
+                RETURNING timesheet_id
+            )
+            INSERT INTO app.t_timesheet_entry (
+                timesheet_id, employee_name, employee_code, client_name, filled,
+                standard_hours, rate2_hours, rate3_hours, rate4_hours, rate5_hours,
+                rate6_hours, holiday_hours, bank_holiday_hours
+            )
+            SELECT t.timesheet_id,
+                   coalesce(c.invoice_contact_name, 'Unknown'),
+                   c.candidate_id::text,
+                   'Default Client',
+                   false, 0, 0, 0, 0, 0, 0, 0, 0
+            FROM new_timesheet t
+            CROSS JOIN unnest(CAST(:candidate_ids AS uuid[])) WITH ORDINALITY AS requested(candidate_id, position)
+            JOIN app.m_candidate c ON c.candidate_id = requested.candidate_id
+            ORDER BY requested.position
+            ON CONFLICT (timesheet_id, employee_code) DO NOTHING
+            RETURNING entry_id, timesheet_id, employee_name, employee_code, client_name, filled,
+                      standard_hours, rate2_hours, rate3_hours, rate4_hours, rate5_hours,
+                      rate6_hours, holiday_hours, bank_holiday_hours, created_on, updated_on
+        """),
+        {
+            "timesheet_id": timesheet_id,
+            "month": timesheet.month,
+            "week": timesheet.week,
+            "candidate_ids": candidate_ids
+        }
+    ).mappings().all()
+    db.commit()
+
+    print(f"🔍 DEBUG: Created timesheet {timesheet_id} with {len(rows)} entries")
     return schemas.TimesheetDetail(
-        timesheet_id=timesheet.timesheet_id,
-        status=timesheet.status,
+        timesheet_id=timesheet_id,
+        status="Open",
         month=timesheet.month,
         week=timesheet.week,
-        date_range=timesheet.date_range,
-        entries=entry_objects
+        date_range=None,
+        entries=[schemas.TimesheetEntry(**row) for row in rows]
     )
 
 
+# Columns of the lean timesheet detail read, in response field order
+TIMESHEET_ENTRY_DETAIL_COLUMNS = [
+    'entry_id', 'timesheet_id', 'employee_name', 'employee_code', 'client_name', 'filled',
+    'standard_hours', 'rate2_hours', 'rate3_hours', 'rate4_hours', 'rate5_hours',
+    'rate6_hours', 'holiday_hours', 'bank_holiday_hours', 'created_on', 'updated_on'
+]
+
+
+def get_timesheet_detail_rows(db: Session, timesheet_id: str) -> Optional[Dict]:
+    """Timesheet detail as plain dicts, selected column-wise without ORM objects.
+
+    Produces the fields of schemas.TimesheetDetail (NULL hours as 0, NULL
+    filled as False) for serializing straight to JSON.
+    """
+    timesheet = db.query(
+        models.Timesheet.timesheet_id,
+        models.Timesheet.status,
+        models.Timesheet.month,
+        models.Timesheet.week,
+        models.Timesheet.date_range
+    ).filter(models.Timesheet.timesheet_id == timesheet_id).first()
+    if not timesheet:
+        return None
+
+    columns = []
+    for name in TIMESHEET_ENTRY_DETAIL_COLUMNS:
+        column = getattr(models.TimesheetEntry, name)
+        if name == 'filled':
+            column = func.coalesce(column, False)
+        elif name.endswith('_hours'):
+            column = func.coalesce(column, 0.0)
+        columns.append(column)
+
+    rows = db.execute(
+        select(*columns).where(models.TimesheetEntry.timesheet_id == timesheet_id)
+    ).all()
+
+    return {
+        'timesheet_id': timesheet.timesheet_id,
+        'status': timesheet.status,
+        'month': timesheet.month,
+        'week': timesheet.week,
+        'date_range': timesheet.date_range,
+        'entries': [dict(zip(TIMESHEET_ENTRY_DETAIL_COLUMNS, row)) for row in rows]
+    }
+
+
 def create_timesheet_entry(db: Session, entry: schemas.TimesheetEntryCreate):
     """Create a new timesheet entry"""
     db_entry = models.TimesheetEntry(
@@ -1103,34 +1300,14 @@ def create_timesheet_entry(db: Session, entry: schemas.TimesheetEntryCreate):
         bank_holiday_hours=entry.bank_holiday_hours,
     )
     db.add(db_entry)
+    db.flush()
+    
+    # The entry and its holiday ledger entries (8% accrual, holiday used) commit together
+    print(f"🔍 Timesheet entry creation - Standard hours: {entry.standard_hours}, Holiday hours: {entry.holiday_hours}")
+    record_timesheet_entry_holiday(db, [db_entry.entry_id])
     db.commit()
     db.refresh(db_entry)
     
-    # Process holiday tracking after successful creation
-    try:
-        standard_hours = entry.standard_hours or 0.0
-        holiday_hours = entry.holiday_hours or 0.0
-        
-        print(f"🔍 Timesheet entry creation - Standard hours: {standard_hours}, Holiday hours: {holiday_hours}")
-        
-        # Get the candidate_id from the employee_code
-        candidate_id = entry.employee_code
-        if candidate_id:
-            # Update holiday count based on standard hours (8% accumulation)
-            if standard_hours > 0:
-                print(f"🔄 Processing standard hours for candidate {candidate_id}: {standard_hours}")
-                update_candidate_holiday_count(db, candidate_id, standard_hours)
-            
-            # Deduct holiday count based on holiday hours
-            if holiday_hours > 0:
-                print(f"🔄 Processing holiday hours for candidate {candidate_id}: {holiday_hours}")
-                deduct_candidate_holiday_count(db, candidate_id, holiday_hours)
-                
-    except Exception as e:
-        print(f"⚠️ Warning: Holiday tracking failed for new timesheet entry: {e}")
-        import traceback
-        traceback.print_exc()
-    
     return db_entry
 
 
@@ -1145,66 +1322,20 @@ def update_timesheet_entry(db: Session, entry_id: str, entry_update: schemas.Tim
         
     print(f"🔍 DEBUG: Found timesheet entry: {db_entry.employee_name} (employee_code: {db_entry.employee_code})")
     
-    # Get the old values for comparison
-    old_standard_hours = db_entry.standard_hours or 0.0
-    old_holiday_hours = db_entry.holiday_hours or 0.0
-    
-    print(f"🔍 DEBUG: Old values - standard_hours: {old_standard_hours}, holiday_hours: {old_holiday_hours}")
-    
     update_data = entry_update.dict(exclude_unset=True)
     print(f"🔍 DEBUG: Update data: {update_data}")
     
     for field, value in update_data.items():
         setattr(db_entry, field, value)
     db_entry.updated_on = func.now()
+    
+    # Ledger entries for the difference to what is already recorded, in the same transaction
+    record_timesheet_entry_holiday(db, [db_entry.entry_id])
     db.commit()
     db.refresh(db_entry)
     
     print(f"🔍 DEBUG: After update - standard_hours: {db_entry.standard_hours}, holiday_hours: {db_entry.holiday_hours}")
     
-    # Process holiday tracking after successful update
-    try:
-        # Get the new values
-        new_standard_hours = db_entry.standard_hours or 0.0
-        new_holiday_hours = db_entry.holiday_hours or 0.0
-        
-        # Calculate the difference in hours
-        standard_hours_diff = new_standard_hours - old_standard_hours
-        holiday_hours_diff = new_holiday_hours - old_holiday_hours
-        
-        print(f"🔍 Timesheet entry update - Standard hours change: {old_standard_hours} -> {new_standard_hours} (diff: {standard_hours_diff})")
-        print(f"🔍 Timesheet entry update - Holiday hours change: {old_holiday_hours} -> {new_holiday_hours} (diff: {holiday_hours_diff})")
-        
-        # Get the candidate_id from the employee_code (which should be the candidate_id)
-        candidate_id = db_entry.employee_code
-        print(f"🔍 DEBUG: Using candidate_id from employee_code: {candidate_id}")
-        
-        if candidate_id:
-            # Update holiday count based on standard hours change (8% accumulation)
-            if standard_hours_diff != 0:
-                print(f"🔄 Processing standard hours change for candidate {candidate_id}: {standard_hours_diff}")
-                result = update_candidate_holiday_count(db, candidate_id, standard_hours_diff)
-                print(f"🔍 DEBUG: update_candidate_holiday_count result: {result}")
-            
-            # Deduct holiday count based on holiday hours change
-            if holiday_hours_diff != 0:
-                print(f"🔄 Processing holiday hours change for candidate {candidate_id}: {holiday_hours_diff}")
-                if holiday_hours_diff > 0:
-                    # Holiday hours increased, deduct from holiday count
-                    result = deduct_candidate_holiday_count(db, candidate_id, holiday_hours_diff)
-                    print(f"🔍 DEBUG: deduct_candidate_holiday_count result: {result}")
-                else:
-                    # Holiday hours decreased, add back to holiday count (reverse deduction)
-                    result = update_candidate_holiday_count(db, candidate_id, abs(holiday_hours_diff))
-                    print(f"🔍 DEBUG: update_candidate_holiday_count (reverse) result: {result}")
-        else:
-            print(f"⚠️ DEBUG: No candidate_id found in employee_code: {db_entry.employee_code}")
-                        
-    except Exception as e:
-        print(f"⚠️ Warning: Holiday tracking failed for timesheet entry {entry_id}: {e}")
-        import traceback
-        traceback.print_exc()
-    
     return db_entry
 
 
@@ -1247,6 +1378,8 @@ def create_contractor_hours(db: Session, payload: schemas.ContractorHoursCreate)
         dedh_bill_rate=payload.dedh_bill_rate,
     )
     db.add(row)
+    db.flush()
+    record_contractor_hours_holiday(db, [row.tch_id], payload.created_by)
     db.commit()
     db.refresh(row)
     return row
@@ -1293,6 +1426,8 @@ def bulk_create_contractor_hours(db: Session, items: List[schemas.ContractorHour
         )
         db.add(row)
         rows.append(row)
+    db.flush()
+    record_contractor_hours_holiday(db, [r.tch_id for r in rows])
     db.commit()
     for r in rows:
         db.refresh(r)
@@ -1308,8 +1443,56 @@ def list_contractor_hours_by_timesheet(db: Session, timesheet_id: str):
     )
 
 
+def list_contractor_hours_changes(db: Session, timesheet_id: str, since: Optional[int] = None) -> Dict:
+    """Contractor hours of a timesheet written, soft-deleted or removed since the `since` watermark.
+
+    Without `since` this is a full load of the live rows. Rows carry the id of
+    the transaction that last wrote them (change_xid), and the watermark is the
+    oldest transaction still running when the poll started, read before the
+    rows: anything below it had already committed and is in this response, and
+    anything at or above it has change_xid >= watermark, so the next poll picks
+    it up whenever it commits. Rows of transactions running at poll time are
+    sent again, which is harmless since clients merge by tch_id. Rows moved to
+    another timesheet or hard-deleted come back as deleted ids.
+    """
+    watermark = db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar()
+
+    query = db.query(models.ContractorHours).filter(models.ContractorHours.timesheet_id == timesheet_id)
+    if since is not None:
+        query = query.filter(models.ContractorHours.change_xid >= since)
+    else:
+        query = query.filter(models.ContractorHours.deleted_on.is_(None))
+    rows = query.all()
+
+    deleted = [row.tch_id for row in rows if row.deleted_on is not None]
+    if since is not None:
+        removed = db.execute(
+            text("""
+                SELECT DISTINCT r.tch_id
+                FROM app.t_contractor_hours_removed r
+                WHERE r.timesheet_id = :timesheet_id
+                  AND r.change_xid >= :since
+                  AND NOT EXISTS (
+                      SELECT 1 FROM app.t_contractor_hours h
+                      WHERE h.tch_id = r.tch_id AND h.timesheet_id = r.timesheet_id AND h.deleted_on IS NULL
+                  )
+            """),
+            {"timesheet_id": str(timesheet_id), "since": since}
+        ).scalars().all()
+        already = set(deleted)
+        deleted.extend(tch_id for tch_id in removed if tch_id not in already)
+
+    return {
+        'changed': [row for row in rows if row.deleted_on is None],
+        'deleted': deleted,
+        'watermark': watermark,
+        'full': since is None
+    }
+
+
 def upsert_contractor_hours(db: Session, items: List[schemas.ContractorHoursUpsert]):
     result = []
+    dirty_pairs = []  # (contractor_id, work_date) touched, for incremental payroll
     for payload in items:
         print(f"🔍 DEBUG: Processing payload for contractor_id: {payload.contractor_id}")
         print(f"🔍 DEBUG: Has tch_id: {payload.tch_id is not None}")
@@ -1324,6 +1507,7 @@ def upsert_contractor_hours(db: Session, items: List[schemas.ContractorHoursUpse
             row = db.query(models.ContractorHours).filter(models.ContractorHours.tch_id == payload.tch_id).first()
             if row:
                 print(f"🔍 DEBUG: Updating existing contractor hours with tch_id: {payload.tch_id}")
+                dirty_pairs.append((row.contractor_id, row.work_date))
                 data = payload.dict(exclude_unset=True)
                 data.pop('tch_id', None)
                 data.pop('rate_hours', None)  # Remove rate_hours from contractor hours data
@@ -1453,62 +1637,54 @@ def upsert_contractor_hours(db: Session, items: List[schemas.ContractorHoursUpse
                         )
                         db.add(new_rate_hour)
     
+    dirty_pairs.extend((r.contractor_id, r.work_date) for r in result)
+    mark_payroll_contractors_dirty(db, dirty_pairs)
+    record_contractor_hours_holiday(db, [r.tch_id for r in result])
+    
     db.commit()
     for r in result:
         db.refresh(r)
     
-    # Process holiday tracking after successful upsert
-    try:
-        process_contractor_hours_for_holiday_tracking(db, items)
-    except Exception as e:
-        print(f"⚠️ Warning: Holiday tracking failed but contractor hours were saved: {e}")
-    
     return result
 
 
 def get_or_create_timesheet_entries_for_candidates(db: Session, timesheet_id: str):
-    """Get or create timesheet entries for all candidates"""
-    # Get all candidates
-    candidates = db.query(models.Candidate).all()
-    
-    # Get existing entries for this timesheet
-    existing_entries = db.query(models.TimesheetEntry).filter(
-        models.TimesheetEntry.timesheet_id == timesheet_id
-    ).all()
-    
-    existing_candidate_ids = {entry.employee_code for entry in existing_entries}
-    
-    # Create entries for candidates that don't have entries yet
-    new_entries = []
-    for candidate in candidates:
-        if candidate.candidate_id not in existing_candidate_ids:
-            entry = models.TimesheetEntry(
-                timesheet_id=timesheet_id,
-                employee_name=candidate.invoice_contact_name or "Unknown",
-                employee_code=candidate.candidate_id,
-                client_name="TBD",  # Will be set when assigned to a client
-                filled=False,
-                standard_hours=0,
-                rate2_hours=0,
-                rate3_hours=0,
-                rate4_hours=0,
-                rate5_hours=0,
-                rate6_hours=0,
-                holiday_hours=0,
-                bank_holiday_hours=0,
+    """Get or create timesheet entries for all candidates.
+
+    One statement inserts an entry for every candidate without one
+    (ON CONFLICT on the unique (timesheet_id, employee_code) constraint, so
+    concurrent calls cannot create duplicates) and returns the timesheet's
+    existing entries together with the ones it just inserted.
+    """
+    statement = text("""
+        WITH inserted AS (
+            INSERT INTO app.t_timesheet_entry (
+                timesheet_id, employee_name, employee_code, client_name, filled,
+                standard_hours, rate2_hours, rate3_hours, rate4_hours, rate5_hours,
+                rate6_hours, holiday_hours, bank_holiday_hours
             )
-            db.add(entry)
-            new_entries.append(entry)
-    
-    if new_entries:
-        db.commit()
-        for entry in new_entries:
-            db.refresh(entry)
-    
-    # Return all entries for this timesheet
-    return db.query(models.TimesheetEntry).filter(
-        models.TimesheetEntry.timesheet_id == timesheet_id
+            SELECT CAST(:timesheet_id AS uuid),
+                   coalesce(c.invoice_contact_name, 'Unknown'),
+                   c.candidate_id::text,
+                   'TBD',  -- Will be set when assigned to a client
+                   false, 0, 0, 0, 0, 0, 0, 0, 0
+            FROM app.m_candidate c
+            ON CONFLICT (timesheet_id, employee_code) DO NOTHING
+            RETURNING *
+        )
+        SELECT * FROM app.t_timesheet_entry WHERE timesheet_id = CAST(:timesheet_id AS uuid)
+        UNION ALL
+        SELECT * FROM inserted
+    """)
+    entries = db.scalars(
+        select(models.TimesheetEntry).from_statement(statement),
+        {"timesheet_id": str(timesheet_id)}
     ).all()
+    # Detached so the commit doesn't expire them and trigger a reload per entry
+    for entry in entries:
+        db.expunge(entry)
+    db.commit()
+    return entries
 
 
 def list_rate_types(db: Session) -> List[models.RateType]:
@@ -1871,113 +2047,44 @@ def get_candidate_pcc_info(db: Session, candidate_ids: List[str]) -> Dict[str, D
 
 
 def get_holiday_summary_for_active_candidates(db: Session) -> List[Dict]:
-    """Compute holiday summary per active candidate.
-    - Active candidates: have at least one row in p_candidate_client (status not enforced here; include all active relationships)
-    - hours_worked: sum of standard_hours from t_contractor_hours (excluding deleted rows)
-    - total_holiday: 8% of hours_worked
-    - holiday_taken: sum of quantities in t_contractor_rate_hours where rate_type is Holiday
-      We resolve Holiday by looking up m_rate_type where rate_type_name ilike 'Holiday%'
-    - holiday_balance: total_holiday - holiday_taken
+    """Holiday summary per active candidate, read from the maintained ledger balances.
+    - Active candidates: non-deleted users with an active (status 0), non-deleted p_candidate_client row
+    - hours_worked / total_holiday (8% of hours worked) / holiday_taken / holiday_balance:
+      the 'contractor_hours' balance in t_holiday_balance, kept up to date by
+      record_contractor_hours_holiday as hours and rate hours are saved
     """
-    from sqlalchemy import func, and_
-
-    # Resolve Holiday rate_type ids (support multiple named variants)
-    holiday_rate_types = db.query(models.RateType.rate_type_id).filter(
-        models.RateType.rate_type_name.ilike('%holiday%'),
-        models.RateType.deleted_on.is_(None)
-    ).all()
-    holiday_rate_type_ids = [rt[0] for rt in holiday_rate_types] if holiday_rate_types else []
-
-    # Base: active candidates via p_candidate_client join to m_user for name/email
-    # Aggregate Hours Worked as sum of quantities from t_contractor_rate_hours where (rate_type=1, rate_frequency=1)
-    # Join through t_contractor_hours to attribute to contractor
-    rate_hours_sub = (
-        db.query(
-            models.ContractorHours.contractor_id.label('contractor_id'),
-            func.coalesce(func.sum(models.ContractorRateHours.quantity), 0.0).label('hours_worked')
-        )
-        .join(models.ContractorRateHours, models.ContractorRateHours.tch_id == models.ContractorHours.tch_id)
-        .filter(models.ContractorHours.deleted_on.is_(None))
-        .filter(models.ContractorRateHours.deleted_on.is_(None))
-        .filter(models.ContractorRateHours.rate_type_id == 1)
-        .filter(models.ContractorRateHours.rate_frequency_id == 1)
-        .group_by(models.ContractorHours.contractor_id)
-        .subquery()
-    )
-
-    # Fallback: sum of standard_hours from t_contractor_hours when no matching tcrh rows exist
-    standard_hours_sub = (
-        db.query(
-            models.ContractorHours.contractor_id.label('contractor_id'),
-            func.coalesce(func.sum(models.ContractorHours.standard_hours), 0.0).label('standard_sum')
-        )
-        .filter(models.ContractorHours.deleted_on.is_(None))
-        .group_by(models.ContractorHours.contractor_id)
-        .subquery()
-    )
-
-    # Aggregate holiday taken from t_contractor_rate_hours joined via tch
-    holiday_taken_sub = None
-    if holiday_rate_type_ids:
-        crh_join = (
-            db.query(
-                models.ContractorHours.contractor_id.label('contractor_id'),
-                func.coalesce(func.sum(models.ContractorRateHours.quantity), 0.0).label('holiday_taken')
-            )
-            .join(models.ContractorRateHours, models.ContractorRateHours.tch_id == models.ContractorHours.tch_id)
-            .filter(models.ContractorHours.deleted_on.is_(None))
-            .filter(models.ContractorRateHours.deleted_on.is_(None))
-            .filter(models.ContractorRateHours.rate_type_id.in_(holiday_rate_type_ids))
-            .group_by(models.ContractorHours.contractor_id)
-            .subquery()
-        )
-        holiday_taken_sub = crh_join
-
-    # Active candidates through p_candidate_client
-    pcc = models.P_CandidateClient
-    mu = models.MUser
-
-    name_expr = (func.coalesce(mu.first_name, '') + ' ' + func.coalesce(mu.last_name, ''))
-    hours_expr = func.coalesce(rate_hours_sub.c.hours_worked, standard_hours_sub.c.standard_sum, 0.0)
-    holiday_taken_expr = holiday_taken_sub.c.holiday_taken if holiday_taken_sub is not None else cast(0.0, Float)
-
-    query = (
-        db.query(
-            mu.user_id.label('user_id'),
-            func.max(name_expr).label('name'),
-            func.max(mu.email_id).label('email_id'),
-            func.max(hours_expr).label('hours_worked'),
-            func.max(holiday_taken_expr).label('holiday_taken')
-        )
-        .join(pcc, pcc.candidate_id == mu.user_id)
-        .outerjoin(rate_hours_sub, rate_hours_sub.c.contractor_id == mu.user_id)
-        .outerjoin(standard_hours_sub, standard_hours_sub.c.contractor_id == mu.user_id)
-    )
-
-    if holiday_taken_sub is not None:
-        query = query.outerjoin(holiday_taken_sub, holiday_taken_sub.c.contractor_id == mu.user_id)
-
-    # Only non-deleted users and non-deleted relationships and active status
-    query = query.filter(mu.deleted_on.is_(None)).filter(pcc.deleted_on.is_(None)).filter(pcc.status == 0)
-
-    rows = query.group_by(mu.user_id)
-
-    result = []
-    for r in rows.all():
-        hours_worked = float(r.hours_worked or 0.0)
-        total_holiday = hours_worked * 0.08
-        holiday_taken = float(r.holiday_taken or 0.0)
-        result.append({
+    rows = db.execute(
+        text("""
+            SELECT mu.user_id,
+                   trim(coalesce(mu.first_name, '') || ' ' || coalesce(mu.last_name, '')) AS name,
+                   mu.email_id,
+                   coalesce(b.hours_worked, 0) AS hours_worked,
+                   coalesce(b.total_holiday, 0) AS total_holiday,
+                   coalesce(b.holiday_taken, 0) AS holiday_taken,
+                   coalesce(b.holiday_balance, 0) AS holiday_balance
+            FROM app.m_user mu
+            LEFT JOIN app.t_holiday_balance b
+              ON b.candidate_id = mu.user_id AND b.source = 'contractor_hours'
+            WHERE mu.deleted_on IS NULL
+              AND EXISTS (
+                  SELECT 1 FROM app.p_candidate_client pcc
+                  WHERE pcc.candidate_id = mu.user_id AND pcc.deleted_on IS NULL AND pcc.status = 0
+              )
+        """)
+    ).fetchall()
+
+    return [
+        {
             'user_id': str(r.user_id),
-            'name': (r.name or '').strip(),
+            'name': r.name,
             'email_id': r.email_id,
-            'hours_worked': hours_worked,
-            'total_holiday': total_holiday,
-            'holiday_taken': holiday_taken,
-            'holiday_balance': total_holiday - holiday_taken
-        })
-
-    return result
+            'hours_worked': float(r.hours_worked),
+            'total_holiday': float(r.total_holiday),
+            'holiday_taken': float(r.holiday_taken),
+            'holiday_balance': float(r.holiday_balance)
+        }
+        for r in rows
+    ]
 
 def create_contract_with_rates(db: Session, contract_data: schemas.ContractWithRatesCreate) -> schemas.ContractWithRatesOut:
     """Create or update contract with rates in a single transaction"""
@@ -2111,6 +2218,7 @@ def create_contract_with_rates(db: Session, contract_data: schemas.ContractWithR
         # Commit transaction
         db.commit()
         db.refresh(pcc)
+        roster_cache.invalidate_client(pcc.client_id)
         
         # Refresh rates to get latest data
         for rate in created_rates:
@@ -2153,6 +2261,8 @@ def create_contractor_rate_hours(db: Session, rate_hours: schemas.ContractorRate
         created_by=rate_hours.created_by
     )
     db.add(db_rate_hours)
+    mark_payroll_dirty_for_contractor_hours(db, [rate_hours.tch_id])
+    record_contractor_hours_holiday(db, [rate_hours.tch_id])
     db.commit()
     db.refresh(db_rate_hours)
     return db_rate_hours
@@ -2176,6 +2286,8 @@ def create_multiple_contractor_rate_hours(db: Session, multiple_rates: schemas.M
         db.add(db_rate_hours)
         created_rates.append(db_rate_hours)
     
+    mark_payroll_dirty_for_contractor_hours(db, [multiple_rates.tch_id])
+    record_contractor_hours_holiday(db, [multiple_rates.tch_id])
     db.commit()
     
     # Refresh all created records
@@ -2214,6 +2326,8 @@ def upsert_multiple_contractor_rate_hours(db: Session, multiple_rates: schemas.M
         db.add(db_rate_hours)
         result_rates.append(db_rate_hours)
     
+    mark_payroll_dirty_for_contractor_hours(db, [multiple_rates.tch_id])
+    record_contractor_hours_holiday(db, [multiple_rates.tch_id])
     db.commit()
     
     # Refresh all created records
@@ -2246,6 +2360,8 @@ def update_contractor_rate_hours(db: Session, tcrh_id: int, rate_hours_update: s
         setattr(db_rate_hours, field, value)
     
     db_rate_hours.updated_on = func.now()
+    mark_payroll_dirty_for_contractor_hours(db, [db_rate_hours.tch_id])
+    record_contractor_hours_holiday(db, [db_rate_hours.tch_id])
     db.commit()
     db.refresh(db_rate_hours)
     return db_rate_hours
@@ -2263,6 +2379,8 @@ def delete_contractor_rate_hours(db: Session, tcrh_id: int, deleted_by: UUID):
     
     db_rate_hours.deleted_on = func.now()
     db_rate_hours.deleted_by = deleted_by
+    mark_payroll_dirty_for_contractor_hours(db, [db_rate_hours.tch_id])
+    record_contractor_hours_holiday(db, [db_rate_hours.tch_id])
     db.commit()
     db.refresh(db_rate_hours)
     return db_rate_hours
@@ -2279,6 +2397,9 @@ def delete_all_contractor_rate_hours_for_tch(db: Session, tch_id: UUID, deleted_
         rate_hours.deleted_on = func.now()
         rate_hours.deleted_by = deleted_by
     
+    if db_rate_hours:
+        mark_payroll_dirty_for_contractor_hours(db, [tch_id])
+        record_contractor_hours_holiday(db, [tch_id])
     db.commit()
     return len(db_rate_hours)
 
@@ -2669,8 +2790,307 @@ def update_constant(db: Session, constant_id: int, constant_update: schemas.MCon
     return db_constant
 
 
-def update_candidate_holiday_count(db: Session, candidate_id: str, hours_to_add: float):
-    """Update candidate's holiday count by adding 8% of standard hours worked"""
+HOLIDAY_ACCRUAL_RATE = 0.08  # holiday hours earned per hour worked
+HOLIDAY_EPSILON = 1e-9  # float noise below which a ledger delta is not written
+
+
+def record_holiday_ledger_entries(db: Session, entries: List[Dict], created_by: UUID = None) -> int:
+    """Append holiday ledger entries and apply them to the running balances.
+
+    Each entry has candidate_id, source, source_id, entry_type ('accrual',
+    'usage' or 'opening'), hours_worked, holiday_hours (+ earned, - taken),
+    effective_date and, for usage, optionally holiday_requested (the hours
+    asked for, when fewer could be deducted). One statement inserts the entries
+    and adds them to t_holiday_balance per (candidate, source), in the caller's
+    transaction. Only 'timesheet_entry' and 'opening' entries also move
+    m_candidate.holiday_count; 'contractor_hours' entries count towards the
+    holiday summary balance alone, since the same week's hours already accrue
+    through the timesheet entry.
+    """
+    if not entries:
+        return 0
+    columns = ['candidate_id', 'source', 'source_id', 'entry_type', 'hours_worked', 'holiday_hours',
+               'holiday_requested', 'effective_date']
+    params = {column: [entry.get(column) for entry in entries] for column in columns}
+    params['candidate_id'] = [str(value) for value in params['candidate_id']]
+    params['source_id'] = [str(value) if value is not None else None for value in params['source_id']]
+    params['hours_worked'] = [float(value or 0.0) for value in params['hours_worked']]
+    params['holiday_hours'] = [float(value or 0.0) for value in params['holiday_hours']]
+    params['holiday_requested'] = [float(value) if value is not None else None for value in params['holiday_requested']]
+    params['created_by'] = str(created_by) if created_by else None
+
+    db.execute(
+        text("""
+            WITH inserted AS (
+                INSERT INTO app.t_holiday_ledger (
+                    candidate_id, source, source_id, entry_type, hours_worked, holiday_hours, holiday_requested,
+                    effective_date, created_by
+                )
+                SELECT v.*, CAST(:created_by AS uuid)
+                FROM unnest(
+                    CAST(:candidate_id AS uuid[]), CAST(:source AS text[]), CAST(:source_id AS text[]),
+                    CAST(:entry_type AS text[]), CAST(:hours_worked AS float8[]), CAST(:holiday_hours AS float8[]),
+                    CAST(:holiday_requested AS float8[]), CAST(:effective_date AS date[])
+                ) AS v
+                RETURNING *
+            ), balances AS (
+                INSERT INTO app.t_holiday_balance AS b (
+                    candidate_id, source, hours_worked, total_holiday, holiday_taken, holiday_balance, last_entry_id, updated_on
+                )
+                SELECT candidate_id, source,
+                       sum(hours_worked),
+                       coalesce(sum(holiday_hours) FILTER (WHERE entry_type = 'accrual'), 0),
+                       coalesce(-sum(holiday_hours) FILTER (WHERE entry_type = 'usage'), 0),
+                       sum(holiday_hours),
+                       max(entry_id),
+                       NOW()
+                FROM inserted
+                GROUP BY candidate_id, source
+                ON CONFLICT (candidate_id, source) DO UPDATE SET
+                    hours_worked = b.hours_worked + EXCLUDED.hours_worked,
+                    total_holiday = b.total_holiday + EXCLUDED.total_holiday,
+                    holiday_taken = b.holiday_taken + EXCLUDED.holiday_taken,
+                    holiday_balance = b.holiday_balance + EXCLUDED.holiday_balance,
+                    last_entry_id = greatest(b.last_entry_id, EXCLUDED.last_entry_id),
+                    updated_on = EXCLUDED.updated_on
+            )
+            UPDATE app.m_candidate c
+            SET holiday_count = coalesce(c.holiday_count, 0) + d.holiday_hours
+            FROM (
+                SELECT candidate_id, sum(holiday_hours) AS holiday_hours
+                FROM inserted
+                WHERE source IN ('timesheet_entry', 'opening')
+                GROUP BY candidate_id
+            ) d
+            WHERE c.candidate_id = d.candidate_id
+        """),
+        params
+    )
+    return len(entries)
+
+
+def record_contractor_hours_holiday(db: Session, tch_ids: List, created_by: UUID = None) -> int:
+    """Bring the ledger in line with the current holiday figures of t_contractor_hours rows.
+
+    Compares each row's figures (v_contractor_hours_holiday) with what the
+    ledger already holds for it and appends only the difference, so saving the
+    same hours twice records nothing new and edits, soft deletes and moves to
+    another date or contractor become reversing entries. Runs in the caller's
+    transaction.
+    """
+    tch_ids = list({str(tch_id) for tch_id in tch_ids if tch_id})
+    if not tch_ids:
+        return 0
+    db.flush()
+    deltas = db.execute(
+        text("""
+            WITH current AS (
+                SELECT tch_id::text AS source_id, candidate_id, work_date AS effective_date, hours_worked, holiday_taken
+                FROM app.v_contractor_hours_holiday
+                WHERE tch_id = ANY(CAST(:tch_ids AS uuid[]))
+            ), recorded AS (
+                SELECT source_id, candidate_id, effective_date,
+                       sum(hours_worked) AS hours_worked,
+                       coalesce(sum(holiday_hours) FILTER (WHERE entry_type = 'accrual'), 0) AS accrued,
+                       coalesce(-sum(holiday_hours) FILTER (WHERE entry_type = 'usage'), 0) AS taken
+                FROM app.t_holiday_ledger
+                WHERE source = 'contractor_hours' AND source_id = ANY(CAST(:tch_ids AS text[]))
+                GROUP BY source_id, candidate_id, effective_date
+            )
+            SELECT source_id, candidate_id, effective_date,
+                   coalesce(c.hours_worked, 0) - coalesce(r.hours_worked, 0) AS hours_worked,
+                   coalesce(c.hours_worked, 0) * :rate - coalesce(r.accrued, 0) AS accrued,
+                   coalesce(c.holiday_taken, 0) - coalesce(r.taken, 0) AS taken
+            FROM current c
+            FULL JOIN recorded r USING (source_id, candidate_id, effective_date)
+        """),
+        {"tch_ids": tch_ids, "rate": HOLIDAY_ACCRUAL_RATE}
+    ).fetchall()
+
+    entries = []
+    for row in deltas:
+        base = {'candidate_id': row.candidate_id, 'source': 'contractor_hours',
+                'source_id': row.source_id, 'effective_date': row.effective_date}
+        if abs(row.hours_worked) > HOLIDAY_EPSILON or abs(row.accrued) > HOLIDAY_EPSILON:
+            entries.append(dict(base, entry_type='accrual', hours_worked=row.hours_worked, holiday_hours=row.accrued))
+        if abs(row.taken) > HOLIDAY_EPSILON:
+            entries.append(dict(base, entry_type='usage', hours_worked=0.0, holiday_hours=-row.taken))
+    return record_holiday_ledger_entries(db, entries, created_by)
+
+
+UUID_PATTERN = '^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'
+
+# Ledger entries the given timesheet entries (:entry_ids) still need, for the
+# candidates the caller has locked (:candidate_ids). Shared by
+# record_timesheet_entry_holiday and the holiday backfill, so both follow one rule.
+TIMESHEET_ENTRY_HOLIDAY_CHANGES_SQL = """
+    WITH target AS (
+        SELECT e.entry_id::text AS source_id, cand.candidate_id,
+               coalesce(e.standard_hours, 0) AS standard_hours,
+               coalesce(e.holiday_hours, 0) AS holiday_hours,
+               CAST(coalesce(e.created_on, now()) AS date) AS effective_date
+        FROM app.t_timesheet_entry e
+        JOIN app.m_candidate cand
+          ON e.employee_code ~ :uuid_pattern AND cand.candidate_id = CAST(e.employee_code AS uuid)
+        WHERE e.entry_id = ANY(CAST(:entry_ids AS uuid[]))
+          AND cand.candidate_id = ANY(CAST(:candidate_ids AS uuid[]))
+    ), recorded AS (
+        SELECT l.source_id,
+               sum(l.hours_worked) AS hours_worked,
+               coalesce(sum(l.holiday_hours) FILTER (WHERE l.entry_type = 'accrual'), 0) AS accrued,
+               coalesce(-sum(l.holiday_hours) FILTER (WHERE l.entry_type = 'usage'), 0) AS taken,
+               coalesce(sum(coalesce(l.holiday_requested, -l.holiday_hours)) FILTER (WHERE l.entry_type = 'usage'), 0) AS requested
+        FROM app.t_holiday_ledger l
+        JOIN target t ON l.source = 'timesheet_entry' AND l.source_id = t.source_id
+        GROUP BY l.source_id
+    ), accruals AS (
+        SELECT t.candidate_id, t.source_id, t.effective_date,
+               t.standard_hours - coalesce(r.hours_worked, 0) AS hours_worked,
+               t.standard_hours * :rate - coalesce(r.accrued, 0) AS holiday_hours
+        FROM target t LEFT JOIN recorded r USING (source_id)
+    ), requests AS (
+        -- Less holiday taken gives back only what was deducted beyond the new figure
+        SELECT t.candidate_id, t.source_id, t.effective_date,
+               t.holiday_hours - coalesce(r.requested, 0) AS requested,
+               CASE WHEN t.holiday_hours < coalesce(r.requested, 0)
+                    THEN greatest(0, coalesce(r.taken, 0) - greatest(t.holiday_hours, 0))
+                    ELSE 0 END AS given_back
+        FROM target t LEFT JOIN recorded r USING (source_id)
+    ), available AS (
+        SELECT cand.candidate_id,
+               coalesce(cand.holiday_count, 0)
+               + coalesce((SELECT sum(a.holiday_hours) FROM accruals a WHERE a.candidate_id = cand.candidate_id), 0)
+               + coalesce((SELECT sum(q.given_back) FROM requests q WHERE q.candidate_id = cand.candidate_id), 0) AS hours
+        FROM app.m_candidate cand
+        WHERE cand.candidate_id IN (SELECT candidate_id FROM target)
+    ), usages AS (
+        -- More holiday taken is deducted only down to 0 (in entry order), as in
+        -- deduct_candidate_holiday_count; the rest is recorded as requested and not owed later
+        SELECT q.candidate_id, q.source_id, q.effective_date, q.requested,
+               CASE WHEN q.requested > 0 THEN
+                        least(q.requested, greatest(0, a.hours - coalesce(sum(q.requested) FILTER (WHERE q.requested > 0) OVER (
+                            PARTITION BY q.candidate_id ORDER BY q.source_id
+                            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                        ), 0)))
+                    ELSE -q.given_back END AS taken
+        FROM requests q JOIN available a USING (candidate_id)
+    ), changes AS (
+        SELECT candidate_id, source_id, effective_date, 'accrual' AS entry_type, hours_worked, holiday_hours,
+               CAST(NULL AS float8) AS holiday_requested
+        FROM accruals
+        WHERE abs(hours_worked) > :epsilon OR abs(holiday_hours) > :epsilon
+        UNION ALL
+        SELECT candidate_id, source_id, effective_date, 'usage', 0, -taken, requested
+        FROM usages
+        WHERE abs(requested) > :epsilon
+    )
+"""
+
+
+def lock_holiday_candidates(db: Session, candidate_ids: List) -> List[str]:
+    """Lock candidates' rows, in candidate_id order, before their ledger entries are computed.
+
+    Anything else recording holiday for the same candidates waits for the
+    caller's transaction, so the next statement sees their entries and
+    holiday_count as they were committed. Returns the ids that exist.
+    """
+    candidate_ids = sorted({str(candidate_id) for candidate_id in candidate_ids if candidate_id})
+    if not candidate_ids:
+        return []
+    return [
+        str(candidate_id) for candidate_id in db.execute(
+            text("""
+                SELECT candidate_id FROM app.m_candidate
+                WHERE candidate_id = ANY(CAST(:candidate_ids AS uuid[]))
+                ORDER BY candidate_id
+                FOR NO KEY UPDATE
+            """),
+            {"candidate_ids": candidate_ids}
+        ).scalars()
+    ]
+
+
+def record_timesheet_entry_holiday(db: Session, entry_ids: List, created_by: UUID = None) -> int:
+    """Bring the ledger in line with the current holiday figures of timesheet entries.
+
+    Compares each entry (8% of standard_hours accrues, holiday_hours is used)
+    with what the ledger already holds for it and appends only the difference,
+    with usage deducted only down to a holiday count of 0. Runs in the
+    caller's transaction, so an entry and its ledger entries commit together,
+    and writes nothing for an entry the holiday backfill already recorded.
+    """
+    entry_ids = list({str(entry_id) for entry_id in entry_ids if entry_id})
+    if not entry_ids:
+        return 0
+    db.flush()
+    candidate_ids = db.execute(
+        text("""
+            SELECT DISTINCT employee_code FROM app.t_timesheet_entry
+            WHERE entry_id = ANY(CAST(:entry_ids AS uuid[])) AND employee_code ~ :uuid_pattern
+        """),
+        {"entry_ids": entry_ids, "uuid_pattern": UUID_PATTERN}
+    ).scalars().all()
+    candidate_ids = lock_holiday_candidates(db, candidate_ids)
+    if not candidate_ids:
+        return 0
+
+    changes = db.execute(
+        text(TIMESHEET_ENTRY_HOLIDAY_CHANGES_SQL + "SELECT * FROM changes"),
+        {"entry_ids": entry_ids, "candidate_ids": candidate_ids, "uuid_pattern": UUID_PATTERN,
+         "rate": HOLIDAY_ACCRUAL_RATE, "epsilon": HOLIDAY_EPSILON}
+    ).fetchall()
+    entries = [
+        {'candidate_id': row.candidate_id, 'source': 'timesheet_entry', 'source_id': row.source_id,
+         'entry_type': row.entry_type, 'hours_worked': row.hours_worked, 'holiday_hours': row.holiday_hours,
+         'holiday_requested': row.holiday_requested, 'effective_date': row.effective_date}
+        for row in changes
+    ]
+    return record_holiday_ledger_entries(db, entries, created_by)
+
+
+def get_holiday_balance_as_of(db: Session, candidate_id: str, as_of, source: str = None) -> Dict:
+    """Reconstruct a candidate's holiday figures from the ledger as they stood on a date"""
+    row = db.execute(
+        text("""
+            SELECT coalesce(sum(hours_worked), 0) AS hours_worked,
+                   coalesce(sum(holiday_hours) FILTER (WHERE entry_type = 'accrual'), 0) AS total_holiday,
+                   coalesce(-sum(holiday_hours) FILTER (WHERE entry_type = 'usage'), 0) AS holiday_taken,
+                   coalesce(sum(holiday_hours), 0) AS holiday_balance,
+                   count(*) AS entries
+            FROM app.t_holiday_ledger
+            WHERE candidate_id = :candidate_id
+              AND effective_date <= :as_of
+              AND (CAST(:source AS text) IS NULL OR source = :source)
+        """),
+        {"candidate_id": str(candidate_id), "as_of": as_of, "source": source}
+    ).fetchone()
+    return {
+        'candidate_id': str(candidate_id),
+        'as_of': as_of,
+        'source': source,
+        'hours_worked': float(row.hours_worked),
+        'total_holiday': float(row.total_holiday),
+        'holiday_taken': float(row.holiday_taken),
+        'holiday_balance': float(row.holiday_balance),
+        'entries': row.entries
+    }
+
+
+def get_holiday_ledger(db: Session, candidate_id: str, skip: int = 0, limit: int = 100):
+    """A candidate's ledger entries, newest first"""
+    return (
+        db.query(models.HolidayLedgerEntry)
+        .filter(models.HolidayLedgerEntry.candidate_id == candidate_id)
+        .order_by(models.HolidayLedgerEntry.effective_date.desc(), models.HolidayLedgerEntry.entry_id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def update_candidate_holiday_count(db: Session, candidate_id: str, hours_to_add: float,
+                                   source_id: str = None, effective_date=None):
+    """Accrue 8% of standard hours worked to the candidate's holiday count (as a ledger entry)"""
     try:
         print(f"🔄 Updating holiday count for candidate {candidate_id}: adding {hours_to_add} hours")
         
@@ -2681,17 +3101,23 @@ def update_candidate_holiday_count(db: Session, candidate_id: str, hours_to_add:
             return False
         
         # Calculate 8% of the hours
-        holiday_earned = hours_to_add * 0.08
-        
-        # Update holiday_count (add to existing value)
+        holiday_earned = hours_to_add * HOLIDAY_ACCRUAL_RATE
         current_holiday_count = candidate.holiday_count or 0.0
-        new_holiday_count = current_holiday_count + holiday_earned
-        candidate.holiday_count = new_holiday_count
+        
+        record_holiday_ledger_entries(db, [{
+            'candidate_id': candidate_id,
+            'source': 'timesheet_entry',
+            'source_id': source_id,
+            'entry_type': 'accrual',
+            'hours_worked': hours_to_add,
+            'holiday_hours': holiday_earned,
+            'effective_date': effective_date or datetime.now().date()
+        }])
         
         db.commit()
         db.refresh(candidate)
         
-        print(f"✅ Updated holiday count for candidate {candidate_id}: {current_holiday_count} -> {new_holiday_count} (+{holiday_earned})")
+        print(f"✅ Updated holiday count for candidate {candidate_id}: {current_holiday_count} -> {candidate.holiday_count} (+{holiday_earned})")
         return True
         
     except Exception as e:
@@ -2700,8 +3126,9 @@ def update_candidate_holiday_count(db: Session, candidate_id: str, hours_to_add:
         return False
 
 
-def deduct_candidate_holiday_count(db: Session, candidate_id: str, holiday_hours_used: float):
-    """Deduct holiday hours from candidate's holiday count when holiday is taken"""
+def deduct_candidate_holiday_count(db: Session, candidate_id: str, holiday_hours_used: float,
+                                   source_id: str = None, effective_date=None):
+    """Deduct holiday hours taken from the candidate's holiday count (negative hours give them back)"""
     try:
         print(f"🔄 Deducting holiday hours for candidate {candidate_id}: deducting {holiday_hours_used} hours")
         
@@ -2711,15 +3138,28 @@ def deduct_candidate_holiday_count(db: Session, candidate_id: str, holiday_hours
             print(f"❌ Candidate {candidate_id} not found")
             return False
         
-        # Deduct holiday hours from holiday_count
+        # Don't go below 0; the ledger records the amount actually deducted next to
+        # the amount requested, so the remainder isn't deducted again later
         current_holiday_count = candidate.holiday_count or 0.0
-        new_holiday_count = max(0.0, current_holiday_count - holiday_hours_used)  # Don't go below 0
-        candidate.holiday_count = new_holiday_count
+        new_holiday_count = max(0.0, current_holiday_count - holiday_hours_used)
+        applied = new_holiday_count - current_holiday_count
+        
+        if holiday_hours_used:
+            record_holiday_ledger_entries(db, [{
+                'candidate_id': candidate_id,
+                'source': 'timesheet_entry',
+                'source_id': source_id,
+                'entry_type': 'usage',
+                'hours_worked': 0.0,
+                'holiday_hours': applied,
+                'holiday_requested': holiday_hours_used,
+                'effective_date': effective_date or datetime.now().date()
+            }])
         
         db.commit()
         db.refresh(candidate)
         
-        print(f"✅ Deducted holiday hours for candidate {candidate_id}: {current_holiday_count} -> {new_holiday_count} (-{holiday_hours_used})")
+        print(f"✅ Deducted holiday hours for candidate {candidate_id}: {current_holiday_count} -> {candidate.holiday_count} (-{holiday_hours_used})")
         return True
         
     except Exception as e:
@@ -2728,105 +3168,19 @@ def deduct_candidate_holiday_count(db: Session, candidate_id: str, holiday_hours
         return False
 
 
-def process_contractor_hours_for_holiday_tracking(db: Session, contractor_hours_data: List[schemas.ContractorHoursUpsert]):
-    """Process contractor hours and update holiday count for standard hours, deduct for holiday hours"""
-    try:
-        print(f"🔄 Processing contractor hours for holiday tracking")
-        
-        for hours_data in contractor_hours_data:
-            if not hours_data.contractor_id:
-                continue
-                
-            # Process standard hours (rate_type=1, rate_frequency=1) for holiday accumulation
-            if hours_data.rate_hours:
-                standard_hours_total = 0.0
-                holiday_hours_total = 0.0
-                
-                for rate_hour in hours_data.rate_hours:
-                    if not rate_hour.quantity or rate_hour.quantity <= 0:
-                        continue
-                    
-                    # Check if this is standard hours (rate_type=1, rate_frequency=1)
-                    if rate_hour.rate_type_id == 1 and rate_hour.rate_frequency_id == 1:
-                        standard_hours_total += rate_hour.quantity
-                        print(f"🔍 Found standard hours: {rate_hour.quantity} for candidate {hours_data.contractor_id}")
-                    
-                    # Check if this is holiday hours (rate_type with name like 'Holiday')
-                    # We need to check the rate_type name to identify holiday
-                    rate_type = db.query(models.RateType).filter(
-                        models.RateType.rate_type_id == rate_hour.rate_type_id,
-                        models.RateType.deleted_on.is_(None)
-                    ).first()
-                    
-                    if rate_type and rate_type.rate_type_name and 'holiday' in rate_type.rate_type_name.lower():
-                        holiday_hours_total += rate_hour.quantity
-                        print(f"🔍 Found holiday hours: {rate_hour.quantity} for candidate {hours_data.contractor_id}")
-                
-                # Update holiday count based on standard hours (8% accumulation)
-                if standard_hours_total > 0:
-                    update_candidate_holiday_count(db, str(hours_data.contractor_id), standard_hours_total)
-                
-                # Deduct holiday count based on holiday hours used
-                if holiday_hours_total > 0:
-                    deduct_candidate_holiday_count(db, str(hours_data.contractor_id), holiday_hours_total)
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error processing contractor hours for holiday tracking: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def backfill_holiday_tracking_for_timesheet_entries(db: Session, timesheet_id: str = None):
-    """Backfill holiday tracking for existing timesheet entries"""
+def backfill_holiday_tracking_for_timesheet_entries(db: Session, timesheet_id: str = None, dry_run: bool = False,
+                                                   chunk_size: int = None, workers: int = None,
+                                                   restart: bool = False) -> Optional[Dict]:
+    """Backfill holiday tracking for existing timesheet entries (see services/holiday_backfill.py)"""
+    from .services.holiday_backfill import backfill_timesheet_holidays
     try:
-        print(f"🔄 Backfilling holiday tracking for timesheet entries")
-        
-        # Get all timesheet entries (optionally filtered by timesheet_id)
-        query = db.query(models.TimesheetEntry)
-        if timesheet_id:
-            query = query.filter(models.TimesheetEntry.timesheet_id == timesheet_id)
-        
-        entries = query.all()
-        print(f"🔍 Found {len(entries)} timesheet entries to process")
-        
-        processed_count = 0
-        for entry in entries:
-            try:
-                standard_hours = entry.standard_hours or 0.0
-                holiday_hours = entry.holiday_hours or 0.0
-                candidate_id = entry.employee_code
-                
-                if not candidate_id:
-                    print(f"⚠️ Skipping entry {entry.entry_id} - no employee_code")
-                    continue
-                
-                print(f"🔍 Processing entry for candidate {candidate_id}: standard={standard_hours}, holiday={holiday_hours}")
-                
-                # Update holiday count based on standard hours (8% accumulation)
-                if standard_hours > 0:
-                    update_candidate_holiday_count(db, candidate_id, standard_hours)
-                
-                # Deduct holiday count based on holiday hours
-                if holiday_hours > 0:
-                    deduct_candidate_holiday_count(db, candidate_id, holiday_hours)
-                
-                processed_count += 1
-                
-            except Exception as e:
-                print(f"❌ Error processing entry {entry.entry_id}: {e}")
-                continue
-        
-        print(f"✅ Successfully processed {processed_count} timesheet entries")
-        return True
-        
+        return backfill_timesheet_holidays(timesheet_id, dry_run=dry_run, chunk_size=chunk_size,
+                                           workers=workers, restart=restart)
     except Exception as e:
         print(f"❌ Error backfilling holiday tracking: {e}")
         import traceback
         traceback.print_exc()
-        return False
+        return None
 
 
 # Payroll Report CRUD Functions
@@ -2909,9 +3263,12 @@ def create_payroll_period(db: Session, period: schemas.PayrollPeriodCreate, crea
     return db_period
 
 
-def get_payroll_period(db: Session, period_id: UUID):
-    """Get a payroll period by ID"""
-    return db.query(models.PayrollPeriod).filter(models.PayrollPeriod.period_id == period_id).first()
+def get_payroll_period(db: Session, period_id: UUID, for_update: bool = False):
+    """Get a payroll period by ID, optionally locking it until the transaction ends"""
+    query = db.query(models.PayrollPeriod).filter(models.PayrollPeriod.period_id == period_id)
+    if for_update:
+        query = query.with_for_update().populate_existing()
+    return query.first()
 
 
 def get_payroll_periods(db: Session, skip: int = 0, limit: int = 100):
@@ -2925,6 +3282,7 @@ def update_payroll_period(db: Session, period_id: UUID, period_update: schemas.P
     if not db_period:
         return None
     
+    was_closed = is_closed_period(db_period)
     update_data = period_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_period, field, value)
@@ -2932,6 +3290,14 @@ def update_payroll_period(db: Session, period_id: UUID, period_update: schemas.P
     db_period.updated_by = updated_by
     db_period.updated_on = datetime.now()
     
+    # Freeze the period's runs when it is locked/completed, drop the snapshot when reopened
+    snapshots = PayrollSnapshotStore(db)
+    if is_closed_period(db_period):
+        if not was_closed or 'status' in update_data:
+            snapshots.write(db_period, _query_payroll_runs_with_details(db, period_id))
+    elif was_closed:
+        snapshots.delete(period_id)
+    
     db.commit()
     db.refresh(db_period)
     return db_period
@@ -2972,6 +3338,153 @@ def create_payroll_run(db: Session, run: schemas.PayrollRunCreate, created_by: U
     return db_run
 
 
+def mark_payroll_contractors_dirty(db: Session, contractor_dates: List) -> None:
+    """Flag (contractor_id, work_date) pairs for incremental payroll recalculation.
+
+    Each pair marks the contractor dirty in every payroll period covering the
+    work date. Runs in the caller's transaction, so the flag commits with the
+    hours change.
+    """
+    pairs = {(str(contractor_id), work_date) for contractor_id, work_date in contractor_dates
+             if contractor_id and work_date}
+    if not pairs:
+        return
+    contractor_ids, work_dates = zip(*pairs)
+    db.execute(
+        text("""
+            INSERT INTO app.t_payroll_dirty_contractor (period_id, contractor_id, marked_on)
+            SELECT DISTINCT p.period_id, v.contractor_id, NOW()
+            FROM unnest(CAST(:contractor_ids AS uuid[]), CAST(:work_dates AS date[])) AS v(contractor_id, work_date)
+            JOIN app.t_payroll_period p ON v.work_date BETWEEN p.start_date AND p.end_date
+            ON CONFLICT (period_id, contractor_id) DO UPDATE SET marked_on = EXCLUDED.marked_on
+        """),
+        {"contractor_ids": list(contractor_ids), "work_dates": list(work_dates)}
+    )
+
+
+def mark_payroll_dirty_for_contractor_hours(db: Session, tch_ids: List) -> None:
+    """Flag the contractors behind t_contractor_hours rows (e.g. after rate hours change)"""
+    if not tch_ids:
+        return
+    rows = db.query(
+        models.ContractorHours.contractor_id,
+        models.ContractorHours.work_date
+    ).filter(models.ContractorHours.tch_id.in_(tch_ids)).all()
+    mark_payroll_contractors_dirty(db, rows)
+
+
+def claim_dirty_payroll_contractors(db: Session, period_id: UUID, contractor_ids: List = None) -> List[str]:
+    """Remove a period's dirty flags (or some contractors' flags) and return the contractor ids removed.
+
+    Called at the start of a recalculation, in its transaction and before any
+    hours are read: an hours save committing after the claim leaves a new flag
+    for the next run instead of having it cleared unprocessed. If the
+    recalculation fails, the rollback restores the claimed flags.
+    """
+    params = {"period_id": str(period_id)}
+    contractor_filter = ""
+    if contractor_ids:
+        contractor_filter = "AND contractor_id = ANY(CAST(:contractor_ids AS uuid[]))"
+        params["contractor_ids"] = [str(contractor_id) for contractor_id in contractor_ids]
+    rows = db.execute(
+        text(f"""
+            DELETE FROM app.t_payroll_dirty_contractor
+            WHERE period_id = :period_id {contractor_filter}
+            RETURNING contractor_id
+        """),
+        params
+    ).all()
+    return [str(row.contractor_id) for row in rows]
+
+
+def upsert_payroll_runs(db: Session, runs: List[Dict], batch_size: int = 1000) -> List[models.PayrollRun]:
+    """Insert or update payroll runs with INSERT ... ON CONFLICT (period_id, contractor_id) DO UPDATE.
+
+    Each dict holds PayrollRun column values including period_id and contractor_id.
+    Rows are sent in batches of batch_size; nothing is committed, so the caller can
+    write the period summary in the same transaction.
+    """
+    if not runs:
+        return []
+
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    rows = []
+    for run in runs:
+        row = dict(run)
+        row['period_id'] = UUID(str(row['period_id']))
+        row['contractor_id'] = UUID(str(row['contractor_id']))
+        rows.append(row)
+
+    update_fields = [field for field in rows[0] if field not in ('period_id', 'contractor_id')]
+
+    payroll_runs = []
+    for start in range(0, len(rows), batch_size):
+        stmt = pg_insert(models.PayrollRun).values(rows[start:start + batch_size])
+        set_ = {field: stmt.excluded[field] for field in update_fields}
+        set_['updated_by'] = None
+        set_['updated_on'] = func.now()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['period_id', 'contractor_id'],
+            set_=set_
+        ).returning(models.PayrollRun)
+        payroll_runs.extend(
+            db.scalars(stmt, execution_options={"populate_existing": True}).all()
+        )
+
+    return payroll_runs
+
+
+def upsert_payroll_run_columns(db: Session, period_id: UUID, contractor_ids: List[str],
+                               columns: Dict[str, List[float]], status: str = 'pending') -> List[models.PayrollRun]:
+    """Insert or update a period's payroll runs from one value list per column.
+
+    Same upsert as upsert_payroll_runs, but each PayrollRun figure column travels
+    as a single float8[] parameter expanded with unnest, so no per-run dict or
+    parameter set is built. columns maps column names to one value per entry of
+    contractor_ids. Nothing is committed.
+    """
+    if not contractor_ids:
+        return []
+
+    fields = list(columns)
+    assignments = ', '.join(f"{field} = EXCLUDED.{field}" for field in fields + ['status'])
+    stmt = select(models.PayrollRun).from_statement(text(f"""
+        INSERT INTO app.t_payroll_run (contractor_id, {', '.join(fields)}, period_id, status)
+        SELECT v.*, CAST(:period_id AS uuid), :status
+        FROM unnest(
+            CAST(:contractor_id AS uuid[]),
+            {', '.join(f"CAST(:{field} AS float8[])" for field in fields)}
+        ) AS v
+        ON CONFLICT (period_id, contractor_id) DO UPDATE
+        SET {assignments}, updated_by = NULL, updated_on = now()
+        RETURNING *
+    """))
+    params = {field: columns[field] for field in fields}
+    params.update(period_id=str(period_id), status=status, contractor_id=[str(c) for c in contractor_ids])
+    return db.scalars(stmt, params, execution_options={"populate_existing": True}).all()
+
+
+def get_payroll_run_totals(db: Session, period_id: UUID) -> Dict:
+    """A period's payroll summary figures, summed over all of its t_payroll_run rows"""
+    row = db.execute(
+        text("""
+            SELECT count(*) AS total_contractors,
+                   coalesce(sum(total_hours), 0) AS total_hours,
+                   coalesce(sum(gross_pay), 0) AS total_gross_pay,
+                   coalesce(sum(total_deductions), 0) AS total_deductions,
+                   coalesce(sum(net_pay), 0) AS total_net_pay,
+                   coalesce(sum(tax_deduction), 0) AS total_tax,
+                   coalesce(sum(prsi_deduction), 0) AS total_prsi,
+                   coalesce(sum(usc_deduction), 0) AS total_usc
+            FROM app.t_payroll_run
+            WHERE period_id = :period_id
+        """),
+        {"period_id": str(period_id)}
+    ).mappings().one()
+    return {field: (int(value) if field == 'total_contractors' else float(value)) for field, value in row.items()}
+
+
 def get_payroll_runs_by_period(db: Session, period_id: UUID):
     """Get all payroll runs for a specific period"""
     return db.query(models.PayrollRun).filter(models.PayrollRun.period_id == period_id).all()
@@ -3064,71 +3577,124 @@ def create_payroll_summary(db: Session, summary: schemas.PayrollSummaryCreate):
     return db_summary
 
 
-def get_payroll_summary_by_period(db: Session, period_id: UUID):
-    """Get payroll summary for a specific period"""
-    return db.query(models.PayrollSummary).filter(models.PayrollSummary.period_id == period_id).first()
+def upsert_payroll_summary(db: Session, period_id: UUID, totals: Dict) -> models.PayrollSummary:
+    """Insert or update a period's payroll summary with INSERT ... ON CONFLICT (period_id) DO UPDATE.
+
+    totals holds PayrollSummary figures (total_contractors, total_hours, ...).
+    Nothing is committed, so the caller writes the runs and the summary together.
+    """
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    stmt = pg_insert(models.PayrollSummary).values(period_id=UUID(str(period_id)), **totals)
+    set_ = {field: stmt.excluded[field] for field in totals}
+    set_['updated_on'] = func.now()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['period_id'],
+        set_=set_
+    ).returning(models.PayrollSummary)
+    return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
+
+def get_payroll_summary_by_period(db: Session, period_id: UUID, for_update: bool = False):
+    """Get payroll summary for a specific period, optionally locking it until the transaction ends"""
+    query = db.query(models.PayrollSummary).filter(models.PayrollSummary.period_id == period_id)
+    if for_update:
+        query = query.with_for_update().populate_existing()
+    return query.first()
+
+
+def get_contractor_hours_totals(db: Session, start_date, end_date, contractor_ids: List = None):
+    """Per-contractor hour and pay totals for a date range, aggregated in SQL.
+
+    One row per contractor with the four hour sums and four hours x rate sums,
+    so payroll never has to load full t_contractor_hours rows. Served by the
+    (work_date, contractor_id) index.
+    """
+    return _contractor_hours_totals_query(db, start_date, end_date, contractor_ids).all()
+
+
+def get_contractor_hours_columns(db: Session, start_date, end_date, contractor_ids: List = None) -> Dict[str, List]:
+    """The rows of get_contractor_hours_totals as one list per column.
+
+    Each column is aggregated into an array by the database, so a period with
+    many contractors comes back as nine lists (contractor_id as text) rather
+    than one result row per contractor. All lists follow the same order.
+    """
+    totals = _contractor_hours_totals_query(db, start_date, end_date, contractor_ids).subquery()
+    columns = ['contractor_id', 'standard_hours', 'holiday_hours', 'weekend_hours', 'oncall_hours',
+               'standard_pay', 'holiday_pay', 'weekend_pay', 'oncall_pay']
+    row = db.query(
+        func.array_agg(cast(totals.c.contractor_id, String)),
+        *(func.array_agg(totals.c[column]) for column in columns[1:])
+    ).one()
+    return {column: values or [] for column, values in zip(columns, row)}
+
+
+def _contractor_hours_totals_query(db: Session, start_date, end_date, contractor_ids: List = None):
+    ch = models.ContractorHours
+
+    def hours(column):
+        return func.coalesce(column, 0.0)
+
+    query = db.query(
+        ch.contractor_id,
+        func.sum(hours(ch.standard_hours)).label('standard_hours'),
+        func.sum(hours(ch.bank_holiday_hours)).label('holiday_hours'),
+        func.sum(hours(ch.weekend_hours)).label('weekend_hours'),
+        func.sum(hours(ch.on_call_hours)).label('oncall_hours'),
+        func.sum(hours(ch.standard_hours) * hours(ch.standard_pay_rate)).label('standard_pay'),
+        func.sum(hours(ch.bank_holiday_hours) * hours(ch.bankholiday_pay_rate)).label('holiday_pay'),
+        func.sum(hours(ch.weekend_hours) * hours(ch.weekend_pay_rate)).label('weekend_pay'),
+        func.sum(hours(ch.on_call_hours) * hours(ch.oncall_pay_rate)).label('oncall_pay')
+    ).filter(
+        ch.work_date >= start_date,
+        ch.work_date <= end_date
+    )
+
+    if contractor_ids:
+        query = query.filter(ch.contractor_id.in_(contractor_ids))
+
+    return query.group_by(ch.contractor_id)
 
 
 def calculate_payroll_for_period(db: Session, period_id: UUID, contractor_ids: List[UUID] = None):
     """Calculate payroll for a specific period and contractors"""
     try:
-        # Get the payroll period
-        period = get_payroll_period(db, period_id)
+        # Lock the period: other runs of it (even its first, with no summary yet) wait,
+        # and it can't be locked/completed meanwhile. Then take its dirty flags before reading hours
+        period = get_payroll_period(db, period_id, for_update=True)
         if not period:
             raise ValueError("Payroll period not found")
+        if is_closed_period(period):
+            raise PayrollPeriodClosed(f"Payroll period is {period.status}")
         
-        # Get contractor hours for the period
-        query = db.query(models.ContractorHours).filter(
-            models.ContractorHours.work_date >= period.start_date,
-            models.ContractorHours.work_date <= period.end_date
-        )
-        
-        if contractor_ids:
-            query = query.filter(models.ContractorHours.contractor_id.in_(contractor_ids))
-        
-        contractor_hours = query.all()
+        claim_dirty_payroll_contractors(db, period_id, contractor_ids)
         
-        # Group hours by contractor
+        # Per-contractor totals for the period, aggregated in SQL
         contractor_data = {}
-        for hours in contractor_hours:
-            contractor_id = hours.contractor_id
-            if contractor_id not in contractor_data:
-                contractor_data[contractor_id] = {
-                    'total_hours': 0.0,
-                    'standard_hours': 0.0,
-                    'overtime_hours': 0.0,
-                    'holiday_hours': 0.0,
-                    'bank_holiday_hours': 0.0,
-                    'weekend_hours': 0.0,
-                    'oncall_hours': 0.0,
-                    'standard_pay': 0.0,
-                    'overtime_pay': 0.0,
-                    'holiday_pay': 0.0,
-                    'bank_holiday_pay': 0.0,
-                    'weekend_pay': 0.0,
-                    'oncall_pay': 0.0,
-                    'gross_pay': 0.0
-                }
-            
-            # Accumulate hours
-            contractor_data[contractor_id]['standard_hours'] += hours.standard_hours or 0.0
-            contractor_data[contractor_id]['holiday_hours'] += hours.bank_holiday_hours or 0.0
-            contractor_data[contractor_id]['weekend_hours'] += hours.weekend_hours or 0.0
-            contractor_data[contractor_id]['oncall_hours'] += hours.on_call_hours or 0.0
-            
-            # Calculate pay based on rates
-            standard_pay = (hours.standard_hours or 0.0) * (hours.standard_pay_rate or 0.0)
-            holiday_pay = (hours.bank_holiday_hours or 0.0) * (hours.bankholiday_pay_rate or 0.0)
-            weekend_pay = (hours.weekend_hours or 0.0) * (hours.weekend_pay_rate or 0.0)
-            oncall_pay = (hours.on_call_hours or 0.0) * (hours.oncall_pay_rate or 0.0)
-            
-            contractor_data[contractor_id]['standard_pay'] += standard_pay
-            contractor_data[contractor_id]['holiday_pay'] += holiday_pay
-            contractor_data[contractor_id]['weekend_pay'] += weekend_pay
-            contractor_data[contractor_id]['oncall_pay'] += oncall_pay
+        for totals in get_contractor_hours_totals(db, period.start_date, period.end_date, contractor_ids):
+            contractor_data[totals.contractor_id] = {
+                'total_hours': (totals.standard_hours + totals.holiday_hours +
+                                totals.weekend_hours + totals.oncall_hours),
+                'standard_hours': totals.standard_hours,
+                'overtime_hours': 0.0,
+                'holiday_hours': totals.holiday_hours,
+                'bank_holiday_hours': 0.0,
+                'weekend_hours': totals.weekend_hours,
+                'oncall_hours': totals.oncall_hours,
+                'standard_pay': totals.standard_pay,
+                'overtime_pay': 0.0,
+                'holiday_pay': totals.holiday_pay,
+                'bank_holiday_pay': 0.0,
+                'weekend_pay': totals.weekend_pay,
+                'oncall_pay': totals.oncall_pay,
+                'gross_pay': 0.0
+            }
+        
+        tax_table = get_tax_table(period.end_date.year)
         
         # Calculate totals and create payroll runs
-        payroll_runs = []
+        run_rows = []
         total_gross_pay = 0.0
         total_deductions = 0.0
         total_net_pay = 0.0
@@ -3138,14 +3704,15 @@ def calculate_payroll_for_period(db: Session, period_id: UUID, contractor_ids: L
             gross_pay = (data['standard_pay'] + data['holiday_pay'] + 
                         data['weekend_pay'] + data['oncall_pay'])
             
-            # Calculate deductions (simplified - you may want to implement proper tax calculations)
-            tax_deduction = gross_pay * 0.20  # 20% tax rate (simplified)
-            prsi_deduction = gross_pay * 0.04  # 4% PRSI (simplified)
-            usc_deduction = gross_pay * 0.02  # 2% USC (simplified)
-            total_deductions_amount = tax_deduction + prsi_deduction + usc_deduction
+            # PAYE/PRSI/USC from the period's tax year, as in PayrollCalculator
+            deductions = tax_table.deductions(gross_pay)
+            tax_deduction = deductions['tax']
+            prsi_deduction = deductions['prsi']
+            usc_deduction = deductions['usc']
+            total_deductions_amount = deductions['total']
             net_pay = gross_pay - total_deductions_amount
             
-            # Create payroll run
+            # Queue payroll run for the batched upsert
             payroll_run = schemas.PayrollRunCreate(
                 period_id=period_id,
                 contractor_id=contractor_id,
@@ -3170,38 +3737,30 @@ def calculate_payroll_for_period(db: Session, period_id: UUID, contractor_ids: L
                 status="pending"
             )
             
-            db_run = create_payroll_run(db, payroll_run)
-            payroll_runs.append(db_run)
+            run_rows.append(payroll_run.dict())
             
             total_gross_pay += gross_pay
             total_deductions += total_deductions_amount
             total_net_pay += net_pay
         
-        # Create or update payroll summary
-        summary = get_payroll_summary_by_period(db, period_id)
-        if summary:
-            summary.total_contractors = len(contractor_data)
-            summary.total_hours = sum(data['total_hours'] for data in contractor_data.values())
-            summary.total_gross_pay = total_gross_pay
-            summary.total_deductions = total_deductions
-            summary.total_net_pay = total_net_pay
-            summary.total_tax = sum(run.tax_deduction for run in payroll_runs)
-            summary.total_prsi = sum(run.prsi_deduction for run in payroll_runs)
-            summary.total_usc = sum(run.usc_deduction for run in payroll_runs)
-            summary.updated_on = datetime.now()
+        payroll_runs = upsert_payroll_runs(db, run_rows)
+        
+        # Create or update payroll summary in the same transaction; a run for some
+        # contractors only re-sums the period's runs, so the others stay counted
+        if contractor_ids:
+            summary_totals = get_payroll_run_totals(db, period_id)
         else:
-            summary_data = schemas.PayrollSummaryCreate(
-                period_id=period_id,
-                total_contractors=len(contractor_data),
-                total_hours=sum(data['total_hours'] for data in contractor_data.values()),
-                total_gross_pay=total_gross_pay,
-                total_deductions=total_deductions,
-                total_net_pay=total_net_pay,
-                total_tax=sum(run.tax_deduction for run in payroll_runs),
-                total_prsi=sum(run.prsi_deduction for run in payroll_runs),
-                total_usc=sum(run.usc_deduction for run in payroll_runs)
-            )
-            summary = create_payroll_summary(db, summary_data)
+            summary_totals = {
+                'total_contractors': len(contractor_data),
+                'total_hours': sum(data['total_hours'] for data in contractor_data.values()),
+                'total_gross_pay': total_gross_pay,
+                'total_deductions': total_deductions,
+                'total_net_pay': total_net_pay,
+                'total_tax': sum(run.tax_deduction for run in payroll_runs),
+                'total_prsi': sum(run.prsi_deduction for run in payroll_runs),
+                'total_usc': sum(run.usc_deduction for run in payroll_runs)
+            }
+        upsert_payroll_summary(db, period_id, summary_totals)
         
         db.commit()
         
@@ -3222,7 +3781,15 @@ def calculate_payroll_for_period(db: Session, period_id: UUID, contractor_ids: L
 
 
 def get_payroll_runs_with_details(db: Session, period_id: UUID):
-    """Get payroll runs with contractor details"""
+    """Get payroll runs with contractor details (from the snapshot for locked/completed periods)"""
+    snapshot = PayrollSnapshotStore(db).read(period_id)
+    if snapshot is not None:
+        return snapshot
+    return _query_payroll_runs_with_details(db, period_id)
+
+
+def _query_payroll_runs_with_details(db: Session, period_id: UUID):
+    """Join payroll runs with contractor and period details"""
     query = db.query(
         models.PayrollRun,
         models.MUser.first_name,
@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from .routers import auth, items, clients, candidates, timesheets, invoices, cost_centers, payroll
 from .database import engine, ensure_app_schema_exists
 from . import models
+from .services.contractor_hours_partitions import ensure_upcoming_partitions
 
 ensure_app_schema_exists()
 models.Base.metadata.create_all(bind=engine)
@@ -34,6 +35,15 @@ app.include_router(cost_centers.router, prefix="/api", tags=["cost-centers"])
 app.include_router(payroll.router, prefix="/api", tags=["payroll"])
 
 
+@app.on_event("startup")
+def ensure_contractor_hours_partitions():
+    """Make sure hours for this year and the next land in their own partitions, not the default one"""
+    try:
+        ensure_upcoming_partitions()
+    except Exception as e:
+        print(f"⚠️ Could not ensure contractor hours partitions: {e}")
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Dangan API"}
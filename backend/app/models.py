@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Date, Float, ForeignKey, text
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Date, Float, ForeignKey, UniqueConstraint, BigInteger, LargeBinary, text
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -83,7 +83,11 @@ class Timesheet(Base):
 
 class TimesheetEntry(Base):
     __tablename__ = "t_timesheet_entry"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        # One entry per candidate (employee_code = candidate_id) per timesheet; target of get-or-create
+        UniqueConstraint("timesheet_id", "employee_code", name="uq_t_timesheet_entry_timesheet_employee_code"),
+        {"schema": "app"},
+    )
 
     entry_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     timesheet_id = Column(UUID(as_uuid=True), ForeignKey("app.t_timesheet.timesheet_id"))
@@ -209,11 +213,13 @@ class ClientRate(Base):
 
 class ContractorHours(Base):
     __tablename__ = "t_contractor_hours"
+    # Range-partitioned by work_date in the database (see services/contractor_hours_partitions.py),
+    # so the primary key includes it; a trigger keeps tch_id unique on its own.
     __table_args__ = {"schema": "app"}
 
     tch_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     contractor_id = Column(UUID(as_uuid=True), ForeignKey("app.m_user.user_id"), nullable=False)
-    work_date = Column(Date, nullable=False)
+    work_date = Column(Date, primary_key=True, nullable=False)
     timesheet_id = Column(UUID(as_uuid=True), ForeignKey("app.t_timesheet.timesheet_id"), nullable=False)
     standard_hours = Column(Float, nullable=True)
     on_call_hours = Column(Float, nullable=True)
@@ -253,6 +259,19 @@ class ContractorHours(Base):
     dedh_pay_rate = Column(Float, nullable=True)
     dedh_bill_rate = Column(Float, nullable=True)
     pcc_id = Column(UUID(as_uuid=True), ForeignKey("app.p_candidate_client.pcc_id"), nullable=True)
+    change_xid = Column(BigInteger, nullable=True)  # Transaction that last wrote the row (set by a trigger)
+
+
+class ContractorHoursRemoved(Base):
+    __tablename__ = "t_contractor_hours_removed"
+    __table_args__ = {"schema": "app"}
+
+    # Rows that left a timesheet (moved to another one or hard-deleted), for delta sync
+    removed_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    tch_id = Column(UUID(as_uuid=True), nullable=False)
+    timesheet_id = Column(UUID(as_uuid=True), nullable=False)
+    change_xid = Column(BigInteger, nullable=False)
+    removed_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
 
 
 class ContractorRateHours(Base):
@@ -260,7 +279,8 @@ class ContractorRateHours(Base):
     __table_args__ = {"schema": "app"}
 
     tcrh_id = Column(Integer, primary_key=True)
-    tch_id = Column(UUID(as_uuid=True), ForeignKey("app.t_contractor_hours.tch_id"), nullable=False)
+    # References t_contractor_hours.tch_id; enforced by triggers, since the partitioned table's key includes work_date
+    tch_id = Column(UUID(as_uuid=True), nullable=False)
     rate_frequency_id = Column(Integer, nullable=False)
     rate_type_id = Column(Integer, nullable=False)
     tcr_id = Column(Integer, nullable=False)
@@ -428,7 +448,11 @@ class PayrollReport(Base):
 
 class PayrollRun(Base):
     __tablename__ = "t_payroll_run"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        # One run per contractor per period; target of the payroll upsert
+        UniqueConstraint("period_id", "contractor_id", name="uq_t_payroll_run_period_contractor"),
+        {"schema": "app"},
+    )
 
     run_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     period_id = Column(UUID(as_uuid=True), ForeignKey("app.t_payroll_period.period_id"), nullable=False)
@@ -487,7 +511,11 @@ class PayrollDeduction(Base):
 
 class PayrollSummary(Base):
     __tablename__ = "t_payroll_summary"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        # One summary per period; target of the payroll summary upsert
+        UniqueConstraint("period_id", name="uq_t_payroll_summary_period_id"),
+        {"schema": "app"},
+    )
 
     summary_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     period_id = Column(UUID(as_uuid=True), ForeignKey("app.t_payroll_period.period_id"), nullable=False)
@@ -501,3 +529,127 @@ class PayrollSummary(Base):
     total_usc = Column(Float, default=0.0)
     created_on = Column(DateTime(timezone=False), server_default=func.now())
     updated_on = Column(DateTime(timezone=False), nullable=True)
+
+
+class ClientContractSummary(Base):
+    __tablename__ = "t_client_contract_summary"
+    __table_args__ = {"schema": "app"}
+
+    # Precomputed per-client counters, maintained by a trigger on p_candidate_client
+    client_id = Column(UUID(as_uuid=True), ForeignKey("app.m_client.client_id"), primary_key=True)
+    active_contracts_count = Column(Integer, nullable=False, default=0)
+    updated_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+
+
+class ClientRosterVersion(Base):
+    __tablename__ = "t_client_roster_version"
+    __table_args__ = {"schema": "app"}
+
+    # Bumped by triggers whenever a client's roster changes; cached rosters are checked against it
+    client_id = Column(UUID(as_uuid=True), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+
+
+class InvoiceWeeksVersion(Base):
+    __tablename__ = "t_invoice_weeks_version"
+    __table_args__ = {"schema": "app"}
+
+    # Single row, bumped by triggers whenever t_invoice's set of weeks can change
+    id = Column(Integer, primary_key=True, default=1)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+
+
+class PayrollDirtyContractor(Base):
+    __tablename__ = "t_payroll_dirty_contractor"
+    __table_args__ = {"schema": "app"}
+
+    # Contractors whose hours changed since their period's payroll was last calculated
+    period_id = Column(UUID(as_uuid=True), ForeignKey("app.t_payroll_period.period_id"), primary_key=True)
+    contractor_id = Column(UUID(as_uuid=True), ForeignKey("app.m_user.user_id"), primary_key=True)
+    marked_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+
+
+class PayrollBatchJob(Base):
+    __tablename__ = "t_payroll_batch_job"
+    __table_args__ = {"schema": "app"}
+
+    # A multi-period payroll batch run and its per-period results so far
+    job_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    status = Column(String, nullable=False, default='pending')  # pending, running, completed, completed_with_errors, failed
+    parallel = Column(Boolean, nullable=False, default=True)
+    total_periods = Column(Integer, nullable=False, default=0)
+    processed_periods = Column(Integer, nullable=False, default=0)
+    period_ids = Column(JSONB, nullable=False, default=list)
+    results = Column(JSONB, nullable=False, default=list)
+    seconds = Column(Float, nullable=True)
+    periods_per_second = Column(Float, nullable=True)
+    error = Column(String, nullable=True)
+    created_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+    updated_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+    completed_on = Column(DateTime(timezone=False), nullable=True)
+
+
+class PayrollPeriodSnapshot(Base):
+    __tablename__ = "t_payroll_period_snapshot"
+    __table_args__ = {"schema": "app"}
+
+    # Compressed result set written when a period is locked/completed
+    period_id = Column(UUID(as_uuid=True), ForeignKey("app.t_payroll_period.period_id"), primary_key=True)
+    payload = Column(LargeBinary, nullable=False)  # gzip-compressed JSON of the period's runs
+    run_count = Column(Integer, nullable=False, default=0)
+    payload_size = Column(Integer, nullable=True)
+    checksum = Column(String(64), nullable=True)  # sha256 of the compressed payload
+    period_status = Column(String, nullable=True)
+    created_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+
+
+class HolidayLedgerEntry(Base):
+    __tablename__ = "t_holiday_ledger"
+    __table_args__ = {"schema": "app"}
+
+    # Append-only holiday accrual (+) and usage (-) movements; corrections are new entries
+    entry_id = Column(Integer, primary_key=True, autoincrement=True)
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("app.m_user.user_id"), nullable=False)
+    source = Column(String, nullable=False)  # contractor_hours, timesheet_entry, opening
+    source_id = Column(String, nullable=True)  # tch_id / entry_id the movement came from
+    entry_type = Column(String, nullable=False)  # accrual, usage, opening
+    hours_worked = Column(Float, nullable=False, default=0.0)
+    holiday_hours = Column(Float, nullable=False, default=0.0)
+    holiday_requested = Column(Float, nullable=True)  # usage asked for, when less could be deducted
+    effective_date = Column(Date, nullable=False)
+    created_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+    created_by = Column(UUID(as_uuid=True), nullable=True)
+
+
+class HolidayBalance(Base):
+    __tablename__ = "t_holiday_balance"
+    __table_args__ = {"schema": "app"}
+
+    # Running totals of t_holiday_ledger per candidate and source, updated with every ledger insert
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("app.m_user.user_id"), primary_key=True)
+    source = Column(String, primary_key=True)
+    hours_worked = Column(Float, nullable=False, default=0.0)
+    total_holiday = Column(Float, nullable=False, default=0.0)
+    holiday_taken = Column(Float, nullable=False, default=0.0)
+    holiday_balance = Column(Float, nullable=False, default=0.0)
+    last_entry_id = Column(Integer, nullable=True)
+    updated_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+
+
+class HolidayBackfillCheckpoint(Base):
+    __tablename__ = "t_holiday_backfill_checkpoint"
+    __table_args__ = {"schema": "app"}
+
+    # Last timesheet entry applied by each partition of a holiday backfill job
+    job_name = Column(String, primary_key=True)
+    partition = Column(Integer, primary_key=True)
+    partitions = Column(Integer, nullable=False)
+    last_entry_id = Column(UUID(as_uuid=True), nullable=True)
+    entries_processed = Column(Integer, nullable=False, default=0)
+    ledger_entries = Column(Integer, nullable=False, default=0)
+    holiday_hours = Column(Float, nullable=False, default=0.0)
+    started_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+    updated_on = Column(DateTime(timezone=False), server_default=func.now(), nullable=True)
+    completed_on = Column(DateTime(timezone=False), nullable=True)
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Optional
+from datetime import date
 import math
 import uuid
 from ..database import get_db
 from .. import crud, schemas, models
+from ..services.cost_center_resolver import resolve_cost_centers_for_candidates, resolve_cost_centers_for_pccs
 
 router = APIRouter()
 
@@ -265,6 +267,20 @@ def seed_candidates(db: Session = Depends(get_db)):
         return {"error": str(e)}
 
 
+@router.get("/search", response_model=List[schemas.CandidateSearchResult])
+def search_candidates(
+    q: str = Query(..., min_length=1, description="Name, email or PPS number (prefix, typos tolerated)"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results"),
+    db: Session = Depends(get_db)
+):
+    """Search candidates by name, email or PPS number"""
+    try:
+        return crud.search_candidates(db, q.strip(), limit)
+    except Exception as e:
+        print(f"❌ Error searching candidates: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/list", response_model=schemas.CandidateListResponse)
 def get_candidates_list(
     page: int = Query(1, ge=1, description="Page number"),
@@ -741,32 +757,30 @@ def create_contract_with_rates(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/cost-centers", response_model=Dict[str, List[schemas.CostCenterWithDetails]])
+def get_cost_centers_for_candidates(candidate_ids: List[str], db: Session = Depends(get_db)):
+    """Get cost centers for multiple candidates, keyed by candidate_id"""
+    try:
+        print(f"🚀 Getting cost centers for {len(candidate_ids)} candidates")
+        result = resolve_cost_centers_for_candidates(db, candidate_ids)
+        print(f"✅ Found {sum(len(v) for v in result.values())} cost centers")
+        return result
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        print(f"❌ Error getting cost centers for candidates: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/{user_id}/cost-centers", response_model=List[schemas.CostCenterWithDetails])
 def get_candidate_cost_centers(user_id: uuid.UUID, db: Session = Depends(get_db)):
     """Get all cost centers for a candidate"""
     try:
         print(f"🚀 Getting cost centers for candidate: {user_id}")
         
-        # Get the candidate's client relationships
-        relationships = crud.get_client_relationships_by_candidate(db, str(user_id))
-        if not relationships:
-            return []
-        
-        # Get cost centers for all client relationships
-        all_cost_centers = []
-        for relationship in relationships:
-            cost_centers = crud.get_candidate_cost_centers(db, relationship.pcc_id)
-            for cc_rel in cost_centers:
-                if cc_rel.cc_id:
-                    cost_center = crud.get_cost_center(db, cc_rel.cc_id)
-                    if cost_center:
-                        all_cost_centers.append(schemas.CostCenterWithDetails(
-                            id=cost_center.id,
-                            cc_name=cost_center.cc_name,
-                            cc_number=cost_center.cc_number,
-                            cc_address=cost_center.cc_address,
-                            relationship_id=cc_rel.id  # Include the relationship ID
-                        ))
+        all_cost_centers = resolve_cost_centers_for_candidates(db, [str(user_id)])[str(user_id)]
         
         print(f"✅ Found {len(all_cost_centers)} cost centers for candidate")
         return all_cost_centers
@@ -778,24 +792,41 @@ def get_candidate_cost_centers(user_id: uuid.UUID, db: Session = Depends(get_db)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get("/{user_id}/holiday-ledger", response_model=List[schemas.HolidayLedgerEntryOut])
+def get_candidate_holiday_ledger(
+    user_id: uuid.UUID,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Holiday accrual and usage entries for a candidate, newest first"""
+    try:
+        return crud.get_holiday_ledger(db, str(user_id), skip=skip, limit=limit)
+    except Exception as e:
+        print(f"❌ Error getting holiday ledger: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/{user_id}/holiday-balance", response_model=schemas.HolidayBalanceAsOf)
+def get_candidate_holiday_balance(
+    user_id: uuid.UUID,
+    as_of: Optional[date] = Query(None, description="Balance as it stood at the end of this date (default today)"),
+    source: Optional[str] = Query(None, description="Only entries from this source, e.g. contractor_hours"),
+    db: Session = Depends(get_db)
+):
+    """Holiday balance for a candidate at any past date, rebuilt from the ledger"""
+    try:
+        return crud.get_holiday_balance_as_of(db, str(user_id), as_of or date.today(), source)
+    except Exception as e:
+        print(f"❌ Error getting holiday balance: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/client-relationship/{pcc_id}/cost-centers", response_model=List[schemas.CostCenterWithDetails])
 def get_cost_centers_by_pcc(pcc_id: uuid.UUID, db: Session = Depends(get_db)):
     """List cost centers assigned to a specific candidate-client relationship (pcc)."""
     try:
-        rows = crud.get_candidate_cost_centers(db, str(pcc_id))
-        result: List[schemas.CostCenterWithDetails] = []
-        for rel in rows:
-            if rel.cc_id:
-                cc = crud.get_cost_center(db, rel.cc_id)
-                if cc:
-                    result.append(schemas.CostCenterWithDetails(
-                        id=cc.id,
-                        cc_name=cc.cc_name,
-                        cc_number=cc.cc_number,
-                        cc_address=cc.cc_address,
-                        relationship_id=rel.id
-                    ))
-        return result
+        return resolve_cost_centers_for_pccs(db, [str(pcc_id)])[str(pcc_id)]
     except Exception as e:
         print(f"❌ Error listing cost centers by pcc: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
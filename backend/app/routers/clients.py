@@ -1,8 +1,9 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from ..database import get_db
 from .. import crud, schemas, auth
+from ..services.roster_cache import roster_cache
 import logging
 
 router = APIRouter()
@@ -27,6 +28,25 @@ def get_rate_frequencies(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/search", response_model=List[schemas.ClientSearchResult])
+def search_clients(
+    q: str = Query(..., min_length=1, description="Client name or prefix"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    try:
+        return crud.search_clients(db, q.strip(), limit)
+    except Exception as e:
+        logging.exception("Failed to search clients")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/roster-cache/stats")
+def get_roster_cache_stats():
+    """Hit/miss metrics for the client roster cache"""
+    return roster_cache.stats()
+
+
 @router.post("/", response_model=schemas.Client)
 def create_client(
     client: schemas.ClientCreate,
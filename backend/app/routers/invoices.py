@@ -6,6 +6,7 @@ from datetime import datetime, date, timedelta
 import uuid
 from ..database import get_db
 from .. import schemas, models, crud
+from ..services.invoice_generator import generate_client_invoices
 
 router = APIRouter()
 
@@ -203,16 +204,24 @@ def generate_invoice(
         # Also check what clients are selected
         print(f"🔍 DEBUG: Selected client IDs: {request.clientIds}")
         
+        # Resolve the client for every contractor hour in one query
+        pcc_ids = {tch.pcc_id for tch in contractor_hours if tch.pcc_id}
+        client_by_pcc = dict(
+            db.query(models.P_CandidateClient.pcc_id, models.P_CandidateClient.client_id)
+            .filter(models.P_CandidateClient.pcc_id.in_(pcc_ids))
+            .all()
+        ) if pcc_ids else {}
+        
         # Check if any of the found contractor hours belong to the selected clients
-        for tch in contractor_hours:
-            if tch.pcc_id:
-                pcc = db.query(models.P_CandidateClient).filter(models.P_CandidateClient.pcc_id == tch.pcc_id).first()
-                if pcc:
-                    print(f"🔍 DEBUG: TCH {tch.tch_id} belongs to client {pcc.client_id}")
-                    if str(pcc.client_id) in request.clientIds:
-                        print(f"🔍 DEBUG: ✅ Client {pcc.client_id} is in selected clients")
+        if not request.parallel:
+            for tch in contractor_hours:
+                client_id = client_by_pcc.get(tch.pcc_id)
+                if client_id:
+                    print(f"🔍 DEBUG: TCH {tch.tch_id} belongs to client {client_id}")
+                    if str(client_id) in request.clientIds:
+                        print(f"🔍 DEBUG: ✅ Client {client_id} is in selected clients")
                     else:
-                        print(f"🔍 DEBUG: ❌ Client {pcc.client_id} is NOT in selected clients")
+                        print(f"🔍 DEBUG: ❌ Client {client_id} is NOT in selected clients")
         
         # Check if we have contractor hours for the specific work_date and clients
         if len(contractor_hours) == 0:
@@ -225,117 +234,23 @@ def generate_invoice(
         # 3. Group contractor hours by client_id to create separate invoices
         client_groups = {}
         for tch in contractor_hours:
-            if tch.pcc_id:
-                # Get client_id from p_candidate_client
-                pcc = db.query(models.P_CandidateClient).filter(models.P_CandidateClient.pcc_id == tch.pcc_id).first()
-                if pcc:
-                    client_id = pcc.client_id
-                    if client_id not in client_groups:
-                        client_groups[client_id] = []
-                    client_groups[client_id].append(tch)
+            client_id = client_by_pcc.get(tch.pcc_id)
+            if client_id:
+                if client_id not in client_groups:
+                    client_groups[client_id] = []
+                client_groups[client_id].append(tch)
         
         print(f"🔍 DEBUG: Found {len(client_groups)} clients for work_date {last_working_day}")
         
-        # Create separate invoice for each client
-        created_invoices = []
-        
-        for client_id, tch_list in client_groups.items():
-            print(f"🔍 DEBUG: Creating invoice for client {client_id} with {len(tch_list)} contractor hours")
-            
-            # Get next invoice number for this client
-            result = db.execute(text("SELECT constant FROM app.m_constant WHERE use_for = 'Sales' LIMIT 1"))
-            current_constant = result.fetchone()
-            
-            if current_constant:
-                next_invoice_num = str(int(current_constant[0]) + 1)
-                # Update the constant with new value
-                db.execute(text("UPDATE app.m_constant SET constant = :new_value WHERE use_for = 'Sales'"), 
-                          {"new_value": next_invoice_num})
-            else:
-                # If no constant exists, start with 1200000
-                next_invoice_num = "1200000"
-                db.execute(text("INSERT INTO app.m_constant (id, constant, use_for) VALUES (1, '1200001', 'Sales')"))
-            
-            # Create invoice for this client
-            client_invoice_id = str(uuid.uuid4())
-            client_invoice = models.Invoice(
-                invoice_id=client_invoice_id,
-                invoice_num=next_invoice_num,
-                invoice_date=invoice_date,
-                status="Draft",
-                show_invoices=True,
-                inv_client_id=client_id
-            )
-            db.add(client_invoice)
-            db.flush()
-            
-            # Process line items for this client only
-            line_items = []
-            total_amount = 0.0
-            
-            for tch in tch_list:
-                print(f"🔍 DEBUG: Processing contractor hour {tch.tch_id} for client {client_id}")
-                
-                # Get rate hours for this contractor hour only
-                rate_hours = db.query(models.ContractorRateHours).filter(
-                    models.ContractorRateHours.tch_id == tch.tch_id
-                ).all()
-                
-                if not rate_hours:
-                    print(f"🔍 DEBUG: No rate hours found for contractor hour {tch.tch_id}")
-                    continue  # Skip this contractor hour if no rate hours
-                
-                for rate_hour in rate_hours:
-                    # Calculate total: quantity * bill_rate
-                    total = (rate_hour.quantity or 0) * (rate_hour.bill_rate or 0)
-                    total_amount += total
-                    
-                    # Get candidate name, client name for m_rate_name
-                    m_rate_name = ""
-                    if tch.pcc_id:
-                        # Get candidate and client info through pcc_id
-                        pcc_info = db.query(models.P_CandidateClient, models.Candidate, models.Client).join(
-                            models.Candidate, models.P_CandidateClient.candidate_id == models.Candidate.candidate_id
-                        ).join(
-                            models.Client, models.P_CandidateClient.client_id == models.Client.client_id
-                        ).filter(models.P_CandidateClient.pcc_id == tch.pcc_id).first()
-                        
-                        if pcc_info:
-                            pcc, candidate, client = pcc_info
-                            candidate_name = candidate.invoice_contact_name or "Unknown Candidate"
-                            client_name = client.client_name or "Unknown Client"
-                            m_rate_name = f"{candidate_name} - {client_name} - {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}"
-                        else:
-                            m_rate_name = f"Unknown - Unknown - {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}"
-                    else:
-                        m_rate_name = f"Unknown - Unknown - {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}"
-                    
-                    # Create line item for this client invoice
-                    line_item = models.InvoiceLineItem(
-                        invoice_id=client_invoice_id,
-                        type=rate_hour.rate_type_id,
-                        quantity=rate_hour.quantity,
-                        rate=rate_hour.bill_rate,
-                        total=total,
-                        timesheet_id=tch.timesheet_id,
-                        m_rate_name=m_rate_name,
-                        tcr_id=rate_hour.tcr_id
-                    )
-                    db.add(line_item)
-                    line_items.append(line_item)
-            
-            # Update client invoice with total amount
-            client_invoice.total_amount = total_amount
-            
-            created_invoices.append({
-                'invoice_id': client_invoice_id,
-                'invoice_num': next_invoice_num,
-                'total_amount': total_amount,
-                'line_items_count': len(line_items),
-                'client_id': client_id
-            })
-            
-            print(f"🔍 DEBUG: Created invoice {next_invoice_num} for client {client_id} with {len(line_items)} line items and total: {total_amount}")
+        # Create separate invoice for each client (line items built concurrently in parallel mode)
+        created_invoices = generate_client_invoices(
+            db,
+            client_groups,
+            invoice_date,
+            week_start,
+            week_end,
+            parallel=request.parallel
+        )
         
         # Check if any invoices were created
         if len(created_invoices) == 0:
@@ -355,7 +270,8 @@ def generate_invoice(
         
         # Get line items for the first invoice to include in response
         first_invoice_line_items = db.query(models.InvoiceLineItem).filter(
-            models.InvoiceLineItem.invoice_id == first_invoice['invoice_id']
+            models.InvoiceLineItem.invoice_id == first_invoice['invoice_id'],
+            models.InvoiceLineItem.deleted_on.is_(None)
         ).all()
         
         return schemas.GenerateInvoiceResponse(
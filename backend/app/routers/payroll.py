@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict
 from uuid import UUID
@@ -9,6 +9,10 @@ from ..database import get_db
 from .. import models, schemas, crud
 from ..auth import get_current_user
 from ..services.payroll_report_generator import generate_payroll_report, PayrollReportGenerator
+from ..services.payroll_calculator import PayrollCalculator
+from ..services.payroll_snapshots import PayrollPeriodClosed
+from ..services.payroll_simulation import simulate_payroll
+from ..services.payroll_batch import PayrollBatchProcessor, payroll_batch_jobs, run_payroll_batch_job
 
 router = APIRouter(prefix="/payroll", tags=["payroll"])
 
@@ -95,6 +99,109 @@ def delete_payroll_report(
         raise HTTPException(status_code=500, detail=f"Error deleting payroll report: {str(e)}")
 
 
+@router.post("/calculate", response_model=Dict)
+def calculate_payroll(
+    request: schemas.PayrollCalculationRequest,
+    current_user: schemas.MUserAuth = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Calculate payroll for a period, or only its dirty contractors when incremental is set"""
+    try:
+        calculator = PayrollCalculator(db)
+        if request.incremental:
+            result = calculator.recalculate_dirty_contractors(request.period_id)
+        else:
+            contractor_ids = [str(contractor_id) for contractor_id in request.contractor_ids] if request.contractor_ids else None
+            result = calculator.calculate_payroll_for_period(request.period_id, contractor_ids)
+            result['recalculated_contractors'] = [str(run.contractor_id) for run in result['payroll_runs']]
+        
+        return {
+            'period_id': str(request.period_id),
+            'incremental': request.incremental,
+            'total_contractors': result['total_contractors'],
+            'total_gross_pay': result['total_gross_pay'],
+            'total_deductions': result['total_deductions'],
+            'total_net_pay': result['total_net_pay'],
+            'recalculated_contractors': result['recalculated_contractors']
+        }
+    except PayrollPeriodClosed as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calculating payroll: {str(e)}")
+
+
+@router.post("/simulate", response_model=Dict)
+def simulate_payroll_period(
+    request: schemas.PayrollSimulationRequest,
+    current_user: schemas.MUserAuth = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Preview a period's payroll under what-if assumptions without saving anything"""
+    try:
+        if not crud.get_payroll_period(db, request.period_id):
+            raise HTTPException(status_code=404, detail="Payroll period not found")
+        return simulate_payroll(db, request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error simulating payroll: {str(e)}")
+
+
+@router.post("/calculate/batch", response_model=Dict)
+def calculate_payroll_batch(
+    request: schemas.PayrollBatchCalculationRequest,
+    background_tasks: BackgroundTasks,
+    current_user: schemas.MUserAuth = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Start calculating payroll for many periods; poll the returned job for progress"""
+    try:
+        period_ids = PayrollBatchProcessor(db).resolve_period_ids(
+            request.period_ids, request.start_date, request.end_date
+        )
+        if not period_ids:
+            raise HTTPException(status_code=404, detail="No payroll periods match the request")
+        
+        job = payroll_batch_jobs.create(period_ids, request.parallel)
+        background_tasks.add_task(run_payroll_batch_job, job['job_id'])
+        return job
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error starting payroll batch: {str(e)}")
+
+
+@router.get("/calculate/batch/{job_id}", response_model=Dict)
+def get_payroll_batch(job_id: str):
+    """Progress and per-period timings of a payroll batch"""
+    job = payroll_batch_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Payroll batch not found")
+    return job
+
+
+@router.get("/periods/{period_id}/runs", response_model=List[schemas.PayrollRunWithDetails])
+def get_period_payroll_runs(
+    period_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """Get a period's payroll runs with contractor details (served from the snapshot once closed)"""
+    try:
+        if not crud.get_payroll_period(db, period_id):
+            raise HTTPException(status_code=404, detail="Payroll period not found")
+        return crud.get_payroll_runs_with_details(db, period_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching payroll runs: {str(e)}")
+
+
 @router.get("/weeks", response_model=List[Dict])
 def get_available_weeks(
     db: Session = Depends(get_db)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, UploadFile, File
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database import get_db
+from ..config import settings
 from .. import crud, schemas, models
 from sqlalchemy.sql import func
 import uuid
@@ -40,75 +42,8 @@ def get_latest_timesheet(db: Session = Depends(get_db)):
 def create_timesheet(timesheet: schemas.TimesheetCreate, db: Session = Depends(get_db)):
     """Create a new timesheet with entries for specified candidates"""
     try:
-        print(f"🔍 DEBUG: Creating timesheet with data: {timesheet}")
-        print(f"🔍 DEBUG: Candidate IDs received: {timesheet.candidate_ids}")
-        
-        # Create the timesheet
-        timesheet_id = str(uuid.uuid4())
-        print(f"🔍 DEBUG: Generated timesheet_id: {timesheet_id}")
-        
-        new_timesheet = models.Timesheet(
-            timesheet_id=timesheet_id,
-            month=timesheet.month,
-            week=timesheet.week,
-            status="Open"
-        )
-        db.add(new_timesheet)
-        db.flush()  # Get the ID
-        print(f"🔍 DEBUG: Timesheet created successfully")
-        
-        # Get candidates to create entries for
-        # Convert string IDs to UUIDs for the query
-        candidate_uuids = []
-        for candidate_id in timesheet.candidate_ids:
-            try:
-                candidate_uuids.append(uuid.UUID(candidate_id))
-                print(f"🔍 DEBUG: Converted candidate_id {candidate_id} to UUID")
-            except ValueError as ve:
-                print(f"🔍 DEBUG: Invalid UUID {candidate_id}: {ve}")
-                # Skip invalid UUIDs
-                continue
-        
-        print(f"🔍 DEBUG: Valid candidate UUIDs: {candidate_uuids}")
-        
-        candidates = db.query(models.Candidate).filter(
-            models.Candidate.candidate_id.in_(candidate_uuids)
-        ).all()
-        
-        print(f"🔍 DEBUG: Found {len(candidates)} candidates in database")
-        for candidate in candidates:
-            print(f"🔍 DEBUG: Candidate: {candidate.invoice_contact_name} (ID: {candidate.candidate_id})")
-        
-        # Create entries for each candidate
-        entries_created = 0
-        for candidate in candidates:
-            entry = models.TimesheetEntry(
-                timesheet_id=timesheet_id,
-                employee_name=candidate.invoice_contact_name or "Unknown",
-                employee_code=str(candidate.candidate_id)[:8],  # Use first 8 chars of UUID
-                client_name="Default Client",  # You might want to get this from client_id
-                filled=False,
-                standard_hours=0,
-                rate2_hours=0,
-                rate3_hours=0,
-                rate4_hours=0,
-                rate5_hours=0,
-                rate6_hours=0,
-                holiday_hours=0,
-                bank_holiday_hours=0
-            )
-            db.add(entry)
-            entries_created += 1
-            print(f"🔍 DEBUG: Created entry for {candidate.invoice_contact_name}")
-        
-        print(f"🔍 DEBUG: Created {entries_created} entries")
-        db.commit()
-        print(f"🔍 DEBUG: Database committed successfully")
-        
-        # Return the created timesheet with entries
-        result = crud.get_timesheet_detail(db, timesheet_id)
-        print(f"🔍 DEBUG: Returning timesheet with {len(result.entries)} entries")
-        return result
+        print(f"🔍 DEBUG: Creating timesheet for {len(timesheet.candidate_ids)} candidates")
+        return crud.create_timesheet_with_entries(db, timesheet)
         
     except Exception as e:
         print(f"🔍 DEBUG: Error creating timesheet: {str(e)}")
@@ -122,10 +57,11 @@ def create_timesheet(timesheet: schemas.TimesheetCreate, db: Session = Depends(g
 @router.get("/{timesheet_id}", response_model=schemas.TimesheetDetail)
 def get_timesheet(timesheet_id: str, db: Session = Depends(get_db)):
     """Get a specific timesheet with all its entries"""
-    timesheet = crud.get_timesheet_detail(db, timesheet_id)
+    timesheet = crud.get_timesheet_detail_rows(db, timesheet_id)
     if not timesheet:
         raise HTTPException(status_code=404, detail="Timesheet not found")
-    return timesheet
+    # Rows already match TimesheetDetail; serialize directly instead of re-validating each entry
+    return ORJSONResponse(timesheet)
 
 
 @router.post("/{timesheet_id}/entries", response_model=schemas.TimesheetEntry)
@@ -170,6 +106,20 @@ def list_contractor_hours(timesheet_id: str, db: Session = Depends(get_db)):
     return crud.list_contractor_hours_by_timesheet(db, timesheet_id)
 
 
+@router.get("/{timesheet_id}/contractor-hours/changes", response_model=schemas.ContractorHoursChanges)
+def list_contractor_hours_changes(
+    timesheet_id: str,
+    since: Optional[int] = Query(None, ge=0, description="Watermark returned by the previous call; omit for a full load"),
+    db: Session = Depends(get_db)
+):
+    """Contractor hours changed (or soft-deleted) since a watermark, for polling clients"""
+    try:
+        uuid.UUID(timesheet_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid timesheet_id")
+    return crud.list_contractor_hours_changes(db, timesheet_id, since)
+
+
 @router.post("/{timesheet_id}/contractor-hours/upsert-debug")
 async def upsert_contractor_hours_debug(
     timesheet_id: str,
@@ -193,16 +143,25 @@ async def upsert_contractor_hours_debug(
 @router.post("/backfill-holiday-tracking")
 def backfill_holiday_tracking(
     timesheet_id: Optional[str] = None,
+    dry_run: bool = False,
+    chunk_size: Optional[int] = Query(None, ge=1),
+    workers: Optional[int] = Query(None, ge=1, le=settings.holiday_backfill_workers),
+    restart: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Backfill holiday tracking for existing timesheet entries"""
+    """Backfill holiday tracking for existing timesheet entries (chunked, resumable, re-runnable)"""
     try:
         print(f"🔄 Backfilling holiday tracking for timesheet: {timesheet_id or 'all'}")
-        success = crud.backfill_holiday_tracking_for_timesheet_entries(db, timesheet_id)
-        if success:
-            return {"message": "Holiday tracking backfill completed successfully", "success": True}
+        result = crud.backfill_holiday_tracking_for_timesheet_entries(
+            db, timesheet_id, dry_run=dry_run, chunk_size=chunk_size, workers=workers, restart=restart
+        )
+        if result:
+            message = "Holiday tracking backfill dry run completed" if dry_run else "Holiday tracking backfill completed successfully"
+            return {"message": message, "success": True, **result}
         else:
             raise HTTPException(status_code=500, detail="Holiday tracking backfill failed")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error in backfill_holiday_tracking: {e}")
         raise HTTPException(status_code=500, detail=f"Error backfilling holiday tracking: {str(e)}")
@@ -325,6 +284,68 @@ async def upsert_contractor_hours(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/{timesheet_id}/contractor-hours/upsert-columnar")
+async def upsert_contractor_hours_columnar(
+    timesheet_id: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Save contractor hours sent as a (gzip/brotli) columnar payload (see services/contractor_hours_columnar.py)"""
+    from ..services.contractor_hours_columnar import upsert_columnar_contractor_hours, ColumnarPayloadError
+    try:
+        try:
+            uuid.UUID(timesheet_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid timesheet_id")
+        body = await request.body()
+        result = upsert_columnar_contractor_hours(db, timesheet_id, body, request.headers.get("content-encoding"))
+        return ORJSONResponse(result)
+    except HTTPException:
+        raise
+    except ColumnarPayloadError as e:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=e.errors)
+    except Exception as e:
+        print(f"❌ Error in upsert_contractor_hours_columnar: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/{timesheet_id}/contractor-hours/import")
+def import_contractor_hours(
+    timesheet_id: str,
+    file: UploadFile = File(...),
+    client_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Import contractor hours from a CSV/XLSX timesheet (see services/timesheet_import.py)"""
+    from ..services.timesheet_import import import_contractor_hours_file
+    try:
+        try:
+            uuid.UUID(timesheet_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid timesheet_id")
+        timesheet = db.query(models.Timesheet).filter(models.Timesheet.timesheet_id == timesheet_id).first()
+        if not timesheet:
+            raise HTTPException(status_code=404, detail="Timesheet not found")
+
+        print(f"📥 Importing {file.filename} into timesheet {timesheet_id}")
+        result = import_contractor_hours_file(db, timesheet_id, file.file, file.filename, client_id=client_id)
+        return {"message": f"Imported {result['imported']} of {result['rows']} rows", "success": True, **result}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Error importing contractor hours: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error importing contractor hours: {str(e)}")
+
+
 @router.post("/seed")
 def seed_timesheets(db: Session = Depends(get_db)):
     try:
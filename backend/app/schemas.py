@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Dict
 from datetime import datetime, date
 from uuid import UUID
 
@@ -364,6 +364,21 @@ class RateFrequencyOut(BaseModel):
         from_attributes = True
 
 
+class ClientSearchResult(BaseModel):
+    client_id: UUID
+    client_name: Optional[str] = None
+    score: float
+
+
+class CandidateSearchResult(BaseModel):
+    user_id: UUID
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email_id: Optional[str] = None
+    pps_number: Optional[str] = None
+    score: float
+
+
 class ClientCandidateOut(BaseModel):
     user_id: str
     first_name: Optional[str] = None
@@ -498,6 +513,14 @@ class ContractorHoursOut(ContractorHoursBase):
         from_attributes = True
 
 
+class ContractorHoursChanges(BaseModel):
+    """Rows of a timesheet changed since a watermark; pass watermark back as `since` next time"""
+    changed: List[ContractorHoursOut]
+    deleted: List[UUID]
+    watermark: Optional[int] = None  # Commit-order position (a transaction id), not a time
+    full: bool = False
+
+
 class ContractorHoursUpsert(BaseModel):
     tch_id: Optional[UUID] = None
     contractor_id: Optional[UUID] = None
@@ -608,6 +631,7 @@ class GenerateInvoiceRequest(BaseModel):
     clientIds: List[str]  # List of Client IDs
     week: str             # Week start date in YYYY-MM-DD format
     invoiceDate: str      # Invoice date in YYYY-MM-DD format
+    parallel: bool = False  # Build each client's invoice concurrently on a pool of sessions
 
 
 class InvoiceLineItemBase(BaseModel):
@@ -791,6 +815,34 @@ class HolidaySummaryItem(BaseModel):
         from_attributes = True
 
 
+class HolidayLedgerEntryOut(BaseModel):
+    entry_id: int
+    candidate_id: UUID
+    source: str
+    source_id: Optional[str] = None
+    entry_type: str
+    hours_worked: float
+    holiday_hours: float
+    holiday_requested: Optional[float] = None
+    effective_date: date
+    created_on: Optional[datetime] = None
+    created_by: Optional[UUID] = None
+
+    class Config:
+        from_attributes = True
+
+
+class HolidayBalanceAsOf(BaseModel):
+    candidate_id: UUID
+    as_of: date
+    source: Optional[str] = None
+    hours_worked: float
+    total_holiday: float
+    holiday_taken: float
+    holiday_balance: float
+    entries: int
+
+
 # Payroll Report Schemas
 class PayrollReportBase(BaseModel):
     report_name: str
@@ -961,6 +1013,33 @@ class PayrollSummary(PayrollSummaryBase):
 class PayrollCalculationRequest(BaseModel):
     period_id: UUID
     contractor_ids: Optional[List[UUID]] = None  # If None, calculate for all contractors
+    incremental: bool = False  # Only recalculate contractors whose hours changed since the last run
+
+
+class PayrollBatchCalculationRequest(BaseModel):
+    period_ids: Optional[List[UUID]] = None  # Either explicit periods...
+    start_date: Optional[date] = None  # ...or every period overlapping start_date..end_date
+    end_date: Optional[date] = None
+    parallel: bool = True  # Process periods concurrently in a process pool
+
+
+class PayrollSimulationRequest(BaseModel):
+    period_id: UUID
+    # What-if assumptions; anything left unset uses the committed calculation's value
+    tax_year: Optional[int] = None  # Band definitions to start from (default: period's year)
+    paye_bands: Optional[Dict[str, List[List[Optional[float]]]]] = None  # {"single": [[lower, upper|null, rate], ...]}
+    usc_bands: Optional[List[List[Optional[float]]]] = None
+    prsi_rate: Optional[float] = None
+    marital_status: Optional[str] = None  # Applied to every contractor
+    pension_rate: float = 0.0  # Share of gross pay
+    other_deductions: float = 0.0  # Fixed amount per contractor
+    pay_rate_multiplier: float = 1.0  # Scales every pay rate
+    standard_rate_multiplier: float = 1.0
+    holiday_rate_multiplier: float = 1.0
+    weekend_rate_multiplier: float = 1.0
+    oncall_rate_multiplier: float = 1.0
+    include_unchanged: bool = False  # Also list contractors whose figures don't change
+    refresh: bool = False  # Reload period data instead of using the cached copy
 
 
 class PayrollCalculationResponse(BaseModel):
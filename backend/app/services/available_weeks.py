@@ -0,0 +1,124 @@
+"""
+Available Weeks Catalog
+
+Distinct ISO weeks that have (non-deleted) invoices, listed on the Payroll page
+to pick report weeks from. The weeks come from one
+SELECT DISTINCT date_trunc('week', invoice_date) over the partial invoice_date
+index and are cached in memory.
+
+The cache is per process, so the cached list is kept with the version from
+t_invoice_weeks_version (bumped by triggers on t_invoice) and only served while
+that version is unchanged, whichever worker or script wrote the invoice, and
+for at most ttl_seconds. An invoice write through this process's ORM also drops
+the cache as soon as its transaction commits.
+"""
+
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy import event, text
+from threading import Lock
+from typing import List, Dict, Optional
+import time
+
+from .. import models
+from ..config import settings
+
+
+class AvailableWeeksCache:
+    """Single cached week list, checked against the invoice weeks version and a TTL"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._weeks: Optional[List[Dict]] = None
+        self._version: Optional[int] = None
+        self._cached_at = 0.0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: int) -> Optional[List[Dict]]:
+        with self._lock:
+            if (self._weeks is None or self._version != version
+                    or time.monotonic() - self._cached_at > self.ttl_seconds):
+                self._weeks = None
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [dict(week) for week in self._weeks]
+
+    def set(self, version: int, weeks: List[Dict]) -> None:
+        with self._lock:
+            self._weeks = [dict(week) for week in weeks]
+            self._version = version
+            self._cached_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._weeks = None
+
+
+available_weeks_cache = AvailableWeeksCache(settings.available_weeks_cache_ttl_seconds)
+
+
+def load_invoice_weeks_version(db: Session) -> int:
+    """Current invoice weeks version (bumped by triggers on t_invoice)"""
+    version = db.execute(
+        text("SELECT version FROM app.t_invoice_weeks_version WHERE id = 1")
+    ).scalar()
+    return version or 0
+
+
+def load_available_weeks(db: Session) -> List[Dict]:
+    """Read the invoice weeks from the database, oldest first"""
+    rows = db.execute(
+        text("""
+            SELECT DISTINCT date_trunc('week', invoice_date::timestamp)::date AS week_start
+            FROM app.t_invoice
+            WHERE deleted_on IS NULL AND invoice_date IS NOT NULL
+            ORDER BY week_start
+        """)
+    ).fetchall()
+
+    weeks = []
+    for row in rows:
+        # ISO year of the week's Monday, so late-December weeks belong to the right year
+        year, week_num, _ = row.week_start.isocalendar()
+        weeks.append({
+            'week': f"{year}-W{week_num:02d}",
+            'label': f"Week {week_num:02d} of {year}"
+        })
+    return weeks
+
+
+def get_available_weeks(db: Session) -> List[Dict]:
+    """Invoice weeks for the payroll report picker, cached until the invoices change"""
+    # Read before the weeks, so a write committed in between makes the cached list stale
+    version = load_invoice_weeks_version(db)
+    weeks = available_weeks_cache.get(version)
+    if weeks is None:
+        weeks = load_available_weeks(db)
+        available_weeks_cache.set(version, weeks)
+    return weeks
+
+
+# Flag sessions that write invoices and drop the cache once their transaction commits,
+# so a concurrent read can't re-cache the weeks from before the write.
+
+def _flag_invoice_write(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info['invoice_weeks_changed'] = True
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(models.Invoice, _event_name, _flag_invoice_write)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session) -> None:
+    if session.info.pop('invoice_weeks_changed', False):
+        available_weeks_cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_flag_after_rollback(session) -> None:
+    session.info.pop('invoice_weeks_changed', None)
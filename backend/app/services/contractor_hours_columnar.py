@@ -0,0 +1,346 @@
+"""
+Columnar Contractor Hours Payload
+
+A compact alternative to posting a list of ContractorHoursUpsert objects to
+/contractor-hours/upsert. The grid sends one array per field, holding only the
+fields it changed:
+
+    {
+      "columns": {
+        "tch_id":         ["7c1e...", null],
+        "contractor_id":  [null, "a5f0..."],
+        "work_date":      [null, "2025-03-07"],
+        "standard_hours": [37.5, 40]
+      },
+      "rate_hours": {
+        "row":               [0, 1, 1],
+        "rate_type_id":      [1, 1, 1],
+        "rate_frequency_id": [1, 1, 3],
+        "tcr_id":            [12, 31, 32],
+        "quantity":          [37.5, 40, 4],
+        "pay_rate":          [20, 22, 33],
+        "bill_rate":         [30, 33, 49.5]
+      }
+    }
+
+Row i is a new contractor-day when tch_id[i] is null (contractor_id and work_date
+are then required), otherwise an update of that t_contractor_hours row in which
+null cells are left unchanged. To set a cell of an existing row to null, list the
+row under its column in "cleared", e.g. "cleared": {"weekend_hours": [1]}.
+A row with rate_hours entries has them saved like
+upsert_contractor_hours does: entries with a quantity above 0 are updated or
+inserted by (rate_type_id, rate_frequency_id), the row's other rate hours are
+soft-deleted. The body may be gzip or brotli compressed (Content-Encoding).
+
+Each column is validated with one pydantic call against its ContractorHoursUpsert
+field type, and the arrays then go straight into unnest() in three statements
+(insert, update, rate hours) instead of an ORM object per row.
+"""
+
+import zlib
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from .. import crud, models, schemas
+from ..config import settings
+
+_HOURS_TABLE = models.ContractorHours.__table__
+
+# Field -> (validator for a whole column, Postgres array type of its t_contractor_hours column)
+HOURS_COLUMNS = {
+    name: (TypeAdapter(List[field.annotation]),
+           _HOURS_TABLE.c[name].type.compile(dialect=postgresql.dialect()) + '[]')
+    for name, field in schemas.ContractorHoursUpsert.model_fields.items()
+    if name not in ('timesheet_id', 'rate_hours')
+}
+
+RATE_COLUMNS = {
+    'row': (TypeAdapter(List[int]), None),
+    'rate_type_id': (TypeAdapter(List[int]), 'INTEGER[]'),
+    'rate_frequency_id': (TypeAdapter(List[int]), 'INTEGER[]'),
+    'tcr_id': (TypeAdapter(List[int]), 'INTEGER[]'),
+    'quantity': (TypeAdapter(List[Optional[float]]), 'FLOAT[]'),
+    'pay_rate': (TypeAdapter(List[Optional[float]]), 'FLOAT[]'),
+    'bill_rate': (TypeAdapter(List[Optional[float]]), 'FLOAT[]'),
+}
+REQUIRED_RATE_COLUMNS = ('row', 'rate_type_id', 'rate_frequency_id', 'tcr_id')
+# Identify the row; never set to null
+UNCLEARABLE_COLUMNS = ('tch_id', 'contractor_id', 'work_date')
+
+UPSERT_RATE_HOURS_SQL = """
+    WITH sent AS (
+        SELECT *
+        FROM unnest(CAST(:tch_id AS UUID[]), CAST(:rate_type_id AS INTEGER[]), CAST(:rate_frequency_id AS INTEGER[]),
+                    CAST(:tcr_id AS INTEGER[]), CAST(:quantity AS FLOAT[]), CAST(:pay_rate AS FLOAT[]),
+                    CAST(:bill_rate AS FLOAT[]))
+             AS s(tch_id, rate_type_id, rate_frequency_id, tcr_id, quantity, pay_rate, bill_rate)
+    ), kept AS (
+        SELECT * FROM sent WHERE quantity > 0
+    ), updated AS (
+        UPDATE app.t_contractor_rate_hours r
+        SET quantity = k.quantity, pay_rate = k.pay_rate, bill_rate = k.bill_rate, updated_on = NOW()
+        FROM kept k
+        WHERE r.tch_id = k.tch_id
+          AND r.rate_type_id = k.rate_type_id
+          AND r.rate_frequency_id = k.rate_frequency_id
+          AND r.deleted_on IS NULL
+        RETURNING r.tch_id, r.rate_type_id, r.rate_frequency_id
+    ), removed AS (
+        UPDATE app.t_contractor_rate_hours r
+        SET deleted_on = NOW()
+        WHERE r.tch_id IN (SELECT tch_id FROM sent)
+          AND r.deleted_on IS NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM kept k
+              WHERE k.tch_id = r.tch_id AND k.rate_type_id = r.rate_type_id AND k.rate_frequency_id = r.rate_frequency_id
+          )
+    )
+    INSERT INTO app.t_contractor_rate_hours (tch_id, rate_frequency_id, rate_type_id, tcr_id, quantity, pay_rate, bill_rate)
+    SELECT k.tch_id, k.rate_frequency_id, k.rate_type_id, k.tcr_id, k.quantity, k.pay_rate, k.bill_rate
+    FROM kept k
+    WHERE NOT EXISTS (
+        SELECT 1 FROM updated u
+        WHERE u.tch_id = k.tch_id AND u.rate_type_id = k.rate_type_id AND u.rate_frequency_id = k.rate_frequency_id
+    )
+"""
+
+
+class ColumnarPayloadError(ValueError):
+    """A columnar payload that can't be decoded or saved; errors are per column/row"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def decode_body(body: bytes, content_encoding: Optional[str] = None) -> Dict:
+    """Decompress (gzip/br) and parse a request body, refusing anything larger than the configured limit"""
+    encoding = (content_encoding or 'identity').strip().lower()
+    limit = settings.contractor_hours_payload_max_bytes
+    if encoding == 'gzip':
+        try:
+            decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+            body = decompressor.decompress(body, limit + 1)
+        except zlib.error as e:
+            raise ColumnarPayloadError([f"Invalid gzip body: {e}"])
+        if len(body) <= limit and not decompressor.eof:
+            raise ColumnarPayloadError(["Invalid gzip body: truncated"])
+        if decompressor.unused_data:
+            raise ColumnarPayloadError(["Invalid gzip body: trailing data after the gzip member"])
+    elif encoding == 'br':
+        import brotli
+        try:
+            decompressor = brotli.Decompressor()
+            body = decompressor.process(body, output_buffer_limit=limit + 1)
+        except brotli.error as e:
+            raise ColumnarPayloadError([f"Invalid brotli body: {e}"])
+        if len(body) <= limit and not decompressor.is_finished():
+            raise ColumnarPayloadError(["Invalid brotli body: truncated"])
+    elif encoding != 'identity':
+        raise ColumnarPayloadError([f"Unsupported Content-Encoding: {content_encoding}"])
+
+    if len(body) > limit:
+        raise ColumnarPayloadError([f"Payload larger than {limit} bytes"])
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise ColumnarPayloadError([f"Invalid JSON: {e}"])
+
+
+def _validate_columns(arrays: Dict, spec: Dict, label: str, errors: List[str]) -> Dict[str, list]:
+    """Validate every array with its column's adapter; returns the typed columns"""
+    columns = {}
+    for name, values in arrays.items():
+        if name not in spec:
+            errors.append(f"{label}.{name}: unknown column")
+            continue
+        if not isinstance(values, list):
+            errors.append(f"{label}.{name}: expected an array")
+            continue
+        try:
+            columns[name] = spec[name][0].validate_python(values)
+        except ValidationError as e:
+            errors.extend(f"{label}.{name}[{error['loc'][0]}]: {error['msg']}" for error in e.errors()[:20])
+            continue
+        if spec[name][1] == 'INTEGER[]' and any(isinstance(value, str) for value in columns[name]):
+            # week is Union[int, str] in the schema but an integer column
+            try:
+                columns[name] = [int(value) if isinstance(value, str) else value for value in columns[name]]
+            except ValueError:
+                errors.append(f"{label}.{name}: expected integers")
+
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        errors.append(f"{label}: all columns must have the same length")
+    return columns
+
+
+class ColumnarContractorHours:
+    """A validated columnar payload, written with set-based statements"""
+
+    def __init__(self, payload: Dict):
+        errors: List[str] = []
+        if not isinstance(payload, dict) or not isinstance(payload.get('columns'), dict):
+            raise ColumnarPayloadError(["Expected an object with a 'columns' object"])
+
+        self.columns = _validate_columns(payload['columns'], HOURS_COLUMNS, 'columns', errors)
+        self.size = max((len(values) for values in self.columns.values()), default=0)
+        rate_hours = payload.get('rate_hours') or {}
+        if not isinstance(rate_hours, dict):
+            raise ColumnarPayloadError(["'rate_hours' must be an object"])
+        self.rate_hours = _validate_columns(rate_hours, RATE_COLUMNS, 'rate_hours', errors)
+        self.cleared = self._validate_cleared(payload.get('cleared') or {}, errors)
+        if errors:
+            raise ColumnarPayloadError(errors)
+
+        tch_ids = self.columns.get('tch_id', [None] * self.size)
+        self.inserts = [i for i, tch_id in enumerate(tch_ids) if tch_id is None]
+        self.updates = [i for i, tch_id in enumerate(tch_ids) if tch_id is not None]
+        for i in self.inserts:
+            if self._cell('contractor_id', i) is None or self._cell('work_date', i) is None:
+                errors.append(f"row {i}: contractor_id and work_date are required for a new row")
+        if len({tch_ids[i] for i in self.updates}) < len(self.updates):
+            errors.append("columns.tch_id: each row may appear only once")
+
+        if self.rate_hours:
+            missing = [name for name in REQUIRED_RATE_COLUMNS if name not in self.rate_hours]
+            if missing:
+                errors.append(f"rate_hours: missing columns {', '.join(missing)}")
+            elif any(row < 0 or row >= self.size for row in self.rate_hours['row']):
+                errors.append("rate_hours.row: index outside the rows sent")
+        if errors:
+            raise ColumnarPayloadError(errors)
+
+    def _validate_cleared(self, cleared, errors: List[str]) -> Dict[str, set]:
+        """Rows whose cell should become null, per column"""
+        if not isinstance(cleared, dict):
+            errors.append("'cleared' must be an object")
+            return {}
+        result = {}
+        for name, rows in cleared.items():
+            if name not in HOURS_COLUMNS or name in UNCLEARABLE_COLUMNS:
+                errors.append(f"cleared.{name}: column can't be cleared")
+            elif not isinstance(rows, list) or not all(isinstance(row, int) and 0 <= row < self.size for row in rows):
+                errors.append(f"cleared.{name}: expected an array of row indexes")
+            elif rows:
+                result[name] = set(rows)
+        return result
+
+    def _cell(self, name: str, i: int):
+        column = self.columns.get(name)
+        return column[i] if column is not None else None
+
+    def _unnest(self, names: List[str], rows: List[int], values: Dict[str, list], prefix: str,
+                with_tch_id: bool = False) -> str:
+        """unnest() over the given rows of each column, as v(tch_id?, names...); fills values with the arrays"""
+        arrays = [f"CAST(:{prefix}tch_id AS UUID[])"] if with_tch_id else []
+        aliases = (['tch_id'] if with_tch_id else []) + list(names)
+        for name in names:
+            values[f"{prefix}{name}"] = [self._cell(name, i) for i in rows]
+            arrays.append(f"CAST(:{prefix}{name} AS {HOURS_COLUMNS[name][1]})")
+        for name in names:
+            if name in self.cleared:
+                values[f"{prefix}clear_{name}"] = [i in self.cleared[name] for i in rows]
+                arrays.append(f"CAST(:{prefix}clear_{name} AS BOOLEAN[])")
+                aliases.append(f"clear_{name}")
+        return f"unnest({', '.join(arrays)}) AS v({', '.join(aliases)})"
+
+    def _assignment(self, name: str) -> str:
+        """SET expression of an update: the sent value, else null if cleared, else unchanged"""
+        if name in self.cleared:
+            return f"{name} = CASE WHEN v.clear_{name} THEN NULL ELSE coalesce(v.{name}, h.{name}) END"
+        return f"{name} = coalesce(v.{name}, h.{name})"
+
+    def write(self, db: Session, timesheet_id: str) -> Dict:
+        """
+        Insert the new rows, update the changed cells of existing ones, save rate hours and commit
+
+        Returns:
+            tch_id per row (in payload order) and insert/update counts
+        """
+        fields = [name for name in self.columns if name != 'tch_id']
+        updated_fields = fields + [name for name in self.cleared if name not in self.columns]
+        tch_ids = list(self.columns.get('tch_id', [None] * self.size))
+        for i in self.inserts:
+            tch_ids[i] = uuid4()
+        touched = []  # (contractor_id, work_date) for payroll, before and after updates
+
+        if self.inserts:
+            params = {"timesheet_id": str(timesheet_id), "i_tch_id": [tch_ids[i] for i in self.inserts]}
+            db.execute(text(f"""
+                INSERT INTO app.t_contractor_hours (tch_id, timesheet_id, {', '.join(fields)})
+                SELECT v.tch_id, CAST(:timesheet_id AS uuid), {', '.join(f'v.{name}' for name in fields)}
+                FROM {self._unnest(fields, self.inserts, params, 'i_', with_tch_id=True)}
+            """), params)
+            touched.extend((self._cell('contractor_id', i), self._cell('work_date', i)) for i in self.inserts)
+
+        if self.updates:
+            params = {"timesheet_id": str(timesheet_id), "u_tch_id": [tch_ids[i] for i in self.updates]}
+            assignments = ''.join(f", {self._assignment(name)}" for name in updated_fields)
+            rows = db.execute(text(f"""
+                WITH v AS (
+                    SELECT * FROM {self._unnest(updated_fields, self.updates, params, 'u_', with_tch_id=True)}
+                ), previous AS (
+                    SELECT h.tch_id, h.contractor_id, h.work_date
+                    FROM app.t_contractor_hours h
+                    JOIN v ON v.tch_id = h.tch_id
+                ), updated AS (
+                    UPDATE app.t_contractor_hours h
+                    SET timesheet_id = CAST(:timesheet_id AS uuid), updated_on = NOW(){assignments}
+                    FROM v
+                    WHERE h.tch_id = v.tch_id
+                    RETURNING h.tch_id, h.contractor_id, h.work_date
+                )
+                SELECT true AS updated, tch_id, contractor_id, work_date FROM updated
+                UNION ALL
+                SELECT false, tch_id, contractor_id, work_date FROM previous
+            """), params).fetchall()
+            found = {row.tch_id for row in rows if row.updated}
+            missing = [str(tch_ids[i]) for i in self.updates if tch_ids[i] not in found]
+            if missing:
+                raise ColumnarPayloadError([f"Unknown tch_id: {', '.join(missing[:20])}"])
+            touched.extend((row.contractor_id, row.work_date) for row in rows)
+
+        rate_hours = self._rate_hours(tch_ids)
+        if rate_hours['tch_id']:
+            db.execute(text(UPSERT_RATE_HOURS_SQL), rate_hours)
+
+        crud.mark_payroll_contractors_dirty(db, touched)
+        crud.record_contractor_hours_holiday(db, tch_ids)
+        db.commit()
+        return {
+            "tch_id": [str(tch_id) for tch_id in tch_ids],
+            "inserted": len(self.inserts),
+            "updated": len(self.updates),
+        }
+
+    def _rate_hours(self, tch_ids: List) -> Dict[str, list]:
+        """Rate hours array parameters, keeping the last entry per row and rate"""
+        latest = {}
+        if self.rate_hours:
+            count = len(self.rate_hours['row'])
+            for j in range(count):
+                key = (self.rate_hours['row'][j], self.rate_hours['rate_type_id'][j],
+                       self.rate_hours['rate_frequency_id'][j])
+                latest[key] = j
+        params = {name: [] for name in RATE_COLUMNS if name != 'row'}
+        params['tch_id'] = []
+        for (row, _, _), j in latest.items():
+            params['tch_id'].append(tch_ids[row])
+            for name in RATE_COLUMNS:
+                if name != 'row':
+                    column = self.rate_hours.get(name)
+                    params[name].append(column[j] if column is not None else None)
+        return params
+
+
+def upsert_columnar_contractor_hours(db: Session, timesheet_id: str, body: bytes,
+                                    content_encoding: Optional[str] = None) -> Dict:
+    """Convenience function to decode a (compressed) columnar payload and save it"""
+    return ColumnarContractorHours(decode_body(body, content_encoding)).write(db, timesheet_id)
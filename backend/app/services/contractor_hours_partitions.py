@@ -0,0 +1,141 @@
+"""
+Contractor Hours Partition Management
+
+t_contractor_hours is range-partitioned by work_date, one partition per
+calendar year (app.t_contractor_hours_yYYYY) plus a default partition that
+catches dates no yearly partition covers yet. Queries filtering on work_date
+(invoice generation, payroll aggregation) only scan the matching partitions.
+
+Partitions are created ahead of time by ensure_partition, which calls the
+app.ensure_contractor_hours_partition() SQL function (it also moves matching
+rows out of the default partition). Every API worker runs
+ensure_upcoming_partitions on startup, creating this year's partition and the
+next settings.contractor_hours_partition_years_ahead ones, so new years exist
+before hours are written for them. A deployment that runs for a long time
+without restarting should also run it from cron (e.g. every December):
+    python -m app.services.contractor_hours_partitions
+
+Closed years can be detached for archiving: the detached table keeps its rows
+and indexes and can be dumped, moved to another tablespace or re-attached later.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import date
+from typing import List, Dict, Optional
+
+from ..config import settings
+from ..database import SessionLocal
+
+PARENT_TABLE = "t_contractor_hours"
+DEFAULT_PARTITION = "t_contractor_hours_default"
+
+
+def partition_name(year: int) -> str:
+    return f"{PARENT_TABLE}_y{int(year)}"
+
+
+class ContractorHoursPartitionManager:
+    """Creates, lists and detaches the yearly t_contractor_hours partitions"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ensure_partition(self, year: int) -> str:
+        """Create the partition for a calendar year if it doesn't exist yet"""
+        name = self.db.execute(
+            text("SELECT app.ensure_contractor_hours_partition(:year)"),
+            {"year": int(year)}
+        ).scalar()
+        self.db.commit()
+        return name
+
+    def ensure_partitions_for_range(self, start_date: date, end_date: date) -> List[str]:
+        """Create the partitions covering every year between two dates"""
+        return [self.ensure_partition(year) for year in range(start_date.year, end_date.year + 1)]
+
+    def list_partitions(self) -> List[Dict]:
+        """Attached partitions with their bounds and approximate row counts"""
+        rows = self.db.execute(
+            text("""
+                SELECT c.relname AS name,
+                       pg_get_expr(c.relpartbound, c.oid) AS bounds,
+                       c.reltuples::bigint AS estimated_rows,
+                       pg_total_relation_size(c.oid) AS total_bytes
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'app.t_contractor_hours'::regclass
+                ORDER BY c.relname
+            """)
+        ).fetchall()
+        return [
+            {
+                'name': row.name,
+                'bounds': row.bounds,
+                'estimated_rows': max(row.estimated_rows, 0),
+                'total_bytes': row.total_bytes
+            }
+            for row in rows
+        ]
+
+    def detach_partition(self, year: int) -> str:
+        """
+        Detach a year's partition from t_contractor_hours for archiving
+
+        The rows stay in the standalone table app.t_contractor_hours_yYYYY but
+        are no longer visible through t_contractor_hours (or the ORM).
+
+        Returns:
+            Name of the detached table
+        """
+        name = partition_name(year)
+        attached = {partition['name'] for partition in self.list_partitions()}
+        if name not in attached:
+            raise ValueError(f"Partition {name} is not attached")
+
+        self.db.execute(text(f'ALTER TABLE app.{PARENT_TABLE} DETACH PARTITION app."{name}"'))
+        self.db.commit()
+        print(f"📦 Detached contractor hours partition {name}")
+        return name
+
+    def attach_partition(self, year: int) -> str:
+        """Re-attach a previously detached year, e.g. after restoring an archive"""
+        name = partition_name(year)
+        self.db.execute(
+            text(f"""
+                ALTER TABLE app.{PARENT_TABLE} ATTACH PARTITION app."{name}"
+                FOR VALUES FROM ('{int(year)}-01-01') TO ('{int(year) + 1}-01-01')
+            """)
+        )
+        self.db.commit()
+        print(f"📥 Attached contractor hours partition {name}")
+        return name
+
+
+def ensure_contractor_hours_partitions(db: Session, start_date: date, end_date: date) -> List[str]:
+    """Convenience function to make sure hours for a date range land in yearly partitions"""
+    return ContractorHoursPartitionManager(db).ensure_partitions_for_range(start_date, end_date)
+
+
+def detach_contractor_hours_partition(db: Session, year: int) -> str:
+    """Convenience function to detach a year of contractor hours for archiving"""
+    return ContractorHoursPartitionManager(db).detach_partition(year)
+
+
+def ensure_upcoming_partitions(years_ahead: Optional[int] = None) -> List[str]:
+    """Create this year's partition and the following ones, on a session of its own"""
+    if years_ahead is None:
+        years_ahead = settings.contractor_hours_partition_years_ahead
+    today = date.today()
+    db = SessionLocal()
+    try:
+        return ContractorHoursPartitionManager(db).ensure_partitions_for_range(
+            today, date(today.year + years_ahead, 1, 1)
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    for name in ensure_upcoming_partitions():
+        print(f"✅ Contractor hours partition {name} ready")
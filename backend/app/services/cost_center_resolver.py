@@ -0,0 +1,130 @@
+"""
+Cost Center Resolution Service
+
+Resolves the cost centers assigned to candidate-client relationships
+(t_candidate_client_cost_center -> t_cost_center) for one or many candidates
+or pccs with a single joined query, instead of loading each relationship and
+then each cost center separately.
+"""
+
+from sqlalchemy.orm import Session
+from typing import List, Dict
+from uuid import UUID
+
+from .. import models, schemas
+
+
+class CostCenterResolver:
+    """Loads cost center assignments in bulk, grouped by candidate or pcc"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _base_query(self):
+        return self.db.query(
+            models.P_CandidateClient.candidate_id,
+            models.P_CandidateClient.pcc_id,
+            models.CandidateClientCostCenter.id.label('relationship_id'),
+            models.CostCenter.id,
+            models.CostCenter.cc_name,
+            models.CostCenter.cc_number,
+            models.CostCenter.cc_address
+        ).join(
+            models.CandidateClientCostCenter,
+            models.CandidateClientCostCenter.pcc_id == models.P_CandidateClient.pcc_id
+        ).join(
+            models.CostCenter,
+            models.CostCenter.id == models.CandidateClientCostCenter.cc_id
+        ).filter(
+            models.CandidateClientCostCenter.deleted_on.is_(None),
+            models.CostCenter.deleted_on.is_(None)
+        )
+
+    @staticmethod
+    def _normalize_ids(ids: List[str]) -> Dict[str, list]:
+        """Canonical UUID strings mapped to empty lists; raises ValueError on a malformed id"""
+        result = {}
+        for raw_id in ids:
+            try:
+                result[str(UUID(str(raw_id)))] = []
+            except ValueError:
+                raise ValueError(f"Invalid id: {raw_id}")
+        return result
+
+    @staticmethod
+    def _to_schema(row) -> schemas.CostCenterWithDetails:
+        return schemas.CostCenterWithDetails(
+            id=row.id,
+            cc_name=row.cc_name,
+            cc_number=row.cc_number,
+            cc_address=row.cc_address,
+            relationship_id=row.relationship_id
+        )
+
+    def for_candidates(self, candidate_ids: List[str]) -> Dict[str, List[schemas.CostCenterWithDetails]]:
+        """
+        Cost centers for every active client relationship of the given candidates
+
+        Args:
+            candidate_ids: Candidate (user) ids
+
+        Returns:
+            Mapping of canonical candidate_id to its cost centers; candidates without any map to []
+
+        Raises:
+            ValueError: If any id is not a valid UUID
+        """
+        result = self._normalize_ids(candidate_ids)
+        if not result:
+            return result
+
+        rows = self._base_query().filter(
+            models.P_CandidateClient.candidate_id.in_(list(result.keys())),
+            models.P_CandidateClient.deleted_on.is_(None)
+        ).order_by(
+            models.P_CandidateClient.candidate_id,
+            models.P_CandidateClient.created_on.desc(),
+            models.CandidateClientCostCenter.sort_order
+        ).all()
+
+        for row in rows:
+            result[str(row.candidate_id)].append(self._to_schema(row))
+        return result
+
+    def for_pccs(self, pcc_ids: List[str]) -> Dict[str, List[schemas.CostCenterWithDetails]]:
+        """
+        Cost centers assigned to the given candidate-client relationships
+
+        Args:
+            pcc_ids: Candidate-client relationship ids
+
+        Returns:
+            Mapping of canonical pcc_id to its cost centers; pccs without any map to []
+
+        Raises:
+            ValueError: If any id is not a valid UUID
+        """
+        result = self._normalize_ids(pcc_ids)
+        if not result:
+            return result
+
+        rows = self._base_query().filter(
+            models.P_CandidateClient.pcc_id.in_(list(result.keys()))
+        ).order_by(
+            models.P_CandidateClient.pcc_id,
+            models.CandidateClientCostCenter.sort_order
+        ).all()
+
+        for row in rows:
+            result[str(row.pcc_id)].append(self._to_schema(row))
+        return result
+
+
+def resolve_cost_centers_for_candidates(db: Session, candidate_ids: List[str]) -> Dict[str, List[schemas.CostCenterWithDetails]]:
+    """Convenience function to resolve cost centers for many candidates"""
+    return CostCenterResolver(db).for_candidates(candidate_ids)
+
+
+def resolve_cost_centers_for_pccs(db: Session, pcc_ids: List[str]) -> Dict[str, List[schemas.CostCenterWithDetails]]:
+    """Convenience function to resolve cost centers for many pccs"""
+    return CostCenterResolver(db).for_pccs(pcc_ids)
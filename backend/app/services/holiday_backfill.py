@@ -0,0 +1,264 @@
+"""
+Holiday Backfill Service
+
+Brings the holiday ledger in line with every timesheet entry (source
+'timesheet_entry'): 8% of standard_hours accrues, holiday_hours is used.
+
+Entries are read in entry_id order, one chunk at a time. The chunk's
+candidates are locked (crud.lock_holiday_candidates), then a single SQL
+statement (crud.TIMESHEET_ENTRY_HOLIDAY_CHANGES_SQL, the same one the live
+create/update timesheet entry path uses) compares each entry's target figures
+with what the ledger already holds for it, appends only the differences, and
+applies them, summed per candidate, to t_holiday_balance and
+m_candidate.holiday_count. The chunk then commits together with its checkpoint
+(t_holiday_backfill_checkpoint). So:
+  - an interrupted job resumes after the last committed chunk
+  - re-running a finished job writes nothing for unchanged entries
+  - entries saved live while the job runs aren't counted twice: an entry and its
+    ledger entries commit together, and whichever side locks the candidate
+    second sees what the other committed
+  - entries from before the ledger, already counted in each candidate's 'opening'
+    entry, were recorded as covered by the add_holiday_opening_timesheet_entries
+    migration, so they aren't counted twice either
+Candidates are hashed into partitions that run in parallel on their own
+sessions (at most holiday_backfill_workers, so the job stays within the
+engine's pool); partitions never touch the same candidate's balance rows.
+
+Usage follows the rule of deduct_candidate_holiday_count on both paths:
+holiday taken is deducted only down to a count of 0, the ledger keeps both the hours deducted
+(holiday_hours) and the hours requested (holiday_requested), and an entry is
+compared with what was requested, so an un-deducted remainder is not deducted
+again on a later run.
+
+A dry run reads the same chunks and reports what would be written, without
+writing ledger entries or checkpoints.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+import time
+
+from .. import crud
+from ..config import settings
+from ..database import SessionLocal
+
+# Next chunk of one partition's entries, with the candidates they belong to
+NEXT_CHUNK_SQL = """
+    SELECT e.entry_id,
+           CASE WHEN e.employee_code ~ :uuid_pattern THEN CAST(e.employee_code AS uuid) END AS candidate_id
+    FROM app.t_timesheet_entry e
+    WHERE (CAST(:after AS uuid) IS NULL OR e.entry_id > CAST(:after AS uuid))
+      AND (CAST(:timesheet_id AS uuid) IS NULL OR e.timesheet_id = CAST(:timesheet_id AS uuid))
+      AND (hashtext(e.employee_code) & 2147483647) % :partitions = :partition
+    ORDER BY e.entry_id
+    LIMIT :chunk_size
+"""
+
+DRY_RUN_SQL = crud.TIMESHEET_ENTRY_HOLIDAY_CHANGES_SQL + """
+    SELECT (SELECT count(*) FROM changes) AS ledger_entries,
+           (SELECT count(DISTINCT candidate_id) FROM changes) AS balance_updates,
+           (SELECT coalesce(sum(holiday_hours), 0) FROM changes) AS holiday_hours
+"""
+
+APPLY_SQL = crud.TIMESHEET_ENTRY_HOLIDAY_CHANGES_SQL + """
+    , inserted AS (
+        INSERT INTO app.t_holiday_ledger (
+            candidate_id, source, source_id, entry_type, hours_worked, holiday_hours, holiday_requested, effective_date
+        )
+        SELECT candidate_id, 'timesheet_entry', source_id, entry_type, hours_worked, holiday_hours, holiday_requested, effective_date
+        FROM changes
+        RETURNING entry_id, candidate_id, entry_type, hours_worked, holiday_hours
+    ), per_candidate AS (
+        SELECT candidate_id,
+               sum(hours_worked) AS hours_worked,
+               coalesce(sum(holiday_hours) FILTER (WHERE entry_type = 'accrual'), 0) AS total_holiday,
+               coalesce(-sum(holiday_hours) FILTER (WHERE entry_type = 'usage'), 0) AS holiday_taken,
+               sum(holiday_hours) AS holiday_balance,
+               max(entry_id) AS last_entry_id
+        FROM inserted
+        GROUP BY candidate_id
+    ), balances AS (
+        INSERT INTO app.t_holiday_balance AS b (
+            candidate_id, source, hours_worked, total_holiday, holiday_taken, holiday_balance, last_entry_id, updated_on
+        )
+        SELECT candidate_id, 'timesheet_entry', hours_worked, total_holiday, holiday_taken, holiday_balance, last_entry_id, NOW()
+        FROM per_candidate
+        ON CONFLICT (candidate_id, source) DO UPDATE SET
+            hours_worked = b.hours_worked + EXCLUDED.hours_worked,
+            total_holiday = b.total_holiday + EXCLUDED.total_holiday,
+            holiday_taken = b.holiday_taken + EXCLUDED.holiday_taken,
+            holiday_balance = b.holiday_balance + EXCLUDED.holiday_balance,
+            last_entry_id = greatest(b.last_entry_id, EXCLUDED.last_entry_id),
+            updated_on = EXCLUDED.updated_on
+    ), counts AS (
+        UPDATE app.m_candidate c
+        SET holiday_count = coalesce(c.holiday_count, 0) + p.holiday_balance
+        FROM per_candidate p
+        WHERE c.candidate_id = p.candidate_id
+    )
+    SELECT (SELECT count(*) FROM inserted) AS ledger_entries,
+           (SELECT count(*) FROM per_candidate) AS balance_updates,
+           (SELECT coalesce(sum(holiday_balance), 0) FROM per_candidate) AS holiday_hours
+"""
+
+
+class HolidayBackfillJob:
+    """Chunked, checkpointed, partition-parallel holiday backfill over t_timesheet_entry"""
+
+    def __init__(self, timesheet_id: Optional[str] = None, chunk_size: Optional[int] = None,
+                 workers: Optional[int] = None, dry_run: bool = False):
+        self.timesheet_id = str(timesheet_id) if timesheet_id else None
+        self.chunk_size = chunk_size or settings.holiday_backfill_chunk_size
+        # Each partition holds its own session, so never more than the configured workers
+        self.partitions = max(1, min(workers or settings.holiday_backfill_workers, settings.holiday_backfill_workers))
+        self.dry_run = dry_run
+        self.job_name = f"timesheet_entries:{self.timesheet_id or 'all'}"
+
+    def run(self, restart: bool = False) -> Dict:
+        """
+        Run (or resume) the backfill across all partitions
+
+        Args:
+            restart: Ignore unfinished checkpoints and start from the first entry
+
+        Returns:
+            Totals over all partitions and per-partition progress
+        """
+        start = time.perf_counter()
+        print(f"🔄 Holiday backfill {self.job_name}: {self.partitions} partitions, "
+              f"{self.chunk_size} entries per chunk{' (dry run)' if self.dry_run else ''}")
+
+        with ThreadPoolExecutor(max_workers=self.partitions) as executor:
+            partitions = list(executor.map(lambda p: self._run_partition(p, restart), range(self.partitions)))
+
+        totals = {
+            field: sum(partition[field] for partition in partitions)
+            for field in ('entries', 'ledger_entries', 'balance_updates', 'holiday_hours', 'chunks')
+        }
+        totals['holiday_hours'] = round(totals['holiday_hours'], 4)
+        result = {
+            'job_name': self.job_name,
+            'dry_run': self.dry_run,
+            **totals,
+            'seconds': round(time.perf_counter() - start, 3),
+            'partitions': partitions
+        }
+        print(f"✅ Holiday backfill {self.job_name}: {totals['entries']} entries, "
+              f"{totals['ledger_entries']} ledger entries in {result['seconds']}s")
+        return result
+
+    def _run_partition(self, partition: int, restart: bool) -> Dict:
+        db = SessionLocal()
+        try:
+            after = None if self.dry_run else self._resume_point(db, partition, restart)
+            progress = {'partition': partition, 'entries': 0, 'ledger_entries': 0,
+                        'balance_updates': 0, 'holiday_hours': 0.0, 'chunks': 0,
+                        'resumed_after': str(after) if after else None}
+            sql = text(DRY_RUN_SQL if self.dry_run else APPLY_SQL)
+
+            while True:
+                chunk = db.execute(text(NEXT_CHUNK_SQL), {
+                    "after": str(after) if after else None,
+                    "timesheet_id": self.timesheet_id,
+                    "partitions": self.partitions,
+                    "partition": partition,
+                    "chunk_size": self.chunk_size,
+                    "uuid_pattern": crud.UUID_PATTERN
+                }).fetchall()
+                if not chunk:
+                    break
+
+                # Live entry saves wait for the chunk (and it for them) on the candidates' rows
+                candidate_ids = sorted({str(entry.candidate_id) for entry in chunk if entry.candidate_id})
+                if not self.dry_run:
+                    candidate_ids = crud.lock_holiday_candidates(db, candidate_ids)
+                row = db.execute(sql, {
+                    "entry_ids": [str(entry.entry_id) for entry in chunk],
+                    "candidate_ids": candidate_ids,
+                    "rate": crud.HOLIDAY_ACCRUAL_RATE,
+                    "epsilon": crud.HOLIDAY_EPSILON,
+                    "uuid_pattern": crud.UUID_PATTERN
+                }).fetchone()
+
+                after = chunk[-1].entry_id
+                progress['entries'] += len(chunk)
+                progress['ledger_entries'] += row.ledger_entries
+                progress['balance_updates'] += row.balance_updates
+                progress['holiday_hours'] += float(row.holiday_hours)
+                progress['chunks'] += 1
+
+                if self.dry_run:
+                    db.rollback()
+                else:
+                    self._checkpoint(db, partition, after, len(chunk), row)
+                    db.commit()
+
+            if not self.dry_run:
+                db.execute(text("""
+                    UPDATE app.t_holiday_backfill_checkpoint
+                    SET completed_on = NOW(), updated_on = NOW()
+                    WHERE job_name = :job_name AND "partition" = :partition
+                """), {"job_name": self.job_name, "partition": partition})
+                db.commit()
+            return progress
+
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _resume_point(self, db: Session, partition: int, restart: bool):
+        """Last applied entry of an unfinished run with the same partitioning; otherwise start over"""
+        row = db.execute(text("""
+            SELECT partitions, last_entry_id, completed_on
+            FROM app.t_holiday_backfill_checkpoint
+            WHERE job_name = :job_name AND "partition" = :partition
+        """), {"job_name": self.job_name, "partition": partition}).fetchone()
+
+        if row and not restart and row.completed_on is None and row.partitions == self.partitions:
+            print(f"⏩ Resuming partition {partition} after entry {row.last_entry_id}")
+            return row.last_entry_id
+
+        db.execute(text("""
+            INSERT INTO app.t_holiday_backfill_checkpoint (job_name, "partition", partitions, started_on, updated_on)
+            VALUES (:job_name, :partition, :partitions, NOW(), NOW())
+            ON CONFLICT (job_name, "partition") DO UPDATE SET
+                partitions = EXCLUDED.partitions,
+                last_entry_id = NULL,
+                entries_processed = 0,
+                ledger_entries = 0,
+                holiday_hours = 0,
+                started_on = NOW(),
+                updated_on = NOW(),
+                completed_on = NULL
+        """), {"job_name": self.job_name, "partition": partition, "partitions": self.partitions})
+        db.commit()
+        return None
+
+    def _checkpoint(self, db: Session, partition: int, last_entry_id, entries: int, row) -> None:
+        db.execute(text("""
+            UPDATE app.t_holiday_backfill_checkpoint
+            SET last_entry_id = :last_entry_id,
+                entries_processed = entries_processed + :entries,
+                ledger_entries = ledger_entries + :ledger_entries,
+                holiday_hours = holiday_hours + :holiday_hours,
+                updated_on = NOW()
+            WHERE job_name = :job_name AND "partition" = :partition
+        """), {
+            "job_name": self.job_name,
+            "partition": partition,
+            "last_entry_id": str(last_entry_id),
+            "entries": entries,
+            "ledger_entries": row.ledger_entries,
+            "holiday_hours": float(row.holiday_hours)
+        })
+
+
+def backfill_timesheet_holidays(timesheet_id: Optional[str] = None, dry_run: bool = False,
+                                chunk_size: Optional[int] = None, workers: Optional[int] = None,
+                                restart: bool = False) -> Dict:
+    """Convenience function to run the timesheet entry holiday backfill"""
+    return HolidayBackfillJob(timesheet_id, chunk_size, workers, dry_run).run(restart)
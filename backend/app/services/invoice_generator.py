@@ -0,0 +1,214 @@
+"""
+Invoice Generation Service
+
+Builds per-client invoices from contractor hours (t_contractor_hours) and their
+rate hours (t_contractor_rate_hours). Line items for each client can be built
+either one client after another or concurrently on a bounded pool of sessions,
+while invoice numbers and the invoice rows themselves are written through the
+caller's session so the whole run commits or rolls back together.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from datetime import date
+import uuid
+
+from .. import models
+from ..config import settings
+from ..database import SessionLocal
+
+
+class InvoiceGenerator:
+    """Handles invoice creation for a week of contractor hours grouped by client"""
+
+    def __init__(self, db: Session, max_workers: Optional[int] = None):
+        self.db = db
+        self.max_workers = max_workers or settings.invoice_generation_workers
+
+    def generate_client_invoices(self, client_groups: Dict, invoice_date: date,
+                                 week_start: date, week_end: date, parallel: bool = False) -> List[Dict]:
+        """
+        Create one invoice per client
+
+        Args:
+            client_groups: Mapping of client_id to the ContractorHours rows for that client
+            invoice_date: Date stamped on every invoice
+            week_start: Monday of the invoiced week
+            week_end: Sunday of the invoiced week
+            parallel: Build each client's line items concurrently on separate sessions
+
+        Returns:
+            List of dictionaries describing the created invoices
+        """
+        # Only ids cross thread boundaries; ORM rows stay bound to the request session
+        groups = [
+            (client_id, [tch.tch_id for tch in tch_list])
+            for client_id, tch_list in client_groups.items()
+        ]
+
+        if parallel and len(groups) > 1:
+            workers = max(1, min(self.max_workers, len(groups)))
+            print(f"🔍 DEBUG: Building line items for {len(groups)} clients on {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._build_line_items_in_session, tch_ids, week_start, week_end)
+                    for _, tch_ids in groups
+                ]
+                # Results are collected in submission order so invoice numbers follow client order
+                line_items_by_client = [future.result() for future in futures]
+        else:
+            line_items_by_client = [
+                self._build_line_items(self.db, tch_ids, week_start, week_end)
+                for _, tch_ids in groups
+            ]
+
+        invoice_numbers = allocate_invoice_numbers(self.db, len(groups))
+
+        created_invoices = []
+        for (client_id, _), line_items, invoice_num in zip(groups, line_items_by_client, invoice_numbers):
+            created_invoices.append(
+                self._create_invoice(client_id, invoice_num, invoice_date, line_items)
+            )
+            print(f"🔍 DEBUG: Created invoice {invoice_num} for client {client_id} with {len(line_items)} line items")
+
+        return created_invoices
+
+    def _build_line_items_in_session(self, tch_ids: List, week_start: date, week_end: date) -> List[Dict]:
+        """Build line items for one client on a dedicated session from the pool"""
+        db = SessionLocal()
+        try:
+            return self._build_line_items(db, tch_ids, week_start, week_end)
+        finally:
+            db.close()
+
+    def _build_line_items(self, db: Session, tch_ids: List, week_start: date, week_end: date) -> List[Dict]:
+        """Collect line item values for a client's contractor hours"""
+        if not tch_ids:
+            return []
+
+        contractor_hours = db.query(
+            models.ContractorHours.tch_id,
+            models.ContractorHours.timesheet_id,
+            models.ContractorHours.pcc_id
+        ).filter(models.ContractorHours.tch_id.in_(tch_ids)).all()
+
+        rate_hours_by_tch = {}
+        for rate_hour in db.query(models.ContractorRateHours).filter(
+            models.ContractorRateHours.tch_id.in_(tch_ids)
+        ).all():
+            rate_hours_by_tch.setdefault(rate_hour.tch_id, []).append(rate_hour)
+
+        pcc_ids = {tch.pcc_id for tch in contractor_hours if tch.pcc_id}
+        names_by_pcc = {}
+        if pcc_ids:
+            rows = db.query(
+                models.P_CandidateClient.pcc_id,
+                models.Candidate.invoice_contact_name,
+                models.Client.client_name
+            ).join(
+                models.Candidate, models.P_CandidateClient.candidate_id == models.Candidate.candidate_id
+            ).join(
+                models.Client, models.P_CandidateClient.client_id == models.Client.client_id
+            ).filter(models.P_CandidateClient.pcc_id.in_(pcc_ids)).all()
+            for pcc_id, candidate_name, client_name in rows:
+                names_by_pcc[pcc_id] = (
+                    candidate_name or "Unknown Candidate",
+                    client_name or "Unknown Client"
+                )
+
+        period = f"{week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}"
+        order = {tch_id: i for i, tch_id in enumerate(tch_ids)}
+
+        line_items = []
+        for tch in sorted(contractor_hours, key=lambda row: order[row.tch_id]):
+            rate_hours = rate_hours_by_tch.get(tch.tch_id)
+            if not rate_hours:
+                print(f"🔍 DEBUG: No rate hours found for contractor hour {tch.tch_id}")
+                continue
+
+            candidate_name, client_name = names_by_pcc.get(tch.pcc_id, ("Unknown", "Unknown"))
+            m_rate_name = f"{candidate_name} - {client_name} - {period}"
+
+            for rate_hour in rate_hours:
+                line_items.append({
+                    'type': rate_hour.rate_type_id,
+                    'quantity': rate_hour.quantity,
+                    'rate': rate_hour.bill_rate,
+                    'total': (rate_hour.quantity or 0) * (rate_hour.bill_rate or 0),
+                    'timesheet_id': tch.timesheet_id,
+                    'm_rate_name': m_rate_name,
+                    'tcr_id': rate_hour.tcr_id
+                })
+
+        return line_items
+
+    def _create_invoice(self, client_id, invoice_num: str, invoice_date: date, line_items: List[Dict]) -> Dict:
+        """Add an invoice and its line items to the caller's session"""
+        client_invoice_id = str(uuid.uuid4())
+        total_amount = sum(item['total'] for item in line_items)
+
+        self.db.add(models.Invoice(
+            invoice_id=client_invoice_id,
+            invoice_num=invoice_num,
+            invoice_date=invoice_date,
+            status="Draft",
+            show_invoices=True,
+            inv_client_id=client_id,
+            total_amount=total_amount
+        ))
+        self.db.flush()
+
+        if line_items:
+            self.db.add_all([
+                models.InvoiceLineItem(invoice_id=client_invoice_id, **item)
+                for item in line_items
+            ])
+
+        return {
+            'invoice_id': client_invoice_id,
+            'invoice_num': invoice_num,
+            'total_amount': total_amount,
+            'line_items_count': len(line_items),
+            'client_id': client_id
+        }
+
+
+def allocate_invoice_numbers(db: Session, count: int) -> List[str]:
+    """Reserve a contiguous block of invoice numbers from the 'Sales' constant.
+
+    The increment happens in a single UPDATE ... RETURNING, so the row lock it
+    takes keeps concurrent invoice runs from handing out the same numbers.
+    """
+    if count <= 0:
+        return []
+
+    result = db.execute(
+        text("""
+            UPDATE app.m_constant
+            SET constant = (CAST(constant AS BIGINT) + :count)::varchar, updated_on = NOW()
+            WHERE use_for = 'Sales'
+            RETURNING constant
+        """),
+        {"count": count}
+    ).fetchone()
+
+    if result:
+        last_value = int(result[0])
+    else:
+        # No constant yet: start numbering at 1200000 as the rest of the app does
+        last_value = 1200000 + count - 1
+        db.execute(
+            text("INSERT INTO app.m_constant (id, constant, use_for) VALUES (1, :constant, 'Sales')"),
+            {"constant": str(last_value)}
+        )
+
+    return [str(value) for value in range(last_value - count + 1, last_value + 1)]
+
+
+def generate_client_invoices(db: Session, client_groups: Dict, invoice_date: date,
+                             week_start: date, week_end: date, parallel: bool = False) -> List[Dict]:
+    """Convenience function to create per-client invoices"""
+    generator = InvoiceGenerator(db)
+    return generator.generate_client_invoices(client_groups, invoice_date, week_start, week_end, parallel)
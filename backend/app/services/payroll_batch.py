@@ -0,0 +1,267 @@
+"""
+Payroll Batch Processing Service
+
+Calculates many payroll periods in one go (year-end runs, backfills). Periods
+are handed to a pool of worker processes, each with its own database session,
+so the per-contractor tax calculations of different periods run on separate
+CPU cores. The pool's processes are spawned, not forked: an API worker runs
+threads and holds pooled connections, neither of which survives a fork safely.
+
+Progress and per-period timings are kept in t_payroll_batch_job, so any API
+worker can answer a poll for a job, and a job outlives the worker that ran it.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, text
+from sqlalchemy.sql import func
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import List, Dict, Optional, Callable
+from datetime import date
+from uuid import UUID
+import json
+import time
+
+from .. import models
+from ..config import settings
+from ..database import SessionLocal
+from .payroll_calculator import PayrollCalculator
+from .payroll_snapshots import PayrollPeriodClosed
+
+
+def calculate_period_in_session(period_id: str) -> Dict:
+    """Calculate one period on a dedicated session and report its outcome and timing.
+
+    Module level so it can be pickled into the process pool; only ids and plain
+    values cross the process boundary.
+    """
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = PayrollCalculator(db).calculate_payroll_for_period(period_id)
+        return {
+            'period_id': str(period_id),
+            'status': 'completed',
+            'total_contractors': result['total_contractors'],
+            'total_gross_pay': result['total_gross_pay'],
+            'total_deductions': result['total_deductions'],
+            'total_net_pay': result['total_net_pay'],
+            'seconds': round(time.perf_counter() - start, 3),
+            'error': None
+        }
+    except Exception as e:
+        db.rollback()
+        return {
+            'period_id': str(period_id),
+            # Locked/completed periods are left as they are on purpose, not an error
+            'status': 'skipped' if isinstance(e, PayrollPeriodClosed) else 'failed',
+            'total_contractors': 0,
+            'total_gross_pay': 0.0,
+            'total_deductions': 0.0,
+            'total_net_pay': 0.0,
+            'seconds': round(time.perf_counter() - start, 3),
+            'error': str(e)
+        }
+    finally:
+        db.close()
+
+
+class PayrollBatchProcessor:
+    """Runs PayrollCalculator over many periods, sequentially or on a process pool"""
+
+    def __init__(self, db: Optional[Session] = None, max_workers: Optional[int] = None):
+        # Only resolve_period_ids reads through db; run() gives every period its own session
+        self.db = db
+        self.max_workers = max_workers or settings.payroll_batch_workers
+
+    def resolve_period_ids(self, period_ids: Optional[List] = None,
+                           start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[str]:
+        """
+        Periods to process, in start date order
+
+        Args:
+            period_ids: Explicit periods; unknown ids raise ValueError
+            start_date: With end_date, selects every period overlapping the range
+
+        Returns:
+            Period ids as strings
+        """
+        query = self.db.query(models.PayrollPeriod.period_id)
+        if period_ids:
+            requested = {str(period_id) for period_id in period_ids}
+            rows = query.filter(models.PayrollPeriod.period_id.in_(requested)).order_by(
+                models.PayrollPeriod.start_date
+            ).all()
+            missing = requested - {str(row.period_id) for row in rows}
+            if missing:
+                raise ValueError(f"Payroll periods not found: {', '.join(sorted(missing))}")
+        elif start_date and end_date:
+            rows = query.filter(
+                and_(
+                    models.PayrollPeriod.start_date <= end_date,
+                    models.PayrollPeriod.end_date >= start_date
+                )
+            ).order_by(models.PayrollPeriod.start_date).all()
+        else:
+            raise ValueError("Provide period_ids or both start_date and end_date")
+
+        return [str(row.period_id) for row in rows]
+
+    def run(self, period_ids: List[str], parallel: bool = True,
+            progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Calculate payroll for every period
+
+        Args:
+            period_ids: Periods to calculate
+            parallel: Spread periods over a process pool instead of a sequential loop
+            progress: Called with each period's result as soon as it finishes
+
+        Returns:
+            Per-period results (in period_ids order) plus overall timing and throughput
+        """
+        start = time.perf_counter()
+        results = {}
+
+        def record(result: Dict) -> None:
+            results[result['period_id']] = result
+            print(f"📊 Payroll period {result['period_id']} {result['status']} in {result['seconds']}s "
+                  f"({len(results)}/{len(period_ids)})")
+            if progress:
+                progress(result)
+
+        if parallel and len(period_ids) > 1:
+            workers = max(1, min(self.max_workers, len(period_ids)))
+            print(f"🔄 Calculating {len(period_ids)} payroll periods on {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+                futures = [executor.submit(calculate_period_in_session, period_id) for period_id in period_ids]
+                for future in as_completed(futures):
+                    record(future.result())
+        else:
+            print(f"🔄 Calculating {len(period_ids)} payroll periods sequentially")
+            for period_id in period_ids:
+                record(calculate_period_in_session(period_id))
+
+        elapsed = time.perf_counter() - start
+        ordered = [results[period_id] for period_id in period_ids]
+        return {
+            'total_periods': len(ordered),
+            'completed': sum(1 for result in ordered if result['status'] == 'completed'),
+            'skipped': sum(1 for result in ordered if result['status'] == 'skipped'),
+            'failed': sum(1 for result in ordered if result['status'] == 'failed'),
+            'seconds': round(elapsed, 3),
+            'periods_per_second': round(len(ordered) / elapsed, 3) if elapsed > 0 else 0.0,
+            'results': ordered
+        }
+
+
+class PayrollBatchJobs:
+    """Batch runs and their progress, stored in t_payroll_batch_job; each call uses its own short session"""
+
+    def create(self, period_ids: List[str], parallel: bool) -> Dict:
+        db = SessionLocal()
+        try:
+            job = models.PayrollBatchJob(
+                status='pending',
+                parallel=parallel,
+                total_periods=len(period_ids),
+                processed_periods=0,
+                period_ids=[str(period_id) for period_id in period_ids],
+                results=[]
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return self._to_dict(job)
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return the job, or None if unknown"""
+        try:
+            job_id = UUID(str(job_id))
+        except ValueError:
+            return None
+        db = SessionLocal()
+        try:
+            job = db.query(models.PayrollBatchJob).filter(models.PayrollBatchJob.job_id == job_id).first()
+            return self._to_dict(job) if job else None
+        finally:
+            db.close()
+
+    def update(self, job_id: str, **fields) -> None:
+        db = SessionLocal()
+        try:
+            db.query(models.PayrollBatchJob).filter(models.PayrollBatchJob.job_id == job_id).update(
+                dict(fields, updated_on=func.now()), synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def add_result(self, job_id: str, result: Dict) -> None:
+        """Append one period's result in a single statement, as it finishes"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                text("""
+                    UPDATE app.t_payroll_batch_job
+                    SET results = results || jsonb_build_array(CAST(:result AS jsonb)),
+                        processed_periods = processed_periods + 1,
+                        updated_on = NOW()
+                    WHERE job_id = :job_id
+                """),
+                {"job_id": str(job_id), "result": json.dumps(result)}
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _to_dict(job: models.PayrollBatchJob) -> Dict:
+        return {
+            'job_id': str(job.job_id),
+            'status': job.status,
+            'parallel': job.parallel,
+            'total_periods': job.total_periods,
+            'processed_periods': job.processed_periods,
+            'period_ids': list(job.period_ids or []),
+            'results': list(job.results or []),
+            'seconds': job.seconds,
+            'periods_per_second': job.periods_per_second,
+            'error': job.error,
+            'created_on': job.created_on.isoformat() if job.created_on else None,
+            'updated_on': job.updated_on.isoformat() if job.updated_on else None,
+            'completed_on': job.completed_on.isoformat() if job.completed_on else None
+        }
+
+
+payroll_batch_jobs = PayrollBatchJobs()
+
+
+def run_payroll_batch_job(job_id: str) -> None:
+    """Execute a registered job (used as a FastAPI background task); periods and job updates use their own sessions"""
+    job = payroll_batch_jobs.get(job_id)
+    try:
+        payroll_batch_jobs.update(job_id, status='running')
+        summary = PayrollBatchProcessor().run(
+            job['period_ids'],
+            parallel=job['parallel'],
+            progress=lambda result: payroll_batch_jobs.add_result(job_id, result)
+        )
+        payroll_batch_jobs.update(
+            job_id,
+            status='completed' if not summary['failed'] else 'completed_with_errors',
+            results=summary['results'],
+            seconds=summary['seconds'],
+            periods_per_second=summary['periods_per_second'],
+            completed_on=func.now()
+        )
+    except Exception as e:
+        print(f"❌ Payroll batch {job_id} failed: {e}")
+        payroll_batch_jobs.update(job_id, status='failed', error=str(e), completed_on=func.now())
+
+
+def calculate_payroll_for_periods(db: Session, period_ids: List[str], parallel: bool = True) -> Dict:
+    """Convenience function to calculate payroll for many periods and wait for the result"""
+    return PayrollBatchProcessor(db).run(period_ids, parallel=parallel)
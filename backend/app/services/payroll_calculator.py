@@ -15,41 +15,28 @@ from datetime import date, datetime
 from decimal import Decimal
 import math
 
-from .. import models, schemas, crud
+from .. import models, crud
 from ..database import get_db
+from .tax_tables import get_tax_table
+from .vectorized_payroll import VectorizedPayrollEngine
+from .payroll_snapshots import PayrollPeriodClosed, is_closed_period
 
 
 class PayrollCalculator:
     """Handles payroll calculations with Irish tax system compliance"""
     
-    # Irish Tax Bands 2024 (simplified)
-    TAX_BANDS = {
-        'single': [
-            (0, 42000, 0.20),      # 20% up to €42,000
-            (42000, float('inf'), 0.40)  # 40% above €42,000
-        ],
-        'married': [
-            (0, 84000, 0.20),      # 20% up to €84,000 (married)
-            (84000, float('inf'), 0.40)  # 40% above €84,000
-        ]
-    }
+    # PAYE/USC bands and the PRSI rate are year-versioned in tax_bands.json (see tax_tables)
     
-    # PRSI Rates 2024
-    PRSI_RATES = {
-        'class_a': 0.04,  # 4% for Class A
-        'class_s': 0.04   # 4% for Class S (self-employed)
-    }
+    # t_payroll_summary figures summed over the period's payroll runs
+    SUMMARY_FIELDS = ['total_contractors', 'total_hours', 'total_gross_pay', 'total_deductions',
+                      'total_net_pay', 'total_tax', 'total_prsi', 'total_usc']
     
-    # USC Rates 2024
-    USC_BANDS = [
-        (0, 12012, 0.005),      # 0.5% up to €12,012
-        (12012, 22020, 0.02),   # 2% from €12,012 to €22,020
-        (22020, 70044, 0.045),  # 4.5% from €22,020 to €70,044
-        (70044, float('inf'), 0.08)  # 8% above €70,044
-    ]
-    
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, tax_year: Optional[int] = None, vectorized: bool = True):
         self.db = db
+        self.tax_table = get_tax_table(tax_year or date.today().year)
+        self._contractor_info = {}
+        # Compute all contractors' runs at once (see vectorized_payroll); False builds them one by one
+        self.vectorized = vectorized
     
     def calculate_payroll_for_period(self, period_id: str, contractor_ids: Optional[List[str]] = None) -> Dict:
         """
@@ -63,83 +50,36 @@ class PayrollCalculator:
             Dictionary with payroll calculation results
         """
         try:
-            # Get the payroll period
-            period = crud.get_payroll_period(self.db, period_id)
+            # Get the payroll period, locked: other runs of it (even its first, with no
+            # summary yet) wait, and it can't be locked/completed meanwhile
+            period = crud.get_payroll_period(self.db, period_id, for_update=True)
             if not period:
                 raise ValueError("Payroll period not found")
+            if is_closed_period(period):
+                raise PayrollPeriodClosed(f"Payroll period is {period.status}")
+            self.tax_table = get_tax_table(period.end_date.year)
             
-            # Get contractor hours for the period
-            contractor_hours = self._get_contractor_hours_for_period(period, contractor_ids)
+            # Take its dirty flags before reading hours, so a save committed after this point stays flagged
+            crud.claim_dirty_payroll_contractors(self.db, period_id, contractor_ids)
             
-            # Group hours by contractor and calculate pay
-            payroll_runs = []
-            total_gross_pay = 0.0
-            total_deductions = 0.0
-            total_net_pay = 0.0
-            
-            for contractor_id, hours_data in contractor_hours.items():
-                # Calculate gross pay
-                gross_pay = self._calculate_gross_pay(hours_data)
-                
-                # Get contractor information for tax calculations
-                contractor = self._get_contractor_info(contractor_id)
-                
-                # Calculate deductions
-                deductions = self._calculate_deductions(gross_pay, contractor)
-                
-                # Calculate net pay
-                net_pay = gross_pay - deductions['total']
-                
-                # Create payroll run
-                payroll_run_data = {
-                    'period_id': period_id,
-                    'contractor_id': contractor_id,
-                    'total_hours': hours_data['total_hours'],
-                    'standard_hours': hours_data['standard_hours'],
-                    'overtime_hours': hours_data['overtime_hours'],
-                    'holiday_hours': hours_data['holiday_hours'],
-                    'bank_holiday_hours': hours_data['bank_holiday_hours'],
-                    'weekend_hours': hours_data['weekend_hours'],
-                    'oncall_hours': hours_data['oncall_hours'],
-                    'standard_pay': hours_data['standard_pay'],
-                    'overtime_pay': hours_data['overtime_pay'],
-                    'holiday_pay': hours_data['holiday_pay'],
-                    'bank_holiday_pay': hours_data['bank_holiday_pay'],
-                    'weekend_pay': hours_data['weekend_pay'],
-                    'oncall_pay': hours_data['oncall_pay'],
-                    'gross_pay': gross_pay,
-                    'tax_deduction': deductions['tax'],
-                    'prsi_deduction': deductions['prsi'],
-                    'usc_deduction': deductions['usc'],
-                    'pension_deduction': deductions['pension'],
-                    'other_deductions': deductions['other'],
-                    'total_deductions': deductions['total'],
-                    'net_pay': net_pay,
-                    'status': 'pending'
-                }
-                
-                # Create or update payroll run
-                existing_run = self._get_existing_payroll_run(period_id, contractor_id)
-                if existing_run:
-                    payroll_run = self._update_payroll_run(existing_run.run_id, payroll_run_data)
-                else:
-                    payroll_run = crud.create_payroll_run(self.db, schemas.PayrollRunCreate(**payroll_run_data))
-                
-                payroll_runs.append(payroll_run)
-                
-                total_gross_pay += gross_pay
-                total_deductions += deductions['total']
-                total_net_pay += net_pay
+            # Calculate pay from the period's hours and create or update all payroll runs
+            payroll_runs = self._calculate_payroll_runs(period, period_id, contractor_ids)
+            run_totals = self._sum_run_totals(payroll_runs)
             
-            # Create or update payroll summary
-            self._update_payroll_summary(period_id, len(contractor_hours), total_gross_pay, total_deductions, total_net_pay, payroll_runs)
+            # Create or update payroll summary (commits runs and summary together). A run for
+            # some contractors only re-sums the period's runs, so the others stay counted
+            if contractor_ids:
+                summary_totals = crud.get_payroll_run_totals(self.db, period_id)
+            else:
+                summary_totals = run_totals
+            self._update_payroll_summary(period_id, summary_totals)
             
             return {
                 'period_id': period_id,
-                'total_contractors': len(contractor_hours),
-                'total_gross_pay': total_gross_pay,
-                'total_deductions': total_deductions,
-                'total_net_pay': total_net_pay,
+                'total_contractors': len(payroll_runs),
+                'total_gross_pay': run_totals['total_gross_pay'],
+                'total_deductions': run_totals['total_deductions'],
+                'total_net_pay': run_totals['total_net_pay'],
                 'payroll_runs': payroll_runs
             }
             
@@ -149,71 +89,200 @@ class PayrollCalculator:
             traceback.print_exc()
             raise e
     
-    def _get_contractor_hours_for_period(self, period, contractor_ids: Optional[List[str]] = None) -> Dict:
-        """Get and aggregate contractor hours for the period"""
-        query = self.db.query(models.ContractorHours).filter(
-            and_(
-                models.ContractorHours.work_date >= period.start_date,
-                models.ContractorHours.work_date <= period.end_date
-            )
-        )
-        
-        if contractor_ids:
-            query = query.filter(models.ContractorHours.contractor_id.in_(contractor_ids))
+    def recalculate_dirty_contractors(self, period_id: str) -> Dict:
+        """
+        Recalculate only the contractors whose hours changed since the last run
         
-        contractor_hours = query.all()
+        The payroll summary is adjusted by the difference between each dirty
+        contractor's old and new run rather than re-summed over the whole period.
+        Falls back to a full calculation when the period has no summary yet.
         
-        # Group hours by contractor
-        contractor_data = {}
-        for hours in contractor_hours:
-            contractor_id = str(hours.contractor_id)
-            if contractor_id not in contractor_data:
-                contractor_data[contractor_id] = {
-                    'total_hours': 0.0,
-                    'standard_hours': 0.0,
-                    'overtime_hours': 0.0,
-                    'holiday_hours': 0.0,
-                    'bank_holiday_hours': 0.0,
-                    'weekend_hours': 0.0,
-                    'oncall_hours': 0.0,
-                    'standard_pay': 0.0,
-                    'overtime_pay': 0.0,
-                    'holiday_pay': 0.0,
-                    'bank_holiday_pay': 0.0,
-                    'weekend_pay': 0.0,
-                    'oncall_pay': 0.0,
-                    'rates': {
-                        'standard_pay_rate': hours.standard_pay_rate or 0.0,
-                        'oncall_pay_rate': hours.oncall_pay_rate or 0.0,
-                        'weekend_pay_rate': hours.weekend_pay_rate or 0.0,
-                        'bankholiday_pay_rate': hours.bankholiday_pay_rate or 0.0
-                    }
-                }
+        Args:
+            period_id: UUID of the payroll period
+            
+        Returns:
+            Dictionary with the period totals and the recalculated contractor ids
+        """
+        try:
+            # Locked until commit: a concurrent run waits, then applies its deltas to our totals
+            period = crud.get_payroll_period(self.db, period_id, for_update=True)
+            if not period:
+                raise ValueError("Payroll period not found")
+            if is_closed_period(period):
+                raise PayrollPeriodClosed(f"Payroll period is {period.status}")
+            self.tax_table = get_tax_table(period.end_date.year)
+            
+            summary = crud.get_payroll_summary_by_period(self.db, period_id, for_update=True)
+            if not summary:
+                print(f"🔄 No payroll summary for period {period_id}, running full calculation")
+                result = self.calculate_payroll_for_period(period_id)
+                result['recalculated_contractors'] = [str(run.contractor_id) for run in result['payroll_runs']]
+                return result
             
-            # Accumulate hours
-            standard_hours = hours.standard_hours or 0.0
-            holiday_hours = hours.bank_holiday_hours or 0.0
-            weekend_hours = hours.weekend_hours or 0.0
-            oncall_hours = hours.on_call_hours or 0.0
+            # Claimed before the hours are read; later saves leave new flags for the next run
+            dirty_ids = crud.claim_dirty_payroll_contractors(self.db, period_id)
+            print(f"🔄 Recalculating {len(dirty_ids)} dirty contractors for period {period_id}")
+            
+            payroll_runs = []
+            if dirty_ids:
+                old_runs = {
+                    str(run.contractor_id): run
+                    for run in self.db.query(models.PayrollRun).filter(
+                        models.PayrollRun.period_id == period_id,
+                        models.PayrollRun.contractor_id.in_(dirty_ids)
+                    ).all()
+                }
+                # Snapshot before the upsert refreshes these instances in place
+                old_totals = {contractor_id: self._run_totals(run) for contractor_id, run in old_runs.items()}
+                
+                payroll_runs = self._calculate_payroll_runs(period, period_id, dirty_ids)
+                
+                # Contractors whose hours were all removed no longer have a run
+                recalculated_ids = {str(run.contractor_id) for run in payroll_runs}
+                removed_ids = [contractor_id for contractor_id in old_runs if contractor_id not in recalculated_ids]
+                for contractor_id in removed_ids:
+                    self.db.delete(old_runs[contractor_id])
+                
+                for totals in old_totals.values():
+                    self._apply_summary_delta(summary, totals, -1)
+                for run in payroll_runs:
+                    self._apply_summary_delta(summary, self._run_totals(run), 1)
+                
+                summary.updated_on = datetime.now()
             
-            contractor_data[contractor_id]['standard_hours'] += standard_hours
-            contractor_data[contractor_id]['holiday_hours'] += holiday_hours
-            contractor_data[contractor_id]['weekend_hours'] += weekend_hours
-            contractor_data[contractor_id]['oncall_hours'] += oncall_hours
-            contractor_data[contractor_id]['total_hours'] += standard_hours + holiday_hours + weekend_hours + oncall_hours
+            self.db.commit()
             
-            # Calculate pay based on rates
-            standard_pay = standard_hours * (hours.standard_pay_rate or 0.0)
-            holiday_pay = holiday_hours * (hours.bankholiday_pay_rate or 0.0)
-            weekend_pay = weekend_hours * (hours.weekend_pay_rate or 0.0)
-            oncall_pay = oncall_hours * (hours.oncall_pay_rate or 0.0)
+            return {
+                'period_id': period_id,
+                'total_contractors': summary.total_contractors,
+                'total_gross_pay': summary.total_gross_pay,
+                'total_deductions': summary.total_deductions,
+                'total_net_pay': summary.total_net_pay,
+                'payroll_runs': payroll_runs,
+                'recalculated_contractors': dirty_ids
+            }
             
-            contractor_data[contractor_id]['standard_pay'] += standard_pay
-            contractor_data[contractor_id]['holiday_pay'] += holiday_pay
-            contractor_data[contractor_id]['weekend_pay'] += weekend_pay
-            contractor_data[contractor_id]['oncall_pay'] += oncall_pay
+        except Exception as e:
+            print(f"Error recalculating payroll: {e}")
+            import traceback
+            traceback.print_exc()
+            self.db.rollback()
+            raise e
+    
+    @staticmethod
+    def _run_totals(run) -> Dict:
+        """The PayrollRun figures that feed the payroll summary"""
+        return {
+            'total_contractors': 1,
+            'total_hours': run.total_hours or 0.0,
+            'total_gross_pay': run.gross_pay or 0.0,
+            'total_deductions': run.total_deductions or 0.0,
+            'total_net_pay': run.net_pay or 0.0,
+            'total_tax': run.tax_deduction or 0.0,
+            'total_prsi': run.prsi_deduction or 0.0,
+            'total_usc': run.usc_deduction or 0.0
+        }
+    
+    @classmethod
+    def _sum_run_totals(cls, payroll_runs: List) -> Dict:
+        """The payroll summary figures of a set of runs"""
+        run_totals = [cls._run_totals(run) for run in payroll_runs]
+        return {field: sum(totals[field] for totals in run_totals) for field in cls.SUMMARY_FIELDS}
+    
+    @staticmethod
+    def _apply_summary_delta(summary, totals: Dict, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one contractor's run from the summary"""
+        for field, value in totals.items():
+            setattr(summary, field, (getattr(summary, field) or 0) + sign * value)
+    
+    def _calculate_payroll_runs(self, period, period_id: str, contractor_ids: Optional[List[str]] = None) -> List:
+        """Compute the period's payroll runs from its aggregated hours and upsert them (not committed)"""
+        if not self._can_vectorize():
+            contractor_hours = self._get_contractor_hours_for_period(period, contractor_ids)
+            self._prefetch_contractor_info(contractor_hours.keys())
+            run_rows = [
+                self._build_payroll_run_data(period_id, contractor_id, hours_data)
+                for contractor_id, hours_data in contractor_hours.items()
+            ]
+            return crud.upsert_payroll_runs(self.db, run_rows)
+        
+        hours = crud.get_contractor_hours_columns(self.db, period.start_date, period.end_date, contractor_ids)
+        ids = hours['contractor_id']
+        self._prefetch_contractor_info(ids)
+        marital_statuses = [self._contractor_info[contractor_id].get('marital_status', 'single') for contractor_id in ids]
+        columns = VectorizedPayrollEngine(self.tax_table).calculate(hours, marital_statuses)
+        return crud.upsert_payroll_run_columns(self.db, period_id, ids, columns)
+    
+    def _can_vectorize(self) -> bool:
+        """The vectorized engine only knows the default pension and other deductions (none)"""
+        cls = type(self)
+        return (self.vectorized and
+                cls._calculate_pension is PayrollCalculator._calculate_pension and
+                cls._calculate_other_deductions is PayrollCalculator._calculate_other_deductions)
+    
+    def _build_payroll_run_data(self, period_id: str, contractor_id: str, hours_data: Dict) -> Dict:
+        """Compute gross pay, deductions and net pay for one contractor's hours"""
+        gross_pay = self._calculate_gross_pay(hours_data)
+        
+        # Get contractor information for tax calculations
+        contractor = self._get_contractor_info(contractor_id)
         
-        return contractor_data
+        # Calculate deductions
+        deductions = self._calculate_deductions(gross_pay, contractor)
+        
+        return {
+            'period_id': period_id,
+            'contractor_id': contractor_id,
+            'total_hours': hours_data['total_hours'],
+            'standard_hours': hours_data['standard_hours'],
+            'overtime_hours': hours_data['overtime_hours'],
+            'holiday_hours': hours_data['holiday_hours'],
+            'bank_holiday_hours': hours_data['bank_holiday_hours'],
+            'weekend_hours': hours_data['weekend_hours'],
+            'oncall_hours': hours_data['oncall_hours'],
+            'standard_pay': hours_data['standard_pay'],
+            'overtime_pay': hours_data['overtime_pay'],
+            'holiday_pay': hours_data['holiday_pay'],
+            'bank_holiday_pay': hours_data['bank_holiday_pay'],
+            'weekend_pay': hours_data['weekend_pay'],
+            'oncall_pay': hours_data['oncall_pay'],
+            'gross_pay': gross_pay,
+            'tax_deduction': deductions['tax'],
+            'prsi_deduction': deductions['prsi'],
+            'usc_deduction': deductions['usc'],
+            'pension_deduction': deductions['pension'],
+            'other_deductions': deductions['other'],
+            'total_deductions': deductions['total'],
+            'net_pay': gross_pay - deductions['total'],
+            'status': 'pending'
+        }
+    
+    def _get_contractor_hours_for_period(self, period, contractor_ids: Optional[List[str]] = None) -> Dict:
+        """Get per-contractor hour and pay totals for the period (aggregated in SQL)"""
+        return {
+            str(totals.contractor_id): self._hours_data(totals)
+            for totals in crud.get_contractor_hours_totals(self.db, period.start_date, period.end_date, contractor_ids)
+        }
+    
+    @staticmethod
+    def _hours_data(totals) -> Dict:
+        """One get_contractor_hours_totals row as the hours_data of _build_payroll_run_data"""
+        return {
+            'total_hours': (totals.standard_hours + totals.holiday_hours +
+                            totals.weekend_hours + totals.oncall_hours),
+            'standard_hours': totals.standard_hours,
+            'overtime_hours': 0.0,
+            'holiday_hours': totals.holiday_hours,
+            'bank_holiday_hours': 0.0,
+            'weekend_hours': totals.weekend_hours,
+            'oncall_hours': totals.oncall_hours,
+            'standard_pay': totals.standard_pay,
+            'overtime_pay': 0.0,
+            'holiday_pay': totals.holiday_pay,
+            'bank_holiday_pay': 0.0,
+            'weekend_pay': totals.weekend_pay,
+            'oncall_pay': totals.oncall_pay
+        }
     
     def _calculate_gross_pay(self, hours_data: Dict) -> float:
         """Calculate gross pay from hours data"""
@@ -222,20 +291,43 @@ class PayrollCalculator:
                 hours_data['weekend_pay'] + 
                 hours_data['oncall_pay'])
     
-    def _get_contractor_info(self, contractor_id: str) -> Dict:
-        """Get contractor information for tax calculations"""
-        contractor = self.db.query(models.MUser).filter(models.MUser.user_id == contractor_id).first()
-        candidate = self.db.query(models.Candidate).filter(models.Candidate.candidate_id == contractor_id).first()
+    def _prefetch_contractor_info(self, contractor_ids) -> None:
+        """Load tax details for all of the period's contractors in one joined query"""
+        contractor_ids = [str(contractor_id) for contractor_id in contractor_ids
+                          if str(contractor_id) not in self._contractor_info]
+        if not contractor_ids:
+            return
         
-        return {
-            'user_id': contractor_id,
-            'first_name': contractor.first_name if contractor else None,
-            'last_name': contractor.last_name if contractor else None,
-            'email': contractor.email_id if contractor else None,
-            'pps_number': candidate.pps_number if candidate else None,
-            'date_of_birth': candidate.date_of_birth if candidate else None,
-            'marital_status': 'single'  # Default to single, could be stored in candidate table
-        }
+        rows = self.db.query(
+            models.MUser.user_id,
+            models.MUser.first_name,
+            models.MUser.last_name,
+            models.MUser.email_id,
+            models.Candidate.pps_number,
+            models.Candidate.date_of_birth
+        ).outerjoin(
+            models.Candidate, models.Candidate.candidate_id == models.MUser.user_id
+        ).filter(models.MUser.user_id.in_(contractor_ids)).all()
+        
+        found = {str(row.user_id): row for row in rows}
+        for contractor_id in contractor_ids:
+            row = found.get(contractor_id)
+            self._contractor_info[contractor_id] = {
+                'user_id': contractor_id,
+                'first_name': row.first_name if row else None,
+                'last_name': row.last_name if row else None,
+                'email': row.email_id if row else None,
+                'pps_number': row.pps_number if row else None,
+                'date_of_birth': row.date_of_birth if row else None,
+                'marital_status': 'single'  # Default to single, could be stored in candidate table
+            }
+    
+    def _get_contractor_info(self, contractor_id: str) -> Dict:
+        """Get contractor information for tax calculations (prefetched per period)"""
+        contractor_id = str(contractor_id)
+        if contractor_id not in self._contractor_info:
+            self._prefetch_contractor_info([contractor_id])
+        return self._contractor_info[contractor_id]
     
     def _calculate_deductions(self, gross_pay: float, contractor: Dict) -> Dict:
         """Calculate all deductions based on Irish tax system"""
@@ -272,39 +364,15 @@ class PayrollCalculator:
     
     def _calculate_paye_tax(self, gross_pay: float, marital_status: str = 'single') -> float:
         """Calculate PAYE tax based on Irish tax bands"""
-        bands = self.TAX_BANDS.get(marital_status, self.TAX_BANDS['single'])
-        total_tax = 0.0
-        remaining_income = gross_pay
-        
-        for lower, upper, rate in bands:
-            if remaining_income <= 0:
-                break
-            
-            taxable_amount = min(remaining_income, upper - lower)
-            total_tax += taxable_amount * rate
-            remaining_income -= taxable_amount
-        
-        return round(total_tax, 2)
+        return self.tax_table.calculate_paye(gross_pay, marital_status)
     
     def _calculate_prsi(self, gross_pay: float) -> float:
         """Calculate PRSI (Pay Related Social Insurance)"""
-        # Simplified PRSI calculation - 4% for most employees
-        return round(gross_pay * 0.04, 2)
+        return self.tax_table.calculate_prsi(gross_pay)
     
     def _calculate_usc(self, gross_pay: float) -> float:
         """Calculate USC (Universal Social Charge)"""
-        total_usc = 0.0
-        remaining_income = gross_pay
-        
-        for lower, upper, rate in self.USC_BANDS:
-            if remaining_income <= 0:
-                break
-            
-            taxable_amount = min(remaining_income, upper - lower)
-            total_usc += taxable_amount * rate
-            remaining_income -= taxable_amount
-        
-        return round(total_usc, 2)
+        return self.tax_table.calculate_usc(gross_pay)
     
     def _calculate_pension(self, gross_pay: float, contractor: Dict) -> float:
         """Calculate pension contributions (if applicable)"""
@@ -318,49 +386,9 @@ class PayrollCalculator:
         # For now, return 0 - could be enhanced with deduction rules
         return 0.0
     
-    def _get_existing_payroll_run(self, period_id: str, contractor_id: str) -> Optional[models.PayrollRun]:
-        """Get existing payroll run for contractor in period"""
-        return self.db.query(models.PayrollRun).filter(
-            and_(
-                models.PayrollRun.period_id == period_id,
-                models.PayrollRun.contractor_id == contractor_id
-            )
-        ).first()
-    
-    def _update_payroll_run(self, run_id: str, run_data: Dict) -> models.PayrollRun:
-        """Update existing payroll run"""
-        update_data = schemas.PayrollRunUpdate(**{k: v for k, v in run_data.items() if k not in ['period_id', 'contractor_id']})
-        return crud.update_payroll_run(self.db, run_id, update_data)
-    
-    def _update_payroll_summary(self, period_id: str, total_contractors: int, 
-                               total_gross_pay: float, total_deductions: float, 
-                               total_net_pay: float, payroll_runs: List) -> None:
-        """Create or update payroll summary"""
-        summary = crud.get_payroll_summary_by_period(self.db, period_id)
-        
-        if summary:
-            summary.total_contractors = total_contractors
-            summary.total_gross_pay = total_gross_pay
-            summary.total_deductions = total_deductions
-            summary.total_net_pay = total_net_pay
-            summary.total_tax = sum(run.tax_deduction for run in payroll_runs)
-            summary.total_prsi = sum(run.prsi_deduction for run in payroll_runs)
-            summary.total_usc = sum(run.usc_deduction for run in payroll_runs)
-            summary.updated_on = datetime.now()
-        else:
-            summary_data = schemas.PayrollSummaryCreate(
-                period_id=period_id,
-                total_contractors=total_contractors,
-                total_hours=sum(run.total_hours for run in payroll_runs),
-                total_gross_pay=total_gross_pay,
-                total_deductions=total_deductions,
-                total_net_pay=total_net_pay,
-                total_tax=sum(run.tax_deduction for run in payroll_runs),
-                total_prsi=sum(run.prsi_deduction for run in payroll_runs),
-                total_usc=sum(run.usc_deduction for run in payroll_runs)
-            )
-            crud.create_payroll_summary(self.db, summary_data)
-        
+    def _update_payroll_summary(self, period_id: str, totals: Dict) -> None:
+        """Create or update payroll summary with the given figures (see _run_totals)"""
+        crud.upsert_payroll_summary(self.db, period_id, totals)
         self.db.commit()
 
 
@@ -368,3 +396,9 @@ def calculate_payroll_for_period(db: Session, period_id: str, contractor_ids: Op
     """Convenience function to calculate payroll for a period"""
     calculator = PayrollCalculator(db)
     return calculator.calculate_payroll_for_period(period_id, contractor_ids)
+
+
+def recalculate_dirty_contractors(db: Session, period_id: str) -> Dict:
+    """Convenience function to recalculate a period's dirty contractors only"""
+    calculator = PayrollCalculator(db)
+    return calculator.recalculate_dirty_contractors(period_id)
@@ -16,6 +16,8 @@ from io import BytesIO
 
 from .. import models, schemas, crud
 from ..database import get_db
+from .tax_tables import get_tax_table
+from .available_weeks import get_available_weeks
 
 
 class PayrollReportGenerator:
@@ -238,12 +240,13 @@ class PayrollReportGenerator:
         oncall_pay = oncall_hours * oncall_rate
         total_pay = standard_pay + overtime_pay + holiday_pay + weekend_pay + oncall_pay
         
-        # Calculate deductions (simplified)
+        # PAYE/PRSI/USC from the tax year of the work date, as in PayrollCalculator
         gross_pay = total_pay
-        tax_deduction = gross_pay * 0.20  # 20% tax
-        prsi_deduction = gross_pay * 0.04  # 4% PRSI
-        usc_deduction = gross_pay * 0.02  # 2% USC
-        total_deductions = tax_deduction + prsi_deduction + usc_deduction
+        deductions = get_tax_table(contractor_hours.work_date.year).deductions(gross_pay)
+        tax_deduction = deductions['tax']
+        prsi_deduction = deductions['prsi']
+        usc_deduction = deductions['usc']
+        total_deductions = deductions['total']
         net_pay = gross_pay - total_deductions
         
         return schemas.PayrollReportItem(
@@ -368,30 +371,8 @@ class PayrollReportGenerator:
             raise e
     
     def get_available_weeks(self) -> List[Dict]:
-        """Get list of available weeks from invoices"""
-        # Get unique weeks from invoices
-        invoices = self.db.query(models.Invoice).filter(
-            models.Invoice.deleted_on.is_(None)
-        ).all()
-        
-        weeks = set()
-        for invoice in invoices:
-            if invoice.invoice_date:
-                # Convert invoice date to week format
-                year = invoice.invoice_date.year
-                week_num = invoice.invoice_date.isocalendar()[1]
-                week_str = f"{year}-W{week_num:02d}"
-                weeks.add(week_str)
-        
-        # Convert to list of dictionaries
-        week_list = []
-        for week in sorted(weeks):
-            week_list.append({
-                'week': week,
-                'label': f"Week {week.split('-W')[1]} of {week.split('-W')[0]}"
-            })
-        
-        return week_list
+        """Get list of available weeks from invoices (cached until the next invoice write)"""
+        return get_available_weeks(self.db)
 
 
 def generate_payroll_report(db: Session, report_request: schemas.PayrollReportGenerationRequest, created_by: str = None) -> Dict:
@@ -0,0 +1,264 @@
+"""
+Payroll Simulation Service
+
+What-if previews of a payroll period. The period's aggregated hours, the
+contractors' tax details and the last committed payroll runs are loaded once
+and kept in memory; each simulation then reruns PayrollCalculator's pay and
+deduction steps on that data under the requested assumptions (tax bands, PRSI
+rate, pension, rate multipliers) and compares the result with the committed
+runs. Nothing is written to the database.
+
+Cached period data is reused until the period's payroll summary is rewritten
+or one of its contractors is flagged dirty by an hours change, which a single
+fingerprint query detects on every call. The cache is per process.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+import time
+
+from .. import models, schemas, crud
+from ..config import settings
+from .payroll_calculator import PayrollCalculator
+from .tax_tables import TaxTable, get_tax_definition, resolve_tax_year
+
+# Run fields compared between the committed and the simulated payroll
+DIFF_FIELDS = ['gross_pay', 'tax_deduction', 'prsi_deduction', 'usc_deduction',
+               'pension_deduction', 'other_deductions', 'total_deductions', 'net_pay']
+
+# Rate multiplier applied to each pay component of the aggregated hours
+PAY_MULTIPLIERS = {
+    'standard_pay': 'standard_rate_multiplier',
+    'holiday_pay': 'holiday_rate_multiplier',
+    'weekend_pay': 'weekend_rate_multiplier',
+    'oncall_pay': 'oncall_rate_multiplier',
+}
+
+
+class PeriodDataCache:
+    """LRU cache of per-period simulation inputs, validated by a fingerprint"""
+
+    def __init__(self, max_periods: int):
+        self.max_periods = max_periods
+        self._entries: "OrderedDict[str, Tuple[tuple, Dict]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, period_id: str, fingerprint: tuple) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(period_id)
+            if entry is None or entry[0] != fingerprint:
+                return None
+            self._entries.move_to_end(period_id)
+            return entry[1]
+
+    def set(self, period_id: str, fingerprint: tuple, data: Dict) -> None:
+        if self.max_periods <= 0:
+            return
+        with self._lock:
+            self._entries[period_id] = (fingerprint, data)
+            self._entries.move_to_end(period_id)
+            while len(self._entries) > self.max_periods:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, period_id: str) -> None:
+        with self._lock:
+            self._entries.pop(period_id, None)
+
+
+period_data_cache = PeriodDataCache(settings.payroll_simulation_cache_periods)
+
+
+class _SimulatedCalculator(PayrollCalculator):
+    """PayrollCalculator with what-if deductions; never touches the database"""
+
+    def __init__(self, tax_table: TaxTable, contractor_info: Dict, marital_status: Optional[str],
+                 pension_rate: float, other_deductions: float):
+        super().__init__(None)
+        self.tax_table = tax_table
+        self._contractor_info = contractor_info
+        self.marital_status = marital_status
+        self.pension_rate = pension_rate
+        self.other_deductions = other_deductions
+
+    def _get_contractor_info(self, contractor_id: str) -> Dict:
+        info = self._contractor_info.get(str(contractor_id), {'user_id': contractor_id, 'marital_status': 'single'})
+        if self.marital_status:
+            info = dict(info, marital_status=self.marital_status)
+        return info
+
+    def _calculate_pension(self, gross_pay: float, contractor: Dict) -> float:
+        return round(gross_pay * self.pension_rate, 2)
+
+    def _calculate_other_deductions(self, gross_pay: float, contractor: Dict) -> float:
+        return self.other_deductions
+
+
+class PayrollSimulator:
+    """Runs side-effect-free payroll calculations against cached period data"""
+
+    def __init__(self, db: Session, cache: PeriodDataCache = period_data_cache):
+        self.db = db
+        self.cache = cache
+
+    def simulate(self, request: schemas.PayrollSimulationRequest) -> Dict:
+        """
+        Preview a period's payroll under the request's assumptions
+
+        Args:
+            request: Period and what-if assumptions
+
+        Returns:
+            Simulated and committed totals, their difference, and per-contractor diffs
+        """
+        start = time.perf_counter()
+        period_id = str(request.period_id)
+
+        data, cache_hit = self._load_period_data(period_id, request.refresh)
+        tax_table = self._build_tax_table(request, data['tax_year'])
+
+        calculator = _SimulatedCalculator(
+            tax_table,
+            data['contractor_info'],
+            request.marital_status,
+            request.pension_rate,
+            request.other_deductions
+        )
+
+        simulated = {}
+        for contractor_id, hours_data in data['contractor_hours'].items():
+            simulated[contractor_id] = calculator._build_payroll_run_data(
+                period_id, contractor_id, self._apply_rate_multipliers(hours_data, request)
+            )
+
+        committed = data['committed_runs']
+        contractors = []
+        for contractor_id in list(simulated) + [c for c in committed if c not in simulated]:
+            old = committed.get(contractor_id)
+            new = simulated.get(contractor_id)
+            diff = {
+                field: round((new[field] if new else 0.0) - ((old[field] or 0.0) if old else 0.0), 2)
+                for field in DIFF_FIELDS
+            }
+            if old is None:
+                change = 'new'
+            elif new is None:
+                change = 'removed'
+            elif any(diff.values()):
+                change = 'changed'
+            else:
+                change = 'unchanged'
+            if change == 'unchanged' and not request.include_unchanged:
+                continue
+            info = data['contractor_info'].get(contractor_id, {})
+            contractors.append({
+                'contractor_id': contractor_id,
+                'contractor_name': f"{info['first_name']} {info['last_name']}"
+                    if info.get('first_name') and info.get('last_name') else None,
+                'change': change,
+                'committed': {field: old[field] for field in DIFF_FIELDS} if old else None,
+                'simulated': {field: new[field] for field in DIFF_FIELDS} if new else None,
+                'diff': diff
+            })
+
+        simulated_totals = self._totals(simulated.values())
+        committed_totals = self._totals(committed.values())
+
+        return {
+            'period_id': period_id,
+            'tax_year': tax_table.year,
+            'simulated_totals': simulated_totals,
+            'committed_totals': committed_totals,
+            'totals_diff': {
+                field: round(simulated_totals[field] - committed_totals[field], 2)
+                for field in simulated_totals
+            },
+            'changed_contractors': sum(1 for row in contractors if row['change'] != 'unchanged'),
+            'contractors': contractors,
+            'cache_hit': cache_hit,
+            'seconds': round(time.perf_counter() - start, 4)
+        }
+
+    def _fingerprint(self, period_id: str) -> tuple:
+        """Changes whenever committed runs are rewritten or the period's hours change"""
+        row = self.db.execute(
+            text("""
+                SELECT
+                    (SELECT status FROM app.t_payroll_period WHERE period_id = :period_id),
+                    (SELECT max(coalesce(updated_on, created_on)) FROM app.t_payroll_summary WHERE period_id = :period_id),
+                    (SELECT count(*) FROM app.t_payroll_dirty_contractor WHERE period_id = :period_id),
+                    (SELECT max(marked_on) FROM app.t_payroll_dirty_contractor WHERE period_id = :period_id)
+            """),
+            {"period_id": period_id}
+        ).fetchone()
+        return tuple(row)
+
+    def _load_period_data(self, period_id: str, refresh: bool = False) -> Tuple[Dict, bool]:
+        fingerprint = self._fingerprint(period_id)
+        if not refresh:
+            data = self.cache.get(period_id, fingerprint)
+            if data is not None:
+                return data, True
+
+        period = crud.get_payroll_period(self.db, period_id)
+        if not period:
+            raise ValueError("Payroll period not found")
+
+        loader = PayrollCalculator(self.db)
+        contractor_hours = loader._get_contractor_hours_for_period(period)
+
+        committed_runs = {
+            str(run.contractor_id): {field: getattr(run, field) for field in DIFF_FIELDS}
+            for run in self.db.query(models.PayrollRun).filter(models.PayrollRun.period_id == period_id).all()
+        }
+        loader._prefetch_contractor_info(list(contractor_hours) + list(committed_runs))
+
+        data = {
+            'tax_year': period.end_date.year,
+            'contractor_hours': contractor_hours,
+            'contractor_info': loader._contractor_info,
+            'committed_runs': committed_runs
+        }
+        self.cache.set(period_id, fingerprint, data)
+        print(f"📥 Loaded simulation data for period {period_id}: {len(contractor_hours)} contractors")
+        return data, False
+
+    @staticmethod
+    def _build_tax_table(request: schemas.PayrollSimulationRequest, period_year: int) -> TaxTable:
+        year = resolve_tax_year(request.tax_year or period_year)
+        definition = get_tax_definition(year)
+        if request.paye_bands:
+            definition['paye'].update(request.paye_bands)
+        if request.usc_bands:
+            definition['usc'] = request.usc_bands
+        if request.prsi_rate is not None:
+            definition['prsi_rate'] = request.prsi_rate
+        return TaxTable(year, definition)
+
+    @staticmethod
+    def _apply_rate_multipliers(hours_data: Dict, request: schemas.PayrollSimulationRequest) -> Dict:
+        adjusted = dict(hours_data)
+        for pay_field, multiplier_field in PAY_MULTIPLIERS.items():
+            multiplier = request.pay_rate_multiplier * getattr(request, multiplier_field)
+            if multiplier != 1.0:
+                adjusted[pay_field] = hours_data[pay_field] * multiplier
+        return adjusted
+
+    @staticmethod
+    def _totals(runs) -> Dict:
+        totals = {field: 0.0 for field in DIFF_FIELDS}
+        count = 0
+        for run in runs:
+            count += 1
+            for field in DIFF_FIELDS:
+                totals[field] += run[field] or 0.0
+        totals = {field: round(value, 2) for field, value in totals.items()}
+        totals['total_contractors'] = count
+        return totals
+
+
+def simulate_payroll(db: Session, request: schemas.PayrollSimulationRequest) -> Dict:
+    """Convenience function to preview a period's payroll without saving it"""
+    return PayrollSimulator(db).simulate(request)
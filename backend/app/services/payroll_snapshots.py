@@ -0,0 +1,114 @@
+"""
+Payroll Period Snapshot Service
+
+When a payroll period is locked or completed its runs can no longer change, so
+the joined run/contractor/period rows returned by
+crud.get_payroll_runs_with_details are written once as gzip-compressed JSON to
+the period's t_payroll_period_snapshot row, in the transaction that closes the
+period. Reads of a closed period load that row by primary key instead of
+re-joining and rebuilding every row; being in the database, the snapshot is
+shared by every worker and replica and survives redeploys.
+
+Reopening a period removes its snapshot; recalculating a closed period is
+refused with PayrollPeriodClosed.
+"""
+
+from sqlalchemy.orm import Session
+from typing import List, Dict, Optional
+from datetime import date, datetime
+import gzip
+import hashlib
+import json
+
+from .. import models
+
+# Period statuses whose payroll runs are frozen
+CLOSED_PERIOD_STATUSES = {'locked', 'completed', 'closed'}
+
+
+class PayrollPeriodClosed(Exception):
+    """Raised when payroll is recalculated for a locked/completed period"""
+
+
+def _json_default(value):
+    """UUIDs as strings, dates and timestamps in ISO format"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def is_closed_period(period) -> bool:
+    return bool(period) and (period.status or '').lower() in CLOSED_PERIOD_STATUSES
+
+
+class PayrollSnapshotStore:
+    """Writes, reads and removes per-period payroll run snapshots"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def write(self, period, runs: List[Dict]) -> models.PayrollPeriodSnapshot:
+        """
+        Store a closed period's runs on its snapshot row (not committed)
+
+        Args:
+            period: The PayrollPeriod being closed
+            runs: Rows as built by crud.get_payroll_runs_with_details
+
+        Returns:
+            The snapshot row
+        """
+        payload = gzip.compress(
+            json.dumps(runs, default=_json_default, separators=(',', ':')).encode('utf-8')
+        )
+
+        snapshot = self.db.query(models.PayrollPeriodSnapshot).filter(
+            models.PayrollPeriodSnapshot.period_id == period.period_id
+        ).first()
+        if not snapshot:
+            snapshot = models.PayrollPeriodSnapshot(period_id=period.period_id)
+            self.db.add(snapshot)
+        snapshot.payload = payload
+        snapshot.run_count = len(runs)
+        snapshot.payload_size = len(payload)
+        snapshot.checksum = hashlib.sha256(payload).hexdigest()
+        snapshot.period_status = period.status
+
+        print(f"📦 Snapshot of period {period.period_id}: {len(runs)} runs, {len(payload)} bytes")
+        return snapshot
+
+    def read(self, period_id) -> Optional[List[Dict]]:
+        """
+        Runs of a closed period from its snapshot
+
+        Returns:
+            The stored rows (ids and timestamps as strings), or None when the period
+            has no usable snapshot and must be read from the tables
+        """
+        snapshot = self.db.query(models.PayrollPeriodSnapshot).filter(
+            models.PayrollPeriodSnapshot.period_id == period_id
+        ).first()
+        if not snapshot:
+            return None
+
+        payload = bytes(snapshot.payload)
+        if snapshot.checksum and hashlib.sha256(payload).hexdigest() != snapshot.checksum:
+            print(f"⚠️ Snapshot checksum mismatch for period {period_id}")
+            return None
+
+        return json.loads(gzip.decompress(payload))
+
+    def delete(self, period_id) -> None:
+        """Remove a period's snapshot row (not committed)"""
+        snapshot = self.db.query(models.PayrollPeriodSnapshot).filter(
+            models.PayrollPeriodSnapshot.period_id == period_id
+        ).first()
+        if not snapshot:
+            return
+        self.db.delete(snapshot)
+        print(f"🗑️ Removed snapshot of period {period_id}")
+
+
+def read_payroll_snapshot(db: Session, period_id) -> Optional[List[Dict]]:
+    """Convenience function to read a closed period's runs from its snapshot"""
+    return PayrollSnapshotStore(db).read(period_id)
@@ -0,0 +1,102 @@
+"""
+Client Roster Cache
+
+Keeps the active candidate roster of recently read clients in memory so the
+Client page and timesheet screens don't rebuild it on every request. The least
+recently used client is evicted once the cache holds max_clients rosters.
+
+The cache is per process, so a roster is stored with the client's roster
+version (t_client_roster_version, bumped by triggers on p_candidate_client and
+m_user) and only served while that version is unchanged, whichever worker or
+script made the write, and for at most ttl_seconds. The crud functions that
+write placements also drop this process's copy straight away.
+
+Rosters are handed out as fresh dicts (their values are strings or None), so
+callers can't change the cached copy.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Dict, Optional, Tuple
+
+from ..config import settings
+
+
+class RosterCache:
+    """Bounded LRU cache of client rosters, checked against a version and a TTL, with hit/miss counters"""
+
+    def __init__(self, max_clients: int, ttl_seconds: float):
+        self.max_clients = max_clients
+        self.ttl_seconds = ttl_seconds
+        # client_id -> (roster version, time cached, rows)
+        self._rosters: "OrderedDict[str, Tuple[int, float, Tuple[Dict, ...]]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, client_id, version: int) -> Optional[List[Dict]]:
+        """Return a copy of the cached roster if it is still at version and within the TTL, or None on a miss"""
+        key = str(client_id)
+        with self._lock:
+            entry = self._rosters.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            cached_version, cached_at, roster = entry
+            if cached_version != version or time.monotonic() - cached_at > self.ttl_seconds:
+                del self._rosters[key]
+                self.misses += 1
+                self.stale += 1
+                return None
+            self._rosters.move_to_end(key)
+            self.hits += 1
+        return [dict(candidate) for candidate in roster]
+
+    def set(self, client_id, version: int, roster: List[Dict]) -> None:
+        """Cache a roster read after its version was read"""
+        if self.max_clients <= 0 or self.ttl_seconds <= 0:
+            return
+        key = str(client_id)
+        entry = (version, time.monotonic(), tuple(dict(candidate) for candidate in roster))
+        with self._lock:
+            self._rosters[key] = entry
+            self._rosters.move_to_end(key)
+            while len(self._rosters) > self.max_clients:
+                self._rosters.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_client(self, client_id) -> None:
+        """Drop one client's roster after its placements change"""
+        if not client_id:
+            return
+        with self._lock:
+            if self._rosters.pop(str(client_id), None) is not None:
+                self.invalidations += 1
+
+    def invalidate_all(self) -> None:
+        """Drop every roster, e.g. after a candidate's user record changes"""
+        with self._lock:
+            self.invalidations += len(self._rosters)
+            self._rosters.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._rosters),
+                'max_clients': self.max_clients,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+roster_cache = RosterCache(settings.roster_cache_max_clients, settings.roster_cache_ttl_seconds)
@@ -0,0 +1,138 @@
+"""
+Tax Table Service
+
+Year-versioned PAYE, USC and PRSI definitions, loaded from tax_bands.json (or
+the file named by settings.tax_bands_file) and precompiled once per year into
+cumulative-threshold tables. Tax on an income is then the precomputed tax up
+to the band the income falls in plus the marginal part, found with bisect
+(or np.searchsorted for an array of incomes), instead of walking every band
+for every contractor.
+
+PayrollCalculator, crud.calculate_payroll_for_period and PayrollReportGenerator
+all take their deductions from here.
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+import json
+import os
+
+import numpy as np
+
+from ..config import settings
+
+DEFAULT_TAX_BANDS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tax_bands.json")
+
+
+class BandTable:
+    """Progressive (lower, upper, rate) bands compiled into cumulative thresholds"""
+
+    def __init__(self, bands: List[Tuple[float, Optional[float], float]]):
+        bands = sorted(bands, key=lambda band: band[0])
+        if not bands or bands[0][0] != 0:
+            raise ValueError("Tax bands must start at 0")
+
+        self.thresholds = []  # lower bound of each band
+        self.rates = []
+        self.cumulative = []  # tax due on income up to each band's lower bound
+        due = 0.0
+        for index, (lower, upper, rate) in enumerate(bands):
+            if index and lower != bands[index - 1][1]:
+                raise ValueError(f"Tax bands are not contiguous at {lower}")
+            self.thresholds.append(float(lower))
+            self.rates.append(float(rate))
+            self.cumulative.append(due)
+            if upper is not None:
+                due += (upper - lower) * rate
+        if bands[-1][1] is not None:
+            raise ValueError("The last tax band must be open-ended")
+        self._thresholds = np.array(self.thresholds)
+        self._rates = np.array(self.rates)
+        self._cumulative = np.array(self.cumulative)
+
+    def apply(self, income: float) -> float:
+        """Tax due on one income (unrounded)"""
+        if income <= 0:
+            return 0.0
+        band = bisect_right(self.thresholds, income) - 1
+        return self.cumulative[band] + (income - self.thresholds[band]) * self.rates[band]
+
+    def apply_array(self, incomes: np.ndarray) -> np.ndarray:
+        """Tax due on every income in the array (unrounded); same arithmetic as apply()"""
+        bands = np.clip(np.searchsorted(self._thresholds, incomes, side='right') - 1, 0, None)
+        due = self._cumulative[bands] + (incomes - self._thresholds[bands]) * self._rates[bands]
+        return np.where(incomes > 0, due, 0.0)
+
+
+class TaxTable:
+    """PAYE, USC and PRSI for one tax year"""
+
+    def __init__(self, year: int, definition: Dict):
+        self.year = year
+        self.paye = {
+            status: BandTable(bands) for status, bands in definition['paye'].items()
+        }
+        self.usc = BandTable(definition['usc'])
+        self.prsi_rate = float(definition['prsi_rate'])
+
+    def paye_table(self, marital_status: str = 'single') -> BandTable:
+        return self.paye.get(marital_status, self.paye['single'])
+
+    def calculate_paye(self, gross_pay: float, marital_status: str = 'single') -> float:
+        return round(self.paye_table(marital_status).apply(gross_pay), 2)
+
+    def calculate_usc(self, gross_pay: float) -> float:
+        return round(self.usc.apply(gross_pay), 2)
+
+    def calculate_prsi(self, gross_pay: float) -> float:
+        return round(gross_pay * self.prsi_rate, 2)
+
+    def deductions(self, gross_pay: float, marital_status: str = 'single') -> Dict:
+        """Rounded PAYE, PRSI and USC for one gross pay, plus their total"""
+        tax = self.calculate_paye(gross_pay, marital_status)
+        prsi = self.calculate_prsi(gross_pay)
+        usc = self.calculate_usc(gross_pay)
+        return {'tax': tax, 'prsi': prsi, 'usc': usc, 'total': tax + prsi + usc}
+
+
+@lru_cache(maxsize=1)
+def _load_definitions() -> Dict[int, Dict]:
+    path = settings.tax_bands_file or DEFAULT_TAX_BANDS_FILE
+    with open(path, encoding="utf-8") as f:
+        definitions = json.load(f)
+    return {int(year): definition for year, definition in definitions.items()}
+
+
+@lru_cache(maxsize=None)
+def _compile(year: int) -> TaxTable:
+    print(f"🔧 Compiling tax table for {year}")
+    return TaxTable(year, _load_definitions()[year])
+
+
+def resolve_tax_year(year: int) -> int:
+    """
+    Defined tax year that applies to a calendar year
+
+    Years without their own definition use the latest earlier year
+    (or the earliest defined year for dates before it).
+    """
+    years = sorted(_load_definitions())
+    index = bisect_right(years, year) - 1
+    return years[max(index, 0)]
+
+
+def get_tax_definition(year: int) -> Dict:
+    """Raw band definition applying to a year, e.g. as the base for what-if overrides"""
+    return json.loads(json.dumps(_load_definitions()[resolve_tax_year(year)]))
+
+
+def get_tax_table(year: int) -> TaxTable:
+    """Compiled tax table for a tax year (see resolve_tax_year)"""
+    return _compile(resolve_tax_year(year))
+
+
+def reload_tax_tables() -> None:
+    """Forget loaded definitions and compiled tables, e.g. after editing the bands file"""
+    _load_definitions.cache_clear()
+    _compile.cache_clear()
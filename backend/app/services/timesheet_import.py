@@ -0,0 +1,443 @@
+"""
+Timesheet Import Service
+
+Imports a client's CSV or XLSX timesheet into t_contractor_hours and
+t_contractor_rate_hours for one timesheet, saving rows the way the Timesheet
+grid does, without holding the file in memory:
+  - rows are read one at a time (csv.reader over the upload, openpyxl in read-only mode)
+  - each row is validated as a ContractorHoursUpsert; rows that fail are reported
+    by row number and skipped
+  - every chunk_size valid rows, contractors, pcc_id (the active placement) and
+    tcr_id (the contract rate applicable on the work date) are resolved with one
+    query each, for the keys earlier chunks haven't already resolved
+  - the chunk is then written with executemany inserts/updates and committed
+    together with its payroll dirty flags and holiday ledger entries
+
+Columns (matched case-insensitively, spaces read as underscores):
+  contractor_id or email_id             who worked (required)
+  work_date                             YYYY-MM-DD or DD/MM/YYYY (required)
+  client_id / pcc_id                    optional; otherwise the contractor's only active placement
+  <rate_type_id>-<rate_frequency_id>    hours per contract rate, e.g. 1-1 for standard hours
+  any other ContractorHoursUpsert field (standard_hours, weekend_hours, status, ...)
+As in the grid, standard_hours, weekend_hours and bank_holiday_hours default to the
+1-1, 1-3 and 8-1 rate columns, and total_hours to the sum of the rate columns.
+A row for a contractor and work_date the timesheet already has updates that row
+(replacing its rate hours) instead of adding another.
+"""
+
+import csv
+import io
+import re
+from datetime import date, datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, insert, text
+from sqlalchemy.orm import Session
+
+from .. import crud, models, schemas
+from ..config import settings
+
+RATE_COLUMN = re.compile(r'^(\d+)-(\d+)$')
+COLUMN_ALIASES = {'candidate_id': 'contractor_id', 'email': 'email_id', 'date': 'work_date'}
+# ContractorHoursUpsert fields the grid fills from rate columns
+GRID_RATE_FIELDS = {'standard_hours': (1, 1), 'weekend_hours': (1, 3), 'bank_holiday_hours': (8, 1)}
+HOURS_FIELDS = [name for name in schemas.ContractorHoursUpsert.model_fields if name not in ('tch_id', 'rate_hours')]
+# Identify the t_contractor_hours row; never changed by an update
+KEY_FIELDS = ('contractor_id', 'work_date', 'timesheet_id')
+
+
+def iter_csv_rows(file: BinaryIO) -> Iterator[List]:
+    """Rows of a UTF-8 CSV file, read as they are needed"""
+    reader = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(reader)
+    finally:
+        reader.detach()
+
+
+def iter_xlsx_rows(file: BinaryIO) -> Iterator[List]:
+    """Rows of the first worksheet of an XLSX file, read as they are needed"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def _clean(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _parse_work_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str) and '/' in value:
+        return datetime.strptime(value, '%d/%m/%Y').date()
+    return value
+
+
+class TimesheetImporter:
+    """Streams a CSV/XLSX timesheet into contractor hours in committed chunks"""
+
+    def __init__(self, db: Session, timesheet_id: str, client_id: Optional[str] = None,
+                 created_by: Optional[str] = None, chunk_size: Optional[int] = None):
+        self.db = db
+        self.timesheet_id = str(timesheet_id)
+        self.client_id = str(client_id) if client_id else None
+        self.created_by = str(created_by) if created_by else None
+        self.chunk_size = chunk_size or settings.timesheet_import_chunk_size
+        self.max_errors = settings.timesheet_import_max_errors
+
+        # Lookups already resolved by earlier chunks
+        self._users: Dict[str, Optional[str]] = {}          # contractor_id / lower(email) -> user_id
+        self._placements: Dict[str, List[Tuple[str, str]]] = {}  # contractor_id -> [(client_id, pcc_id)]
+        self._rates: Dict[str, List[models.ContractRate]] = {}    # pcc_id -> contract rates, newest first
+        self._seen: Dict[Tuple[str, date], int] = {}        # (contractor_id, work_date) -> row number
+
+        self.result = {
+            'rows': 0, 'imported': 0, 'inserted': 0, 'updated': 0, 'failed': 0,
+            'ignored_columns': [], 'errors': [], 'errors_truncated': False
+        }
+
+    def run(self, file: BinaryIO, filename: str) -> Dict:
+        """
+        Import every row of an uploaded file
+
+        Args:
+            file: Binary file object positioned at the start of the upload
+            filename: Upload name; its extension (.csv or .xlsx) picks the reader
+
+        Returns:
+            Row counts and per-row errors ({'row': n, 'errors': [...]})
+        """
+        extension = (filename or '').rsplit('.', 1)[-1].lower()
+        if extension == 'csv':
+            rows = iter_csv_rows(file)
+        elif extension == 'xlsx':
+            rows = iter_xlsx_rows(file)
+        else:
+            raise ValueError("Unsupported file type; upload a .csv or .xlsx file")
+
+        header = next(rows, None)
+        if not header:
+            raise ValueError("The file is empty")
+        self._read_header(header)
+
+        print(f"📥 Importing {filename} into timesheet {self.timesheet_id} ({self.chunk_size} rows per chunk)")
+        chunk = []
+        for row_number, values in enumerate(rows, start=2):
+            if all(_clean(value) is None for value in values):
+                continue
+            self.result['rows'] += 1
+            try:
+                chunk.append((row_number, *self._parse_row(values)))
+            except (ValidationError, ValueError) as e:
+                self._fail(row_number, e)
+            if len(chunk) >= self.chunk_size:
+                self._load_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._load_chunk(chunk)
+
+        print(f"✅ Imported {self.result['imported']} of {self.result['rows']} rows "
+              f"({self.result['inserted']} new, {self.result['updated']} updated, {self.result['failed']} failed)")
+        return self.result
+
+    def _read_header(self, header: List) -> None:
+        self.columns = []
+        self.rate_columns = {}
+        for index, name in enumerate(header):
+            column = re.sub(r'\s+', '_', str(name or '').strip().lower())
+            column = COLUMN_ALIASES.get(column, column)
+            rate = RATE_COLUMN.match(column)
+            if rate:
+                self.rate_columns[index] = (int(rate.group(1)), int(rate.group(2)))
+            elif column not in HOURS_FIELDS and column not in ('email_id', 'client_id'):
+                if column:
+                    self.result['ignored_columns'].append(str(name))
+                column = None
+            self.columns.append(column)
+
+        present = set(self.columns)
+        if 'work_date' not in present or not present & {'contractor_id', 'email_id'}:
+            raise ValueError("The file needs a work_date column and a contractor_id or email_id column")
+
+        rate_keys = set(self.rate_columns.values())
+        self.grid_fields = {field: key for field, key in GRID_RATE_FIELDS.items()
+                            if field not in present and key in rate_keys}
+        self.derive_total = bool(self.rate_columns) and 'total_hours' not in present
+        # Same keys for every row, so each chunk is one executemany per statement
+        self.write_fields = [field for field in HOURS_FIELDS
+                             if field in present or field in self.grid_fields or field in KEY_FIELDS
+                             or field == 'pcc_id' or (field == 'total_hours' and self.derive_total)]
+
+    def _parse_row(self, values: List):
+        data, errors, quantities = {}, [], {}
+        extra = {'email_id': None, 'client_id': self.client_id}
+        for index, value in enumerate(values[:len(self.columns)]):
+            value = _clean(value)
+            if value is None:
+                continue
+            if index in self.rate_columns:
+                try:
+                    quantities[self.rate_columns[index]] = float(value)
+                except (TypeError, ValueError):
+                    errors.append(f"{'-'.join(map(str, self.rate_columns[index]))}: not a number ({value})")
+                continue
+            column = self.columns[index]
+            if column in extra:
+                extra[column] = str(value)
+            elif column == 'work_date':
+                try:
+                    data[column] = _parse_work_date(value)
+                except ValueError:
+                    errors.append(f"work_date: not a date ({value})")
+            elif column:
+                data[column] = value
+        if errors:
+            raise ValueError('; '.join(errors))
+
+        data['timesheet_id'] = self.timesheet_id
+        for field, key in self.grid_fields.items():
+            data[field] = quantities.get(key, 0 if field == 'standard_hours' else None)
+        if self.derive_total:
+            data['total_hours'] = sum(quantities.values())
+        data['rate_hours'] = [
+            {'rate_type_id': rate_type_id, 'rate_frequency_id': rate_frequency_id, 'tcr_id': 0, 'quantity': quantity}
+            for (rate_type_id, rate_frequency_id), quantity in quantities.items() if quantity > 0
+        ]
+
+        payload = schemas.ContractorHoursUpsert(**data)
+        if payload.work_date is None:
+            raise ValueError("work_date: required")
+        if payload.contractor_id is None and not extra['email_id']:
+            raise ValueError("contractor_id or email_id: required")
+        return payload, extra['email_id'], extra['client_id']
+
+    def _fail(self, row_number: int, error) -> None:
+        self.result['failed'] += 1
+        if len(self.result['errors']) >= self.max_errors:
+            self.result['errors_truncated'] = True
+            return
+        if isinstance(error, ValidationError):
+            messages = [f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()]
+        else:
+            messages = [str(error)]
+        self.result['errors'].append({'row': row_number, 'errors': messages})
+
+    def _load_chunk(self, chunk: List) -> None:
+        """Resolve a chunk's references, write its valid rows and commit"""
+        self._resolve_users(chunk)
+        resolved = []
+        for row_number, payload, email_id, client_id in chunk:
+            contractor_id = str(payload.contractor_id) if payload.contractor_id else None
+            user_id = self._users.get(contractor_id or email_id.lower())
+            if not user_id:
+                self._fail(row_number, ValueError(f"Unknown contractor: {contractor_id or email_id}"))
+                continue
+            payload.contractor_id = UUID(user_id)
+            key = (user_id, payload.work_date)
+            if key in self._seen:
+                self._fail(row_number, ValueError(
+                    f"Duplicate of row {self._seen[key]} (same contractor and work_date)"))
+                continue
+            self._seen[key] = row_number
+            resolved.append((row_number, payload, client_id))
+
+        self._resolve_placements([payload for _, payload, client_id in resolved if not payload.pcc_id])
+        rows = []
+        for row_number, payload, client_id in resolved:
+            try:
+                if not payload.pcc_id:
+                    payload.pcc_id = UUID(self._placement_for(str(payload.contractor_id), client_id))
+                rows.append((row_number, payload))
+            except ValueError as e:
+                self._fail(row_number, e)
+
+        self._resolve_rates({str(payload.pcc_id) for _, payload in rows if payload.rate_hours})
+        valid = []
+        for row_number, payload in rows:
+            try:
+                for rate_hour in payload.rate_hours:
+                    self._apply_contract_rate(payload, rate_hour)
+                valid.append((row_number, payload))
+            except ValueError as e:
+                self._fail(row_number, e)
+
+        if not valid:
+            return
+        try:
+            inserted, updated = self._write(valid)
+            self.db.commit()
+            self.result['imported'] += len(valid)
+            self.result['inserted'] += inserted
+            self.result['updated'] += updated
+            print(f"📦 Imported chunk ending at row {valid[-1][0]}: {inserted} new, {updated} updated")
+        except Exception as e:
+            self.db.rollback()
+            print(f"❌ Error importing chunk ending at row {valid[-1][0]}: {e}")
+            for row_number, _ in valid:
+                self._fail(row_number, ValueError(f"Not saved: {e}"))
+
+    def _resolve_users(self, chunk: List) -> None:
+        contractor_ids = {str(payload.contractor_id) for _, payload, _, _ in chunk if payload.contractor_id}
+        emails = {email_id.lower() for _, payload, email_id, _ in chunk if not payload.contractor_id}
+        contractor_ids -= self._users.keys()
+        emails -= self._users.keys()
+        if contractor_ids:
+            found = self.db.query(models.MUser.user_id).filter(
+                models.MUser.user_id.in_(list(contractor_ids)),
+                models.MUser.deleted_on.is_(None)
+            ).all()
+            found = {str(user_id) for user_id, in found}
+            self._users.update({contractor_id: contractor_id if contractor_id in found else None
+                                for contractor_id in contractor_ids})
+        if emails:
+            found = self.db.query(func.lower(models.MUser.email_id), models.MUser.user_id).filter(
+                func.lower(models.MUser.email_id).in_(list(emails)),
+                models.MUser.deleted_on.is_(None)
+            ).all()
+            self._users.update({email: None for email in emails})
+            self._users.update({email: str(user_id) for email, user_id in found})
+
+    def _resolve_placements(self, payloads: List[schemas.ContractorHoursUpsert]) -> None:
+        contractor_ids = {str(payload.contractor_id) for payload in payloads} - self._placements.keys()
+        if not contractor_ids:
+            return
+        rows = self.db.query(
+            models.P_CandidateClient.candidate_id,
+            models.P_CandidateClient.client_id,
+            models.P_CandidateClient.pcc_id
+        ).filter(
+            models.P_CandidateClient.candidate_id.in_(list(contractor_ids)),
+            models.P_CandidateClient.status == 0,
+            models.P_CandidateClient.deleted_on.is_(None)
+        ).all()
+        self._placements.update({contractor_id: [] for contractor_id in contractor_ids})
+        for candidate_id, client_id, pcc_id in rows:
+            self._placements[str(candidate_id)].append((str(client_id), str(pcc_id)))
+
+    def _placement_for(self, contractor_id: str, client_id: Optional[str]) -> str:
+        placements = self._placements.get(contractor_id, [])
+        if client_id:
+            placements = [placement for placement in placements if placement[0] == client_id]
+        if not placements:
+            raise ValueError(f"No active placement for contractor {contractor_id}"
+                             + (f" with client {client_id}" if client_id else ""))
+        if len(placements) > 1:
+            raise ValueError(f"Contractor {contractor_id} has {len(placements)} active placements; "
+                             f"add a client_id or pcc_id column")
+        return placements[0][1]
+
+    def _resolve_rates(self, pcc_ids: set) -> None:
+        pcc_ids = pcc_ids - self._rates.keys()
+        if not pcc_ids:
+            return
+        rows = self.db.query(models.ContractRate).filter(
+            models.ContractRate.pcc_id.in_(list(pcc_ids)),
+            models.ContractRate.deleted_on.is_(None)
+        ).order_by(models.ContractRate.created_on.desc()).all()
+        self._rates.update({pcc_id: [] for pcc_id in pcc_ids})
+        for rate in rows:
+            self._rates[str(rate.pcc_id)].append(rate)
+
+    def _apply_contract_rate(self, payload: schemas.ContractorHoursUpsert,
+                             rate_hour: schemas.ContractorRateHoursCreate) -> None:
+        """Set tcr_id and pay/bill rates from the newest contract rate applicable on the work date"""
+        for rate in self._rates.get(str(payload.pcc_id), []):
+            if (rate.rate_type == rate_hour.rate_type_id
+                    and rate.rate_frequency == rate_hour.rate_frequency_id
+                    and (rate.date_applicable is None or rate.date_applicable <= payload.work_date)
+                    and (rate.date_end is None or rate.date_end >= payload.work_date)):
+                rate_hour.tcr_id = rate.id
+                rate_hour.pay_rate = rate.pay_rate
+                rate_hour.bill_rate = rate.bill_rate
+                return
+        raise ValueError(f"{rate_hour.rate_type_id}-{rate_hour.rate_frequency_id}: "
+                         f"no contract rate for {payload.work_date}")
+
+    def _write(self, valid: List) -> Tuple[int, int]:
+        """Insert new rows, update existing ones, and replace their rate hours"""
+        db = self.db
+        hours = models.ContractorHours.__table__
+        payloads = [payload for _, payload in valid]
+        work_dates = [payload.work_date for payload in payloads]
+
+        existing = db.query(
+            models.ContractorHours.contractor_id,
+            models.ContractorHours.work_date,
+            models.ContractorHours.tch_id
+        ).filter(
+            models.ContractorHours.timesheet_id == self.timesheet_id,
+            models.ContractorHours.contractor_id.in_(list({payload.contractor_id for payload in payloads})),
+            models.ContractorHours.work_date.between(min(work_dates), max(work_dates)),
+            models.ContractorHours.deleted_on.is_(None)
+        ).all()
+        existing = {(str(contractor_id), work_date): tch_id for contractor_id, work_date, tch_id in existing}
+
+        new_rows, updates, tch_ids = [], [], {}
+        for payload in payloads:
+            values = payload.dict(include=set(self.write_fields))
+            tch_id = existing.get((str(payload.contractor_id), payload.work_date))
+            if tch_id:
+                tch_ids[id(payload)] = tch_id
+                updates.append({'b_tch_id': tch_id, 'b_updated_by': self.created_by,
+                                **{f'b_{field}': values.get(field) for field in self.write_fields
+                                   if field not in KEY_FIELDS}})
+            else:
+                new_rows.append({**{field: values.get(field) for field in self.write_fields},
+                                 'created_by': self.created_by})
+
+        if new_rows:
+            created = db.execute(
+                insert(hours).returning(hours.c.tch_id, hours.c.contractor_id, hours.c.work_date),
+                new_rows
+            ).all()
+            created = {(str(contractor_id), work_date): tch_id for tch_id, contractor_id, work_date in created}
+            for payload in payloads:
+                if id(payload) not in tch_ids:
+                    tch_ids[id(payload)] = created[(str(payload.contractor_id), payload.work_date)]
+
+        if updates:
+            set_fields = [field for field in self.write_fields if field not in KEY_FIELDS]
+            db.execute(
+                hours.update()
+                .where(hours.c.tch_id == bindparam('b_tch_id'))
+                .values({**{field: bindparam(f'b_{field}') for field in set_fields},
+                         'updated_by': bindparam('b_updated_by'), 'updated_on': func.now()}),
+                updates
+            )
+
+        if self.rate_columns:
+            if updates:
+                db.execute(text("""
+                    UPDATE app.t_contractor_rate_hours
+                    SET deleted_on = NOW(), deleted_by = CAST(:deleted_by AS uuid)
+                    WHERE tch_id = ANY(CAST(:tch_ids AS uuid[])) AND deleted_on IS NULL
+                """), {"tch_ids": [str(update['b_tch_id']) for update in updates], "deleted_by": self.created_by})
+            rate_rows = [
+                {'tch_id': tch_ids[id(payload)], 'rate_frequency_id': rate_hour.rate_frequency_id,
+                 'rate_type_id': rate_hour.rate_type_id, 'tcr_id': rate_hour.tcr_id, 'quantity': rate_hour.quantity,
+                 'pay_rate': rate_hour.pay_rate, 'bill_rate': rate_hour.bill_rate, 'created_by': self.created_by}
+                for payload in payloads for rate_hour in payload.rate_hours
+            ]
+            if rate_rows:
+                db.execute(insert(models.ContractorRateHours.__table__), rate_rows)
+
+        crud.mark_payroll_contractors_dirty(db, [(payload.contractor_id, payload.work_date) for payload in payloads])
+        crud.record_contractor_hours_holiday(db, list(tch_ids.values()), self.created_by)
+        return len(new_rows), len(updates)
+
+
+def import_contractor_hours_file(db: Session, timesheet_id: str, file: BinaryIO, filename: str,
+                                 client_id: Optional[str] = None, created_by: Optional[str] = None) -> Dict:
+    """Convenience function to import a CSV/XLSX timesheet into contractor hours"""
+    return TimesheetImporter(db, timesheet_id, client_id, created_by).run(file, filename)
@@ -0,0 +1,104 @@
+"""
+Vectorized Payroll Engine
+
+Computes a period's payroll runs for all contractors at once. The hours stay
+aggregated per contractor by SQL and come back as one list per column
+(crud.get_contractor_hours_columns); gross pay, PAYE (per marital status),
+PRSI, USC, total deductions and net pay are then each computed with a single
+NumPy array expression instead of a Python call chain per contractor.
+
+The arithmetic is PayrollCalculator._build_payroll_run_data's, in the same
+order, and round_array rounds exactly like Python's round(), so every figure
+is identical to the per-contractor path (see benchmark_payroll_engine.py).
+Pension and other deductions are PayrollCalculator's defaults (none);
+calculators that override those hooks keep using the per-contractor path.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from .tax_tables import TaxTable
+
+# Aggregated columns of crud.get_contractor_hours_columns, besides contractor_id
+HOURS_COLUMNS = ['standard_hours', 'holiday_hours', 'weekend_hours', 'oncall_hours',
+                 'standard_pay', 'holiday_pay', 'weekend_pay', 'oncall_pay']
+
+# PayrollRun figures not tracked by t_contractor_hours or the deduction rules
+ZERO_COLUMNS = ['overtime_hours', 'bank_holiday_hours', 'overtime_pay', 'bank_holiday_pay',
+                'pension_deduction', 'other_deductions']
+
+# Distance from a .5 tie below which x * 10**digits may have rounded across it
+_TIE_TOLERANCE = 1e-6
+
+
+def round_array(values: np.ndarray, digits: int = 2) -> np.ndarray:
+    """
+    Round like Python's round(value, digits), element-wise
+
+    np.round scales by 10**digits first, which can land a value just below a
+    .5 tie on it (or the other way round). Values that close to a tie are
+    rounded with round() itself; all others come out the same either way.
+    """
+    scale = 10.0 ** digits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < _TIE_TOLERANCE)
+    if len(near_tie):
+        rounded[near_tie] = [round(value, digits) for value in values[near_tie].tolist()]
+    return rounded
+
+
+class VectorizedPayrollEngine:
+    """Pay and deductions for many contractors at once under one tax table"""
+
+    def __init__(self, tax_table: TaxTable):
+        self.tax_table = tax_table
+
+    def calculate(self, hours: Dict[str, List[float]], marital_statuses: List[str]) -> Dict[str, List[float]]:
+        """
+        Payroll run figures for every contractor
+
+        Args:
+            hours: HOURS_COLUMNS lists, one value per contractor (see crud.get_contractor_hours_columns)
+            marital_statuses: Each contractor's marital status, in the same order
+
+        Returns:
+            One list per PayrollRun figure column, in contractor order; the
+            hours and pay lists are the given ones
+        """
+        count = len(marital_statuses)
+        arrays = {column: np.fromiter(hours[column], dtype=float, count=count) for column in HOURS_COLUMNS}
+        gross_pay = arrays['standard_pay'] + arrays['holiday_pay'] + arrays['weekend_pay'] + arrays['oncall_pay']
+
+        statuses = set(marital_statuses)
+        if len(statuses) == 1:
+            tax = self.tax_table.paye_table(statuses.pop()).apply_array(gross_pay)
+        else:
+            tax = np.zeros(count)
+            status_array = np.array(marital_statuses, dtype=object)
+            for status in statuses:
+                mask = status_array == status
+                tax[mask] = self.tax_table.paye_table(status).apply_array(gross_pay[mask])
+        tax = round_array(tax)
+        prsi = round_array(gross_pay * self.tax_table.prsi_rate)
+        usc = round_array(self.tax_table.usc.apply_array(gross_pay))
+        # + 0.0 + 0.0: pension and other deductions, summed in the per-contractor order
+        total_deductions = tax + prsi + usc + 0.0 + 0.0
+
+        columns = {
+            'total_hours': arrays['standard_hours'] + arrays['holiday_hours'] +
+                           arrays['weekend_hours'] + arrays['oncall_hours'],
+            'gross_pay': gross_pay,
+            'tax_deduction': tax,
+            'prsi_deduction': prsi,
+            'usc_deduction': usc,
+            'total_deductions': total_deductions,
+            'net_pay': gross_pay - total_deductions
+        }
+        runs = {column: values.tolist() for column, values in columns.items()}
+        runs.update((column, hours[column]) for column in HOURS_COLUMNS)
+        zeros = [0.0] * count
+        for column in ZERO_COLUMNS:
+            runs[column] = zeros
+        return runs
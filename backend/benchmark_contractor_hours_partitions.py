@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the work_date partitioning of t_contractor_hours
+
+Seeds three years of daily contractor hours into their own yearly partitions,
+then EXPLAINs and times the two hot work_date queries:
+  - invoice generation: hours for one work_date (routers/invoices.py)
+  - payroll aggregation: per-contractor totals for a period
+    (crud.get_contractor_hours_totals)
+Each plan must scan a single partition. A query across all three years is
+timed alongside for comparison. The benchmark partitions are detached with
+ContractorHoursPartitionManager and dropped afterwards.
+"""
+
+import sys
+import os
+import time
+from datetime import date
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.services.contractor_hours_partitions import ContractorHoursPartitionManager, partition_name
+from sqlalchemy import text
+
+CONTRACTORS = 500
+YEARS = [2095, 2096, 2097]
+REPEATS = 5
+BENCH_DOMAIN = "partition-bench.test"
+BENCH_MONTH = "Contractor hours partition benchmark"
+
+INVOICE_QUERY = """
+    SELECT * FROM app.t_contractor_hours
+    WHERE work_date = :work_date
+"""
+
+PAYROLL_QUERY = """
+    SELECT contractor_id,
+           sum(coalesce(standard_hours, 0.0)) AS standard_hours,
+           sum(coalesce(standard_hours, 0.0) * coalesce(standard_pay_rate, 0.0)) AS standard_pay
+    FROM app.t_contractor_hours
+    WHERE work_date >= :start_date AND work_date <= :end_date
+    GROUP BY contractor_id
+"""
+
+
+def seed(db):
+    manager = ContractorHoursPartitionManager(db)
+    manager.ensure_partitions_for_range(date(YEARS[0], 1, 1), date(YEARS[-1], 12, 31))
+
+    db.execute(text("""
+        INSERT INTO app.m_user (first_name, last_name, email_id)
+        SELECT 'Bench', 'Contractor ' || i, 'contractor' || i || '@' || :domain
+        FROM generate_series(1, :n) AS i
+    """), {"domain": BENCH_DOMAIN, "n": CONTRACTORS})
+    timesheet_id = db.execute(text("""
+        INSERT INTO app.t_timesheet (timesheet_id, status, month)
+        VALUES (gen_random_uuid(), 'benchmark', :month)
+        RETURNING timesheet_id
+    """), {"month": BENCH_MONTH}).scalar()
+    db.execute(text("""
+        INSERT INTO app.t_contractor_hours (contractor_id, work_date, timesheet_id, standard_hours, standard_pay_rate)
+        SELECT u.user_id, d::date, :timesheet_id, 8.0, 20 + (abs(hashtext(u.email_id)) % 40)
+        FROM app.m_user u
+        CROSS JOIN generate_series(make_date(:first_year, 1, 1), make_date(:last_year, 12, 31), interval '1 day') AS d
+        WHERE u.email_id LIKE :pattern
+    """), {"timesheet_id": timesheet_id, "first_year": YEARS[0], "last_year": YEARS[-1],
+           "pattern": f"%@{BENCH_DOMAIN}"})
+    db.commit()
+    db.execute(text("ANALYZE app.t_contractor_hours"))
+    db.commit()
+
+
+def cleanup(db):
+    params = {"pattern": f"%@{BENCH_DOMAIN}", "month": BENCH_MONTH}
+    manager = ContractorHoursPartitionManager(db)
+    attached = {partition['name'] for partition in manager.list_partitions()}
+    for year in YEARS:
+        name = partition_name(year)
+        if name in attached:
+            manager.detach_partition(year)
+        db.execute(text(f'DROP TABLE IF EXISTS app."{name}"'))
+    db.execute(text("""
+        DELETE FROM app.t_contractor_hours
+        WHERE contractor_id IN (SELECT user_id FROM app.m_user WHERE email_id LIKE :pattern)
+    """), params)
+    db.execute(text("DELETE FROM app.t_timesheet WHERE month = :month"), params)
+    db.execute(text("DELETE FROM app.m_user WHERE email_id LIKE :pattern"), params)
+    db.commit()
+
+
+def scanned_partitions(plan):
+    """Names of the t_contractor_hours partitions a JSON plan reads"""
+    names = set()
+    relation = plan.get("Relation Name", "")
+    if relation.startswith("t_contractor_hours"):
+        names.add(relation)
+    for child in plan.get("Plans", []):
+        names |= scanned_partitions(child)
+    return names
+
+
+def explain(db, sql, params):
+    plan = db.execute(text("EXPLAIN (FORMAT JSON) " + sql), params).scalar()
+    return scanned_partitions(plan[0]["Plan"])
+
+
+def best_of(db, sql, params):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        rows = db.execute(text(sql), params).fetchall()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(rows)
+
+
+def benchmark_contractor_hours_partitions():
+    db = SessionLocal()
+
+    try:
+        print(f"📝 Seeding {CONTRACTORS} contractors x {len(YEARS)} years of daily hours...")
+        seed(db)
+        for partition in ContractorHoursPartitionManager(db).list_partitions():
+            print(f"   {partition['name']}: {partition['bounds']} (~{partition['estimated_rows']} rows)")
+
+        middle_year = YEARS[1]
+        cases = [
+            ("Invoice (one work_date)", INVOICE_QUERY, {"work_date": date(middle_year, 3, 13)}),
+            ("Payroll (one month)", PAYROLL_QUERY,
+             {"start_date": date(middle_year, 3, 1), "end_date": date(middle_year, 3, 31)}),
+        ]
+
+        all_pruned = True
+        for label, sql, params in cases:
+            partitions = explain(db, sql, params)
+            elapsed, rows = best_of(db, sql, params)
+            pruned = partitions == {partition_name(middle_year)}
+            all_pruned &= pruned
+            print(f"{'✅' if pruned else '❌'} {label}: scans {sorted(partitions)}, "
+                  f"{elapsed * 1000:.1f} ms for {rows} rows")
+
+        span = {"start_date": date(YEARS[0], 3, 1), "end_date": date(YEARS[-1], 3, 31)}
+        partitions = explain(db, PAYROLL_QUERY, span)
+        elapsed, rows = best_of(db, PAYROLL_QUERY, span)
+        print(f"📊 Payroll across {len(YEARS)} years: scans {len(partitions)} partitions, "
+              f"{elapsed * 1000:.1f} ms for {rows} rows")
+
+        return all_pruned
+
+    except Exception as e:
+        print(f"❌ Benchmark failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            cleanup(db)
+            print("🧹 Cleaned up benchmark data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up benchmark data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = benchmark_contractor_hours_partitions()
+    sys.exit(0 if success else 1)
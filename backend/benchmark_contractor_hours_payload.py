@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the columnar contractor hours payload
+(services/contractor_hours_columnar.py)
+
+Builds the save of a 500-contractor week (one row per contractor-day, three
+rate hours each) in three shapes:
+  - legacy: a list of full ContractorHoursUpsert objects, as /contractor-hours/upsert takes
+  - columnar: every field the grid fills, one array each
+  - columnar delta: a re-save where only the hours changed (tch_id + changed cells)
+and reports each body's size (raw, gzip and, when installed, brotli) and the
+time to turn it into something ready to write: json.loads plus one
+ContractorHoursUpsert per item for legacy (like the router), decode_body plus
+column validation for columnar. Needs no database.
+"""
+
+import sys
+import os
+import gzip
+import json
+import time
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import schemas
+from app.services.contractor_hours_columnar import ColumnarContractorHours, decode_body
+
+CONTRACTORS = 500
+DAYS = 5
+REPEATS = 5
+WEEK_START = date(2025, 3, 3)
+# (rate_type_id, rate_frequency_id) -> (pay_rate, bill_rate)
+RATES = {(1, 1): (20.0, 30.0), (1, 3): (25.0, 37.5), (2, 1): (30.0, 45.0)}
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_rows():
+    timesheet_id = str(uuid4())
+    rows = []
+    for contractor in range(CONTRACTORS):
+        contractor_id, pcc_id = str(uuid4()), str(uuid4())
+        for day in range(DAYS):
+            hours = {key: 7.5 + (contractor + day) % 3 for key in RATES}
+            rows.append({
+                "tch_id": str(uuid4()),
+                "contractor_id": contractor_id,
+                "work_date": (WEEK_START + timedelta(days=day)).isoformat(),
+                "timesheet_id": timesheet_id,
+                "pcc_id": pcc_id,
+                "standard_hours": hours[(1, 1)],
+                "weekend_hours": hours[(1, 3)],
+                "total_hours": sum(hours.values()),
+                "day": (WEEK_START + timedelta(days=6)).isoformat(),
+                "week": 10,
+                "rate_hours": [
+                    {"rate_type_id": rate_type_id, "rate_frequency_id": rate_frequency_id,
+                     "tcr_id": 100 + index, "quantity": hours[(rate_type_id, rate_frequency_id)],
+                     "pay_rate": pay_rate, "bill_rate": bill_rate}
+                    for index, ((rate_type_id, rate_frequency_id), (pay_rate, bill_rate)) in enumerate(RATES.items())
+                ],
+            })
+    return rows
+
+
+def legacy_body(rows):
+    """Full objects with every ContractorHoursUpsert field, nulls included"""
+    items = [schemas.ContractorHoursUpsert(**row).model_dump(mode="json") for row in rows]
+    return json.dumps(items).encode()
+
+
+def columnar_body(rows, fields):
+    rate_hours = {name: [] for name in ("row", "rate_type_id", "rate_frequency_id", "tcr_id",
+                                        "quantity", "pay_rate", "bill_rate")}
+    for index, row in enumerate(rows):
+        for rate_hour in row["rate_hours"]:
+            rate_hours["row"].append(index)
+            for name in rate_hours:
+                if name != "row":
+                    rate_hours[name].append(rate_hour[name])
+    return json.dumps({
+        "columns": {field: [row[field] for row in rows] for field in fields},
+        "rate_hours": rate_hours,
+    }).encode()
+
+
+def parse_legacy(body):
+    """What /contractor-hours/upsert does before writing"""
+    items = json.loads(body)
+    normalized = []
+    for item in items:
+        data = item.copy()
+        if data.get("work_date") and isinstance(data["work_date"], str):
+            data["work_date"] = datetime.strptime(data["work_date"], "%Y-%m-%d").date()
+        normalized.append(schemas.ContractorHoursUpsert(**data))
+    return normalized
+
+
+def parse_columnar(body, encoding=None):
+    return ColumnarContractorHours(decode_body(body, encoding))
+
+
+def best_of(fn, *args):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def sizes(body):
+    result = {"raw": len(body), "gzip": len(gzip.compress(body))}
+    if brotli:
+        result["brotli"] = len(brotli.compress(body))
+    return result
+
+
+def describe(label, body, elapsed):
+    size = sizes(body)
+    compressed = ", ".join(f"{name} {value / 1024:.1f} KB" for name, value in size.items() if name != "raw")
+    print(f"📦 {label}: {size['raw'] / 1024:.1f} KB raw, {compressed}; parsed in {elapsed * 1000:.1f} ms")
+    return size
+
+
+def benchmark_contractor_hours_payload():
+    try:
+        rows = build_rows()
+        print(f"📝 {CONTRACTORS} contractors x {DAYS} days = {len(rows)} contractor-days, "
+              f"{len(RATES)} rate hours each")
+
+        legacy = legacy_body(rows)
+        full = columnar_body(rows, ["tch_id", "contractor_id", "work_date", "pcc_id", "standard_hours",
+                                    "weekend_hours", "total_hours", "day", "week"])
+        delta = columnar_body(rows, ["tch_id", "standard_hours", "weekend_hours", "total_hours"])
+
+        legacy_size = describe("Legacy objects", legacy, best_of(parse_legacy, legacy))
+        full_size = describe("Columnar", full, best_of(parse_columnar, full))
+        delta_time = best_of(parse_columnar, delta)
+        delta_size = describe("Columnar delta", delta, delta_time)
+        gzip_time = best_of(parse_columnar, gzip.compress(delta), "gzip")
+        print(f"📦 Columnar delta (gzip body): parsed in {gzip_time * 1000:.1f} ms")
+
+        legacy_time = best_of(parse_legacy, legacy)
+        for label, size in (("Columnar", full_size), ("Columnar delta", delta_size)):
+            print(f"📊 {label} vs legacy: {legacy_size['raw'] / size['raw']:.1f}x smaller raw, "
+                  f"{legacy_size['gzip'] / size['gzip']:.1f}x smaller gzipped")
+        print(f"📊 Parse time: {legacy_time * 1000:.1f} ms -> {delta_time * 1000:.1f} ms "
+              f"({legacy_time / delta_time:.1f}x faster)")
+
+        return delta_size["gzip"] < legacy_size["gzip"] and delta_time < legacy_time
+
+    except Exception as e:
+        print(f"❌ Benchmark failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = benchmark_contractor_hours_payload()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the chunked holiday backfill (services/holiday_backfill.py)
+
+Seeds 100,000 candidates x 10 timesheets (one million timesheet entries), then
+times the backfill of each timesheet:
+  - a dry run, which must report the writes without making them
+  - the real run
+  - a re-run, which must append no ledger entries
+Afterwards every candidate's holiday_count must equal its ledger total and
+8% of its standard hours less its holiday hours.
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.services.holiday_backfill import backfill_timesheet_holidays
+from sqlalchemy import text
+
+CANDIDATES = 100000
+TIMESHEETS = 10
+BENCH_DOMAIN = "holiday-backfill-bench.test"
+BENCH_MONTH = "Holiday backfill benchmark"
+
+
+def seed(db):
+    params = {"domain": BENCH_DOMAIN, "n": CANDIDATES, "month": BENCH_MONTH, "timesheets": TIMESHEETS}
+    db.execute(text("""
+        INSERT INTO app.m_user (first_name, last_name, email_id)
+        SELECT 'Bench', 'Candidate ' || i, 'candidate' || i || '@' || :domain
+        FROM generate_series(1, :n) AS i
+    """), params)
+    db.execute(text("""
+        INSERT INTO app.m_candidate (candidate_id, holiday_count)
+        SELECT user_id, 0 FROM app.m_user WHERE email_id LIKE '%@' || :domain
+    """), params)
+    db.execute(text("""
+        INSERT INTO app.t_timesheet (timesheet_id, status, month)
+        SELECT gen_random_uuid(), 'benchmark', :month
+        FROM generate_series(1, :timesheets)
+    """), params)
+    db.execute(text("""
+        INSERT INTO app.t_timesheet_entry (timesheet_id, employee_name, employee_code, client_name,
+                                           standard_hours, holiday_hours)
+        SELECT t.timesheet_id, u.first_name || ' ' || u.last_name, u.user_id::text, 'Bench Client',
+               20 + (hashtext(u.email_id || t.timesheet_id::text) & 15),
+               CASE WHEN (hashtext(t.timesheet_id::text || u.email_id) & 7) = 0 THEN 8 ELSE 0 END
+        FROM app.t_timesheet t
+        CROSS JOIN app.m_user u
+        WHERE t.month = :month AND u.email_id LIKE '%@' || :domain
+    """), params)
+    db.commit()
+    db.execute(text("ANALYZE app.t_timesheet_entry"))
+    db.commit()
+
+
+def timesheet_ids(db):
+    return [str(row[0]) for row in db.execute(text(
+        "SELECT timesheet_id FROM app.t_timesheet WHERE month = :month ORDER BY timesheet_id"
+    ), {"month": BENCH_MONTH})]
+
+
+def run_all(timesheets, dry_run=False):
+    start = time.perf_counter()
+    totals = {'entries': 0, 'ledger_entries': 0}
+    for timesheet_id in timesheets:
+        result = backfill_timesheet_holidays(timesheet_id, dry_run=dry_run)
+        totals['entries'] += result['entries']
+        totals['ledger_entries'] += result['ledger_entries']
+    totals['seconds'] = time.perf_counter() - start
+    return totals
+
+
+def mismatched_candidates(db):
+    """Bench candidates whose holiday_count disagrees with their ledger or their entries"""
+    return db.execute(text("""
+        WITH expected AS (
+            SELECT e.employee_code AS candidate_id,
+                   sum(e.standard_hours) * 0.08 - sum(e.holiday_hours) AS holiday_hours
+            FROM app.t_timesheet_entry e
+            JOIN app.t_timesheet t ON t.timesheet_id = e.timesheet_id
+            WHERE t.month = :month
+            GROUP BY e.employee_code
+        ), ledger AS (
+            SELECT candidate_id::text AS candidate_id, sum(holiday_hours) AS holiday_hours
+            FROM app.t_holiday_ledger
+            WHERE source = 'timesheet_entry'
+            GROUP BY candidate_id
+        )
+        SELECT count(*)
+        FROM expected x
+        JOIN app.m_candidate c ON c.candidate_id::text = x.candidate_id
+        LEFT JOIN ledger l ON l.candidate_id = x.candidate_id
+        WHERE abs(coalesce(c.holiday_count, 0) - coalesce(l.holiday_hours, 0)) > 1e-6
+           OR abs(coalesce(c.holiday_count, 0) - x.holiday_hours) > 1e-6
+    """), {"month": BENCH_MONTH}).scalar()
+
+
+def cleanup(db):
+    params = {"pattern": f"%@{BENCH_DOMAIN}", "month": BENCH_MONTH}
+    candidates = "SELECT user_id FROM app.m_user WHERE email_id LIKE :pattern"
+    db.execute(text(f"DELETE FROM app.t_holiday_balance WHERE candidate_id IN ({candidates})"), params)
+    db.execute(text(f"DELETE FROM app.t_holiday_ledger WHERE candidate_id IN ({candidates})"), params)
+    db.execute(text("""
+        DELETE FROM app.t_holiday_backfill_checkpoint
+        WHERE job_name IN (SELECT 'timesheet_entries:' || timesheet_id FROM app.t_timesheet WHERE month = :month)
+    """), params)
+    db.execute(text("""
+        DELETE FROM app.t_timesheet_entry
+        WHERE timesheet_id IN (SELECT timesheet_id FROM app.t_timesheet WHERE month = :month)
+    """), params)
+    db.execute(text("DELETE FROM app.t_timesheet WHERE month = :month"), params)
+    db.execute(text(f"DELETE FROM app.m_candidate WHERE candidate_id IN ({candidates})"), params)
+    db.execute(text("DELETE FROM app.m_user WHERE email_id LIKE :pattern"), params)
+    db.commit()
+
+
+def benchmark_holiday_backfill():
+    db = SessionLocal()
+
+    try:
+        print(f"📝 Seeding {CANDIDATES} candidates x {TIMESHEETS} timesheets...")
+        seed(db)
+        timesheets = timesheet_ids(db)
+
+        dry = run_all(timesheets, dry_run=True)
+        written = db.execute(text("""
+            SELECT count(*) FROM app.t_holiday_ledger
+            WHERE candidate_id IN (SELECT user_id FROM app.m_user WHERE email_id LIKE :pattern)
+        """), {"pattern": f"%@{BENCH_DOMAIN}"}).scalar()
+        dry_ok = written == 0 and dry['ledger_entries'] > 0
+        print(f"{'✅' if dry_ok else '❌'} Dry run: {dry['entries']} entries, would write "
+              f"{dry['ledger_entries']} ledger entries in {dry['seconds']:.2f}s (wrote {written})")
+
+        full = run_all(timesheets)
+        full_ok = full['ledger_entries'] == dry['ledger_entries']
+        print(f"{'✅' if full_ok else '❌'} Backfill: {full['entries']} entries, "
+              f"{full['ledger_entries']} ledger entries in {full['seconds']:.2f}s "
+              f"({full['entries'] / full['seconds']:.0f} entries/s)")
+
+        rerun = run_all(timesheets)
+        rerun_ok = rerun['ledger_entries'] == 0
+        print(f"{'✅' if rerun_ok else '❌'} Re-run: {rerun['ledger_entries']} ledger entries "
+              f"in {rerun['seconds']:.2f}s")
+
+        mismatched = mismatched_candidates(db)
+        print(f"{'✅' if mismatched == 0 else '❌'} holiday_count matches the ledger "
+              f"({mismatched} mismatched candidates)")
+
+        return dry_ok and full_ok and rerun_ok and mismatched == 0
+
+    except Exception as e:
+        print(f"❌ Benchmark failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            cleanup(db)
+            print("🧹 Cleaned up benchmark data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up benchmark data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = benchmark_holiday_backfill()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for sequential vs parallel invoice generation
+
+Seeds 50 clients x 20 contractors with one day of contractor hours each,
+generates the week's invoices in both execution modes and compares wall time.
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import models, schemas
+from app.routers.invoices import generate_invoice
+from uuid import uuid4
+from datetime import date
+
+CLIENTS = 50
+CONTRACTORS_PER_CLIENT = 20
+WEEK = "2099-W10"
+LAST_WORKING_DAY = date(2099, 3, 6)  # Friday of 2099-W10
+
+
+def seed(db):
+    """Create clients, contractors, placements and one day of hours per contractor"""
+    timesheet_id = uuid4()
+    db.add(models.Timesheet(timesheet_id=timesheet_id, month="March 2099", week="Week 10", status="Open"))
+
+    client_ids, user_ids = [], []
+    for c in range(CLIENTS):
+        client_id = uuid4()
+        client_ids.append(client_id)
+        db.add(models.Client(client_id=client_id, client_name=f"Benchmark Client {c}"))
+    db.flush()
+
+    for c, client_id in enumerate(client_ids):
+        for n in range(CONTRACTORS_PER_CLIENT):
+            user_id = uuid4()
+            user_ids.append(user_id)
+            db.add(models.MUser(user_id=user_id, first_name="Bench", last_name=f"{c}-{n}"))
+            db.flush()
+            db.add(models.Candidate(candidate_id=user_id, invoice_contact_name=f"Bench {c}-{n}"))
+            pcc = models.P_CandidateClient(candidate_id=user_id, client_id=client_id, status=0)
+            db.add(pcc)
+            db.flush()
+            tch = models.ContractorHours(
+                contractor_id=user_id,
+                work_date=LAST_WORKING_DAY,
+                timesheet_id=timesheet_id,
+                pcc_id=pcc.pcc_id,
+                standard_hours=8.0
+            )
+            db.add(tch)
+            db.flush()
+            db.add_all([
+                models.ContractorRateHours(tch_id=tch.tch_id, rate_frequency_id=1, rate_type_id=1,
+                                           tcr_id=1, quantity=8.0, pay_rate=20.0, bill_rate=30.0),
+                models.ContractorRateHours(tch_id=tch.tch_id, rate_frequency_id=1, rate_type_id=2,
+                                           tcr_id=1, quantity=2.0, pay_rate=30.0, bill_rate=45.0),
+            ])
+    db.commit()
+    return timesheet_id, client_ids, user_ids
+
+
+def clean_invoices(db, client_ids):
+    invoice_ids = [
+        row[0] for row in db.query(models.Invoice.invoice_id)
+        .filter(models.Invoice.inv_client_id.in_(client_ids)).all()
+    ]
+    if invoice_ids:
+        db.query(models.InvoiceLineItem).filter(
+            models.InvoiceLineItem.invoice_id.in_(invoice_ids)
+        ).delete(synchronize_session=False)
+        db.query(models.Invoice).filter(
+            models.Invoice.invoice_id.in_(invoice_ids)
+        ).delete(synchronize_session=False)
+    db.commit()
+
+
+def run(client_ids, parallel):
+    db = SessionLocal()
+    try:
+        request = schemas.GenerateInvoiceRequest(
+            clientIds=[str(client_id) for client_id in client_ids],
+            week=WEEK,
+            invoiceDate=str(LAST_WORKING_DAY),
+            parallel=parallel
+        )
+        start = time.perf_counter()
+        response = generate_invoice(request, db)
+        elapsed = time.perf_counter() - start
+        return elapsed, response.total_amount
+    finally:
+        db.close()
+
+
+def benchmark_invoice_generation():
+    db = SessionLocal()
+    timesheet_id, client_ids, user_ids = None, [], []
+
+    try:
+        print(f"📝 Seeding {CLIENTS} clients x {CONTRACTORS_PER_CLIENT} contractors...")
+        timesheet_id, client_ids, user_ids = seed(db)
+
+        print("\n⏱️ Sequential run")
+        sequential_time, sequential_total = run(client_ids, parallel=False)
+        clean_invoices(db, client_ids)
+        print(f"   {sequential_time:.2f}s, total_amount={sequential_total:.2f}")
+
+        print("\n⏱️ Parallel run")
+        parallel_time, parallel_total = run(client_ids, parallel=True)
+        clean_invoices(db, client_ids)
+        print(f"   {parallel_time:.2f}s, total_amount={parallel_total:.2f}")
+
+        assert abs(sequential_total - parallel_total) < 0.01, "Totals differ between modes"
+        print(f"\n✅ Speedup: {sequential_time / parallel_time:.1f}x")
+        return True
+
+    except Exception as e:
+        print(f"❌ Benchmark failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    finally:
+        try:
+            clean_invoices(db, client_ids)
+            tch_ids = [
+                row[0] for row in db.query(models.ContractorHours.tch_id)
+                .filter(models.ContractorHours.timesheet_id == timesheet_id).all()
+            ]
+            if tch_ids:
+                db.query(models.ContractorRateHours).filter(
+                    models.ContractorRateHours.tch_id.in_(tch_ids)
+                ).delete(synchronize_session=False)
+            db.query(models.ContractorHours).filter(
+                models.ContractorHours.timesheet_id == timesheet_id
+            ).delete(synchronize_session=False)
+            db.query(models.P_CandidateClient).filter(
+                models.P_CandidateClient.client_id.in_(client_ids)
+            ).delete(synchronize_session=False)
+            db.query(models.Candidate).filter(
+                models.Candidate.candidate_id.in_(user_ids)
+            ).delete(synchronize_session=False)
+            db.query(models.MUser).filter(models.MUser.user_id.in_(user_ids)).delete(synchronize_session=False)
+            db.query(models.Client).filter(models.Client.client_id.in_(client_ids)).delete(synchronize_session=False)
+            db.query(models.Timesheet).filter(models.Timesheet.timesheet_id == timesheet_id).delete()
+            db.commit()
+            print("🧹 Cleaned up benchmark data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up benchmark data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = benchmark_invoice_generation()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for parallel multi-period payroll processing
+
+Seeds a year of monthly payroll periods with contractor hours, then calculates
+every period with PayrollBatchProcessor twice: as a sequential loop and on the
+process pool. Both runs must produce the same period totals; the script reports
+per-period timings and the combined throughput of each mode.
+"""
+
+import sys
+import os
+from datetime import date
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.config import settings
+from app.services.payroll_batch import PayrollBatchProcessor
+from sqlalchemy import text
+
+CONTRACTORS = 2_000
+PERIODS = 12
+YEAR = 2099
+BENCH_DOMAIN = "payroll-batch-bench.test"
+BENCH_PERIOD_PREFIX = "Payroll batch benchmark"
+
+
+def seed(db):
+    """Bulk insert contractors, one month of daily hours per period, and the periods"""
+    db.execute(text("""
+        INSERT INTO app.m_user (first_name, last_name, email_id)
+        SELECT 'Bench', 'Contractor ' || i, 'contractor' || i || '@' || :domain
+        FROM generate_series(1, :n) AS i
+    """), {"domain": BENCH_DOMAIN, "n": CONTRACTORS})
+    timesheet_id = db.execute(text("""
+        INSERT INTO app.t_timesheet (timesheet_id, status, month)
+        VALUES (gen_random_uuid(), 'benchmark', :month)
+        RETURNING timesheet_id
+    """), {"month": BENCH_PERIOD_PREFIX}).scalar()
+    db.execute(text("""
+        INSERT INTO app.t_contractor_hours (
+            contractor_id, work_date, timesheet_id, standard_hours, on_call_hours,
+            weekend_hours, bank_holiday_hours, standard_pay_rate, oncall_pay_rate,
+            weekend_pay_rate, bankholiday_pay_rate
+        )
+        SELECT u.user_id, d::date, :timesheet_id,
+               8.0, (extract(day FROM d)::int % 5),
+               CASE WHEN extract(isodow FROM d) >= 6 THEN 4.0 ELSE 0.0 END,
+               CASE WHEN extract(day FROM d) = 1 THEN 8.0 ELSE 0.0 END,
+               20 + (abs(hashtext(u.email_id)) % 40), 12.5, 35.0, 50.0
+        FROM app.m_user u
+        CROSS JOIN generate_series(make_date(:year, 1, 1), make_date(:year, 12, 31), interval '1 day') AS d
+        WHERE u.email_id LIKE :pattern
+    """), {"timesheet_id": timesheet_id, "year": YEAR, "pattern": f"%@{BENCH_DOMAIN}"})
+    db.execute(text("""
+        INSERT INTO app.t_payroll_period (period_name, start_date, end_date, status)
+        SELECT :prefix || ' ' || m, make_date(:year, m, 1),
+               (make_date(:year, m, 1) + interval '1 month' - interval '1 day')::date, 'draft'
+        FROM generate_series(1, :periods) AS m
+    """), {"prefix": BENCH_PERIOD_PREFIX, "year": YEAR, "periods": PERIODS})
+    db.commit()
+    db.execute(text("ANALYZE app.t_contractor_hours"))
+    db.commit()
+
+
+def cleanup(db):
+    params = {"pattern": f"%@{BENCH_DOMAIN}", "prefix": f"{BENCH_PERIOD_PREFIX}%"}
+    periods = "SELECT period_id FROM app.t_payroll_period WHERE period_name LIKE :prefix"
+    db.execute(text(f"DELETE FROM app.t_payroll_dirty_contractor WHERE period_id IN ({periods})"), params)
+    db.execute(text(f"DELETE FROM app.t_payroll_run WHERE period_id IN ({periods})"), params)
+    db.execute(text(f"DELETE FROM app.t_payroll_summary WHERE period_id IN ({periods})"), params)
+    db.execute(text("DELETE FROM app.t_payroll_period WHERE period_name LIKE :prefix"), params)
+    db.execute(text("""
+        DELETE FROM app.t_contractor_hours
+        WHERE contractor_id IN (SELECT user_id FROM app.m_user WHERE email_id LIKE :pattern)
+    """), params)
+    db.execute(text("DELETE FROM app.t_timesheet WHERE month LIKE :prefix"), params)
+    db.execute(text("DELETE FROM app.m_user WHERE email_id LIKE :pattern"), params)
+    db.commit()
+
+
+def benchmark_payroll_batch():
+    db = SessionLocal()
+
+    try:
+        print(f"📝 Seeding {PERIODS} periods x {CONTRACTORS} contractors...")
+        seed(db)
+
+        processor = PayrollBatchProcessor(db)
+        period_ids = processor.resolve_period_ids(start_date=date(YEAR, 1, 1), end_date=date(YEAR, 12, 31))
+
+        print("\n⏱️ Sequential loop")
+        sequential = processor.run(period_ids, parallel=False)
+        print(f"\n⏱️ Process pool ({settings.payroll_batch_workers} workers)")
+        parallel = processor.run(period_ids, parallel=True)
+
+        for mode, summary in (("sequential", sequential), ("parallel", parallel)):
+            if summary['failed']:
+                failures = [r for r in summary['results'] if r['status'] == 'failed']
+                print(f"❌ {mode}: {len(failures)} periods failed, first error: {failures[0]['error']}")
+                return False
+
+        for expected, actual in zip(sequential['results'], parallel['results']):
+            for field in ('total_contractors', 'total_gross_pay', 'total_deductions', 'total_net_pay'):
+                assert abs(expected[field] - actual[field]) < 0.01, \
+                    f"{field} differs for period {expected['period_id']}: {expected[field]} != {actual[field]}"
+        print(f"\n✅ All {len(period_ids)} period totals identical")
+
+        print(f"📊 Sequential: {sequential['seconds']}s ({sequential['periods_per_second']} periods/s)")
+        print(f"📊 Parallel:   {parallel['seconds']}s ({parallel['periods_per_second']} periods/s)")
+        print(f"📊 Speedup: {sequential['seconds'] / parallel['seconds']:.1f}x")
+        return True
+
+    except Exception as e:
+        print(f"❌ Benchmark failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            cleanup(db)
+            print("🧹 Cleaned up benchmark data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up benchmark data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = benchmark_payroll_batch()
+    sys.exit(0 if success else 1)
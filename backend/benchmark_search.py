@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for trigram-indexed candidate search
+
+Seeds 100k candidates, then measures crud.search_candidates latency for
+exact prefixes, misspelled names, email and PPS prefixes. Target: p95 < 20 ms.
+Requires the add_trigram_search_indexes migration.
+"""
+
+import sys
+import os
+import time
+import statistics
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import crud
+from sqlalchemy import text
+
+CANDIDATES = 100_000
+ROUNDS = 50
+BENCH_DOMAIN = "search-bench.test"
+
+FIRST_NAMES = ['John', 'Mary', 'Patrick', 'Siobhan', 'Michael', 'Aoife', 'Sean', 'Niamh', 'Conor', 'Ciara']
+LAST_NAMES = ['Murphy', 'Kelly', 'OSullivan', 'Walsh', 'Smith', 'OBrien', 'Byrne', 'Ryan', 'Connor', 'Doyle']
+
+QUERIES = [
+    "Pat",           # prefix
+    "Siobhan Walsh",  # full name
+    "Mihcael",       # transposed letters
+    "Doyel",         # misspelled surname
+    "ciara.ryan",    # email prefix
+    "00012",         # PPS number prefix
+]
+
+
+def seed(db):
+    """Bulk insert benchmark users and candidates in SQL"""
+    db.execute(text("""
+        INSERT INTO app.m_user (first_name, last_name, email_id)
+        SELECT (:first_names)[1 + (i % 10)],
+               (:last_names)[1 + ((i / 10) % 10)] || (i / 100)::text,
+               lower((:first_names)[1 + (i % 10)] || '.' || (:last_names)[1 + ((i / 10) % 10)])
+                   || i::text || '@' || :domain
+        FROM generate_series(1, :n) AS i
+    """), {"first_names": FIRST_NAMES, "last_names": LAST_NAMES, "domain": BENCH_DOMAIN, "n": CANDIDATES})
+    db.execute(text("""
+        INSERT INTO app.m_candidate (candidate_id, pps_number)
+        SELECT user_id, lpad((row_number() OVER ())::text, 7, '0') || 'A'
+        FROM app.m_user
+        WHERE email_id LIKE :pattern
+    """), {"pattern": f"%@{BENCH_DOMAIN}"})
+    db.commit()
+    db.execute(text("ANALYZE app.m_user"))
+    db.execute(text("ANALYZE app.m_candidate"))
+    db.commit()
+
+
+def cleanup(db):
+    db.execute(text("""
+        DELETE FROM app.m_candidate
+        WHERE candidate_id IN (SELECT user_id FROM app.m_user WHERE email_id LIKE :pattern)
+    """), {"pattern": f"%@{BENCH_DOMAIN}"})
+    db.execute(text("DELETE FROM app.m_user WHERE email_id LIKE :pattern"), {"pattern": f"%@{BENCH_DOMAIN}"})
+    db.commit()
+
+
+def benchmark_search():
+    db = SessionLocal()
+
+    try:
+        print(f"📝 Seeding {CANDIDATES} candidates...")
+        seed(db)
+
+        # Warm the index pages before timing
+        for q in QUERIES:
+            crud.search_candidates(db, q, 10)
+            db.rollback()
+
+        all_timings = []
+        for q in QUERIES:
+            timings = []
+            for _ in range(ROUNDS):
+                start = time.perf_counter()
+                results = crud.search_candidates(db, q, 10)
+                timings.append((time.perf_counter() - start) * 1000)
+                db.rollback()
+            all_timings.extend(timings)
+            p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+            top = f"{results[0]['first_name']} {results[0]['last_name']}" if results else "-"
+            print(f"   '{q}': {len(results)} results, median {statistics.median(timings):.2f} ms, "
+                  f"p95 {p95:.2f} ms, top: {top}")
+
+        overall_p95 = sorted(all_timings)[int(len(all_timings) * 0.95) - 1]
+        print(f"\n📊 Overall p95: {overall_p95:.2f} ms")
+        if overall_p95 < 20:
+            print("✅ Search latency within the 20 ms target")
+            return True
+        print("❌ Search latency above the 20 ms target")
+        return False
+
+    except Exception as e:
+        print(f"❌ Benchmark failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            cleanup(db)
+            print("🧹 Cleaned up benchmark data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up benchmark data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = benchmark_search()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the lean timesheet detail read
+
+Seeds one timesheet with 5,000 entries and times a GET /api/timesheets/{id}
+response built two ways:
+  - ORM: the endpoint's previous read (TimesheetEntry entities copied into
+    schemas, kept below as orm_timesheet_detail) plus FastAPI's
+    response_model validation and JSON encoding
+  - lean: crud.get_timesheet_detail_rows (column tuples) serialized by orjson
+Both must produce the same JSON document.
+"""
+
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import crud, models, schemas
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+import orjson
+
+ENTRIES = 5_000
+REPEATS = 5
+BENCH_MONTH = "Timesheet detail benchmark"
+
+
+def seed(db):
+    timesheet_id = db.execute(text("""
+        INSERT INTO app.t_timesheet (timesheet_id, status, month, week)
+        VALUES (gen_random_uuid(), 'Open', :month, 'Week 1')
+        RETURNING timesheet_id
+    """), {"month": BENCH_MONTH}).scalar()
+    db.execute(text("""
+        INSERT INTO app.t_timesheet_entry (
+            timesheet_id, employee_name, employee_code, client_name, filled,
+            standard_hours, rate2_hours, rate3_hours, rate4_hours, rate5_hours,
+            rate6_hours, holiday_hours, bank_holiday_hours
+        )
+        SELECT :timesheet_id, 'Employee ' || i, gen_random_uuid()::text, 'Client ' || (i % 50),
+               i % 3 = 0, 37.5, i % 4, 0, 0, 0, 0, (i % 7)::float, 0
+        FROM generate_series(1, :n) AS i
+    """), {"timesheet_id": timesheet_id, "n": ENTRIES})
+    db.commit()
+    return str(timesheet_id)
+
+
+def cleanup(db):
+    db.execute(text("""
+        DELETE FROM app.t_timesheet_entry
+        WHERE timesheet_id IN (SELECT timesheet_id FROM app.t_timesheet WHERE month = :month)
+    """), {"month": BENCH_MONTH})
+    db.execute(text("DELETE FROM app.t_timesheet WHERE month = :month"), {"month": BENCH_MONTH})
+    db.commit()
+
+
+def orm_timesheet_detail(db, timesheet_id):
+    """The ORM read the endpoint used before get_timesheet_detail_rows"""
+    timesheet = db.query(models.Timesheet).filter(models.Timesheet.timesheet_id == timesheet_id).first()
+    if not timesheet:
+        return None
+
+    # Get existing entries for this timesheet
+    entries = db.query(models.TimesheetEntry).filter(
+        models.TimesheetEntry.timesheet_id == timesheet_id
+    ).all()
+
+    # Convert entries to proper schema objects
+    entry_objects = []
+    for entry in entries:
+        entry_objects.append(schemas.TimesheetEntry(
+            entry_id=entry.entry_id,
+            timesheet_id=entry.timesheet_id,
+            employee_name=entry.employee_name,
+            employee_code=entry.employee_code,
+            client_name=entry.client_name,
+            filled=entry.filled,
+            standard_hours=entry.standard_hours,
+            rate2_hours=entry.rate2_hours,
+            rate3_hours=entry.rate3_hours,
+            rate4_hours=entry.rate4_hours,
+            rate5_hours=entry.rate5_hours,
+            rate6_hours=entry.rate6_hours,
+            holiday_hours=entry.holiday_hours,
+            bank_holiday_hours=entry.bank_holiday_hours,
+            created_on=entry.created_on,
+            updated_on=entry.updated_on
+        ))
+
+    return schemas.TimesheetDetail(
+        timesheet_id=timesheet.timesheet_id,
+        status=timesheet.status,
+        month=timesheet.month,
+        week=timesheet.week,
+        date_range=timesheet.date_range,
+        entries=entry_objects
+    )
+
+
+def orm_response(db, timesheet_id):
+    """What the endpoint did before: ORM read, schema copy, response_model pass, JSON"""
+    detail = orm_timesheet_detail(db, timesheet_id)
+    validated = schemas.TimesheetDetail.model_validate(detail, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def lean_response(db, timesheet_id):
+    return orjson.dumps(crud.get_timesheet_detail_rows(db, timesheet_id))
+
+
+def best_of(build, db, timesheet_id):
+    timings = []
+    for _ in range(REPEATS):
+        db.expire_all()
+        start = time.perf_counter()
+        body = build(db, timesheet_id)
+        timings.append(time.perf_counter() - start)
+        db.rollback()
+    return min(timings), body
+
+
+def benchmark_timesheet_detail():
+    db = SessionLocal()
+
+    try:
+        print(f"📝 Seeding a timesheet with {ENTRIES} entries...")
+        timesheet_id = seed(db)
+
+        orm_time, orm_body = best_of(orm_response, db, timesheet_id)
+        print(f"⏱️ ORM path:  {orm_time * 1000:.1f} ms ({len(orm_body)} bytes)")
+        lean_time, lean_body = best_of(lean_response, db, timesheet_id)
+        print(f"⏱️ Lean path: {lean_time * 1000:.1f} ms ({len(lean_body)} bytes)")
+
+        assert json.loads(orm_body) == json.loads(lean_body), "Response documents differ"
+        print("✅ Responses identical")
+        print(f"📊 Speedup: {orm_time / lean_time:.1f}x")
+        return True
+
+    except Exception as e:
+        print(f"❌ Benchmark failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            cleanup(db)
+            print("🧹 Cleaned up benchmark data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up benchmark data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = benchmark_timesheet_detail()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the timesheet CSV import (services/timesheet_import.py)
+
+Seeds 2,000 candidates with an active placement and a standard contract rate,
+writes a 100,000-row CSV (50 work dates each) to a temporary file, and imports
+it through import_contractor_hours_file. Reports the rows per second and the
+peak Python memory traced during the import, which must stay well below the
+size of the file's rows held as objects.
+"""
+
+import sys
+import os
+import csv
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.services.timesheet_import import import_contractor_hours_file
+from sqlalchemy import text
+
+CANDIDATES = 2000
+DAYS = 50
+FIRST_DAY = date(2093, 1, 2)
+MAX_PEAK_MB = 64
+BENCH_DOMAIN = "timesheet-import-bench.test"
+BENCH_MONTH = "Timesheet import benchmark"
+
+
+def seed(db):
+    params = {"domain": BENCH_DOMAIN, "n": CANDIDATES, "month": BENCH_MONTH}
+    db.execute(text("""
+        INSERT INTO app.m_user (first_name, last_name, email_id)
+        SELECT 'Bench', 'Candidate ' || i, 'candidate' || i || '@' || :domain
+        FROM generate_series(1, :n) AS i
+    """), params)
+    db.execute(text("""
+        INSERT INTO app.m_candidate (candidate_id, holiday_count)
+        SELECT user_id, 0 FROM app.m_user WHERE email_id LIKE '%@' || :domain
+    """), params)
+    client_id = db.execute(text("""
+        INSERT INTO app.m_client (client_id, client_name)
+        VALUES (gen_random_uuid(), :month)
+        RETURNING client_id
+    """), params).scalar()
+    db.execute(text("""
+        INSERT INTO app.p_candidate_client (candidate_id, client_id, status)
+        SELECT user_id, :client_id, 0 FROM app.m_user WHERE email_id LIKE '%@' || :domain
+    """), {**params, "client_id": client_id})
+    db.execute(text("""
+        INSERT INTO app.t_contract_rates (pcc_id, rate_type, rate_frequency, pay_rate, bill_rate)
+        SELECT pcc_id, 1, 1, 20, 30 FROM app.p_candidate_client WHERE client_id = :client_id
+    """), {"client_id": client_id})
+    timesheet_id = db.execute(text("""
+        INSERT INTO app.t_timesheet (timesheet_id, status, month)
+        VALUES (gen_random_uuid(), 'benchmark', :month)
+        RETURNING timesheet_id
+    """), params).scalar()
+    emails = [row[0] for row in db.execute(text(
+        "SELECT email_id FROM app.m_user WHERE email_id LIKE '%@' || :domain ORDER BY email_id"
+    ), params)]
+    db.commit()
+    return str(timesheet_id), emails
+
+
+def write_csv(path, emails):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Email", "Work Date", "1-1"])
+        for day in range(DAYS):
+            work_date = (FIRST_DAY + timedelta(days=day)).isoformat()
+            for email in emails:
+                writer.writerow([email, work_date, 8])
+
+
+def cleanup(db):
+    params = {"pattern": f"%@{BENCH_DOMAIN}", "month": BENCH_MONTH}
+    candidates = "SELECT user_id FROM app.m_user WHERE email_id LIKE :pattern"
+    db.execute(text(f"DELETE FROM app.t_holiday_balance WHERE candidate_id IN ({candidates})"), params)
+    db.execute(text(f"DELETE FROM app.t_holiday_ledger WHERE candidate_id IN ({candidates})"), params)
+    db.execute(text(f"DELETE FROM app.t_payroll_dirty_contractor WHERE contractor_id IN ({candidates})"), params)
+    db.execute(text(f"""
+        DELETE FROM app.t_contractor_rate_hours
+        WHERE tch_id IN (SELECT tch_id FROM app.t_contractor_hours WHERE contractor_id IN ({candidates}))
+    """), params)
+    db.execute(text(f"DELETE FROM app.t_contractor_hours WHERE contractor_id IN ({candidates})"), params)
+    db.execute(text("DELETE FROM app.t_timesheet WHERE month = :month"), params)
+    db.execute(text(f"""
+        DELETE FROM app.t_contract_rates
+        WHERE pcc_id IN (SELECT pcc_id FROM app.p_candidate_client WHERE candidate_id IN ({candidates}))
+    """), params)
+    db.execute(text(f"DELETE FROM app.p_candidate_client WHERE candidate_id IN ({candidates})"), params)
+    db.execute(text("DELETE FROM app.m_client WHERE client_name = :month"), params)
+    db.execute(text(f"DELETE FROM app.m_candidate WHERE candidate_id IN ({candidates})"), params)
+    db.execute(text("DELETE FROM app.m_user WHERE email_id LIKE :pattern"), params)
+    db.commit()
+
+
+def benchmark_timesheet_import():
+    db = SessionLocal()
+    path = os.path.join(tempfile.gettempdir(), "benchmark_timesheet_import.csv")
+
+    try:
+        print(f"📝 Seeding {CANDIDATES} candidates and a {CANDIDATES * DAYS}-row CSV...")
+        timesheet_id, emails = seed(db)
+        write_csv(path, emails)
+        print(f"   CSV size: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            result = import_contractor_hours_file(db, timesheet_id, f, "benchmark.csv")
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        imported_ok = result['imported'] == CANDIDATES * DAYS and result['failed'] == 0
+        print(f"{'✅' if imported_ok else '❌'} Imported {result['imported']} rows "
+              f"({result['failed']} failed) in {elapsed:.1f}s ({result['imported'] / elapsed:.0f} rows/s)")
+        peak_mb = peak / 1024 / 1024
+        memory_ok = peak_mb < MAX_PEAK_MB
+        print(f"{'✅' if memory_ok else '❌'} Peak traced memory: {peak_mb:.1f} MB (limit {MAX_PEAK_MB} MB)")
+
+        return imported_ok and memory_ok
+
+    except Exception as e:
+        print(f"❌ Benchmark failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+            cleanup(db)
+            print("🧹 Cleaned up benchmark data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up benchmark data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = benchmark_timesheet_import()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for contractor hours delta sync (crud.list_contractor_hours_changes)
+
+Saves three days of hours for a test candidate and checks that:
+  - a call without a watermark is a full load of the live rows
+  - polling with the returned watermark sends only rows written since
+  - soft-deleted rows come back as deleted ids
+  - a row written by a transaction that was still open during a poll, and
+    committed afterwards, is sent by the next poll however long it ran
+  - a row moved to another timesheet comes back as deleted for the old one
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import crud, models, schemas
+from sqlalchemy import text
+from sqlalchemy.sql import func
+from uuid import uuid4
+
+FIRST_DAY = date(2025, 4, 7)
+
+
+def test_contractor_hours_sync():
+    db = SessionLocal()
+    writer = SessionLocal()
+    candidate_id = str(uuid4())
+    timesheet_id = str(uuid4())
+    other_timesheet_id = str(uuid4())
+
+    try:
+        print("🧪 Testing contractor hours delta sync...")
+
+        db.add(models.MUser(user_id=candidate_id, first_name="Sync", last_name="Candidate",
+                            email_id="sync-candidate@example.com"))
+        db.add(models.Timesheet(timesheet_id=timesheet_id, status="test", month="Contractor hours sync test"))
+        db.add(models.Timesheet(timesheet_id=other_timesheet_id, status="test", month="Contractor hours sync test"))
+        db.commit()
+        rows = crud.upsert_contractor_hours(db, [
+            schemas.ContractorHoursUpsert(contractor_id=candidate_id, timesheet_id=timesheet_id,
+                                          work_date=FIRST_DAY + timedelta(days=day), standard_hours=8.0)
+            for day in range(3)
+        ])
+        tch_ids = [row.tch_id for row in rows]
+
+        # Test 1: Full load
+        print("\n🧪 Test 1: Full load")
+        full = crud.list_contractor_hours_changes(db, timesheet_id)
+        db.commit()
+        assert full['full'] and len(full['changed']) == 3 and not full['deleted'], f"Unexpected full load: {full}"
+        watermark = full['watermark']
+        print(f"✅ {len(full['changed'])} rows, watermark {watermark}")
+
+        # Test 2: Nothing written since the watermark
+        print("\n🧪 Test 2: Polling without changes")
+        delta = crud.list_contractor_hours_changes(db, timesheet_id, watermark)
+        db.commit()
+        assert not delta['changed'] and not delta['deleted'], f"Expected no changes: {delta}"
+        watermark = delta['watermark']
+        print("✅ No rows sent")
+
+        # Test 3: An edit and a soft delete
+        print("\n🧪 Test 3: Editing one row and soft-deleting another")
+        crud.upsert_contractor_hours(db, [schemas.ContractorHoursUpsert(tch_id=tch_ids[0], standard_hours=6.0)])
+        db.query(models.ContractorHours).filter(models.ContractorHours.tch_id == tch_ids[1]).update(
+            {models.ContractorHours.deleted_on: func.now()}, synchronize_session=False)
+        db.commit()
+        delta = crud.list_contractor_hours_changes(db, timesheet_id, watermark)
+        db.commit()
+        assert [row.tch_id for row in delta['changed']] == [tch_ids[0]], f"Unexpected changed rows: {delta['changed']}"
+        assert delta['changed'][0].standard_hours == 6.0, "Edit not returned"
+        assert delta['deleted'] == [tch_ids[1]], f"Unexpected deleted rows: {delta['deleted']}"
+        watermark = delta['watermark']
+        print("✅ 1 changed, 1 deleted")
+
+        # Test 4: A write that commits after a poll that ran while it was open
+        print("\n🧪 Test 4: Long-running write transaction")
+        writer.execute(text("UPDATE app.t_contractor_hours SET standard_hours = 4.0, updated_on = NOW() WHERE tch_id = :tch_id"),
+                       {"tch_id": str(tch_ids[2])})
+        during = crud.list_contractor_hours_changes(db, timesheet_id, watermark)
+        db.commit()
+        assert not during['changed'], "Uncommitted row was sent"
+        writer.commit()
+        after = crud.list_contractor_hours_changes(db, timesheet_id, during['watermark'])
+        db.commit()
+        assert [row.tch_id for row in after['changed']] == [tch_ids[2]], "Row committed after the poll was missed"
+        watermark = after['watermark']
+        print("✅ Row sent by the next poll")
+
+        # Test 5: A row moved to another timesheet
+        print("\n🧪 Test 5: Moving a row to another timesheet")
+        crud.upsert_contractor_hours(db, [schemas.ContractorHoursUpsert(tch_id=tch_ids[0], timesheet_id=other_timesheet_id)])
+        moved = crud.list_contractor_hours_changes(db, timesheet_id, watermark)
+        db.commit()
+        assert tch_ids[0] in moved['deleted'] and not moved['changed'], f"Moved row not deleted: {moved}"
+        print("✅ Moved row sent as deleted")
+
+        print("\n🎉 All contractor hours sync tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        writer.rollback()
+        return False
+
+    finally:
+        try:
+            params = {"candidate_id": candidate_id, "timesheet_id": timesheet_id,
+                      "other_timesheet_id": other_timesheet_id}
+            db.execute(text("DELETE FROM app.t_holiday_balance WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_holiday_ledger WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_payroll_dirty_contractor WHERE contractor_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_contractor_hours WHERE contractor_id = :candidate_id"), params)
+            db.execute(text("""
+                DELETE FROM app.t_contractor_hours_removed WHERE timesheet_id IN (:timesheet_id, :other_timesheet_id)
+            """), params)
+            db.execute(text("DELETE FROM app.t_timesheet WHERE timesheet_id IN (:timesheet_id, :other_timesheet_id)"), params)
+            db.execute(text("DELETE FROM app.m_user WHERE user_id = :candidate_id"), params)
+            db.commit()
+            print("🧹 Cleaned up test data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up test data: {e}")
+        finally:
+            writer.close()
+            db.close()
+
+
+if __name__ == "__main__":
+    success = test_contractor_hours_sync()
+    sys.exit(0 if success else 1)
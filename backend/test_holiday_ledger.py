@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test script for the holiday ledger
+
+Saves contractor hours and rate hours for a test candidate through crud and
+checks that:
+  - accrual (8% of standard hours) and usage entries are appended to t_holiday_ledger
+  - re-saving unchanged hours appends nothing, edits append only the difference
+  - t_holiday_balance and the holiday summary follow the ledger
+  - m_candidate.holiday_count does not: only timesheet entries feed it
+  - the balance can be rebuilt for past dates
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import crud, models, schemas
+from sqlalchemy import text
+from uuid import uuid4
+from datetime import date
+
+HOLIDAY_RATE_TYPE_ID = 990046
+FIRST_DAY = date(2025, 3, 3)
+SECOND_DAY = date(2025, 3, 10)
+
+
+def ledger_entries(db, candidate_id):
+    return db.query(models.HolidayLedgerEntry).filter(
+        models.HolidayLedgerEntry.candidate_id == candidate_id
+    ).order_by(models.HolidayLedgerEntry.entry_id).all()
+
+
+def balance(db, candidate_id):
+    db.expire_all()
+    return db.query(models.HolidayBalance).filter(
+        models.HolidayBalance.candidate_id == candidate_id,
+        models.HolidayBalance.source == 'contractor_hours'
+    ).first()
+
+
+def close(a, b):
+    return abs(a - b) < 1e-6
+
+
+def test_holiday_ledger():
+    db = SessionLocal()
+    candidate_id = str(uuid4())
+    client_id = str(uuid4())
+    timesheet_id = str(uuid4())
+
+    try:
+        print("🧪 Testing holiday ledger...")
+
+        db.add(models.MUser(user_id=candidate_id, first_name="Ledger", last_name="Candidate",
+                            email_id="ledger-candidate@example.com"))
+        db.add(models.Client(client_id=client_id, client_name="Ledger Test Client"))
+        db.add(models.Timesheet(timesheet_id=timesheet_id, status="test", month="Holiday ledger test"))
+        db.add(models.RateType(rate_type_id=HOLIDAY_RATE_TYPE_ID, rate_type_name="Holiday (ledger test)"))
+        db.flush()
+        db.add(models.Candidate(candidate_id=candidate_id, holiday_count=0.0))
+        db.add(models.P_CandidateClient(candidate_id=candidate_id, client_id=client_id, status=0))
+        db.commit()
+
+        # Test 1: 40 standard hours accrue 3.2 hours of holiday
+        print("\n🧪 Test 1: Saving 40 standard hours")
+        saved = crud.upsert_contractor_hours(db, [schemas.ContractorHoursUpsert(
+            contractor_id=candidate_id, work_date=FIRST_DAY, timesheet_id=timesheet_id, standard_hours=40.0,
+            rate_hours=[schemas.ContractorRateHoursCreate(rate_type_id=1, rate_frequency_id=1, tcr_id=0, quantity=40.0)]
+        )])
+        tch_id = saved[0].tch_id
+        entries = ledger_entries(db, candidate_id)
+        assert len(entries) == 1 and entries[0].entry_type == 'accrual', f"Unexpected entries: {entries}"
+        assert close(entries[0].holiday_hours, 3.2), f"Expected 3.2, got {entries[0].holiday_hours}"
+        print(f"✅ Accrual entry written: {entries[0].holiday_hours}")
+
+        # Test 2: Re-saving without a change to the counted hours appends nothing
+        print("\n🧪 Test 2: Re-saving the same hours")
+        crud.upsert_contractor_hours(db, [schemas.ContractorHoursUpsert(tch_id=tch_id, status="submitted")])
+        assert len(ledger_entries(db, candidate_id)) == 1, "Re-save must not add ledger entries"
+        print("✅ No new entries")
+
+        # Test 3: Lowering the standard rate hours to 30 reverses 0.8 hours of accrual
+        print("\n🧪 Test 3: Editing standard hours 40 -> 30")
+        standard_rate = crud.get_contractor_rate_hours_by_tch_id(db, tch_id)[0]
+        crud.update_contractor_rate_hours(db, standard_rate.tcrh_id, schemas.ContractorRateHoursUpdate(quantity=30.0))
+        entries = ledger_entries(db, candidate_id)
+        assert len(entries) == 2 and close(entries[-1].holiday_hours, -0.8), f"Unexpected delta: {entries[-1].holiday_hours}"
+        print(f"✅ Delta entry written: {entries[-1].holiday_hours}")
+
+        # Test 4: 8 holiday hours a week later are recorded as usage
+        print("\n🧪 Test 4: Taking 8 holiday hours")
+        later = crud.upsert_contractor_hours(db, [schemas.ContractorHoursUpsert(
+            contractor_id=candidate_id, work_date=SECOND_DAY, timesheet_id=timesheet_id,
+            rate_hours=[schemas.ContractorRateHoursCreate(
+                rate_type_id=HOLIDAY_RATE_TYPE_ID, rate_frequency_id=1, tcr_id=0, quantity=8.0)]
+        )])
+        current = balance(db, candidate_id)
+        assert close(current.hours_worked, 30.0), f"Expected 30 hours worked, got {current.hours_worked}"
+        assert close(current.total_holiday, 2.4), f"Expected 2.4 accrued, got {current.total_holiday}"
+        assert close(current.holiday_taken, 8.0), f"Expected 8 taken, got {current.holiday_taken}"
+        assert close(current.holiday_balance, -5.6), f"Expected -5.6, got {current.holiday_balance}"
+        print(f"✅ Balance: worked={current.hours_worked}, accrued={current.total_holiday}, "
+              f"taken={current.holiday_taken}, balance={current.holiday_balance}")
+
+        # Test 5: The summary follows the ledger; holiday_count only follows timesheet entries
+        print("\n🧪 Test 5: holiday_count and summary")
+        candidate = db.query(models.Candidate).filter(models.Candidate.candidate_id == candidate_id).first()
+        timesheet_total = sum(entry.holiday_hours for entry in ledger_entries(db, candidate_id)
+                              if entry.source in ('timesheet_entry', 'opening'))
+        assert close(candidate.holiday_count, timesheet_total), \
+            f"holiday_count {candidate.holiday_count} != timesheet ledger {timesheet_total}"
+        assert close(candidate.holiday_count, 0.0), f"Contractor hours moved holiday_count to {candidate.holiday_count}"
+        summary = {row['user_id']: row for row in crud.get_holiday_summary_for_active_candidates(db)}
+        assert close(summary[candidate_id]['holiday_balance'], -5.6), f"Summary mismatch: {summary[candidate_id]}"
+        print(f"✅ holiday_count={candidate.holiday_count}, summary balance={summary[candidate_id]['holiday_balance']}")
+
+        # Test 6: Balances for past dates
+        print("\n🧪 Test 6: Rebuilding past balances")
+        before = crud.get_holiday_balance_as_of(db, candidate_id, date(2025, 3, 1), 'contractor_hours')
+        after_first = crud.get_holiday_balance_as_of(db, candidate_id, FIRST_DAY, 'contractor_hours')
+        after_second = crud.get_holiday_balance_as_of(db, candidate_id, SECOND_DAY, 'contractor_hours')
+        assert before['entries'] == 0 and close(before['holiday_balance'], 0.0)
+        assert close(after_first['holiday_balance'], 2.4), f"Expected 2.4, got {after_first['holiday_balance']}"
+        assert close(after_second['holiday_balance'], -5.6), f"Expected -5.6, got {after_second['holiday_balance']}"
+        print(f"✅ Balances: {before['holiday_balance']} -> {after_first['holiday_balance']} -> {after_second['holiday_balance']}")
+
+        # Test 7: Soft-deleting the holiday rate hours reverses the usage
+        print("\n🧪 Test 7: Removing the holiday hours")
+        crud.delete_all_contractor_rate_hours_for_tch(db, later[0].tch_id, candidate_id)
+        assert close(balance(db, candidate_id).holiday_balance, 2.4), "Usage was not reversed"
+        print("✅ Usage reversed")
+
+        print("\n🎉 All holiday ledger tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            params = {"candidate_id": candidate_id, "client_id": client_id, "timesheet_id": timesheet_id}
+            db.execute(text("DELETE FROM app.t_holiday_balance WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_holiday_ledger WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_payroll_dirty_contractor WHERE contractor_id = :candidate_id"), params)
+            db.execute(text("""
+                DELETE FROM app.t_contractor_rate_hours
+                WHERE tch_id IN (SELECT tch_id FROM app.t_contractor_hours WHERE contractor_id = :candidate_id)
+            """), params)
+            db.execute(text("DELETE FROM app.t_contractor_hours WHERE contractor_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_timesheet WHERE timesheet_id = :timesheet_id"), params)
+            db.execute(text("DELETE FROM app.p_candidate_client WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.m_client WHERE client_id = :client_id"), params)
+            db.execute(text("DELETE FROM app.m_rate_type WHERE rate_type_id = :rate_type_id"),
+                       {"rate_type_id": HOLIDAY_RATE_TYPE_ID})
+            db.execute(text("DELETE FROM app.m_candidate WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.m_user WHERE user_id = :candidate_id"), params)
+            db.commit()
+            print("🧹 Cleaned up test data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up test data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = test_holiday_ledger()
+    sys.exit(0 if success else 1)
@@ -101,6 +101,8 @@ def test_holiday_tracking():
     finally:
         # Clean up test data
         try:
+            db.query(models.HolidayBalance).filter(models.HolidayBalance.candidate_id == test_candidate_id).delete()
+            db.query(models.HolidayLedgerEntry).filter(models.HolidayLedgerEntry.candidate_id == test_candidate_id).delete()
             db.query(models.Candidate).filter(models.Candidate.candidate_id == test_candidate_id).delete()
             db.query(models.MUser).filter(models.MUser.user_id == test_candidate_id).delete()
             db.commit()
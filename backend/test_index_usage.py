@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Test script for the foreign key / soft-delete indexes
+
+Seeds placements, contract rates, timesheet entries, contractor hours, rate
+hours, invoices and line items (a share of each soft-deleted), ANALYZEs the
+tables and EXPLAINs the hot lookups exactly as the ORM compiles them. Every
+plan must read its table through an index (Index Scan, Index Only Scan or
+Bitmap Index Scan) and never through a sequential scan.
+"""
+
+import sys
+import os
+from datetime import date
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import models
+from app.services.contractor_hours_partitions import ContractorHoursPartitionManager, partition_name
+from sqlalchemy import text
+
+CANDIDATES = 2_000
+CLIENTS = 50
+TIMESHEETS = 20
+DAYS = 60
+YEAR = 2096
+TEST_DOMAIN = "index-usage.test"
+TEST_MONTH = "Index usage test"
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+SEEDED_TABLES = ['m_user', 'm_client', 'p_candidate_client', 't_contract_rates', 't_timesheet',
+                 't_timesheet_entry', 't_contractor_hours', 't_contractor_rate_hours',
+                 't_invoice', 'p_invoice_line_items']
+
+
+def seed(db):
+    """Bulk insert a realistic spread of rows, with some placements, rates, rate hours and line items soft-deleted"""
+    ContractorHoursPartitionManager(db).ensure_partition(YEAR)
+    params = {"domain": TEST_DOMAIN, "pattern": f"%@{TEST_DOMAIN}", "month": TEST_MONTH}
+
+    db.execute(text("""
+        INSERT INTO app.m_user (first_name, last_name, email_id)
+        SELECT 'Index', 'Candidate ' || i, 'candidate' || i || '@' || :domain
+        FROM generate_series(1, :n) AS i
+    """), dict(params, n=CANDIDATES))
+    db.execute(text("""
+        INSERT INTO app.m_client (client_name, email)
+        SELECT 'Index Client ' || i, 'client' || i || '@' || :domain
+        FROM generate_series(1, :n) AS i
+    """), dict(params, n=CLIENTS))
+    # Two placements per candidate
+    db.execute(text("""
+        INSERT INTO app.p_candidate_client (candidate_id, client_id, status, deleted_on)
+        SELECT u.user_id, c.client_id, 0, CASE WHEN (u.rn + p) % 10 = 0 THEN now() END
+        FROM (SELECT user_id, row_number() OVER () AS rn FROM app.m_user WHERE email_id LIKE :pattern) u
+        CROSS JOIN generate_series(0, 1) AS p
+        JOIN (SELECT client_id, row_number() OVER () - 1 AS cn FROM app.m_client WHERE email LIKE :pattern) c
+          ON c.cn = (u.rn + p * 7) % :clients
+    """), dict(params, clients=CLIENTS))
+    db.execute(text("""
+        INSERT INTO app.t_contract_rates (pcc_id, pay_rate, bill_rate, date_applicable, deleted_on)
+        SELECT pcc.pcc_id, 20 + r, 30 + r, make_date(:year, 1, 1), CASE WHEN r = 2 THEN now() END
+        FROM app.p_candidate_client pcc
+        JOIN app.m_user u ON u.user_id = pcc.candidate_id
+        CROSS JOIN generate_series(0, 2) AS r
+        WHERE u.email_id LIKE :pattern
+    """), dict(params, year=YEAR))
+    db.execute(text("""
+        INSERT INTO app.t_timesheet (timesheet_id, status, month, week)
+        SELECT gen_random_uuid(), 'Open', :month, 'Week ' || i
+        FROM generate_series(1, :n) AS i
+    """), dict(params, n=TIMESHEETS))
+    timesheets = "SELECT timesheet_id, row_number() OVER () - 1 AS tn FROM app.t_timesheet WHERE month = :month"
+    db.execute(text(f"""
+        INSERT INTO app.t_timesheet_entry (timesheet_id, employee_name, employee_code, client_name)
+        SELECT t.timesheet_id, u.last_name, u.user_id::text, 'Index Client'
+        FROM app.m_user u
+        CROSS JOIN ({timesheets}) t
+        WHERE u.email_id LIKE :pattern
+    """), params)
+    db.execute(text(f"""
+        INSERT INTO app.t_contractor_hours (contractor_id, work_date, timesheet_id, pcc_id, standard_hours, standard_pay_rate)
+        SELECT pcc.candidate_id, make_date(:year, 1, 1) + d, t.timesheet_id, pcc.pcc_id, 8.0, 25.0
+        FROM app.p_candidate_client pcc
+        JOIN app.m_user u ON u.user_id = pcc.candidate_id
+        CROSS JOIN generate_series(0, :days - 1) AS d
+        JOIN ({timesheets}) t ON t.tn = d % :timesheets
+        WHERE u.email_id LIKE :pattern AND pcc.deleted_on IS NULL
+    """), dict(params, year=YEAR, days=DAYS, timesheets=TIMESHEETS))
+    db.execute(text("""
+        INSERT INTO app.t_contractor_rate_hours (tch_id, rate_frequency_id, rate_type_id, tcr_id, quantity, pay_rate, deleted_on)
+        SELECT h.tch_id, 1, 1, 0, 2.0, 30.0, CASE WHEN extract(day FROM h.work_date) = 1 THEN now() END
+        FROM app.t_contractor_hours h
+        JOIN app.m_user u ON u.user_id = h.contractor_id
+        WHERE u.email_id LIKE :pattern AND extract(isodow FROM h.work_date) = 1
+    """), params)
+    db.execute(text("""
+        INSERT INTO app.t_invoice (pcc_id, status, amount, invoice_date)
+        SELECT pcc.pcc_id, 'draft', 100.0, make_date(:year, 1, 1) + w * 7
+        FROM app.p_candidate_client pcc
+        JOIN app.m_user u ON u.user_id = pcc.candidate_id
+        CROSS JOIN generate_series(0, 3) AS w
+        WHERE u.email_id LIKE :pattern
+    """), dict(params, year=YEAR))
+    db.execute(text("""
+        INSERT INTO app.p_invoice_line_items (invoice_id, type, quantity, rate, total, deleted_on)
+        SELECT i.invoice_id, l, 8.0, 25.0, 200.0, CASE WHEN l = 4 THEN now() END
+        FROM app.t_invoice i
+        JOIN app.p_candidate_client pcc ON pcc.pcc_id = i.pcc_id
+        JOIN app.m_user u ON u.user_id = pcc.candidate_id
+        CROSS JOIN generate_series(0, 4) AS l
+        WHERE u.email_id LIKE :pattern
+    """), params)
+    db.commit()
+    for table in SEEDED_TABLES:
+        db.execute(text(f"ANALYZE app.{table}"))
+    db.commit()
+
+
+def cleanup(db):
+    params = {"pattern": f"%@{TEST_DOMAIN}", "month": TEST_MONTH}
+    candidates = "SELECT user_id FROM app.m_user WHERE email_id LIKE :pattern"
+    placements = f"SELECT pcc_id FROM app.p_candidate_client WHERE candidate_id IN ({candidates})"
+    db.execute(text(f"""
+        DELETE FROM app.p_invoice_line_items
+        WHERE invoice_id IN (SELECT invoice_id FROM app.t_invoice WHERE pcc_id IN ({placements}))
+    """), params)
+    db.execute(text(f"DELETE FROM app.t_invoice WHERE pcc_id IN ({placements})"), params)
+    db.execute(text(f"""
+        DELETE FROM app.t_contractor_rate_hours
+        WHERE tch_id IN (SELECT tch_id FROM app.t_contractor_hours WHERE contractor_id IN ({candidates}))
+    """), params)
+    db.execute(text(f"DELETE FROM app.t_contractor_hours WHERE contractor_id IN ({candidates})"), params)
+    db.execute(text("""
+        DELETE FROM app.t_timesheet_entry
+        WHERE timesheet_id IN (SELECT timesheet_id FROM app.t_timesheet WHERE month = :month)
+    """), params)
+    db.execute(text("DELETE FROM app.t_timesheet WHERE month = :month"), params)
+    db.execute(text(f"DELETE FROM app.t_contract_rates WHERE pcc_id IN ({placements})"), params)
+    db.execute(text(f"DELETE FROM app.p_candidate_client WHERE candidate_id IN ({candidates})"), params)
+    db.execute(text("DELETE FROM app.m_client WHERE email LIKE :pattern"), params)
+    db.execute(text("DELETE FROM app.m_user WHERE email_id LIKE :pattern"), params)
+    db.commit()
+
+    manager = ContractorHoursPartitionManager(db)
+    if partition_name(YEAR) in {partition['name'] for partition in manager.list_partitions()}:
+        manager.detach_partition(YEAR)
+        db.execute(text(f'DROP TABLE IF EXISTS app."{partition_name(YEAR)}"'))
+        db.commit()
+
+
+def sample(db):
+    """One live key of each kind to look up"""
+    row = db.execute(text("""
+        SELECT pcc.pcc_id, pcc.candidate_id, pcc.client_id, h.tch_id, h.timesheet_id, i.invoice_id
+        FROM app.p_candidate_client pcc
+        JOIN app.m_user u ON u.user_id = pcc.candidate_id
+        JOIN app.t_contractor_hours h ON h.pcc_id = pcc.pcc_id AND extract(isodow FROM h.work_date) = 1
+        JOIN app.t_invoice i ON i.pcc_id = pcc.pcc_id
+        WHERE u.email_id LIKE :pattern AND pcc.deleted_on IS NULL
+        LIMIT 1
+    """), {"pattern": f"%@{TEST_DOMAIN}"}).fetchone()
+    pcc_ids = [r[0] for r in db.execute(text("""
+        SELECT pcc_id FROM app.p_candidate_client WHERE candidate_id = :candidate_id
+    """), {"candidate_id": row.candidate_id}).fetchall()]
+    return row, pcc_ids
+
+
+def hot_queries(db, row, pcc_ids):
+    """(label, table, ORM query) for the lookups the indexes are meant to serve"""
+    ch = models.ContractorHours
+    return [
+        ("Hours by timesheet", "t_contractor_hours",
+         db.query(ch).filter(ch.timesheet_id == row.timesheet_id).filter(ch.deleted_on.is_(None))),
+        ("Hours changed in a timesheet since a watermark (delta sync)", "t_contractor_hours",
+         db.query(ch).filter(ch.timesheet_id == row.timesheet_id).filter(
+             ch.change_xid >= db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar())),
+        ("Hours by contractor, in date order", "t_contractor_hours",
+         db.query(ch).filter(ch.contractor_id == row.candidate_id, ch.deleted_on.is_(None)).order_by(ch.work_date)),
+        ("Hours by placement for a month", "t_contractor_hours",
+         db.query(ch).filter(ch.pcc_id == row.pcc_id, ch.work_date.between(date(YEAR, 2, 1), date(YEAR, 2, 28)))),
+        ("Rate hours by tch_id", "t_contractor_rate_hours",
+         db.query(models.ContractorRateHours).filter(
+             models.ContractorRateHours.tch_id == row.tch_id,
+             models.ContractorRateHours.deleted_on.is_(None))),
+        ("Invoice line items", "p_invoice_line_items",
+         db.query(models.InvoiceLineItem).filter(
+             models.InvoiceLineItem.invoice_id == row.invoice_id,
+             models.InvoiceLineItem.deleted_on.is_(None))),
+        ("Contract rates by placement", "t_contract_rates",
+         db.query(models.ContractRate)
+         .filter(models.ContractRate.pcc_id == row.pcc_id)
+         .filter(models.ContractRate.deleted_on.is_(None))
+         .order_by(models.ContractRate.created_on.desc())),
+        ("Contract rates by placements", "t_contract_rates",
+         db.query(models.ContractRate)
+         .filter(models.ContractRate.pcc_id.in_(pcc_ids))
+         .filter(models.ContractRate.deleted_on.is_(None))),
+        ("Placements by candidate", "p_candidate_client",
+         db.query(models.P_CandidateClient)
+         .filter(models.P_CandidateClient.candidate_id == row.candidate_id)
+         .filter(models.P_CandidateClient.deleted_on.is_(None))),
+        ("Active placement for candidate and client", "p_candidate_client",
+         db.query(models.P_CandidateClient)
+         .filter(models.P_CandidateClient.candidate_id == row.candidate_id)
+         .filter(models.P_CandidateClient.client_id == row.client_id)
+         .filter(models.P_CandidateClient.status == 0)
+         .filter(models.P_CandidateClient.deleted_on.is_(None))),
+        ("Timesheet entries", "t_timesheet_entry",
+         db.query(models.TimesheetEntry).filter(models.TimesheetEntry.timesheet_id == row.timesheet_id)),
+    ]
+
+
+def bitmap_indexes(plan):
+    """Index names under a Bitmap Heap Scan (through BitmapAnd/BitmapOr)"""
+    if plan.get("Node Type") == "Bitmap Index Scan":
+        return [plan["Index Name"]]
+    return [name for child in plan.get("Plans", []) for name in bitmap_indexes(child)]
+
+
+def table_scans(plan, table):
+    """(node type, index name) of every plan node reading the table or one of its partitions"""
+    scans = []
+    if plan.get("Relation Name", "").startswith(table):
+        if plan["Node Type"] == "Bitmap Heap Scan":
+            scans.extend(("Bitmap Index Scan", name) for name in bitmap_indexes(plan))
+        else:
+            scans.append((plan["Node Type"], plan.get("Index Name")))
+    for child in plan.get("Plans", []):
+        scans.extend(table_scans(child, table))
+    return scans
+
+
+def explain(db, query):
+    """EXPLAIN the statement exactly as the ORM compiles it for this database"""
+    compiled = query.statement.compile(dialect=db.bind.dialect, compile_kwargs={"render_postcompile": True})
+    plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+    return plan[0]["Plan"]
+
+
+def test_index_usage():
+    db = SessionLocal()
+
+    try:
+        print(f"📝 Seeding {CANDIDATES} candidates with placements, rates, hours and invoices...")
+        seed(db)
+        row, pcc_ids = sample(db)
+
+        failures = 0
+        for label, table, query in hot_queries(db, row, pcc_ids):
+            scans = table_scans(explain(db, query), table)
+            node_types = {node_type for node_type, _ in scans}
+            indexes = sorted({index for _, index in scans if index})
+            if scans and "Seq Scan" not in node_types and node_types & INDEX_SCANS:
+                print(f"✅ {label}: {', '.join(indexes)}")
+            else:
+                failures += 1
+                print(f"❌ {label}: {sorted(node_types) or 'table not scanned'}")
+
+        if failures:
+            print(f"❌ {failures} hot queries are not served by an index")
+            return False
+        print("✅ All hot queries use index scans")
+        return True
+
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            db.rollback()
+            cleanup(db)
+            print("🧹 Cleaned up test data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up test data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = test_index_usage()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for the number of queries issued by a payroll calculation
+
+Calculates two payroll periods, one with few contractors and one with many, and
+counts the SQL statements PayrollCalculator sends for each. Contractor details
+are prefetched in one joined query, so both periods must need the same number
+of statements (payroll runs are upserted in batches of 1000, so counts stay
+constant up to that many contractors).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, engine
+from app.services.payroll_calculator import PayrollCalculator
+from sqlalchemy import event, text
+
+SMALL = 5
+LARGE = 300
+YEAR = 2098
+TEST_DOMAIN = "payroll-query-count.test"
+TEST_PERIOD_PREFIX = "Payroll query count test"
+
+
+class QueryCounter:
+    """Counts statements executed on the engine while active"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._count)
+
+
+def seed_period(db, name, month, contractors):
+    """Period with one week of hours for its own contractors; every other one is also a candidate"""
+    db.execute(text("""
+        INSERT INTO app.m_user (first_name, last_name, email_id)
+        SELECT 'Query', 'Count ' || i, :name_key || '-' || i || '@' || :domain
+        FROM generate_series(1, :n) AS i
+    """), {"name_key": month, "domain": TEST_DOMAIN, "n": contractors})
+    db.execute(text("""
+        INSERT INTO app.m_candidate (candidate_id, pps_number)
+        SELECT user_id, lpad(row_number() OVER ()::text, 7, '0') || 'Q'
+        FROM app.m_user
+        WHERE email_id LIKE :pattern AND right(split_part(email_id, '@', 1), 1) IN ('0', '2', '4', '6', '8')
+    """), {"pattern": f"{month}-%@{TEST_DOMAIN}"})
+    timesheet_id = db.execute(text("""
+        INSERT INTO app.t_timesheet (timesheet_id, status, month)
+        VALUES (gen_random_uuid(), 'test', :month)
+        RETURNING timesheet_id
+    """), {"month": TEST_PERIOD_PREFIX}).scalar()
+    db.execute(text("""
+        INSERT INTO app.t_contractor_hours (
+            contractor_id, work_date, timesheet_id, standard_hours, standard_pay_rate
+        )
+        SELECT u.user_id, d::date, :timesheet_id, 8.0, 25.0
+        FROM app.m_user u
+        CROSS JOIN generate_series(make_date(:year, :month, 1), make_date(:year, :month, 7), interval '1 day') AS d
+        WHERE u.email_id LIKE :pattern
+    """), {"timesheet_id": timesheet_id, "year": YEAR, "month": month, "pattern": f"{month}-%@{TEST_DOMAIN}"})
+    period_id = db.execute(text("""
+        INSERT INTO app.t_payroll_period (period_name, start_date, end_date, status)
+        VALUES (:name, make_date(:year, :month, 1), make_date(:year, :month, 28), 'draft')
+        RETURNING period_id
+    """), {"name": f"{TEST_PERIOD_PREFIX} {name}", "year": YEAR, "month": month}).scalar()
+    db.commit()
+    return str(period_id)
+
+
+def cleanup(db):
+    params = {"pattern": f"%@{TEST_DOMAIN}", "prefix": f"{TEST_PERIOD_PREFIX}%"}
+    periods = "SELECT period_id FROM app.t_payroll_period WHERE period_name LIKE :prefix"
+    users = "SELECT user_id FROM app.m_user WHERE email_id LIKE :pattern"
+    db.execute(text(f"DELETE FROM app.t_payroll_dirty_contractor WHERE period_id IN ({periods})"), params)
+    db.execute(text(f"DELETE FROM app.t_payroll_run WHERE period_id IN ({periods})"), params)
+    db.execute(text(f"DELETE FROM app.t_payroll_summary WHERE period_id IN ({periods})"), params)
+    db.execute(text("DELETE FROM app.t_payroll_period WHERE period_name LIKE :prefix"), params)
+    db.execute(text(f"DELETE FROM app.t_contractor_hours WHERE contractor_id IN ({users})"), params)
+    db.execute(text("DELETE FROM app.t_timesheet WHERE month LIKE :prefix"), params)
+    db.execute(text(f"DELETE FROM app.m_candidate WHERE candidate_id IN ({users})"), params)
+    db.execute(text("DELETE FROM app.m_user WHERE email_id LIKE :pattern"), params)
+    db.commit()
+
+
+def count_calculation_queries(period_id):
+    """Statements issued by one payroll calculation on a fresh session"""
+    db = SessionLocal()
+    try:
+        with QueryCounter() as counter:
+            result = PayrollCalculator(db).calculate_payroll_for_period(period_id)
+        return counter.count, result['total_contractors']
+    finally:
+        db.close()
+
+
+def test_payroll_query_count():
+    db = SessionLocal()
+
+    try:
+        print("🧪 Testing payroll calculation query count...")
+        small_period = seed_period(db, "small", 1, SMALL)
+        large_period = seed_period(db, "large", 2, LARGE)
+
+        small_queries, small_contractors = count_calculation_queries(small_period)
+        print(f"📊 {small_contractors} contractors: {small_queries} queries")
+        large_queries, large_contractors = count_calculation_queries(large_period)
+        print(f"📊 {large_contractors} contractors: {large_queries} queries")
+
+        assert small_contractors == SMALL, f"Expected {SMALL} contractors, got {small_contractors}"
+        assert large_contractors == LARGE, f"Expected {LARGE} contractors, got {large_contractors}"
+        assert small_queries == large_queries, \
+            f"Query count grows with contractors: {small_queries} vs {large_queries}"
+
+        print("\n✅ Payroll calculation issues a constant number of queries")
+        return True
+
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            cleanup(db)
+            print("🧹 Cleaned up test data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up test data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = test_payroll_query_count()
+    sys.exit(0 if success else 1)
@@ -108,6 +108,14 @@ def test_timesheet_holiday_tracking():
         print(f"✅ Holiday count after 20 standard hours: {test_candidate.holiday_count} (expected: 0.8)")
         assert test_candidate.holiday_count == 0.8, f"Expected 0.8, got {test_candidate.holiday_count}"
         
+        # Test 4: The backfill finds the entry settled, including the forgiven 0.2 holiday hours
+        print("\n🧪 Test 4: Running the holiday backfill over the timesheet")
+        result = crud.backfill_holiday_tracking_for_timesheet_entries(db, timesheet_id=timesheet_id, restart=True)
+        db.refresh(test_candidate)
+        print(f"✅ Backfill wrote {result['ledger_entries']} ledger entries, holiday count: {test_candidate.holiday_count} (expected: 0.8)")
+        assert result['ledger_entries'] == 0, f"Expected no ledger entries, got {result['ledger_entries']}"
+        assert abs(test_candidate.holiday_count - 0.8) < 1e-9, f"Expected 0.8, got {test_candidate.holiday_count}"
+        
         print("\n✅ All timesheet holiday tracking tests passed!")
         return True
         
@@ -120,6 +128,11 @@ def test_timesheet_holiday_tracking():
     finally:
         # Clean up test data
         try:
+            db.query(models.HolidayBackfillCheckpoint).filter(
+                models.HolidayBackfillCheckpoint.job_name == f"timesheet_entries:{timesheet_id}"
+            ).delete()
+            db.query(models.HolidayBalance).filter(models.HolidayBalance.candidate_id == test_candidate_id).delete()
+            db.query(models.HolidayLedgerEntry).filter(models.HolidayLedgerEntry.candidate_id == test_candidate_id).delete()
             db.query(models.TimesheetEntry).filter(models.TimesheetEntry.timesheet_id == timesheet_id).delete()
             db.query(models.Timesheet).filter(models.Timesheet.timesheet_id == timesheet_id).delete()
             db.query(models.Candidate).filter(models.Candidate.candidate_id == test_candidate_id).delete()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script for the timesheet CSV import (services/timesheet_import.py)
+
+Imports a small CSV for a test candidate with an active placement and contract
+rates, and checks that:
+  - valid rows are saved with pcc_id, tcr_id and the contract pay/bill rates
+  - standard_hours / total_hours are filled from the rate columns like the grid
+  - bad rows (unknown contractor, bad number, missing rate, duplicate) are reported by row number
+  - importing the file again updates the saved rows instead of adding new ones
+"""
+
+import sys
+import os
+import io
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app import models
+from app.services.timesheet_import import import_contractor_hours_file
+from sqlalchemy import text
+from uuid import uuid4
+from datetime import date
+
+
+def build_csv(candidate_id, email, standard_hours):
+    lines = [
+        "Contractor ID,Email,Work Date,1-1,1-3,Notes",
+        f"{candidate_id},,07/03/2025,{standard_hours},4,first week",
+        f",{email.upper()},2025-03-14,{standard_hours},,second week by email",
+        f"{uuid4()},,2025-03-14,40,,unknown contractor",
+        f"{candidate_id},,2025-03-21,forty,,bad number",
+        f"{candidate_id},,2025-03-28,8,,",
+        f"{candidate_id},,07/03/2025,40,,duplicate",
+        f"{candidate_id},,2024-12-20,40,,before the rates apply",
+    ]
+    return io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def saved_hours(db, candidate_id):
+    db.expire_all()
+    return db.query(models.ContractorHours).filter(
+        models.ContractorHours.contractor_id == candidate_id,
+        models.ContractorHours.deleted_on.is_(None)
+    ).order_by(models.ContractorHours.work_date).all()
+
+
+def active_rate_hours(db, tch_id):
+    return db.query(models.ContractorRateHours).filter(
+        models.ContractorRateHours.tch_id == tch_id,
+        models.ContractorRateHours.deleted_on.is_(None)
+    ).all()
+
+
+def test_timesheet_import():
+    db = SessionLocal()
+    candidate_id = str(uuid4())
+    client_id = str(uuid4())
+    timesheet_id = str(uuid4())
+    email = f"import-{candidate_id[:8]}@example.com"
+
+    try:
+        print("🧪 Testing timesheet import...")
+
+        db.add(models.MUser(user_id=candidate_id, first_name="Import", last_name="Candidate", email_id=email))
+        db.add(models.Client(client_id=client_id, client_name="Import Test Client"))
+        db.add(models.Timesheet(timesheet_id=timesheet_id, status="test", month="Timesheet import test"))
+        db.flush()
+        db.add(models.Candidate(candidate_id=candidate_id, holiday_count=0.0))
+        placement = models.P_CandidateClient(candidate_id=candidate_id, client_id=client_id, status=0)
+        db.add(placement)
+        db.flush()
+        db.add(models.ContractRate(pcc_id=placement.pcc_id, rate_type=1, rate_frequency=1,
+                                   pay_rate=20.0, bill_rate=30.0, date_applicable=date(2025, 1, 1)))
+        db.add(models.ContractRate(pcc_id=placement.pcc_id, rate_type=1, rate_frequency=3,
+                                   pay_rate=25.0, bill_rate=37.5, date_applicable=date(2025, 1, 1)))
+        db.commit()
+        pcc_id = placement.pcc_id
+
+        # Test 1: Valid rows are saved, bad rows are reported
+        print("\n🧪 Test 1: Importing the CSV")
+        result = import_contractor_hours_file(db, timesheet_id, build_csv(candidate_id, email, 40), "hours.csv")
+        assert result['rows'] == 7, f"Expected 7 rows, got {result['rows']}"
+        assert result['inserted'] == 3 and result['failed'] == 4, f"Unexpected counts: {result}"
+        failed_rows = sorted(error['row'] for error in result['errors'])
+        assert failed_rows == [4, 5, 7, 8], f"Unexpected failed rows: {result['errors']}"
+        assert result['ignored_columns'] == ['Notes'], f"Unexpected ignored columns: {result['ignored_columns']}"
+        print(f"✅ {result['inserted']} rows saved, errors on rows {failed_rows}")
+
+        # Test 2: References and grid fields are filled in
+        print("\n🧪 Test 2: Checking the saved rows")
+        rows = saved_hours(db, candidate_id)
+        first = rows[0]
+        assert first.work_date == date(2025, 3, 7) and first.pcc_id == pcc_id, "pcc_id not resolved"
+        assert first.standard_hours == 40 and first.weekend_hours == 4 and first.total_hours == 44, \
+            f"Grid fields not filled: {first.standard_hours}, {first.weekend_hours}, {first.total_hours}"
+        rates = {(r.rate_type_id, r.rate_frequency_id): r for r in active_rate_hours(db, first.tch_id)}
+        assert rates[(1, 1)].pay_rate == 20.0 and rates[(1, 3)].bill_rate == 37.5, "Contract rates not applied"
+        print(f"✅ pcc_id={first.pcc_id}, rate hours={sorted(rates)}")
+
+        # Test 3: Re-importing updates rows instead of duplicating them
+        print("\n🧪 Test 3: Re-importing with 35 standard hours")
+        result = import_contractor_hours_file(db, timesheet_id, build_csv(candidate_id, email, 35), "hours.csv")
+        assert result['inserted'] == 0 and result['updated'] == 3, f"Unexpected counts: {result}"
+        rows = saved_hours(db, candidate_id)
+        assert len(rows) == 3 and rows[0].standard_hours == 35, "Rows were duplicated or not updated"
+        assert len(active_rate_hours(db, rows[0].tch_id)) == 2, "Rate hours were not replaced"
+        print("✅ Rows updated in place")
+
+        # Test 4: Holiday tracking follows the imported hours (35 + 35 + 8 standard hours); contractor
+        # hours feed the holiday summary balance, not holiday_count
+        print("\n🧪 Test 4: Holiday ledger")
+        db.expire_all()
+        balance = db.query(models.HolidayBalance).filter(
+            models.HolidayBalance.candidate_id == candidate_id,
+            models.HolidayBalance.source == 'contractor_hours'
+        ).first()
+        assert balance and abs(balance.total_holiday - 78 * 0.08) < 1e-6, f"Unexpected balance {balance and balance.total_holiday}"
+        candidate = db.query(models.Candidate).filter(models.Candidate.candidate_id == candidate_id).first()
+        assert abs(candidate.holiday_count) < 1e-6, f"Unexpected holiday_count {candidate.holiday_count}"
+        print(f"✅ total_holiday={balance.total_holiday}, holiday_count={candidate.holiday_count}")
+
+        print("\n🎉 All timesheet import tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+
+    finally:
+        try:
+            params = {"candidate_id": candidate_id, "client_id": client_id, "timesheet_id": timesheet_id}
+            db.execute(text("DELETE FROM app.t_holiday_balance WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_holiday_ledger WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_payroll_dirty_contractor WHERE contractor_id = :candidate_id"), params)
+            db.execute(text("""
+                DELETE FROM app.t_contractor_rate_hours
+                WHERE tch_id IN (SELECT tch_id FROM app.t_contractor_hours WHERE contractor_id = :candidate_id)
+            """), params)
+            db.execute(text("DELETE FROM app.t_contractor_hours WHERE contractor_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.t_timesheet WHERE timesheet_id = :timesheet_id"), params)
+            db.execute(text("""
+                DELETE FROM app.t_contract_rates
+                WHERE pcc_id IN (SELECT pcc_id FROM app.p_candidate_client WHERE candidate_id = :candidate_id)
+            """), params)
+            db.execute(text("DELETE FROM app.p_candidate_client WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.m_client WHERE client_id = :client_id"), params)
+            db.execute(text("DELETE FROM app.m_candidate WHERE candidate_id = :candidate_id"), params)
+            db.execute(text("DELETE FROM app.m_user WHERE user_id = :candidate_id"), params)
+            db.commit()
+            print("🧹 Cleaned up test data")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to clean up test data: {e}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    success = test_timesheet_import()
+    sys.exit(0 if success else 1)
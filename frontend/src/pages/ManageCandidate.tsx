@@ -33,6 +33,7 @@ interface Row {
   startDate: string;
   finishDate: string;
   managerName: string;
+  costCenters: string;
 }
 
 const ManageCandidate: React.FC = () => {
@@ -43,6 +44,7 @@ const ManageCandidate: React.FC = () => {
   
   // API state
   const [candidates, setCandidates] = useState<CandidateDTO[]>([]);
+  const [costCentersByCandidate, setCostCentersByCandidate] = useState<Record<string, any[]>>({});
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [pagination, setPagination] = useState({
@@ -71,6 +73,20 @@ const ManageCandidate: React.FC = () => {
       }
       
       setCandidates(response);
+
+      // Load cost centers for the whole list in one request
+      const candidateIds = response.map((c) => c.candidate_id).filter(Boolean);
+      if (candidateIds.length > 0) {
+        try {
+          const costCenters = await candidatesAPI.getCostCentersForCandidates(candidateIds);
+          setCostCentersByCandidate(costCenters);
+        } catch (ccErr) {
+          console.error('❌ Error loading cost centers:', ccErr);
+          setCostCentersByCandidate({});
+        }
+      } else {
+        setCostCentersByCandidate({});
+      }
       setPagination({
         page: 1,
         limit: response.length,
@@ -125,9 +141,13 @@ const ManageCandidate: React.FC = () => {
           startDate: candidate.contract_start_date || 'N/A',
           finishDate: candidate.contract_end_date || 'N/A',
           managerName: 'N/A', // This would come from a separate API call
+          costCenters: (costCentersByCandidate[candidate.candidate_id] || [])
+            .map((cc: any) => cc.cc_name || cc.cc_number)
+            .filter(Boolean)
+            .join(', ') || 'N/A',
         };
       });
-  }, [candidates, query]);
+  }, [candidates, query, costCentersByCandidate]);
 
   return (
     <Container maxWidth="lg">
@@ -194,19 +214,20 @@ const ManageCandidate: React.FC = () => {
                   <TableCell>Start Date</TableCell>
                   <TableCell>Finish Date</TableCell>
                   <TableCell>Manager Name</TableCell>
+                  <TableCell>Cost Centers</TableCell>
                 </TableRow>
               </TableHead>
               <TableBody>
                 {loading ? (
                   <TableRow>
-                    <TableCell colSpan={5} sx={{ textAlign: 'center', py: 2 }}>
+                    <TableCell colSpan={6} sx={{ textAlign: 'center', py: 2 }}>
                       <CircularProgress />
                       <Typography variant="body2" sx={{ mt: 2 }}>Loading candidates...</Typography>
                     </TableCell>
                   </TableRow>
                 ) : rows.length === 0 ? (
                   <TableRow>
-                    <TableCell colSpan={5} sx={{ textAlign: 'center', py: 2 }}>
+                    <TableCell colSpan={6} sx={{ textAlign: 'center', py: 2 }}>
                       <Typography variant="body2" color="text.secondary">
                         No candidates found
                       </Typography>
@@ -241,6 +262,7 @@ const ManageCandidate: React.FC = () => {
                       <TableCell>{r.startDate}</TableCell>
                       <TableCell>{r.finishDate}</TableCell>
                       <TableCell>{r.managerName}</TableCell>
+                      <TableCell>{r.costCenters}</TableCell>
                     </TableRow>
                   ))
                 )}
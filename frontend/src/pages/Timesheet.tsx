@@ -1,4 +1,4 @@
-import React, { useMemo, useState, useEffect } from 'react';
+import React, { useMemo, useState, useEffect, useRef } from 'react';
 import { useParams, useSearchParams, useNavigate } from 'react-router-dom';
 import { timesheetsAPI, TimesheetDetailDTO, TimesheetEntryDTO, candidatesAPI, CandidateDTO, ContractRateOutDTO, ContractorHoursCreateDTO, ContractorHoursDTO, ContractorHoursUpsertDTO, ContractorRateHoursCreateDTO, ContractorRateHoursOutDTO, MultipleRateHoursCreateDTO } from '../services/api';
 import { RateTypeDTO, RateFrequencyDTO } from '../types';
@@ -116,6 +116,8 @@ const Timesheet: React.FC = () => {
   const [dateRange, setDateRange] = useState('');
   const [saving, setSaving] = useState(false);
   const [contractorHoursMap, setContractorHoursMap] = useState<Record<string, ContractorHoursDTO>>({});
+  // Delta-sync watermark of the contractor hours in contractorHoursMap
+  const contractorHoursWatermark = useRef<number | null>(null);
   
   // Notification state
   const [toastOpen, setToastOpen] = useState(false);
@@ -231,14 +233,16 @@ const Timesheet: React.FC = () => {
 
           // Fetch existing contractor hours for this timesheet and map by contractor_id
           try {
-            const tchList = await timesheetsAPI.listContractorHours(timesheetId);
+            const { changed: tchList, watermark } = await timesheetsAPI.listContractorHoursChanges(timesheetId);
             const map: Record<string, ContractorHoursDTO> = {};
             tchList.forEach(t => { if (t.contractor_id) map[t.contractor_id] = t; });
             setContractorHoursMap(map);
+            contractorHoursWatermark.current = watermark;
             console.log('✅ Loaded contractor hours count:', tchList.length);
           } catch (err) {
             console.error('❌ Error loading contractor hours:', err);
             setContractorHoursMap({});
+            contractorHoursWatermark.current = null;
           }
         }
       } catch (error) {
@@ -719,11 +723,18 @@ const Timesheet: React.FC = () => {
     if (!timesheetData?.timesheet_id) return;
     
     try {
-      const tchList = await timesheetsAPI.listContractorHours(timesheetData.timesheet_id);
-      const map: Record<string, ContractorHoursDTO> = {};
-      tchList.forEach(t => { if (t.contractor_id) map[t.contractor_id] = t; });
-      setContractorHoursMap(map);
-      console.log('✅ Refreshed contractor hours data, count:', tchList.length);
+      // Only rows changed since the last load; merged into the current map
+      const since = contractorHoursWatermark.current;
+      const delta = await timesheetsAPI.listContractorHoursChanges(timesheetData.timesheet_id, since);
+      setContractorHoursMap(prev => {
+        const map: Record<string, ContractorHoursDTO> = delta.full ? {} : { ...prev };
+        const deleted = new Set(delta.deleted);
+        Object.keys(map).forEach(key => { if (deleted.has(map[key].tch_id)) delete map[key]; });
+        delta.changed.forEach(t => { if (t.contractor_id) map[t.contractor_id] = t; });
+        return map;
+      });
+      contractorHoursWatermark.current = delta.watermark;
+      console.log('✅ Refreshed contractor hours data, changed:', delta.changed.length, 'deleted:', delta.deleted.length);
     } catch (err) {
       console.error('❌ Failed to refresh contractor hours:', err);
     }
@@ -785,8 +796,8 @@ const Timesheet: React.FC = () => {
           timesheet_id: timesheetData.timesheet_id,
           pcc_id: pccId,
           standard_hours: row.hours["1-1"] ?? 0,
-          weekend_hours: row.hours["1-3"] ?? undefined,
-          bank_holiday_hours: row.hours["8-1"] ?? undefined,
+          weekend_hours: row.hours["1-3"] ?? null, // null clears a cell emptied since the last load
+          bank_holiday_hours: row.hours["8-1"] ?? null,
           total_hours: total,
           day: weekEnd,
           week: weekNumber ?? undefined, // Store week number for now (temporary fix)
@@ -799,8 +810,11 @@ const Timesheet: React.FC = () => {
 
       if (payload.length > 0) {
         console.log('🔍 DEBUG: Sending payload to backend:', JSON.stringify(payload, null, 2));
-        const savedContractorHours = await timesheetsAPI.upsertContractorHours(timesheetData.timesheet_id, payload);
-        console.log(`✅ Saved contractor hours and rate hours for ${savedContractorHours.length} contractors`);
+        // Columnar, gzipped, and only the cells that differ from the loaded rows
+        const previous: Record<string, ContractorHoursDTO> = {};
+        Object.values(contractorHoursMap).forEach((tch) => { previous[tch.tch_id] = tch; });
+        const saved = await timesheetsAPI.upsertContractorHoursColumnar(timesheetData.timesheet_id, payload, previous);
+        console.log(`✅ Saved contractor hours and rate hours for ${saved.tch_id.length} contractors`);
       }
       
       // Refresh the contractor hours data to get the latest tch_ids
@@ -139,6 +139,10 @@ export const clientsAPI = {
     const res = await api.get('/api/clients/', { params });
     return res.data;
   },
+  search: async (q: string, limit: number = 10): Promise<{ client_id: string; client_name?: string; score: number }[]> => {
+    const res = await api.get('/api/clients/search', { params: { q, limit } });
+    return res.data;
+  },
   get: async (clientId: string): Promise<ClientDTO> => {
     const res = await api.get(`/api/clients/${clientId}`);
     return res.data;
@@ -345,6 +349,10 @@ export interface ContractWithRatesOutDTO {
 }
 
 export const candidatesAPI = {
+  search: async (q: string, limit: number = 10): Promise<{ user_id: string; first_name?: string; last_name?: string; email_id?: string; pps_number?: string; score: number }[]> => {
+    const res = await api.get('/api/candidates/search', { params: { q, limit } });
+    return res.data;
+  },
   list: async (params?: { page?: number; limit?: number }): Promise<CandidateListResponseDTO> => {
     console.log('Making API call to /api/candidates/list with params:', params);
     try {
@@ -544,6 +552,11 @@ export const candidatesAPI = {
     return res.data;
   },
 
+  getCostCentersForCandidates: async (candidateIds: string[]): Promise<Record<string, any[]>> => {
+    const res = await api.post('/api/candidates/cost-centers', candidateIds);
+    return res.data;
+  },
+
   assignCostCenter: async (userId: string, costCenterData: any): Promise<any> => {
     const res = await api.post(`/api/candidates/${userId}/cost-centers`, costCenterData);
     return res.data;
@@ -722,6 +735,73 @@ export interface TimesheetCreateDTO {
   candidate_ids: string[];
 }
 
+export interface ContractorHoursChangesDTO {
+  changed: ContractorHoursDTO[];
+  deleted: string[];
+  watermark: number | null; // commit-order position, pass back as `since`
+  full: boolean;
+}
+
+export interface ColumnarContractorHoursResultDTO {
+  tch_id: string[];
+  inserted: number;
+  updated: number;
+}
+
+const RATE_HOURS_COLUMNS = ['rate_type_id', 'rate_frequency_id', 'tcr_id', 'quantity', 'pay_rate', 'bill_rate'] as const;
+
+const UNCLEARABLE_COLUMNS = ['tch_id', 'contractor_id', 'work_date', 'timesheet_id', 'rate_hours'];
+
+// Columnar body for /contractor-hours/upsert-columnar: one array per field, with
+// cells equal to the previously loaded row (by tch_id) left out (sent as null).
+// A null or '' cell of an existing row whose loaded value isn't empty is listed
+// under `cleared` so the server sets it to null; undefined cells are left alone.
+export const toColumnarContractorHours = (
+  rows: ContractorHoursUpsertDTO[],
+  previous: Record<string, ContractorHoursDTO> = {}
+) => {
+  const cleared: Record<string, number[]> = {};
+  const cells = rows.map((row, index) => {
+    const before: Record<string, any> = (row.tch_id && previous[row.tch_id]) || {};
+    const changed: Record<string, any> = {};
+    Object.entries(row).forEach(([key, value]) => {
+      if (key === 'rate_hours' || key === 'timesheet_id' || value === undefined) return;
+      if (value === null || value === '') {
+        if (row.tch_id && !UNCLEARABLE_COLUMNS.includes(key) && before[key] != null && before[key] !== '') {
+          (cleared[key] = cleared[key] || []).push(index);
+        }
+        return;
+      }
+      if (key !== 'tch_id' && before[key] === value) return;
+      changed[key] = value;
+    });
+    return changed;
+  });
+
+  const columns: Record<string, any[]> = {};
+  cells.forEach((changed) => Object.keys(changed).forEach((key) => { columns[key] = columns[key] || []; }));
+  Object.keys(columns).forEach((key) => { columns[key] = cells.map((changed) => changed[key] ?? null); });
+
+  const rateHours: Record<string, any[]> = { row: [] };
+  RATE_HOURS_COLUMNS.forEach((key) => { rateHours[key] = []; });
+  rows.forEach((row, index) => {
+    (row.rate_hours || []).forEach((rate) => {
+      rateHours.row.push(index);
+      RATE_HOURS_COLUMNS.forEach((key) => rateHours[key].push(rate[key] ?? null));
+    });
+  });
+
+  return { columns, rate_hours: rateHours, cleared };
+};
+
+const gzipJson = async (value: unknown): Promise<{ body: BlobPart; encoding?: string }> => {
+  const json = JSON.stringify(value);
+  const Compression = (window as any).CompressionStream;
+  if (!Compression) return { body: json };
+  const stream = new Blob([json]).stream().pipeThrough(new Compression('gzip'));
+  return { body: await new Response(stream).arrayBuffer(), encoding: 'gzip' };
+};
+
 export const timesheetsAPI = {
   listSummaries: async (params?: { month?: string }): Promise<TimesheetSummaryDTO[]> => {
     const res = await api.get('/api/timesheets/', { params });
@@ -760,11 +840,47 @@ export const timesheetsAPI = {
     const res = await api.get(`/api/timesheets/${timesheetId}/contractor-hours`);
     return res.data;
   },
+  // Rows changed since `since` (the watermark of the previous call); omit it for a full load
+  listContractorHoursChanges: async (timesheetId: string, since?: number | null): Promise<ContractorHoursChangesDTO> => {
+    const res = await api.get(`/api/timesheets/${timesheetId}/contractor-hours/changes`, {
+      params: since != null ? { since } : undefined,
+    });
+    return res.data;
+  },
   upsertContractorHours: async (timesheetId: string, rows: ContractorHoursUpsertDTO[]): Promise<ContractorHoursDTO[]> => {
     const res = await api.post(`/api/timesheets/${timesheetId}/contractor-hours/upsert`, rows);
     return res.data;
   },
-  
+  upsertContractorHoursColumnar: async (
+    timesheetId: string,
+    rows: ContractorHoursUpsertDTO[],
+    previous: Record<string, ContractorHoursDTO> = {}
+  ): Promise<ColumnarContractorHoursResultDTO> => {
+    const { body, encoding } = await gzipJson(toColumnarContractorHours(rows, previous));
+    const res = await api.post(`/api/timesheets/${timesheetId}/contractor-hours/upsert-columnar`, body, {
+      headers: encoding ? { 'Content-Type': 'application/json', 'Content-Encoding': encoding } : undefined,
+    });
+    return res.data;
+  },
+  importContractorHours: async (timesheetId: string, file: File, clientId?: string): Promise<{
+    message: string;
+    rows: number;
+    imported: number;
+    inserted: number;
+    updated: number;
+    failed: number;
+    ignored_columns: string[];
+    errors: { row: number; errors: string[] }[];
+    errors_truncated: boolean;
+  }> => {
+    const formData = new FormData();
+    formData.append('file', file);
+    const res = await api.post(`/api/timesheets/${timesheetId}/contractor-hours/import`, formData, {
+      params: clientId ? { client_id: clientId } : undefined,
+    });
+    return res.data;
+  },
+
   seedData: async (): Promise<{ seeded: boolean; message?: string; error?: string }> => {
     const res = await api.post('/api/timesheets/seed');
     return res.data;